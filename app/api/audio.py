@@ -1,12 +1,26 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from typing import Optional
-import tempfile
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    UploadFile,
+    File,
+    Form,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, List, Optional
+import asyncio
+import json
 import os
+import time
 import uuid
+import zipfile
 from datetime import datetime, timedelta
-import librosa
-import numpy as np
 
+from app.core.config import settings
 from app.models.schemas import (
     AudioAnalysisRequest,
     AudioAnalysisResponse,
@@ -14,9 +28,31 @@ from app.models.schemas import (
     AudioFeaturesResponse,
     ErrorResponse,
 )
-from app.services.audio_analyzer_simple import AudioAnalyzer
+from app.services.analysis_cache import AnalysisResultCache
+from app.services.analysis_jobs import AnalysisJob, AnalysisJobManager
+from app.services.analysis_pool import (
+    AnalysisPool,
+    AnalysisPoolUnavailableError,
+    AnalysisQueueFullError,
+    AnalysisTimeoutError,
+)
+from app.services.audio_analyzer_simple import ANALYSIS_WINDOWS, AudioAnalyzer
+from app.services.audio_decoders import DecoderUnavailableError, probe_audio_duration
+from app.services.fingerprint import FingerprintIndex
+from app.services.live_analysis import LiveAnalysisSession
+from app.services.session_store import analysis_sessions
 from app.services.spotify_service import SpotifyService
 from app.services.chatgpt_service import ChatGPTService
+from app.services.upload_ingest import (
+    IngestedUpload,
+    UploadTooLargeError,
+    ingest_bytes,
+    decode_spooled_upload,
+    ingest_upload,
+    is_zip_archive,
+    list_zip_audio_entries,
+    spool_upload,
+)
 
 router = APIRouter()
 
@@ -25,15 +61,394 @@ audio_analyzer = AudioAnalyzer()
 spotify_service = SpotifyService()
 chatgpt_service = ChatGPTService()
 
-# 분석 결과 저장소 (메모리 기반)
-analysis_sessions = {}
+
+# 업로드 내용 기반 분석 결과 캐시
+analysis_cache = AnalysisResultCache(
+    analyzer_version=AudioAnalyzer.version,
+    max_memory_entries=settings.ANALYSIS_CACHE_MEMORY_ENTRIES,
+    disk_dir=settings.ANALYSIS_CACHE_DIR or None,
+    max_disk_bytes=settings.ANALYSIS_CACHE_MAX_DISK_BYTES,
+)
+
+# 참조 곡 핑거프린트 인덱스 (python -m app.tools.fingerprint로 생성)
+fingerprint_index = FingerprintIndex(
+    settings.FINGERPRINT_INDEX_DIR, min_matches=settings.FINGERPRINT_MIN_MATCHES
+)
+
+# 비동기 분석 작업 (?async=true)
+analysis_jobs = AnalysisJobManager(retention_seconds=settings.ANALYSIS_JOB_RETENTION)
+_background_tasks = set()
+
+# 업로드 허용 확장자
+ALLOWED_EXTENSIONS = [
+    ".mp3",
+    ".wav",
+    ".flac",
+    ".m4a",
+    ".aac",
+    ".webm",
+    ".mp4",
+    ".ogg",
+]
+
+# 배치 분석에서 분석 대기열이 가득 찼을 때 재시도 횟수
+BATCH_QUEUE_RETRIES = 3
+
+# 진행 이벤트에서 key_tempo 단계로 보고하는 필드
+KEY_TEMPO_FIELDS = ("tempo", "key", "mode")
+
+# CPU 집약적인 분석을 실행하는 프로세스 풀 (main.py lifespan에서 시작/종료)
+analysis_pool = AnalysisPool(
+    workers=settings.ANALYSIS_WORKERS,
+    max_queue=settings.ANALYSIS_QUEUE_SIZE,
+    job_timeout=settings.ANALYSIS_JOB_TIMEOUT,
+)
+
+
+def _resolve_upload_extension(filename: str, content_type: Optional[str]) -> str:
+    """파일명 확장자와 Content-Type으로 실제 형식의 확장자를 정합니다."""
+    file_extension = os.path.splitext(filename)[1].lower()
+
+    # Content-Type 기반으로 실제 형식 확인
+    content_type = content_type or ""
+    if "webm" in content_type:
+        return ".webm"
+    elif "mp4" in content_type:
+        return ".mp4"
+    elif "ogg" in content_type:
+        return ".ogg"
+    elif "wav" in content_type:
+        return ".wav"
+    return file_extension
+
+
+def _validate_analysis_window(analysis_window: str):
+    """지원하는 분석 구간 방식인지 확인합니다."""
+    if analysis_window not in ANALYSIS_WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 analysis_window입니다. 지원 값: {', '.join(ANALYSIS_WINDOWS)}",
+        )
+
+
+def _cache_lookup(
+    analysis_window: str, analysis_type: str = "feature_extraction"
+) -> Callable[[str], Optional[dict]]:
+    """분석 구간 방식별 캐시 조회 함수"""
+    if analysis_type != "identification":
+        return lambda sha256: analysis_cache.get(sha256, variant=analysis_window)
+
+    def lookup(sha256: str) -> Optional[dict]:
+        # 곡 식별 결과가 없거나 인덱스가 다시 빌드된 뒤의 결과이면 미스로 처리
+        cached = analysis_cache.get(sha256, variant=analysis_window)
+        identification = (cached or {}).get("identification")
+        if identification is None:
+            return None
+        if identification.get("build_id") != fingerprint_index.build_id:
+            return None
+        return cached
+
+    return lookup
+
+
+def _identify_track(upload: IngestedUpload) -> Optional[TrackInfo]:
+    """
+    업로드 오디오를 핑거프린트 인덱스에서 찾아 곡 정보를 만듭니다.
+
+    segments는 구간마다 조회해 정렬 해시가 가장 많은 결과를 사용하고,
+    full은 임시 파일에서 구간을 샘플링해 조회합니다.
+
+    Args:
+        upload: ingest_upload 결과 (캐시 미스)
+
+    Returns:
+        TrackInfo (일치하는 곡이 없으면 None)
+    """
+    y, sr = upload.y, upload.sr
+    if upload.audio_path is not None:
+        y, sr = audio_analyzer.load_audio_segments(upload.audio_path)
+    if y is None or y.size == 0:
+        return None
+
+    clips = y if y.ndim == 2 else [y]
+    matches = [
+        match
+        for match in (fingerprint_index.lookup(clip, sr) for clip in clips)
+        if match is not None
+    ]
+    if not matches:
+        print("핑거프린트 일치 곡 없음")
+        return None
+
+    match = max(matches, key=lambda m: m.matches)
+    track = match.track
+    print(
+        f"곡 식별: {track['artist']} - {track['title']} "
+        f"(정렬 해시 {match.matches}/{match.query_hashes}, 신뢰도 {match.confidence:.2f})"
+    )
+    return TrackInfo(
+        track_name=track["title"],
+        artist=track["artist"],
+        album=track.get("album") or "Unknown",
+        release_year=track.get("release_year"),
+        spotify_id=track.get("spotify_id"),
+        confidence=round(match.confidence, 3),
+    )
+
+
+def _generate_analysis_reason(audio_features: AudioFeaturesResponse):
+    """
+    ChatGPT로 분석 설명을 생성합니다.
+
+    Args:
+        audio_features: 분석된 오디오 특징
+
+    Returns:
+        (분석 설명, AI 분석 성공 여부)
+    """
+    print(
+        f"ChatGPT 서비스 상태 확인 - 클라이언트: {chatgpt_service.client is not None}, API 키: {chatgpt_service.api_key is not None}"
+    )
+
+    if chatgpt_service.api_key:  # API 키만 있으면 사용 가능
+        try:
+            features_dict = audio_features.dict()
+            print(f"ChatGPT 분석 요청 - 특징: {features_dict}")
+            analysis_reason = chatgpt_service.analyze_audio_features(features_dict)
+            print(f"ChatGPT 분석 완료 - 결과: {analysis_reason}")
+            return analysis_reason, True
+        except Exception as e:
+            print(f"ChatGPT 분석 실패: {e}")
+            return f"오디오 특징 분석 완료 (AI 분석 실패: {str(e)})", False
+
+    print("ChatGPT API 키가 설정되지 않았습니다.")
+    return "오디오 특징 분석 완료 (AI 분석 서비스 사용 불가)", False
+
+
+def _report_feature_stages(report: Callable[[str, dict], None], features: dict):
+    """특징 결과를 features / key_tempo 단계로 나누어 보고합니다."""
+    report(
+        "features",
+        {k: v for k, v in features.items() if k not in KEY_TEMPO_FIELDS},
+    )
+    report("key_tempo", {k: features[k] for k in KEY_TEMPO_FIELDS})
+
+
+def _full_analysis_timeout(duration: Optional[float]) -> float:
+    """
+    analysis_window=full 작업의 제한 시간을 곡 길이에 맞춰 계산합니다.
+
+    Args:
+        duration: 미리 알아낸 곡 길이 (초, 알 수 없으면 None이며 최대 길이로 가정)
+
+    Returns:
+        제한 시간 (초)
+    """
+    max_duration = settings.ANALYSIS_FULL_MAX_DURATION
+    duration = max_duration if duration is None else min(duration, max_duration)
+    return (
+        settings.ANALYSIS_JOB_TIMEOUT
+        + duration * settings.ANALYSIS_FULL_TIMEOUT_PER_SECOND
+    )
+
+
+async def _run_analysis_job(
+    job: AnalysisJob, upload: IngestedUpload, analysis_type: str, input_type: str
+):
+    """비동기 분석 작업을 실행하고 결과나 오류를 작업에 기록합니다."""
+    try:
+        response = await _analyze_upload(
+            upload,
+            analysis_type,
+            input_type,
+            on_stage=lambda stage, data: analysis_jobs.emit(job, stage, data),
+        )
+        analysis_jobs.complete(job, response.dict())
+    except HTTPException as e:
+        analysis_jobs.fail(job, str(e.detail), e.status_code)
+    except Exception as e:
+        print(f"비동기 분석 작업 실패: {e}")
+        analysis_jobs.fail(job, f"오디오 분석 중 오류가 발생했습니다: {str(e)}")
+    finally:
+        upload.close()
+
+
+async def _analyze_upload(
+    upload: IngestedUpload,
+    analysis_type: str,
+    input_type: str,
+    on_stage: Optional[Callable[[str, dict], None]] = None,
+    include_reason: bool = True,
+) -> AudioAnalysisResponse:
+    """
+    수집된 업로드를 분석하고 세션에 저장합니다.
+
+    Args:
+        upload: ingest_upload 결과
+        analysis_type: 분석 유형
+        input_type: 입력 유형
+        on_stage: 단계가 끝날 때마다 (단계 이름, 중간 결과)로 호출되는 함수
+        include_reason: False이면 ChatGPT 분석을 생략 (캐시된 설명은 사용)
+
+    Returns:
+        분석 결과
+    """
+
+    def report(stage: str, data: dict):
+        if on_stage is not None:
+            on_stage(stage, data)
+
+    # 비동기 작업: 요청에서는 받기만 했으므로 여기서 디코딩 (decoded 단계가 실제 디코딩 뒤에 옴)
+    await decode_spooled_upload(upload, audio_analyzer)
+
+    duration = upload.y.size / upload.sr if upload.y is not None else 0.0
+    full_duration = None
+    if upload.audio_path is not None and upload.cached is None:
+        # full: 디코딩은 워커에서 하므로 헤더로 길이만 확인해 제한 시간 계산에 사용
+        full_duration = await run_in_threadpool(probe_audio_duration, upload.audio_path)
+        duration = full_duration or 0.0
+
+    report(
+        "decoded",
+        {
+            "audio_format": upload.audio_format,
+            "size": upload.size,
+            "duration": duration,
+            "analysis_window": upload.analysis_window,
+            "cached": upload.cached is not None,
+        },
+    )
+
+    track_info = None
+    if upload.cached is not None:
+        # 같은 내용이 이미 분석됨: 디코딩/특징 추출 없이 결과 재사용
+        audio_features = AudioFeaturesResponse(**upload.cached["audio_features"])
+        if analysis_type == "identification":
+            cached_track = upload.cached["identification"]["track_info"]
+            track_info = TrackInfo(**cached_track) if cached_track else None
+        _report_feature_stages(report, audio_features.dict())
+        analysis_reason = upload.cached.get("analysis_reason")
+        if analysis_reason is None and include_reason:
+            analysis_reason, reason_ok = await run_in_threadpool(
+                _generate_analysis_reason, audio_features
+            )
+            if reason_ok:
+                analysis_cache.put(
+                    upload.sha256,
+                    {**upload.cached, "analysis_reason": analysis_reason},
+                    variant=upload.analysis_window,
+                )
+    else:
+        if analysis_type == "identification":
+            # 특징 분석이 끝나면 full 임시 파일이 삭제될 수 있으므로 먼저 조회
+            build_id = fingerprint_index.build_id
+            track_info = await run_in_threadpool(_identify_track, upload)
+
+        # 이벤트 루프를 막지 않도록 워커 프로세스에서 분석
+        try:
+            if upload.audio_path is not None:
+                # full: 워커가 임시 파일을 블록 단위로 디코딩하며 분석
+                features_data, decoded = await analysis_pool.analyze_file(
+                    upload.audio_path,
+                    progress=report,
+                    timeout=_full_analysis_timeout(full_duration),
+                )
+            else:
+                features_data = await analysis_pool.analyze(
+                    upload.y, upload.sr, progress=report
+                )
+                decoded = upload.y is not None and upload.y.size > 0
+        except (AnalysisQueueFullError, AnalysisPoolUnavailableError) as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        except AnalysisTimeoutError as e:
+            raise HTTPException(status_code=504, detail=str(e))
+
+        # 진행 이벤트가 결과보다 늦게 도착한 경우를 위해 결과로도 보고
+        _report_feature_stages(report, features_data)
+        audio_features = AudioFeaturesResponse(**features_data)
+        analysis_reason, reason_ok = None, False
+        if include_reason:
+            analysis_reason, reason_ok = await run_in_threadpool(
+                _generate_analysis_reason, audio_features
+            )
+
+        # 실제로 디코딩된 경우만 캐시 (기본값 결과는 저장하지 않음)
+        if decoded:
+            entry = {
+                "audio_features": audio_features.dict(),
+                # AI 분석이 실패한 경우 다음 히트에서 다시 시도
+                "analysis_reason": analysis_reason if reason_ok else None,
+            }
+            if analysis_type == "identification":
+                entry["identification"] = {
+                    "build_id": build_id,
+                    "track_info": track_info.dict() if track_info else None,
+                }
+            analysis_cache.put(upload.sha256, entry, variant=upload.analysis_window)
+
+    if include_reason:
+        report("ai_reason", {"analysis_reason": analysis_reason})
+
+    return _save_analysis_session(
+        audio_features, analysis_reason, analysis_type, input_type, track_info
+    )
+
+
+def _save_analysis_session(
+    audio_features: AudioFeaturesResponse,
+    analysis_reason: Optional[str],
+    analysis_type: str,
+    input_type: str,
+    track_info: Optional[TrackInfo] = None,
+) -> AudioAnalysisResponse:
+    """분석 결과를 세션에 저장하고 응답을 만듭니다."""
+    # 곡 식별 결과가 없으면 기본값 반환
+    if analysis_type == "identification" and track_info is None:
+        track_info = TrackInfo(
+            track_name="식별된 곡 없음",
+            artist="Unknown",
+            album="Unknown",
+            confidence=0.0,
+        )
+
+    # 세션 ID 생성
+    session_id = str(uuid.uuid4())
+
+    # 분석 결과를 세션에 저장
+    analysis_sessions[session_id] = {
+        "audio_features": audio_features,
+        "analysis_reason": analysis_reason,
+        "track_info": track_info,
+        "timestamp": datetime.now(),
+        "analysis_type": analysis_type,
+        "input_type": input_type,
+    }
+    print(f"분석 세션 저장 완료: {session_id}")
+    print(
+        f"저장된 오디오 특징: danceability={audio_features.danceability:.2f}, energy={audio_features.energy:.2f}, valence={audio_features.valence:.2f}, tempo={audio_features.tempo:.1f}"
+    )
+
+    return AudioAnalysisResponse(
+        session_id=session_id,
+        analysis_type=analysis_type,
+        result=track_info,
+        audio_features=audio_features,
+        analysis_reason=analysis_reason,
+    )
 
 
 @router.post("/analyze", response_model=AudioAnalysisResponse)
 async def analyze_audio(
+    request: Request,
     file: UploadFile = File(...),
     analysis_type: str = Form(...),
     input_type: str = Form(...),
+    analysis_window: str = Form("prefix"),
+    async_mode: bool = Query(False, alias="async"),
 ):
     """
     오디오 파일을 분석합니다.
@@ -42,9 +457,11 @@ async def analyze_audio(
         file: 업로드된 오디오 파일
         analysis_type: 분석 유형 ("identification" | "feature_extraction")
         input_type: 입력 유형 ("microphone" | "file" | "spotify")
+        analysis_window: 분석 구간 ("prefix": 앞부분 30초 | "segments": 곡 전체에서 샘플링한 구간 | "full": 곡 전체 스트리밍 분석)
+        async_mode: True이면 업로드 수신 후 작업 ID를 바로 반환 (202)
 
     Returns:
-        분석 결과
+        분석 결과 (비동기 모드에서는 작업 ID와 상태/이벤트 URL)
     """
     try:
         # 파일 유효성 검사
@@ -52,30 +469,8 @@ async def analyze_audio(
             raise HTTPException(status_code=400, detail="파일명이 없습니다.")
 
         # 파일 확장자 검사 (더 유연하게 처리)
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        allowed_extensions = [
-            ".mp3",
-            ".wav",
-            ".flac",
-            ".m4a",
-            ".aac",
-            ".webm",
-            ".mp4",
-            ".ogg",
-        ]
-
-        # Content-Type 기반으로 실제 형식 확인
-        content_type = file.content_type or ""
-        actual_extension = file_extension
-
-        if "webm" in content_type:
-            actual_extension = ".webm"
-        elif "mp4" in content_type:
-            actual_extension = ".mp4"
-        elif "ogg" in content_type:
-            actual_extension = ".ogg"
-        elif "wav" in content_type:
-            actual_extension = ".wav"
+        allowed_extensions = ALLOWED_EXTENSIONS
+        actual_extension = _resolve_upload_extension(file.filename, file.content_type)
 
         if actual_extension not in allowed_extensions:
             raise HTTPException(
@@ -83,134 +478,406 @@ async def analyze_audio(
                 detail=f"지원하지 않는 파일 형식입니다. 지원 형식: {', '.join(allowed_extensions)}",
             )
 
-        # 임시 파일로 저장 (실제 형식에 맞는 확장자 사용)
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=actual_extension
-        ) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        _validate_analysis_window(analysis_window)
 
+        # 동기 모드: 업로드를 조각 단위로 읽으며 크기 제한, 해시, 디코딩을 동시에 처리
+        # 비동기 모드: 받으면서 해시만 계산하고 디코딩은 분석 작업에서 진행
+        ingest = spool_upload if async_mode else ingest_upload
         try:
-            # 오디오 분석
-            features = audio_analyzer.extract_features(temp_file_path)
+            upload = await ingest(
+                file,
+                audio_analyzer,
+                max_bytes=settings.MAX_FILE_SIZE,
+                lookup=_cache_lookup(analysis_window, analysis_type),
+                analysis_window=analysis_window,
+            )
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
 
-            # 오디오 데이터 로드 (추가 분석용)
+        if not async_mode:
             try:
-                y, sr = audio_analyzer._load_audio_safely(temp_file_path)
-                if y is None or len(y) == 0:
-                    y, sr = None, 44100  # 기본값
-            except:
-                y, sr = None, 44100  # 기본값
-
-            # 실제 계산된 템포 가져오기
-            actual_tempo = features.get("tempo", 120)
-            if y is not None and len(y) > sr * 5:  # 최소 5초 이상
+                return await _analyze_upload(upload, analysis_type, input_type)
+            finally:
+                upload.close()
+
+        # 비동기 모드: 작업 ID를 바로 반환하고 나머지 분석은 백그라운드에서 진행
+        job = analysis_jobs.create()
+        task = asyncio.create_task(
+            _run_analysis_job(job, upload, analysis_type, input_type)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+        return JSONResponse(
+            status_code=202,
+            content={
+                "job_id": job.job_id,
+                "status": job.status,
+                "status_url": str(
+                    request.url_for("get_analysis_job", job_id=job.job_id)
+                ),
+                "events_url": str(
+                    request.url_for("stream_analysis_job_events", job_id=job.job_id)
+                ),
+            },
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"오디오 분석 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """
+    비동기 분석 작업의 상태를 가져옵니다.
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        작업 상태, 끝난 단계, 결과(AudioAnalysisResponse) 또는 오류
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job_events(job_id: str):
+    """
+    비동기 분석 작업의 단계 진행 상황을 SSE로 전달합니다.
+
+    decoded, features, key_tempo, ai_reason 단계 뒤에 completed(결과) 또는
+    failed(오류) 이벤트를 보내고 스트림을 닫습니다.
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        text/event-stream 응답
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+
+    async def event_stream():
+        async for event in analysis_jobs.subscribe(job):
+            payload = json.dumps(event, ensure_ascii=False)
+            yield f"event: {event['stage']}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/analyze/batch")
+async def analyze_audio_batch(
+    files: List[UploadFile] = File(...),
+    analysis_type: str = Form("feature_extraction"),
+    input_type: str = Form("file"),
+    include_reason: bool = Form(False),
+    analysis_window: str = Form("prefix"),
+):
+    """
+    여러 오디오 파일(또는 zip)을 한 번에 분석합니다.
+
+    파일들은 병렬로 디코딩/분석되며, 각 파일의 결과는 끝나는 순서대로 한 줄씩
+    NDJSON으로 전달됩니다. 마지막 줄은 전체 요약입니다.
+
+    Args:
+        files: 오디오 파일 또는 오디오가 들어 있는 zip 파일들
+        analysis_type: 분석 유형
+        input_type: 입력 유형
+        include_reason: True이면 파일마다 ChatGPT 분석 설명을 생성
+        analysis_window: 분석 구간 ("prefix" | "segments" | "full")
+
+    Returns:
+        application/x-ndjson 스트림 (파일별 결과, 단계별 소요 시간, 요약)
+    """
+    _validate_analysis_window(analysis_window)
+    lookup = _cache_lookup(analysis_window, analysis_type)
+
+    archives = []
+    items = []  # (파일명, 업로드 파일, zip 항목 또는 None)
+    try:
+        for file in files:
+            filename = file.filename or "unknown"
+            if is_zip_archive(file.file):
                 try:
-                    # calculate_danceability에서 계산된 템포 사용
-                    tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-                    actual_tempo = float(tempo)
-                    print(
-                        f"실제 계산된 템포: {actual_tempo:.1f} BPM (오디오 길이: {len(y)/sr:.1f}초)"
+                    archive = zipfile.ZipFile(file.file)
+                except zipfile.BadZipFile:
+                    raise HTTPException(
+                        status_code=400, detail=f"잘못된 zip 파일입니다: {filename}"
                     )
-                except Exception as e:
-                    print(f"템포 계산 실패: {e}")
-                    actual_tempo = features.get("tempo", 120)
+                archives.append(archive)
+                for info in list_zip_audio_entries(archive, ALLOWED_EXTENSIONS):
+                    items.append((f"{filename}/{info.filename}", archive, info))
             else:
-                print(
-                    f"오디오가 너무 짧음: {len(y)/sr if y is not None else 0:.1f}초, 기본 템포 사용"
-                )
+                items.append((filename, file, None))
 
-            # Spotify Audio Features 형식으로 변환
-            audio_features = AudioFeaturesResponse(
-                danceability=(
-                    audio_analyzer.calculate_danceability(y, sr)
-                    if y is not None
-                    else 0.5
-                ),
-                energy=audio_analyzer.calculate_energy(y, sr) if y is not None else 0.5,
-                valence=(
-                    audio_analyzer.calculate_valence(y, sr) if y is not None else 0.5
-                ),
-                tempo=actual_tempo,
-                key=audio_analyzer.estimate_key_and_mode(temp_file_path)[0],
-                mode=audio_analyzer.estimate_key_and_mode(temp_file_path)[1],
-                loudness=features.get("rms_mean", 0) * 100,  # 대략적인 변환
-                acousticness=0.5,  # 기본값
-                instrumentalness=0.5,  # 기본값
-                speechiness=0.1,  # 기본값
-                liveness=0.1,  # 기본값
-                duration_ms=int(features.get("duration", 0) * 1000),
-                time_signature=4,  # 기본값
+        if not items:
+            raise HTTPException(
+                status_code=400, detail="분석할 오디오 파일이 없습니다."
             )
+        if len(items) > settings.BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"한 번에 최대 {settings.BATCH_MAX_FILES}개 파일까지 분석할 수 있습니다.",
+            )
+    except HTTPException:
+        for archive in archives:
+            archive.close()
+        raise
 
-            # ChatGPT 분석
-            analysis_reason = None
-            print(
-                f"ChatGPT 서비스 상태 확인 - 클라이언트: {chatgpt_service.client is not None}, API 키: {chatgpt_service.api_key is not None}"
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    # 같은 zip 파일 객체를 여러 스레드에서 동시에 읽지 않도록 보호
+    archive_lock = asyncio.Lock()
+
+    async def ingest(source, info) -> IngestedUpload:
+        if info is None:
+            return await ingest_upload(
+                source,
+                audio_analyzer,
+                max_bytes=settings.MAX_FILE_SIZE,
+                lookup=lookup,
+                analysis_window=analysis_window,
             )
+        if info.file_size > settings.MAX_FILE_SIZE:
+            raise UploadTooLargeError(settings.MAX_FILE_SIZE)
+        async with archive_lock:
+            data = await run_in_threadpool(source.read, info)
+        return await ingest_bytes(
+            data, audio_analyzer, lookup=lookup, analysis_window=analysis_window
+        )
 
-            if chatgpt_service.api_key:  # API 키만 있으면 사용 가능
-                try:
-                    features_dict = audio_features.dict()
-                    print(f"ChatGPT 분석 요청 - 특징: {features_dict}")
-                    analysis_reason = chatgpt_service.analyze_audio_features(
-                        features_dict
+    async def process(index: int, filename: str, source, info) -> dict:
+        started = time.perf_counter()
+        item = {"index": index, "filename": filename}
+        marks = {}
+
+        def on_stage(stage: str, data: dict):
+            marks.setdefault(stage, time.perf_counter())
+
+        try:
+            if info is None:
+                extension = _resolve_upload_extension(filename, source.content_type)
+                if extension not in ALLOWED_EXTENSIONS:
+                    raise HTTPException(
+                        status_code=400, detail="지원하지 않는 파일 형식입니다."
                     )
-                    print(f"ChatGPT 분석 완료 - 결과: {analysis_reason}")
-                except Exception as e:
-                    print(f"ChatGPT 분석 실패: {e}")
-                    analysis_reason = f"오디오 특징 분석 완료 (AI 분석 실패: {str(e)})"
-            else:
-                print("ChatGPT API 키가 설정되지 않았습니다.")
-                analysis_reason = "오디오 특징 분석 완료 (AI 분석 서비스 사용 불가)"
 
-            # 곡 식별 (현재는 기본값 반환)
-            track_info = None
-            if analysis_type == "identification":
-                track_info = TrackInfo(
-                    track_name="식별된 곡 없음",
-                    artist="Unknown",
-                    album="Unknown",
-                    confidence=0.0,
-                )
+            async with semaphore:
+                acquired = time.perf_counter()
+                upload = await ingest(source, info)
+                decoded_at = time.perf_counter()
+                try:
+                    for attempt in range(BATCH_QUEUE_RETRIES + 1):
+                        try:
+                            response = await _analyze_upload(
+                                upload,
+                                analysis_type,
+                                input_type,
+                                on_stage=on_stage,
+                                include_reason=include_reason,
+                            )
+                            break
+                        except HTTPException as e:
+                            # 분석 대기열이 가득 찬 경우 Retry-After만큼 기다렸다가 재시도
+                            if e.status_code != 503 or attempt == BATCH_QUEUE_RETRIES:
+                                raise
+                            await asyncio.sleep(float(e.headers["Retry-After"]))
+                finally:
+                    upload.close()
 
-            # 세션 ID 생성
-            session_id = str(uuid.uuid4())
-
-            # 분석 결과를 세션에 저장
-            analysis_sessions[session_id] = {
-                "audio_features": audio_features,
-                "analysis_reason": analysis_reason,
-                "track_info": track_info,
-                "timestamp": datetime.now(),
-                "analysis_type": analysis_type,
-                "input_type": input_type,
+            finished = time.perf_counter()
+            analyzed_at = marks.get("key_tempo", finished)
+            item.update(
+                {
+                    "status": "ok",
+                    "cached": upload.cached is not None,
+                    "result": response.dict(),
+                }
+            )
+            timings = {
+                "wait_ms": (acquired - started) * 1000,
+                "decode_ms": (decoded_at - acquired) * 1000,
+                "analysis_ms": (analyzed_at - decoded_at) * 1000,
+                "total_ms": (finished - started) * 1000,
             }
-            print(f"분석 세션 저장 완료: {session_id}")
-            print(
-                f"저장된 오디오 특징: danceability={audio_features.danceability:.2f}, energy={audio_features.energy:.2f}, valence={audio_features.valence:.2f}, tempo={audio_features.tempo:.1f}"
+            if include_reason:
+                timings["reason_ms"] = (finished - analyzed_at) * 1000
+        except UploadTooLargeError as e:
+            item.update({"status": "error", "status_code": 413, "error": str(e)})
+            timings = {"total_ms": (time.perf_counter() - started) * 1000}
+        except HTTPException as e:
+            item.update(
+                {"status": "error", "status_code": e.status_code, "error": e.detail}
             )
-
-            return AudioAnalysisResponse(
-                session_id=session_id,
-                analysis_type=analysis_type,
-                result=track_info,
-                audio_features=audio_features,
-                analysis_reason=analysis_reason,
+            timings = {"total_ms": (time.perf_counter() - started) * 1000}
+        except Exception as e:
+            print(f"배치 분석 실패 ({filename}): {e}")
+            item.update(
+                {
+                    "status": "error",
+                    "status_code": 500,
+                    "error": f"오디오 분석 중 오류가 발생했습니다: {str(e)}",
+                }
             )
+            timings = {"total_ms": (time.perf_counter() - started) * 1000}
+
+        item["timings"] = {key: round(value, 1) for key, value in timings.items()}
+        return item
+
+    async def result_stream():
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(process(index, filename, source, info))
+            for index, (filename, source, info) in enumerate(items)
+        ]
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                succeeded += item["status"] == "ok"
+                yield json.dumps(item, ensure_ascii=False) + "\n"
 
+            summary = {
+                "summary": True,
+                "total": len(items),
+                "succeeded": succeeded,
+                "failed": len(items) - succeeded,
+                "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            print(
+                f"배치 분석 완료: {succeeded}/{len(items)}개 성공 ({summary['total_ms']:.0f}ms)"
+            )
+            yield json.dumps(summary, ensure_ascii=False) + "\n"
         finally:
-            # 임시 파일 삭제
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+            # 클라이언트가 연결을 끊은 경우 남은 작업 취소
+            for task in tasks:
+                task.cancel()
+            for archive in archives:
+                archive.close()
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"오디오 분석 중 오류가 발생했습니다: {str(e)}"
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+@router.websocket("/stream")
+async def stream_audio(
+    websocket: WebSocket,
+    input_format: str = Query("pcm_s16le", alias="format"),
+    sample_rate: int = 48000,
+    channels: int = 1,
+    analysis_type: str = "feature_extraction",
+    include_reason: bool = True,
+):
+    """
+    녹음 중인 오디오를 WebSocket으로 받아 실시간으로 분석합니다.
+
+    프로토콜:
+        - 쿼리: format (pcm_s16le | pcm_f32le | opus), sample_rate, channels
+          (PCM 입력만 해당), analysis_type, include_reason
+        - 클라이언트 -> 서버: 바이너리 메시지로 오디오 조각, 녹음이 끝나면
+          텍스트 메시지 {"type": "stop"}
+        - 서버 -> 클라이언트: {"type": "ready"}, LIVE_UPDATE_INTERVAL초마다
+          {"type": "features", ...}, 마지막에 {"type": "result", ...}
+          (AudioAnalysisResponse 필드) 또는 {"type": "error", "detail": ...}
+
+    결과는 input_type="microphone"으로 analysis_sessions에 저장되므로
+    session_id로 추천 API를 바로 호출할 수 있습니다.
+    """
+    await websocket.accept()
+    try:
+        session = LiveAnalysisSession(
+            audio_analyzer,
+            input_format=input_format,
+            sample_rate=sample_rate,
+            channels=channels,
+            ring_seconds=settings.LIVE_RING_SECONDS,
         )
+    except (ValueError, DecoderUnavailableError) as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1008)
+        return
+
+    loop = asyncio.get_running_loop()
+    interval = settings.LIVE_UPDATE_INTERVAL
+    next_update = loop.time() + interval
+    try:
+        await websocket.send_json({"type": "ready", "sample_rate": session.sr})
+        while session.duration < settings.LIVE_MAX_DURATION:
+            try:
+                message = await asyncio.wait_for(
+                    websocket.receive(), timeout=max(0.0, next_update - loop.time())
+                )
+            except asyncio.TimeoutError:
+                message = None
+
+            if message is not None:
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("bytes"):
+                    if session.input_format == "opus":
+                        # ffmpeg 파이프 쓰기는 블로킹이므로 스레드풀에서 실행
+                        await run_in_threadpool(session.feed, message["bytes"])
+                    else:
+                        session.feed(message["bytes"])
+                        if session.needs_drain:
+                            # 실시간보다 빠르게 들어오면 버퍼가 넘치기 전에 누적
+                            await run_in_threadpool(session.drain)
+                elif message.get("text"):
+                    try:
+                        command = json.loads(message["text"])
+                    except ValueError:
+                        command = {}
+                    if command.get("type") == "stop":
+                        break
+
+            if loop.time() >= next_update:
+                # 지난 업데이트 이후 쌓인 오디오만 특징에 누적
+                update = await run_in_threadpool(session.update)
+                await websocket.send_json({"type": "features", **update})
+                next_update = loop.time() + interval
+
+        features_data = await run_in_threadpool(session.finish)
+        if features_data is None:
+            await websocket.send_json(
+                {"type": "error", "detail": "분석할 오디오가 수신되지 않았습니다."}
+            )
+            await websocket.close(code=1000)
+            return
+
+        audio_features = AudioFeaturesResponse(**features_data)
+        analysis_reason = None
+        if include_reason:
+            analysis_reason, _ = await run_in_threadpool(
+                _generate_analysis_reason, audio_features
+            )
+        response = _save_analysis_session(
+            audio_features, analysis_reason, analysis_type, "microphone"
+        )
+        await websocket.send_json({"type": "result", **response.dict()})
+        await websocket.close(code=1000)
+    except WebSocketDisconnect:
+        print("실시간 분석 연결이 끊겼습니다. 세션을 저장하지 않습니다.")
+    except Exception as e:
+        print(f"실시간 분석 오류: {e}")
+        try:
+            await websocket.send_json(
+                {"type": "error", "detail": f"실시간 분석 중 오류가 발생했습니다: {e}"}
+            )
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        session.close()
 
 
 @router.post("/analyze/spotify", response_model=AudioAnalysisResponse)
@@ -231,7 +898,9 @@ async def analyze_spotify_track(track_id: str = Form(...)):
             raise HTTPException(status_code=404, detail="트랙을 찾을 수 없습니다.")
 
         # Audio Features 가져오기
-        audio_features_data = spotify_service.get_audio_features(track_id)
+        audio_features_data = await run_in_threadpool(
+            spotify_service.get_audio_features, track_id
+        )
         if not audio_features_data:
             raise HTTPException(
                 status_code=404, detail="Audio Features를 찾을 수 없습니다."
@@ -307,7 +976,9 @@ async def get_audio_features(track_id: str):
         Audio Features
     """
     try:
-        features_data = spotify_service.get_audio_features(track_id)
+        features_data = await run_in_threadpool(
+            spotify_service.get_audio_features, track_id
+        )
         if not features_data:
             raise HTTPException(
                 status_code=404, detail="Audio Features를 찾을 수 없습니다."
@@ -336,3 +1007,47 @@ async def get_audio_features(track_id: str):
             status_code=500,
             detail=f"Audio Features 조회 중 오류가 발생했습니다: {str(e)}",
         )
+
+
+@router.get("/decoders/stats")
+async def get_decoder_stats():
+    """
+    형식/디코더별 디코딩 통계를 가져옵니다.
+
+    Returns:
+        형식별 디코더 시도/실패 횟수와 평균 디코딩 시간
+    """
+    return {"decoders": audio_analyzer.decoder_registry.stats()}
+
+
+@router.get("/cache/stats")
+async def get_analysis_cache_stats():
+    """
+    분석 결과 캐시 통계를 가져옵니다.
+
+    Returns:
+        메모리/디스크 히트, 미스, 삭제 횟수와 계층별 크기
+    """
+    return {"cache": analysis_cache.stats()}
+
+
+@router.get("/fingerprint/stats")
+async def get_fingerprint_index_stats():
+    """
+    곡 식별용 핑거프린트 인덱스 정보를 가져옵니다.
+
+    Returns:
+        인덱스 로드 여부, 빌드 ID, 참조 곡 수, 해시 수
+    """
+    return {"fingerprint": fingerprint_index.stats()}
+
+
+@router.get("/pool/stats")
+async def get_analysis_pool_stats():
+    """
+    분석 프로세스 풀 상태를 가져옵니다.
+
+    Returns:
+        워커 수, 대기 중인 작업 수, 완료/거절/시간 초과 횟수
+    """
+    return {"pool": analysis_pool.stats()}
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Any, Optional
 import uuid
 
@@ -10,16 +11,36 @@ from app.models.schemas import (
     SpotifySearchResponse,
     SpotifyTrack,
 )
+from app.core.config import settings
 from app.services.spotify_service import SpotifyService
 from app.services.chatgpt_service import ChatGPTService
+from app.services.recommendation_cache import (
+    RecommendationCache,
+    make_recommendation_key,
+    quantize_features,
+    seed_for_key,
+)
+from app.services.session_store import analysis_sessions
 
 router = APIRouter()
 
 # 서비스 인스턴스
 chatgpt_service = ChatGPTService()
+spotify_service = SpotifyService()
+
+# 양자화된 목표 특성 기반 추천 결과 캐시 (Spotify 검색과 추천 근거 생성 결과 재사용)
+recommendation_cache = RecommendationCache(
+    ttl=settings.RECOMMENDATION_CACHE_TTL,
+    stale_ttl=settings.RECOMMENDATION_CACHE_STALE_TTL,
+    max_entries=settings.RECOMMENDATION_CACHE_MAX_ENTRIES,
+)
 
-# 분석 세션 저장소 import (audio.py에서)
-from app.api.audio import analysis_sessions
+
+def _get_spotify_service(access_token: Optional[str]) -> SpotifyService:
+    """사용자 토큰이 있으면 토큰별로 재사용되는 클라이언트, 없으면 공유 인스턴스"""
+    if access_token:
+        return SpotifyService(access_token=access_token)
+    return spotify_service
 
 
 @router.post("/similar", response_model=RecommendationResponse)
@@ -41,8 +62,8 @@ async def get_similar_recommendations(
             f"추천 요청 받음: session_id={request.session_id}, num_recommendations={request.num_recommendations}"
         )
 
-        # Spotify 서비스 인스턴스 생성 (사용자 토큰이 있으면 사용)
-        spotify_service = SpotifyService(access_token=access_token)
+        # Spotify 서비스 (사용자 토큰이 있으면 사용)
+        spotify_service = _get_spotify_service(access_token)
 
         # 실제 분석된 오디오 특징 가져오기
         target_features = None
@@ -84,85 +105,43 @@ async def get_similar_recommendations(
             }
             print("세션을 찾을 수 없음, 기본값 사용")
 
-        # 실제 Spotify API를 사용한 추천 시도
-        if spotify_service.sp:
-            try:
-
-                # Spotify에서 유사한 곡 검색
-                recommendations = spotify_service.get_recommendations(
-                    target_features=target_features,
-                    limit=request.num_recommendations,
-                    filters=request.filters,
-                )
-
-                if recommendations:
-                    recommendation_items = []
-                    for i, track in enumerate(recommendations):
-                        # 디버깅: track 타입 확인
-                        print(f"Track {i} type: {type(track)}")
-                        print(f"Track {i} content: {track}")
-
-                        # track이 딕셔너리가 아닌 경우 처리
-                        if not isinstance(track, dict):
-                            print(f"Track {i} is not a dict, skipping...")
-                            continue
-
-                        # 유사도 점수 계산
-                        try:
-                            similarity_score = spotify_service.calculate_similarity(
-                                target_features, track.get("audio_features", {})
-                            )
-                            print(f"Track {i} similarity_score: {similarity_score}")
-                        except Exception as e:
-                            print(f"Track {i} similarity calculation error: {e}")
-                            similarity_score = 50.0  # 기본값을 50%로 변경
-
-                        # 추천 근거 생성
-                        try:
-                            recommendation_reason = (
-                                chatgpt_service.generate_recommendation_reason(
-                                    target_features,
-                                    track.get("audio_features", {}),
-                                    similarity_score,
-                                )
-                            )
-                            print(
-                                f"Track {i} recommendation_reason: {recommendation_reason}"
-                            )
-                        except Exception as e:
-                            print(f"Track {i} recommendation reason error: {e}")
-                            recommendation_reason = "추천 이유를 생성할 수 없습니다."
-
-                        recommendation_item = RecommendationItem(
-                            spotify_id=track["id"],
-                            track_name=track["name"],
-                            artist_name=(
-                                ", ".join(track["artists"])
-                                if isinstance(track["artists"][0], str)
-                                else ", ".join(
-                                    [artist["name"] for artist in track["artists"]]
-                                )
-                            ),
-                            album_name=track["album"]["name"],
-                            similarity_score=similarity_score,
-                            audio_features=track.get("audio_features"),
-                            recommendation_reason=recommendation_reason,
-                            preview_url=track.get("preview_url"),
-                            external_urls=track.get("external_urls", {}),
-                        )
-                        recommendation_items.append(recommendation_item)
-
-                    print(
-                        f"Spotify API로 추천 곡 {len(recommendation_items)}개 생성 완료"
-                    )
-                    return RecommendationResponse(
-                        recommendations=recommendation_items,
-                        total=len(recommendation_items),
-                        session_id=request.session_id,
-                    )
+        # 같은 구간에 드는 분석 결과는 추천을 공유 (구간 중앙값 특성으로 계산하고,
+        # 키에서 만든 시드로 검색어와 순서를 정하므로 캐시 결과와 새 결과가 같은 기준)
+        quantized_features = quantize_features(
+            target_features,
+            step=settings.RECOMMENDATION_CACHE_FEATURE_STEP,
+            tempo_step=settings.RECOMMENDATION_CACHE_TEMPO_STEP,
+        )
+        cache_key = make_recommendation_key(
+            quantized_features, request.num_recommendations, request.filters
+        )
+        recommendation_items = await run_in_threadpool(
+            recommendation_cache.get_or_compute,
+            cache_key,
+            lambda: _compute_recommendations(
+                spotify_service,
+                quantized_features,
+                request.num_recommendations,
+                request.filters,
+                seed_for_key(cache_key),
+            ),
+            # 백그라운드 갱신은 만료될 수 있는 사용자 토큰 대신 앱 클라이언트 사용
+            lambda: _compute_recommendations(
+                _get_spotify_service(None),
+                quantized_features,
+                request.num_recommendations,
+                request.filters,
+                seed_for_key(cache_key),
+            ),
+        )
 
-            except Exception as spotify_error:
-                print(f"Spotify API 추천 실패, 기본 추천 사용: {str(spotify_error)}")
+        if recommendation_items:
+            print(f"추천 곡 {len(recommendation_items)}개 생성 완료")
+            return RecommendationResponse(
+                recommendations=recommendation_items,
+                total=len(recommendation_items),
+                session_id=request.session_id,
+            )
 
         # Spotify API 실패 시 기본 추천 사용
         return await _get_default_recommendations(request)
@@ -172,6 +151,115 @@ async def get_similar_recommendations(
         return await _get_error_recommendation(request)
 
 
+def _compute_recommendations(
+    spotify_service: SpotifyService,
+    target_features: Dict[str, Any],
+    limit: int,
+    filters: Optional[Dict[str, Any]],
+    seed: int,
+) -> List[RecommendationItem]:
+    """
+    추천 곡 목록과 추천 근거를 계산합니다 (recommendation_cache가 스레드에서 호출).
+
+    Args:
+        spotify_service: 사용할 Spotify 서비스
+        target_features: 양자화된 목표 특성
+        limit: 추천 곡 수
+        filters: 추천 필터
+        seed: Spotify 검색 추천의 난수 시드
+
+    Returns:
+        추천 항목 목록 (추천을 만들지 못하면 빈 목록, 캐시에 저장되지 않음)
+    """
+    # 로컬 카탈로그가 있으면 Spotify 검색 없이 유사곡 검색
+    recommendations = spotify_service.get_catalog_recommendations(
+        target_features=target_features,
+        limit=limit,
+    )
+
+    # 카탈로그가 없으면 실제 Spotify API를 사용한 추천 시도
+    if not recommendations and spotify_service.sp:
+        try:
+
+            # Spotify에서 유사한 곡 검색
+            # (스레드풀에서 실행되므로 동시 요청의 audio_features 호출이 한 묶음으로 합쳐짐)
+            recommendations = spotify_service.get_recommendations(
+                target_features=target_features,
+                limit=limit,
+                filters=filters,
+                seed=seed,
+            )
+        except Exception as spotify_error:
+            print(f"Spotify API 추천 실패, 기본 추천 사용: {str(spotify_error)}")
+
+    if recommendations:
+        try:
+            recommendation_items = []
+            for i, track in enumerate(recommendations):
+                # 디버깅: track 타입 확인
+                print(f"Track {i} type: {type(track)}")
+                print(f"Track {i} content: {track}")
+
+                # track이 딕셔너리가 아닌 경우 처리
+                if not isinstance(track, dict):
+                    print(f"Track {i} is not a dict, skipping...")
+                    continue
+
+                # 유사도 점수 계산 (카탈로그 결과는 검색 점수 사용)
+                try:
+                    similarity_score = track.get("similarity")
+                    if similarity_score is None:
+                        similarity_score = spotify_service.calculate_similarity(
+                            target_features, track.get("audio_features", {})
+                        )
+                    print(f"Track {i} similarity_score: {similarity_score}")
+                except Exception as e:
+                    print(f"Track {i} similarity calculation error: {e}")
+                    similarity_score = 50.0  # 기본값을 50%로 변경
+
+                # 추천 근거 생성
+                try:
+                    recommendation_reason = (
+                        chatgpt_service.generate_recommendation_reason(
+                            target_features,
+                            track.get("audio_features", {}),
+                            similarity_score,
+                        )
+                    )
+                    print(
+                        f"Track {i} recommendation_reason: {recommendation_reason}"
+                    )
+                except Exception as e:
+                    print(f"Track {i} recommendation reason error: {e}")
+                    recommendation_reason = "추천 이유를 생성할 수 없습니다."
+
+                recommendation_item = RecommendationItem(
+                    spotify_id=track["id"],
+                    track_name=track["name"],
+                    artist_name=(
+                        ", ".join(track["artists"])
+                        if isinstance(track["artists"][0], str)
+                        else ", ".join(
+                            [artist["name"] for artist in track["artists"]]
+                        )
+                    ),
+                    album_name=track["album"]["name"],
+                    similarity_score=similarity_score,
+                    audio_features=track.get("audio_features"),
+                    recommendation_reason=recommendation_reason,
+                    preview_url=track.get("preview_url"),
+                    external_urls=track.get("external_urls", {}),
+                )
+                recommendation_items.append(recommendation_item)
+
+            return recommendation_items
+
+        except Exception as recommendation_error:
+            print(f"추천 결과 생성 실패, 기본 추천 사용: {str(recommendation_error)}")
+
+    return []
+
+
 async def _get_default_recommendations(request: RecommendationRequest):
     """기본 추천 곡 반환"""
     # 실제 인기 곡들 (Spotify API 실패 시 사용)
@@ -385,6 +473,17 @@ async def _get_error_recommendation(request: RecommendationRequest):
     )
 
 
+@router.get("/cache/stats")
+async def get_recommendation_cache_stats():
+    """
+    추천 결과 캐시 통계를 가져옵니다.
+
+    Returns:
+        히트(만료 전/갱신 중), 미스, 백그라운드 갱신 횟수와 항목 수
+    """
+    return {"cache": recommendation_cache.stats()}
+
+
 @router.post("/search", response_model=SpotifySearchResponse)
 async def search_tracks(request: SpotifySearchRequest, access_token: str = None):
     """
@@ -398,8 +497,8 @@ async def search_tracks(request: SpotifySearchRequest, access_token: str = None)
         검색 결과
     """
     try:
-        # Spotify 서비스 인스턴스 생성 (사용자 토큰이 있으면 사용)
-        spotify_service = SpotifyService(access_token=access_token)
+        # Spotify 서비스 (사용자 토큰이 있으면 사용)
+        spotify_service = _get_spotify_service(access_token)
 
         # Spotify API가 설정되어 있으면 실제 검색 시도
         if spotify_service.sp:
@@ -5,6 +5,8 @@ from spotipy.oauth2 import SpotifyOAuth
 from typing import Dict, Any
 import os
 from app.core.config import settings
+from app.services.feature_store import audio_feature_store
+from app.services.spotify_clients import spotify_client_manager
 
 router = APIRouter()
 
@@ -77,7 +79,7 @@ async def spotify_callback(code: str = None, error: str = None):
 async def get_user_profile(token: str):
     """사용자 프로필 정보 가져오기"""
     try:
-        sp = spotipy.Spotify(auth=token)
+        sp = spotify_client_manager.user_client(token)
         user_info = sp.current_user()
 
         return {
@@ -101,7 +103,7 @@ async def get_user_top_tracks(
 ):
     """사용자의 인기 트랙 가져오기"""
     try:
-        sp = spotipy.Spotify(auth=token)
+        sp = spotify_client_manager.user_client(token)
         results = sp.current_user_top_tracks(time_range=time_range, limit=limit)
 
         tracks = []
@@ -132,7 +134,7 @@ async def get_user_top_tracks(
 async def get_user_recently_played(token: str, limit: int = 20):
     """사용자의 최근 재생 곡 가져오기"""
     try:
-        sp = spotipy.Spotify(auth=token)
+        sp = spotify_client_manager.user_client(token)
         results = sp.current_user_recently_played(limit=limit)
 
         tracks = []
@@ -167,15 +169,12 @@ async def search_tracks(q: str, limit: int = 10, access_token: str = None):
     try:
         if access_token:
             # 사용자 토큰으로 검색 (더 많은 결과)
-            sp = spotipy.Spotify(auth=access_token)
+            sp = spotify_client_manager.user_client(access_token)
         else:
-            # 기본 클라이언트 자격 증명으로 검색
-            sp = spotipy.Spotify(
-                client_credentials_manager=spotipy.oauth2.SpotifyClientCredentials(
-                    client_id=settings.SPOTIFY_CLIENT_ID,
-                    client_secret=settings.SPOTIFY_CLIENT_SECRET
-                )
-            )
+            # 기본 클라이언트 자격 증명으로 검색 (토큰은 만료될 때까지 재사용)
+            sp = spotify_client_manager.app_client()
+        if sp is None:
+            raise Exception("Spotify API 설정이 필요합니다.")
         
         results = sp.search(q=q, type='track', limit=limit)
         
@@ -201,3 +200,12 @@ async def search_tracks(q: str, limit: int = 10, access_token: str = None):
         raise HTTPException(
             status_code=500, detail=f"Spotify 검색 오류: {str(e)}"
         )
+
+
+@router.get("/clients/stats")
+async def get_spotify_client_stats():
+    """공유 Spotify 클라이언트 상태 (토큰 만료, 사용자 클라이언트 풀, 연결 확인 결과)"""
+    return {
+        "clients": spotify_client_manager.stats(),
+        "feature_store": audio_feature_store.stats(),
+    }
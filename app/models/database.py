@@ -5,8 +5,10 @@ from sqlalchemy import (
     DateTime,
     Text,
     DECIMAL,
+    Float,
     JSON,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -51,19 +53,22 @@ class Recommendation(Base):
 
 class AudioFeatures(Base):
     __tablename__ = "audio_features"
+    # TTL 확인용 인덱스 (docs/database/init.sql과 같은 이름)
+    __table_args__ = (Index("idx_audio_features_updated_at", "updated_at"),)
 
     spotify_track_id = Column(String(22), primary_key=True)
-    danceability = Column(DECIMAL(3, 2), nullable=True)
-    energy = Column(DECIMAL(3, 2), nullable=True)
-    valence = Column(DECIMAL(3, 2), nullable=True)
-    tempo = Column(DECIMAL(6, 2), nullable=True)
+    # Spotify 값(예: 0.735, 118.211)을 반올림 없이 저장 (DECIMAL(3, 2)는 둘째 자리로 반올림)
+    danceability = Column(Float, nullable=True)
+    energy = Column(Float, nullable=True)
+    valence = Column(Float, nullable=True)
+    tempo = Column(Float, nullable=True)
     key_value = Column(Integer, nullable=True)
     mode_value = Column(Integer, nullable=True)
-    loudness = Column(DECIMAL(6, 2), nullable=True)
-    acousticness = Column(DECIMAL(3, 2), nullable=True)
-    instrumentalness = Column(DECIMAL(3, 2), nullable=True)
-    speechiness = Column(DECIMAL(3, 2), nullable=True)
-    liveness = Column(DECIMAL(3, 2), nullable=True)
+    loudness = Column(Float, nullable=True)
+    acousticness = Column(Float, nullable=True)
+    instrumentalness = Column(Float, nullable=True)
+    speechiness = Column(Float, nullable=True)
+    liveness = Column(Float, nullable=True)
     duration_ms = Column(Integer, nullable=True)
     time_signature = Column(Integer, nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
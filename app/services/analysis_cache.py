@@ -0,0 +1,190 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import json
+import os
+import threading
+
+
+class AnalysisResultCache:
+    """
+    업로드 내용(SHA-256)과 분석기 버전으로 주소를 정하는 분석 결과 캐시
+
+    메모리 LRU 계층과 디스크(JSON 파일) 계층으로 구성됩니다. 디스크 계층은
+    전체 크기가 한도를 넘으면 가장 오래 사용되지 않은 파일부터 삭제합니다.
+    """
+
+    def __init__(
+        self,
+        analyzer_version: str,
+        max_memory_entries: int = 256,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+    ):
+        """
+        Args:
+            analyzer_version: 분석 로직 버전 (바뀌면 이전 결과는 자동으로 무효)
+            max_memory_entries: 메모리 계층 최대 항목 수
+            disk_dir: 디스크 계층 디렉터리 (None이면 메모리만 사용)
+            max_disk_bytes: 디스크 계층 최대 크기
+        """
+        self.analyzer_version = analyzer_version
+        self.max_memory_entries = max_memory_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    def make_key(self, content_sha256: str, variant: str = "prefix") -> str:
+        """업로드 해시, 분석 방식, 분석기 버전으로 캐시 키를 만듭니다."""
+        return f"{self.analyzer_version}-{variant}-{content_sha256}"
+
+    def get(
+        self, content_sha256: str, variant: str = "prefix"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 분석 결과를 가져옵니다.
+
+        Args:
+            content_sha256: 업로드 바이트의 SHA-256
+            variant: 분석 방식 (같은 파일도 분석 구간이 다르면 결과가 다름)
+
+        Returns:
+            {"audio_features": {...}, "analysis_reason": str} 또는 None
+        """
+        key = self.make_key(content_sha256, variant)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._memory[key]
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._put_memory(key, value)
+        return value
+
+    def put(self, content_sha256: str, value: Dict[str, Any], variant: str = "prefix"):
+        """
+        분석 결과를 두 계층 모두에 저장합니다.
+
+        Args:
+            content_sha256: 업로드 바이트의 SHA-256
+            value: JSON 직렬화 가능한 분석 결과
+            variant: 분석 방식
+        """
+        key = self.make_key(content_sha256, variant)
+        with self._lock:
+            self._put_memory(key, value)
+            self._counters["stores"] += 1
+        self._write_disk(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 카운터와 계층별 크기"""
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "analyzer_version": self.analyzer_version,
+            }
+
+    def _put_memory(self, key: str, value: Dict[str, Any]):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["memory_evictions"] += 1
+
+    # ---- 디스크 계층 ----
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            # 최근 사용 시간 갱신 (LRU 삭제 기준)
+            os.utime(path, None)
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"분석 캐시 읽기 실패: {e}")
+            return None
+
+    def _write_disk(self, key: str, value: Dict[str, Any]):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"분석 캐시 저장 실패: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            self._disk_bytes += len(data) - previous
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _disk_entries(self):
+        """(경로, 크기, 최근 사용 시간) 목록"""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict_disk(self):
+        """디스크 계층이 한도의 90% 이하가 될 때까지 오래된 항목을 삭제합니다."""
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_disk_bytes * 0.9)
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self._counters["disk_evictions"] += 1
+        self._disk_bytes = total
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import uuid
+
+# 진행 이벤트로 보고하는 분석 단계 (순서대로)
+JOB_STAGES = ("decoded", "features", "key_tempo", "ai_reason")
+
+
+class AnalysisJob:
+    """비동기 분석 작업 하나의 상태와 단계 이벤트 기록"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = "queued"  # queued | running | completed | failed
+        self.events: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def stages(self) -> List[str]:
+        """지금까지 끝난 단계 이름"""
+        return [event["stage"] for event in self.events if event["stage"] in JOB_STAGES]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """GET /jobs/{id} 응답 형식"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "stages": self.stages,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class AnalysisJobManager:
+    """
+    비동기 분석 작업 저장소
+
+    작업마다 단계 이벤트를 기록하고, SSE 구독자에게는 지난 이벤트를 먼저
+    보낸 뒤 새 이벤트를 전달합니다. 끝난 작업은 보관 기간이 지나면 삭제됩니다.
+    """
+
+    def __init__(self, retention_seconds: int = 3600, max_jobs: int = 1000):
+        """
+        Args:
+            retention_seconds: 끝난 작업을 보관하는 시간 (초)
+            max_jobs: 보관하는 최대 작업 수
+        """
+        self.retention = timedelta(seconds=retention_seconds)
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, AnalysisJob] = {}
+
+    def create(self) -> AnalysisJob:
+        """새 작업을 만듭니다."""
+        self._purge()
+        job = AnalysisJob(str(uuid.uuid4()))
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    def emit(self, job: AnalysisJob, stage: str, data: Optional[Dict] = None):
+        """
+        단계 완료 이벤트를 기록하고 구독자에게 전달합니다.
+
+        같은 단계는 한 번만 기록됩니다 (워커 진행 이벤트와 최종 결과가 모두
+        같은 단계를 보고할 수 있음).
+
+        Args:
+            job: 대상 작업
+            stage: 단계 이름
+            data: 단계의 중간 결과
+        """
+        if job.finished or stage in job.stages:
+            return
+        if job.status == "queued":
+            job.status = "running"
+        self._publish(job, {"stage": stage, "data": data or {}})
+
+    def complete(self, job: AnalysisJob, result: Dict[str, Any]):
+        """최종 분석 결과(AudioAnalysisResponse)로 작업을 끝냅니다."""
+        if job.finished:
+            return
+        job.status = "completed"
+        job.result = result
+        self._publish(job, {"stage": "completed", "data": result})
+        self._close(job)
+
+    def fail(self, job: AnalysisJob, error: str, status_code: int = 500):
+        """오류로 작업을 끝냅니다."""
+        if job.finished:
+            return
+        job.status = "failed"
+        job.error = error
+        job.status_code = status_code
+        self._publish(
+            job,
+            {"stage": "failed", "data": {"error": error, "status_code": status_code}},
+        )
+        self._close(job)
+
+    async def subscribe(self, job: AnalysisJob) -> AsyncIterator[Dict[str, Any]]:
+        """
+        작업 이벤트를 순서대로 내보냅니다. 작업이 끝나면 종료됩니다.
+
+        Args:
+            job: 대상 작업
+
+        Yields:
+            {"stage": str, "data": dict} 이벤트
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        # 지난 이벤트 재생과 구독 등록 사이에 await가 없으므로 이벤트가 빠지지 않음
+        for event in job.events:
+            queue.put_nowait(event)
+        if job.finished:
+            queue.put_nowait(None)
+        else:
+            job._subscribers.append(queue)
+
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            if queue in job._subscribers:
+                job._subscribers.remove(queue)
+
+    def _publish(self, job: AnalysisJob, event: Dict[str, Any]):
+        job.updated_at = datetime.now()
+        event = {**event, "timestamp": job.updated_at.isoformat()}
+        job.events.append(event)
+        for queue in job._subscribers:
+            queue.put_nowait(event)
+
+    def _close(self, job: AnalysisJob):
+        for queue in job._subscribers:
+            queue.put_nowait(None)
+        job._subscribers.clear()
+
+    def _purge(self):
+        """보관 기간이 지났거나 한도를 넘은 끝난 작업을 삭제합니다."""
+        cutoff = datetime.now() - self.retention
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.updated_at < cutoff:
+                del self._jobs[job_id]
+
+        if len(self._jobs) >= self.max_jobs:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.finished),
+                key=lambda job: job.updated_at,
+            )
+            for job in finished[: len(self._jobs) - self.max_jobs + 1]:
+                del self._jobs[job.job_id]
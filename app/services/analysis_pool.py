@@ -0,0 +1,409 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import math
+import multiprocessing
+import signal
+import threading
+import time
+import uuid
+import numpy as np
+
+from app.services.audio_analyzer_simple import AudioAnalyzer
+from app.services.audio_decoders import AudioDecodeError
+from app.services.warmup import warm_up_analyzer
+
+# 워커 프로세스마다 하나씩 만드는 분석기
+_worker_analyzer: Optional[AudioAnalyzer] = None
+
+# 워커에서 부모 프로세스로 단계 진행 상황을 보내는 큐
+_worker_progress_queue = None
+
+# 분석 단계 진행 상황 콜백 (단계 이름, 중간 결과)
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+# 제한 시간이 지난 뒤 워커가 스스로 작업을 멈추기를 기다리는 시간 (초).
+# 이 안에 끝나지 않으면 (C 코드 안에서 멈춘 경우 등) 워커를 강제 종료함
+OVERRUN_GRACE_SECONDS = 2.0
+
+
+class AnalysisQueueFullError(Exception):
+    """분석 대기열이 가득 찬 경우"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("분석 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+        self.retry_after = retry_after
+
+
+class AnalysisTimeoutError(Exception):
+    """분석 작업이 제한 시간을 넘은 경우"""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"오디오 분석 시간이 초과되었습니다. ({timeout:.0f}초)")
+        self.timeout = timeout
+
+
+class AnalysisPoolUnavailableError(Exception):
+    """워커 프로세스가 비정상 종료되어 풀을 다시 만드는 중인 경우"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("오디오 분석 워커를 다시 시작하는 중입니다.")
+        self.retry_after = retry_after
+
+
+class _JobDeadlineExceeded(BaseException):
+    """
+    워커 안에서 작업이 제한 시각을 넘은 경우 (부모에서 AnalysisTimeoutError로 변환)
+
+    분석 코드 곳곳의 except Exception(기본값으로 대체)에 잡히지 않도록
+    BaseException을 상속합니다.
+    """
+
+
+def _raise_deadline(signum, frame):
+    raise _JobDeadlineExceeded()
+
+
+def _run_with_deadline(fn: Callable, deadline: float, args: tuple, token):
+    """
+    워커에서 작업을 실행하되 deadline(time.time() 기준)이 지나면 중단합니다.
+
+    대기열에서 기다린 시간도 제한 시간에 포함되므로 남은 시간만큼만 타이머를
+    겁니다. SIGALRM은 작업을 실행하는 워커의 메인 스레드에서 처리되므로
+    디코딩 대기(블로킹 read)나 파이썬 루프 중에도 작업이 끝나고 워커는 다음
+    작업을 받습니다. setitimer가 없는 플랫폼에서는 부모의 강제 종료에 맡깁니다.
+    """
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise _JobDeadlineExceeded()
+    has_timer = hasattr(signal, "setitimer")
+    if has_timer:
+        signal.signal(signal.SIGALRM, _raise_deadline)
+        signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        return fn(*args, token)
+    finally:
+        if has_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _init_worker(progress_queue=None):
+    """워커 프로세스 초기화: 분석기를 만들고 librosa/numba 경로를 한 번 실행"""
+    global _worker_analyzer, _worker_progress_queue
+    _worker_progress_queue = progress_queue
+    _worker_analyzer = AudioAnalyzer()
+    elapsed = warm_up_analyzer(_worker_analyzer)
+    print(f"분석 워커 워밍업 완료 ({elapsed:.1f}초)")
+
+
+def _ping() -> bool:
+    return True
+
+
+def _worker_progress(token: Optional[str]) -> Optional[ProgressCallback]:
+    if token is None or _worker_progress_queue is None:
+        return None
+
+    def progress(stage: str, data: Dict[str, Any]):
+        _worker_progress_queue.put((token, stage, data))
+
+    return progress
+
+
+def _analyze_in_worker(
+    y: Optional[np.ndarray], sr: int, token: Optional[str] = None
+) -> Dict[str, Any]:
+    return _worker_analyzer.analyze_signal(y, sr, progress=_worker_progress(token))
+
+
+def _analyze_file_in_worker(
+    path: str, token: Optional[str] = None
+) -> Tuple[Dict[str, Any], bool]:
+    progress = _worker_progress(token)
+    try:
+        return _worker_analyzer.analyze_file_streaming(path, progress=progress), True
+    except AudioDecodeError as e:
+        print(f"전체 구간 스트리밍 분석 실패, 기본값 사용: {e}")
+        sr = _worker_analyzer.sample_rate
+        return _worker_analyzer.analyze_signal(None, sr, progress=progress), False
+
+
+class AnalysisPool:
+    """
+    CPU를 많이 쓰는 오디오 분석을 이벤트 루프 밖에서 실행하는 프로세스 풀
+
+    워커는 시작할 때 분석기를 만들고 합성 신호로 한 번 분석해 두므로 첫 요청에서
+    import/JIT 비용이 들지 않습니다. 실행 중이거나 대기 중인 작업 수가
+    워커 수 + 대기열 크기를 넘으면 즉시 거절하여 요청이 무한히 쌓이지 않게 합니다.
+
+    제한 시간을 넘은 작업은 워커 안의 타이머로 중단되어 워커를 계속 점유하지
+    않습니다. 그래도 overrun_grace초 안에 끝나지 않으면 워커를 강제 종료하고
+    풀을 다시 시작합니다 (그때 실행 중이던 다른 작업은 503).
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 8,
+        job_timeout: float = 60,
+        overrun_grace: float = OVERRUN_GRACE_SECONDS,
+    ):
+        """
+        Args:
+            workers: 워커 프로세스 수
+            max_queue: 모든 워커가 바쁠 때 기다릴 수 있는 작업 수
+            job_timeout: 작업당 기본 제한 시간 (초, 대기 시간 포함)
+            overrun_grace: 제한 시간 뒤 워커를 강제 종료하기 전까지 기다리는 시간 (초)
+        """
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.job_timeout = job_timeout
+        self.overrun_grace = overrun_grace
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._progress_queue = None
+        self._progress_callbacks: Dict[str, tuple] = {}
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._avg_job_seconds = 3.0  # 첫 작업 전 Retry-After 추정용
+        self._warmup_seconds: Optional[float] = None
+        self._counters = {
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "killed_workers": 0,
+            "restarts": 0,
+        }
+
+    @property
+    def ready(self) -> bool:
+        """모든 워커가 워밍업을 마쳤는지 여부"""
+        return self._executor is not None and self._warmup_seconds is not None
+
+    async def start(self):
+        """워커를 모두 띄우고 워밍업이 끝날 때까지 기다립니다."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._executor is not None:
+                return
+
+            started = time.perf_counter()
+            # fork는 스레드가 있는 서버 프로세스에서 안전하지 않으므로 spawn 사용
+            context = multiprocessing.get_context("spawn")
+            self._progress_queue = context.Queue()
+            threading.Thread(
+                target=self._dispatch_progress,
+                args=(self._progress_queue,),
+                name="analysis-progress",
+                daemon=True,
+            ).start()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._progress_queue,),
+            )
+            # 유휴 워커가 없으면 작업마다 프로세스가 하나씩 생성되므로
+            # 워커 수만큼 동시에 제출하면 모든 워커가 초기화됨
+            pings = [
+                asyncio.wrap_future(self._executor.submit(_ping))
+                for _ in range(self.workers)
+            ]
+            await asyncio.gather(*pings)
+            self._warmup_seconds = time.perf_counter() - started
+            print(
+                f"분석 워커 {self.workers}개 준비 완료 ({self._warmup_seconds:.1f}초)"
+            )
+
+    def shutdown(self):
+        """대기 중인 작업을 취소하고 워커를 종료합니다."""
+        executor, self._executor = self._executor, None
+        progress_queue, self._progress_queue = self._progress_queue, None
+        self._warmup_seconds = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if progress_queue is not None:
+            # 진행 상황 전달 스레드 종료
+            progress_queue.put(None)
+
+    async def analyze(
+        self,
+        y: Optional[np.ndarray],
+        sr: int,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        워커 프로세스에서 AudioAnalyzer.analyze_signal을 실행합니다.
+
+        Args:
+            y: 디코딩된 오디오 (실패한 경우 None)
+            sr: 샘플링 레이트
+            progress: 워커에서 단계가 끝날 때마다 이벤트 루프에서 호출되는 함수.
+                진행 이벤트는 결과와 다른 채널로 오므로 결과보다 늦게 도착할 수 있음
+
+        Returns:
+            Spotify Audio Features 형식의 딕셔너리
+
+        Raises:
+            AnalysisQueueFullError: 대기열이 가득 찬 경우
+            AnalysisTimeoutError: 제한 시간 안에 끝나지 않은 경우
+            AnalysisPoolUnavailableError: 워커가 비정상 종료된 경우
+        """
+        return await self._submit(_analyze_in_worker, (y, sr), progress)
+
+    async def analyze_file(
+        self,
+        path: str,
+        progress: Optional[ProgressCallback] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        워커 프로세스에서 파일 전체를 블록 단위로 스트리밍 분석합니다.
+
+        PCM은 워커 안에서만 만들어지므로 곡 길이와 상관없이 프로세스 간에는
+        경로와 결과만 오갑니다. 대기열, 제한 시간, 오류 처리는 analyze와 같습니다.
+
+        Args:
+            path: 워커가 읽을 수 있는 오디오 파일 경로
+            progress: 워커에서 단계가 끝날 때마다 호출되는 함수
+            timeout: 이 작업의 제한 시간 (초, None이면 job_timeout).
+                곡 길이에 비례하는 full 분석은 호출한 쪽에서 길이에 맞춰 지정
+
+        Returns:
+            (Spotify Audio Features 형식의 딕셔너리, 디코딩 성공 여부) 튜플.
+            디코딩에 실패하면 기본값 결과를 반환
+        """
+        return await self._submit(
+            _analyze_file_in_worker, (path,), progress, timeout=timeout
+        )
+
+    async def _submit(
+        self,
+        fn: Callable,
+        args: tuple,
+        progress: Optional[ProgressCallback],
+        timeout: Optional[float] = None,
+    ):
+        if self._executor is None:
+            await self.start()
+        timeout = self.job_timeout if timeout is None else timeout
+
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._counters["rejected"] += 1
+                raise AnalysisQueueFullError(self._retry_after_locked())
+            self._pending += 1
+
+        token = None
+        if progress is not None:
+            token = uuid.uuid4().hex
+            self._progress_callbacks[token] = (asyncio.get_running_loop(), progress)
+
+        started = time.perf_counter()
+        executor = self._executor
+        try:
+            future = executor.submit(
+                _run_with_deadline, fn, time.time() + timeout, args, token
+            )
+        except (BrokenProcessPool, RuntimeError) as e:
+            with self._lock:
+                self._pending -= 1
+            self._progress_callbacks.pop(token, None)
+            self._restart(e)
+            raise AnalysisPoolUnavailableError()
+        future.add_done_callback(lambda f: self._on_done(f, started))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except (asyncio.TimeoutError, _JobDeadlineExceeded):
+            with self._lock:
+                self._counters["timeouts"] += 1
+            # 대기 중이던 작업은 취소. 실행 중인 작업은 워커의 타이머로 멈추고,
+            # 그래도 끝나지 않으면 워커를 강제 종료
+            if not future.cancel() and not future.done():
+                asyncio.get_running_loop().call_later(
+                    self.overrun_grace, self._stop_overrun, executor, future
+                )
+            raise AnalysisTimeoutError(timeout)
+        except BrokenProcessPool as e:
+            self._restart(e)
+            raise AnalysisPoolUnavailableError()
+        finally:
+            self._progress_callbacks.pop(token, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """풀 크기, 대기열 상태, 작업 카운터"""
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "job_timeout": self.job_timeout,
+                "pending": self._pending,
+                "queued": max(0, self._pending - self.workers),
+                "avg_job_seconds": round(self._avg_job_seconds, 3),
+                "warmup_seconds": self._warmup_seconds,
+                **self._counters,
+            }
+
+    def _dispatch_progress(self, progress_queue):
+        """워커가 보낸 진행 이벤트를 요청한 이벤트 루프로 전달합니다."""
+        while True:
+            try:
+                message = progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            token, stage, data = message
+            target = self._progress_callbacks.get(token)
+            if target is None:
+                continue
+            loop, callback = target
+            try:
+                loop.call_soon_threadsafe(callback, stage, data)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힌 경우
+                continue
+
+    def _on_done(self, future: Future, started: float):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self._counters["failed"] += 1
+                return
+            self._counters["completed"] += 1
+            # 지수 이동 평균 (대기 시간이 포함되므로 혼잡할수록 커짐)
+            self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+
+    def _retry_after_locked(self) -> int:
+        """대기열이 한 칸 빌 때까지 걸릴 것으로 예상되는 시간 (초)"""
+        waves = (self._pending - self.workers + 1) / self.workers
+        return max(1, math.ceil(self._avg_job_seconds * max(waves, 1)))
+
+    def _stop_overrun(self, executor: ProcessPoolExecutor, future: Future):
+        """제한 시간이 지나고도 끝나지 않은 작업의 워커를 종료하고 풀을 다시 시작합니다."""
+        if future.done() or self._executor is not executor:
+            return
+        # ProcessPoolExecutor는 작업 하나만 취소할 수 없으므로 워커를 모두 종료
+        # (실행 중이던 다른 작업은 BrokenProcessPool로 끝나 503을 반환)
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        for process in processes:
+            process.terminate()
+        with self._lock:
+            self._counters["killed_workers"] += len(processes)
+        self._restart(Exception("제한 시간을 넘은 작업이 멈추지 않아 워커 종료"))
+
+    def _restart(self, error: Exception):
+        """깨진 풀을 버리고 다음 요청에서 새로 시작하도록 합니다."""
+        print(f"분석 워커 풀 재시작: {error}")
+        with self._lock:
+            self._counters["restarts"] += 1
+        self.shutdown()
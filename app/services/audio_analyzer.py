@@ -4,7 +4,7 @@ from typing import Dict, Any, Optional, Tuple
 import tempfile
 import os
 from pathlib import Path
-from .advanced_audio_analyzer import AdvancedAudioAnalyzer
+from app.services.audio_feature_graph import estimate_key_from_chroma
 
 
 class AudioAnalyzer:
@@ -12,7 +12,16 @@ class AudioAnalyzer:
 
     def __init__(self):
         self.sample_rate = 44100
-        self.advanced_analyzer = AdvancedAudioAnalyzer()
+        self._advanced_analyzer = None
+
+    @property
+    def advanced_analyzer(self):
+        """torch/transformers 기반 분석기 (처음 사용할 때 import하고 생성)"""
+        if self._advanced_analyzer is None:
+            from .advanced_audio_analyzer import AdvancedAudioAnalyzer
+
+            self._advanced_analyzer = AdvancedAudioAnalyzer()
+        return self._advanced_analyzer
 
     def extract_features(self, audio_file_path: str) -> Dict[str, Any]:
         """
@@ -80,45 +89,10 @@ class AudioAnalyzer:
         try:
             y, sr = librosa.load(audio_file_path, sr=self.sample_rate)
 
-            # 크로마 특징 추출
+            # 크로마를 한 번만 계산해 조성 프로파일과 상관
             chroma = librosa.feature.chroma_stft(y=y, sr=sr)
-
-            # 조성 추정
-            key_profiles = librosa.feature.chroma_stft(y=y, sr=sr)
-            key_profile = np.mean(key_profiles, axis=1)
-
-            # 주요 조성과 단조 프로파일
-            major_profile = np.array([1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 1])  # C major
-            minor_profile = np.array([1, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0])  # A minor
-
-            # 유사도 계산
-            major_similarities = []
-            minor_similarities = []
-
-            for i in range(12):
-                # 회전된 프로파일
-                major_rotated = np.roll(major_profile, i)
-                minor_rotated = np.roll(minor_profile, i)
-
-                # 코사인 유사도
-                major_sim = np.dot(key_profile, major_rotated) / (
-                    np.linalg.norm(key_profile) * np.linalg.norm(major_rotated)
-                )
-                minor_sim = np.dot(key_profile, minor_rotated) / (
-                    np.linalg.norm(key_profile) * np.linalg.norm(minor_rotated)
-                )
-
-                major_similarities.append(major_sim)
-                minor_similarities.append(minor_sim)
-
-            # 최고 유사도 찾기
-            max_major_idx = np.argmax(major_similarities)
-            max_minor_idx = np.argmax(minor_similarities)
-
-            if major_similarities[max_major_idx] > minor_similarities[max_minor_idx]:
-                return max_major_idx, 1  # 장조
-            else:
-                return max_minor_idx, 0  # 단조
+            key, mode, _ = estimate_key_from_chroma(np.mean(chroma, axis=1))
+            return key, mode
 
         except Exception as e:
             # 기본값 반환
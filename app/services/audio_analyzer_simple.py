@@ -1,136 +1,321 @@
 import librosa
 import numpy as np
-from typing import Dict, Any, Optional, Tuple
-import tempfile
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
 import os
-from pathlib import Path
-import warnings
 
-# scipy 호환성 문제 해결
-try:
-    from scipy.signal import windows
-
-    # scipy.signal.hann이 없는 경우 windows.hann 사용
-    if not hasattr(windows, "hann"):
-        import scipy.signal as signal
-
-        windows.hann = signal.hann
-except ImportError:
-    pass
+from app.core.config import settings
+from app.services.audio_decoders import (
+    AudioDecodeError,
+    FFmpegPCMStream,
+    create_default_registry,
+    decode_segments,
+    detect_audio_format_from_header,
+    find_ffmpeg,
+    iter_pcm_blocks,
+    probe_audio_duration,
+)
+from app.services.audio_feature_graph import AudioFeatureGraph, normalize_fields
+from app.services.streaming_features import StreamingFeatureAccumulator
+
+# analyze_signal 응답에 실제로 사용되는 특징 필드 (tonnetz, MFCC 등은 계산하지 않음)
+ANALYZE_FEATURE_FIELDS = ("tempo", "rms_mean", "duration")
+
+# 분석 구간 선택 방식
+# prefix: 앞부분 MAX_RECORDING_DURATION초, segments: 곡 전체에 퍼진 짧은 구간들,
+# full: 곡 전체를 블록 단위로 스트리밍 분석
+ANALYSIS_WINDOWS = ("prefix", "segments", "full")
+
+
+def plan_segment_offsets(
+    total_duration: Optional[float], count: int, segment_duration: float
+) -> List[float]:
+    """
+    곡 전체에 고르게 퍼진 구간 시작 위치를 정합니다.
+
+    구간 중심을 곡 길이의 1/(count+1), 2/(count+1), ... 지점에 두므로
+    인트로와 아웃트로를 자연스럽게 피합니다.
+
+    Args:
+        total_duration: 곡 길이 (초, 모르면 None)
+        count: 구간 수
+        segment_duration: 구간 길이 (초)
+
+    Returns:
+        구간 시작 위치 목록 (초). 곡이 구간 합보다 짧으면 빈 목록
+    """
+    if not total_duration or count <= 0:
+        return []
+    if total_duration < count * segment_duration:
+        return []
+
+    offsets = []
+    for index in range(count):
+        center = total_duration * (index + 1) / (count + 1)
+        start = center - segment_duration / 2
+        offsets.append(
+            round(min(max(start, 0.0), total_duration - segment_duration), 3)
+        )
+    return offsets
 
 
 class AudioAnalyzer:
     """오디오 분석을 위한 클래스"""
 
+    # 분석 결과에 영향을 주는 로직이 바뀌면 올려서 캐시된 결과를 무효화
+    version = "3"
+
     def __init__(self):
         self.sample_rate = 48000  # 더 높은 샘플링 레이트
-
-    def extract_features(self, audio_file_path: str) -> Dict[str, Any]:
+        self.max_duration = settings.MAX_RECORDING_DURATION  # 분석할 최대 길이 (초)
+        self.segment_count = settings.ANALYSIS_SEGMENT_COUNT  # 구간 샘플링 구간 수
+        self.segment_duration = settings.ANALYSIS_SEGMENT_DURATION  # 구간 길이 (초)
+        self.full_max_duration = settings.ANALYSIS_FULL_MAX_DURATION  # full 최대 길이
+        self.decoder_registry = create_default_registry()
+
+    def extract_features(
+        self, audio_file_path: str, fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
         """
         오디오 파일에서 특징을 추출합니다.
 
         Args:
             audio_file_path: 오디오 파일 경로
+            fields: 계산할 특징 필드 마스크 (None이면 전체)
 
         Returns:
             추출된 오디오 특징 딕셔너리
         """
         try:
-            # 기본값으로 시작
-            features = {
-                "tempo": 120.0,
-                "beats": 0,
-                "chroma_mean": [0.1] * 12,
-                "tonnetz_mean": [0.1] * 6,
-                "mfcc_mean": [0.1] * 13,
-                "spectral_centroid_mean": 2000.0,
-                "spectral_rolloff_mean": 4000.0,
-                "zero_crossing_rate_mean": 0.05,
-                "onset_count": 0,
-                "rms_mean": 0.1,
-                "duration": 30.0,
-            }
-
             # 오디오 파일 존재 확인
             if not os.path.exists(audio_file_path):
-                return features
+                return self._get_default_features(fields)
 
             # 파일 크기 확인 (너무 작으면 건너뛰기)
             file_size = os.path.getsize(audio_file_path)
             if file_size < 1000:  # 1KB 미만
-                return features
+                return self._get_default_features(fields)
 
-            # 오디오 로드 시도
-            try:
-                # 안전한 오디오 로딩
-                y, sr = self._load_audio_safely(audio_file_path)
+            # 안전한 오디오 로딩
+            y, sr = self._load_audio_safely(audio_file_path)
+            if y is None or len(y) == 0:
+                print("오디오 데이터가 비어있음, 기본값 사용")
+                return self._get_enhanced_default_features(fields)
+
+            return self.extract_features_from_graph(
+                AudioFeatureGraph(y, sr), fields=fields
+            )
+
+        except Exception as e:
+            # 전체 실패 시 기본값 반환
+            print(f"오디오 분석 실패, 기본값 사용: {str(e)}")
+            return self._get_enhanced_default_features(fields)
+
+    def extract_features_from_graph(
+        self, graph: AudioFeatureGraph, fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        이미 디코딩된 클립의 특징 그래프에서 특징을 추출합니다.
 
-                if y is None or len(y) == 0:
-                    print("오디오 데이터가 비어있음, 기본값 사용")
-                    return self._get_enhanced_default_features()
+        Args:
+            graph: 공유 특징 그래프
+            fields: 계산할 특징 필드 마스크 (None이면 전체, 요청되지 않은 필드는 계산하지 않음)
 
-                # 오디오 길이 체크
-                audio_length = len(y) / sr
-                print(f"오디오 길이: {audio_length:.1f}초")
+        Returns:
+            요청된 필드만 포함한 오디오 특징 딕셔너리
+        """
+        try:
+            # 오디오 길이 체크
+            audio_length = graph.duration
+            print(f"오디오 길이: {audio_length:.1f}초")
 
-                if audio_length < 5.0:
-                    print(f"오디오가 너무 짧음 ({audio_length:.1f}초), 기본값 사용")
-                    return self._get_enhanced_default_features()
+            if audio_length < 5.0:
+                print(f"오디오가 너무 짧음 ({audio_length:.1f}초), 기본값 사용")
+                return self._get_enhanced_default_features(fields)
 
-                # 기본 특징 추출
-                tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
-                features["tempo"] = float(tempo)
-                features["beats"] = len(beats)
-                print(f"extract_features에서 계산된 템포: {tempo:.1f} BPM")
+            features = graph.summarize(fields)
+            if "tempo" in features:
+                print(f"extract_features에서 계산된 템포: {features['tempo']:.1f} BPM")
+            return features
 
-                # 조성 분석
-                chroma = librosa.feature.chroma_stft(y=y, sr=sr)
-                features["chroma_mean"] = np.mean(chroma, axis=1).tolist()
+        except Exception as e:
+            # librosa 실패 시 기본값 사용
+            print(f"librosa 특징 추출 실패, 기본값 사용: {str(e)}")
+            return self._get_enhanced_default_features(fields)
+
+    def analyze_signal(
+        self,
+        y: Optional[np.ndarray],
+        sr: int,
+        progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        디코딩된 오디오에서 Spotify Audio Features 형식의 특징을 계산합니다.
 
-                tonnetz = librosa.feature.tonnetz(y=y, sr=sr)
-                features["tonnetz_mean"] = np.mean(tonnetz, axis=1).tolist()
+        CPU를 많이 쓰는 작업이므로 API에서는 분석 프로세스 풀에서 실행됩니다.
 
-                # MFCC 특징
-                mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-                features["mfcc_mean"] = np.mean(mfccs, axis=1).tolist()
+        Args:
+            y: 디코딩된 오디오 (실패한 경우 None)
+            sr: 샘플링 레이트
+            progress: 단계가 끝날 때마다 (단계 이름, 중간 결과)로 호출되는 함수
+                ("features" -> "key_tempo")
 
-                # 스펙트럴 특징
-                spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-                features["spectral_centroid_mean"] = float(np.mean(spectral_centroids))
+        Returns:
+            AudioFeaturesResponse 필드와 같은 키를 가진 딕셔너리
+        """
+        if y is None or y.size == 0:
+            return self.analyze_graph(None, progress)
 
-                spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
-                features["spectral_rolloff_mean"] = float(np.mean(spectral_rolloff))
+        # 디코딩된 클립(또는 구간 배치) 하나에 대한 공유 특징 그래프
+        return self.analyze_graph(AudioFeatureGraph(y, sr), progress)
 
-                # 제로 크로싱 레이트
-                zcr = librosa.feature.zero_crossing_rate(y)[0]
-                features["zero_crossing_rate_mean"] = float(np.mean(zcr))
+    def analyze_file_streaming(
+        self,
+        audio_file_path: str,
+        progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        곡 전체를 블록 단위로 디코딩하며 특징을 누적해 분석합니다.
 
-                # 온셋 감지
-                onsets = librosa.onset.onset_detect(y=y, sr=sr)
-                features["onset_count"] = len(onsets)
+        한 번에 하나의 PCM 블록만 메모리에 있으므로 긴 믹스도 곡 길이와
+        상관없이 일정한 메모리로 분석합니다 (analysis_window=full).
 
-                # 음량 분석
-                rms = librosa.feature.rms(y=y)[0]
-                features["rms_mean"] = float(np.mean(rms))
+        Args:
+            audio_file_path: 오디오 파일 경로
+            progress: 단계가 끝날 때마다 (단계 이름, 중간 결과)로 호출되는 함수
 
-                # 지속시간
-                features["duration"] = len(y) / sr
+        Returns:
+            AudioFeaturesResponse 필드와 같은 키를 가진 딕셔너리
 
+        Raises:
+            AudioDecodeError: 파일을 디코딩할 수 없는 경우
+        """
+        sr, blocks = iter_pcm_blocks(
+            audio_file_path,
+            self.sample_rate,
+            max_duration=self.full_max_duration,
+        )
+        accumulator = StreamingFeatureAccumulator(sr)
+        try:
+            for block in blocks:
+                accumulator.update(block)
+        finally:
+            # 중간에 멈춘 경우(분석 제한 시간 등)에도 ffmpeg 프로세스를 바로 정리
+            blocks.close()
+        accumulator.finish()
+
+        print(f"전체 구간 스트리밍 분석: {accumulator.duration:.1f}초")
+        return self.analyze_graph(accumulator, progress)
+
+    def analyze_graph(
+        self,
+        graph,
+        progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        특징 그래프(또는 같은 요약 속성을 가진 스트리밍 누적기)로 결과를 만듭니다.
+
+        Args:
+            graph: AudioFeatureGraph, StreamingFeatureAccumulator 또는 None(기본값)
+            progress: 단계가 끝날 때마다 호출되는 함수
+
+        Returns:
+            AudioFeaturesResponse 필드와 같은 키를 가진 딕셔너리
+        """
+        audio_length = graph.duration if graph is not None else 0.0
+
+        # 오디오 분석 (응답에 필요한 필드만 계산)
+        if graph is not None:
+            features = self.extract_features_from_graph(
+                graph, fields=ANALYZE_FEATURE_FIELDS
+            )
+        else:
+            features = self._get_enhanced_default_features(ANALYZE_FEATURE_FIELDS)
+
+        # Spotify Audio Features 형식으로 변환
+        result = {
+            "danceability": (
+                self.calculate_danceability(None, graph.sr, graph=graph)
+                if graph is not None
+                else 0.5
+            ),
+            "energy": (
+                self.calculate_energy(None, graph.sr, graph=graph)
+                if graph is not None
+                else 0.5
+            ),
+            "valence": (
+                self.calculate_valence(None, graph.sr, graph=graph)
+                if graph is not None
+                else 0.5
+            ),
+            "loudness": features.get("rms_mean", 0) * 100,  # 대략적인 변환
+            "acousticness": 0.5,  # 기본값
+            "instrumentalness": 0.5,  # 기본값
+            "speechiness": 0.1,  # 기본값
+            "liveness": 0.1,  # 기본값
+            "duration_ms": int(features.get("duration", 0) * 1000),
+            "time_signature": 4,  # 기본값
+        }
+        if progress is not None:
+            progress("features", dict(result))
+
+        # 실제 계산된 템포 가져오기
+        actual_tempo = features.get("tempo", 120)
+        if audio_length > 5:  # 최소 5초 이상
+            try:
+                # 그래프에 캐시된 비트 트래킹 결과 사용
+                actual_tempo = graph.tempo
+                print(
+                    f"실제 계산된 템포: {actual_tempo:.1f} BPM (오디오 길이: {audio_length:.1f}초)"
+                )
             except Exception as e:
-                # librosa 실패 시 기본값 사용
-                print(f"librosa 로딩 실패, 기본값 사용: {str(e)}")
-                return self._get_enhanced_default_features()
+                print(f"템포 계산 실패: {e}")
+                actual_tempo = features.get("tempo", 120)
+        else:
+            print(f"오디오가 너무 짧음: {audio_length:.1f}초, 기본 템포 사용")
+
+        # 조성 추정 (그래프의 크로마 재사용)
+        key, mode = self.estimate_key_and_mode(graph)
+
+        key_tempo = {"tempo": actual_tempo, "key": key, "mode": mode}
+        if progress is not None:
+            progress("key_tempo", dict(key_tempo))
+        result.update(key_tempo)
+        return result
+
+    def _get_default_features(
+        self, fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """파일을 읽을 수 없을 때의 기본 특징 반환"""
+        features = {
+            "tempo": 120.0,
+            "beats": 0,
+            "chroma_mean": [0.1] * 12,
+            "tonnetz_mean": [0.1] * 6,
+            "mfcc_mean": [0.1] * 13,
+            "spectral_centroid_mean": 2000.0,
+            "spectral_rolloff_mean": 4000.0,
+            "zero_crossing_rate_mean": 0.05,
+            "onset_count": 0,
+            "rms_mean": 0.1,
+            "duration": 30.0,
+        }
+        return self._apply_field_mask(features, fields)
 
+    def _apply_field_mask(
+        self, features: Dict[str, Any], fields: Optional[Iterable[str]]
+    ) -> Dict[str, Any]:
+        """필드 마스크에 포함된 특징만 남깁니다."""
+        if fields is None:
             return features
+        mask = normalize_fields(fields)
+        return {key: value for key, value in features.items() if key in mask}
 
-        except Exception as e:
-            # 전체 실패 시 기본값 반환
-            print(f"오디오 분석 실패, 기본값 사용: {str(e)}")
-            return self._get_enhanced_default_features()
-
-    def _get_enhanced_default_features(self) -> Dict[str, Any]:
+    def _get_enhanced_default_features(
+        self, fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
         """개선된 기본 특징 반환 (webm 파일 처리 실패 시 사용)"""
-        return {
+        features = {
             "tempo": 120.0,
             "beats": 24,  # 30초 * 120BPM / 60 = 60비트, 약 24온셋
             "chroma_mean": [
@@ -170,382 +355,195 @@ class AudioAnalyzer:
             "rms_mean": 0.15,  # 약간 더 높은 음량
             "duration": 30.0,
         }
+        return self._apply_field_mask(features, fields)
 
     def _load_audio_safely(
-        self, audio_file_path: str
+        self, audio_file_path: str, exclude: Tuple[str, ...] = ()
     ) -> Tuple[Optional[np.ndarray], int]:
         """
         안전하게 오디오 파일을 로딩합니다.
 
+        파일 헤더로 형식을 감지한 뒤 디코더 레지스트리를 통해 해당 형식에 가장
+        적합한 디코더로 바로 디코딩합니다. 실제 디코딩 오류가 발생한 경우에만
+        다음 디코더로 넘어갑니다.
+
         Args:
             audio_file_path: 오디오 파일 경로
+            exclude: 건너뛸 디코더 이름 (이미 실패한 디코더)
 
         Returns:
             (오디오 데이터, 샘플링 레이트) 튜플
         """
+        # 파일 형식 감지
+        detected_format = self._detect_audio_format(audio_file_path)
+        print(f"감지된 파일 형식: {detected_format}")
+
         try:
-            # 파일 형식 감지
-            detected_format = self._detect_audio_format(audio_file_path)
-            print(f"감지된 파일 형식: {detected_format}")
-
-            # 방법 1: librosa 기본 로딩 (경고 억제 및 scipy 호환성 처리)
-            import warnings
-
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                # scipy 호환성 문제 해결을 위한 환경변수 설정
-                os.environ["LIBROSA_CACHE_DIR"] = "/tmp/librosa_cache"
-                y, sr = librosa.load(
-                    audio_file_path, sr=self.sample_rate, duration=30, mono=True
-                )
-            return y, sr
-        except Exception as e1:
-            print(f"librosa 기본 로딩 실패: {e1}")
+            return self.decoder_registry.decode(
+                audio_file_path,
+                detected_format,
+                sample_rate=self.sample_rate,
+                duration=self.max_duration,
+                exclude=exclude,
+            )
+        except AudioDecodeError as e:
+            print(f"오디오 로딩 실패: {e}")
+            if detected_format in ["webm", "mp4", "ogg"] and not find_ffmpeg():
+                self._print_ffmpeg_installation_guide()
+            return None, self.sample_rate
+
+    def load_audio_file(
+        self, audio_file_path: str, exclude: Tuple[str, ...] = ()
+    ) -> Tuple[Optional[np.ndarray], int]:
+        """
+        오디오 파일의 앞부분(최대 분석 길이)을 디코더 레지스트리로 디코딩합니다.
 
-            try:
-                # 방법 2: 다른 샘플링 레이트로 시도
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    y, sr = librosa.load(
-                        audio_file_path, sr=None, duration=30, mono=True
-                    )
-                # 리샘플링
-                if sr != self.sample_rate:
-                    y = librosa.resample(y, orig_sr=sr, target_sr=self.sample_rate)
-                return y, self.sample_rate
-            except Exception as e2:
-                print(f"librosa 리샘플링 로딩 실패: {e2}")
-
-                try:
-                    # 방법 3: pydub를 사용한 WebM 처리 (개선된 버전)
-                    if detected_format in ["webm", "mp4", "ogg"]:
-                        try:
-                            from pydub import AudioSegment
-                            from pydub.utils import which
-                            import subprocess
-
-                            print(f"pydub로 {detected_format} 파일 처리 시도...")
-
-                            # ffmpeg 경로 확인 및 설정 (더 강력한 검색)
-                            ffmpeg_path = None
-
-                            # 1. which로 검색
-                            try:
-                                ffmpeg_path = which("ffmpeg")
-                                print(f"which로 ffmpeg 검색 결과: {ffmpeg_path}")
-                            except:
-                                print("which로 ffmpeg 검색 실패")
-
-                            # 2. 직접 경로들 확인
-                            if not ffmpeg_path:
-                                possible_paths = [
-                                    r"C:\ffmpeg\bin\ffmpeg.exe",
-                                    r"C:\ProgramData\chocolatey\bin\ffmpeg.exe",
-                                    r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
-                                    r"C:\Program Files (x86)\ffmpeg\bin\ffmpeg.exe",
-                                    r"C:\tools\ffmpeg\bin\ffmpeg.exe",
-                                ]
-
-                                for path in possible_paths:
-                                    if os.path.exists(path):
-                                        ffmpeg_path = path
-                                        print(
-                                            f"직접 경로에서 ffmpeg 발견: {ffmpeg_path}"
-                                        )
-                                        break
-
-                            # 3. 환경변수에서 검색
-                            if not ffmpeg_path:
-                                import shutil
-
-                                try:
-                                    ffmpeg_path = shutil.which("ffmpeg")
-                                    print(
-                                        f"shutil.which로 ffmpeg 검색 결과: {ffmpeg_path}"
-                                    )
-                                except:
-                                    print("shutil.which로 ffmpeg 검색 실패")
-
-                            print(f"최종 ffmpeg 경로: {ffmpeg_path}")
-
-                            if ffmpeg_path:
-                                print(f"ffmpeg 경로 발견: {ffmpeg_path}")
-                                # pydub에 ffmpeg 경로 설정
-                                AudioSegment.converter = ffmpeg_path
-                                AudioSegment.ffmpeg = ffmpeg_path
-
-                                # ffprobe 경로 설정 (다양한 경우 처리)
-                                ffprobe_path = ffmpeg_path.replace("ffmpeg", "ffprobe")
-                                if not os.path.exists(ffprobe_path):
-                                    # 다른 가능한 경로들 시도
-                                    possible_ffprobe_paths = [
-                                        ffmpeg_path.replace(
-                                            "ffmpeg.exe", "ffprobe.exe"
-                                        ),
-                                        ffmpeg_path.replace("ffmpeg", "ffprobe.exe"),
-                                        os.path.join(
-                                            os.path.dirname(ffmpeg_path), "ffprobe.exe"
-                                        ),
-                                        os.path.join(
-                                            os.path.dirname(ffmpeg_path), "ffprobe"
-                                        ),
-                                    ]
-                                    for path in possible_ffprobe_paths:
-                                        if os.path.exists(path):
-                                            ffprobe_path = path
-                                            break
-
-                                AudioSegment.ffprobe = ffprobe_path
-                                print(f"ffprobe 경로 설정: {ffprobe_path}")
-                            else:
-                                print(
-                                    "ffmpeg를 찾을 수 없습니다. 기본 설정으로 시도합니다."
-                                )
-                                self._print_ffmpeg_installation_guide()
-
-                                # Windows에서 일반적인 ffmpeg 경로들 시도
-                                possible_paths = [
-                                    r"C:\ffmpeg\bin\ffmpeg.exe",
-                                    r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
-                                    r"C:\Program Files (x86)\ffmpeg\bin\ffmpeg.exe",
-                                    r"C:\tools\ffmpeg\bin\ffmpeg.exe",
-                                ]
-
-                                for path in possible_paths:
-                                    if os.path.exists(path):
-                                        print(f"ffmpeg 경로 발견: {path}")
-                                        AudioSegment.converter = path
-                                        AudioSegment.ffmpeg = path
-                                        AudioSegment.ffprobe = path.replace(
-                                            "ffmpeg.exe", "ffprobe.exe"
-                                        )
-                                        break
-
-                            # WebM 파일의 경우 특별한 처리
-                            if detected_format == "webm":
-                                # WebM 파일을 WAV로 변환하여 로드
-                                audio_segment = AudioSegment.from_file(
-                                    audio_file_path, format="webm"
-                                )
-                            else:
-                                # 다른 형식은 일반적으로 처리
-                                audio_segment = AudioSegment.from_file(audio_file_path)
-
-                            # 최대 30초로 제한
-                            if len(audio_segment) > 30000:  # 30초 = 30000ms
-                                audio_segment = audio_segment[:30000]
-
-                            # numpy 배열로 변환
-                            y = np.array(
-                                audio_segment.get_array_of_samples(), dtype=np.float32
-                            )
-
-                            # 스테레오인 경우 모노로 변환
-                            if audio_segment.channels == 2:
-                                y = y.reshape((-1, 2)).mean(axis=1)
-
-                            # 샘플링 레이트 가져오기
-                            sr = audio_segment.frame_rate
-
-                            # 목표 샘플링 레이트로 리샘플링
-                            if sr != self.sample_rate:
-                                y = librosa.resample(
-                                    y, orig_sr=sr, target_sr=self.sample_rate
-                                )
-
-                            print(
-                                f"pydub로 {detected_format} 파일 로딩 성공 (길이: {len(y)/sr:.1f}초)"
-                            )
-                            return y, self.sample_rate
-
-                        except Exception as pydub_error:
-                            print(f"pydub 로딩 실패: {pydub_error}")
-
-                            # 방법 3-1: 직접 ffmpeg 명령어로 변환 시도
-                            try:
-                                print("직접 ffmpeg 변환 시도...")
-                                import tempfile
-
-                                temp_wav = tempfile.mktemp(suffix=".wav")
-
-                                # ffmpeg 명령어 실행 (webm 지원)
-                                # ffmpeg 전체 경로 사용 (강력한 검색)
-                                ffmpeg_cmd = None
-
-                                # 1. 위에서 찾은 ffmpeg 경로 사용
-                                if "ffmpeg_path" in locals() and ffmpeg_path:
-                                    ffmpeg_cmd = ffmpeg_path
-                                    print(f"위에서 찾은 ffmpeg 경로 사용: {ffmpeg_cmd}")
-                                else:
-                                    # 2. 직접 경로들 확인
-                                    possible_paths = [
-                                        r"C:\ffmpeg\bin\ffmpeg.exe",
-                                        r"C:\ProgramData\chocolatey\bin\ffmpeg.exe",
-                                        r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
-                                        r"C:\Program Files (x86)\ffmpeg\bin\ffmpeg.exe",
-                                        r"C:\tools\ffmpeg\bin\ffmpeg.exe",
-                                    ]
-
-                                    for path in possible_paths:
-                                        if os.path.exists(path):
-                                            ffmpeg_cmd = path
-                                            print(
-                                                f"직접 경로에서 ffmpeg 발견: {ffmpeg_cmd}"
-                                            )
-                                            break
-
-                                # 3. 최후의 수단으로 "ffmpeg" 사용
-                                if not ffmpeg_cmd:
-                                    ffmpeg_cmd = "ffmpeg"
-                                    print("ffmpeg 경로를 찾을 수 없어 기본값 사용")
-                                cmd = [
-                                    ffmpeg_cmd,
-                                    "-i",
-                                    audio_file_path,
-                                    "-ac",
-                                    "1",  # 모노
-                                    "-ar",
-                                    str(self.sample_rate),  # 샘플링 레이트
-                                    "-acodec",
-                                    "pcm_s16le",  # 16비트 PCM
-                                    "-y",  # 덮어쓰기
-                                    temp_wav,
-                                ]
-
-                                result = subprocess.run(
-                                    cmd, capture_output=True, text=True, timeout=30
-                                )
-                                if result.returncode == 0 and os.path.exists(temp_wav):
-                                    with warnings.catch_warnings():
-                                        warnings.simplefilter("ignore")
-                                        y, sr = librosa.load(
-                                            temp_wav,
-                                            sr=self.sample_rate,
-                                            duration=30,
-                                            mono=True,
-                                        )
-                                    os.remove(temp_wav)
-                                    print(
-                                        f"직접 ffmpeg 변환 성공: {len(y)} samples, {sr} Hz"
-                                    )
-                                    return y, sr
-                                else:
-                                    print(f"직접 ffmpeg 변환 실패: {result.stderr}")
-                                    if os.path.exists(temp_wav):
-                                        os.remove(temp_wav)
-
-                            except Exception as direct_error:
-                                print(f"직접 ffmpeg 변환 실패: {direct_error}")
-
-                            # pydub 실패 시 계속해서 다른 방법 시도
-
-                    # 방법 4: ffmpeg를 사용한 변환 후 로딩
-                    import tempfile
-
-                    temp_wav_path = tempfile.mktemp(suffix=".wav")
-
-                    if self._convert_audio_format(
-                        audio_file_path, temp_wav_path, "wav"
-                    ):
-                        try:
-                            with warnings.catch_warnings():
-                                warnings.simplefilter("ignore")
-                                y, sr = librosa.load(
-                                    temp_wav_path,
-                                    sr=self.sample_rate,
-                                    duration=30,
-                                    mono=True,
-                                )
-                            return y, sr
-                        finally:
-                            # 임시 파일 삭제
-                            if os.path.exists(temp_wav_path):
-                                os.unlink(temp_wav_path)
-                    else:
-                        raise Exception("ffmpeg 변환 실패")
-
-                except Exception as e3:
-                    print(f"ffmpeg 변환 로딩 실패: {e3}")
-
-                    try:
-                        # 방법 5: soundfile 직접 사용
-                        import soundfile as sf
-
-                        y, sr = sf.read(audio_file_path, dtype="float32")
-                        if sr != self.sample_rate:
-                            y = librosa.resample(
-                                y, orig_sr=sr, target_sr=self.sample_rate
-                            )
-                        return y, self.sample_rate
-                    except Exception as e4:
-                        print(f"soundfile 로딩 실패: {e4}")
-
-                        try:
-                            # 방법 6: audioread 사용
-                            import audioread
-
-                            with audioread.audio_open(audio_file_path) as f:
-                                sr = f.samplerate
-                                y = []
-                                for frame in f:
-                                    y.extend(frame)
-                                y = np.array(y, dtype=np.float32)
-                                if sr != self.sample_rate:
-                                    y = librosa.resample(
-                                        y, orig_sr=sr, target_sr=self.sample_rate
-                                    )
-                                return y, self.sample_rate
-                        except Exception as e5:
-                            print(f"audioread 로딩 실패: {e5}")
-                            return None, self.sample_rate
-
-    def estimate_key_and_mode(self, audio_file_path: str) -> Tuple[int, int]:
+        Args:
+            audio_file_path: 오디오 파일 경로
+            exclude: 건너뛸 디코더 이름 (이미 실패한 디코더)
+
+        Returns:
+            (오디오 데이터, 샘플링 레이트) 튜플
+        """
+        return self._load_audio_safely(audio_file_path, exclude)
+
+    def load_audio_segments(
+        self, audio_file_path: str
+    ) -> Tuple[Optional[np.ndarray], int]:
+        """
+        곡 전체에 고르게 퍼진 짧은 구간들을 seek로 디코딩합니다.
+
+        인트로처럼 대표성이 낮은 앞부분 대신 곡의 여러 위치를 샘플링하며,
+        결과는 AudioFeatureGraph가 한 번에 처리할 수 있는 (구간 수, 샘플 수)
+        배열입니다. 길이를 알 수 없거나 곡이 구간 합보다 짧으면 앞부분
+        디코딩으로 대체합니다.
+
+        Args:
+            audio_file_path: 오디오 파일 경로 (seek 가능한 파일이어야 함)
+
+        Returns:
+            (구간 배열 또는 1차원 오디오, 샘플링 레이트) 튜플
+        """
+        total = probe_audio_duration(audio_file_path)
+        offsets = plan_segment_offsets(total, self.segment_count, self.segment_duration)
+        if not offsets:
+            print(f"구간 샘플링 불가 (길이: {total}), 앞부분 분석으로 대체")
+            return self._load_audio_safely(audio_file_path)
+
+        try:
+            segments = decode_segments(
+                audio_file_path, offsets, self.segment_duration, self.sample_rate
+            )
+        except AudioDecodeError as e:
+            print(f"구간 디코딩 실패, 앞부분 분석으로 대체: {e}")
+            return self._load_audio_safely(audio_file_path)
+
+        print(
+            f"구간 샘플링: {len(offsets)}개 x {self.segment_duration:.0f}초 "
+            f"(시작: {', '.join(f'{o:.1f}' for o in offsets)}초 / 전체 {total:.1f}초)"
+        )
+        return segments, self.sample_rate
+
+    def load_audio_bytes(
+        self, data: bytes, exclude: Tuple[str, ...] = ()
+    ) -> Tuple[Optional[np.ndarray], int]:
+        """
+        업로드된 원본 바이트를 디스크를 거치지 않고 디코딩합니다.
+
+        Args:
+            data: 업로드된 오디오 파일 바이트
+            exclude: 건너뛸 디코더 이름 (이미 실패한 디코더)
+
+        Returns:
+            (오디오 데이터, 샘플링 레이트) 튜플
+        """
+        detected_format = detect_audio_format_from_header(data[:16])
+        print(f"감지된 파일 형식: {detected_format}")
+
+        try:
+            return self.decoder_registry.decode(
+                data,
+                detected_format,
+                sample_rate=self.sample_rate,
+                duration=self.max_duration,
+                exclude=exclude,
+            )
+        except AudioDecodeError as e:
+            print(f"오디오 로딩 실패: {e}")
+            if detected_format in ["webm", "mp4", "ogg"] and not find_ffmpeg():
+                self._print_ffmpeg_installation_guide()
+            return None, self.sample_rate
+
+    def open_pcm_stream(self) -> FFmpegPCMStream:
+        """
+        업로드 조각을 바로 받을 수 있는 ffmpeg PCM 스트림을 엽니다.
+
+        Returns:
+            분석 샘플링 레이트/최대 길이로 설정된 FFmpegPCMStream
+
+        Raises:
+            DecoderUnavailableError: ffmpeg가 없는 경우
+        """
+        return FFmpegPCMStream(self.sample_rate, self.max_duration)
+
+    def estimate_key_and_mode(
+        self, graph: Optional[AudioFeatureGraph] = None
+    ) -> Tuple[int, int]:
         """
         오디오의 조성과 장조/단조를 추정합니다.
 
+        특징 그래프에 이미 계산된 크로마를 Krumhansl-Kessler 프로파일과
+        상관시키므로 추가 디코딩이나 STFT 비용이 없습니다.
+
         Args:
-            audio_file_path: 오디오 파일 경로
+            graph: 공유 특징 그래프 (없으면 기본값)
 
         Returns:
             (key, mode) 튜플 (key: 0-11, mode: 0=단조, 1=장조)
         """
-        try:
-            # 기본값 반환
+        if graph is None:
             return 0, 1  # C major
 
+        try:
+            key, mode, correlation = graph.key_mode
+            print(f"추정 조성: key={key}, mode={mode} (상관계수 {correlation:.2f})")
+            return key, mode
+
         except Exception as e:
             print(f"조성 추정 실패: {e}")
             return 0, 1
 
-    def calculate_danceability(self, y: np.ndarray, sr: int) -> float:
+    def calculate_danceability(
+        self, y: np.ndarray, sr: int, graph: Optional[AudioFeatureGraph] = None
+    ) -> float:
         """
         댄서빌리티를 계산합니다.
 
         Args:
             y: 오디오 시계열
             sr: 샘플링 레이트
+            graph: 공유 특징 그래프 (없으면 새로 생성)
 
         Returns:
             댄서빌리티 점수 (0.0-1.0)
         """
         try:
-            if y is None or len(y) == 0:
+            if graph is None and (y is None or len(y) == 0):
                 return 0.5
 
+            graph = graph or AudioFeatureGraph(y, sr)
+
             # 리듬 강도 계산
-            tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+            tempo = graph.tempo
 
             # 온셋 강도 계산
-            onset_strength = librosa.onset.onset_strength(y=y, sr=sr)
-            onset_mean = np.mean(onset_strength)
+            onset_mean = graph.onset_strength_mean
 
             # 제로 크로싱 레이트 (리듬의 규칙성)
-            zcr = librosa.feature.zero_crossing_rate(y)[0]
-            zcr_mean = np.mean(zcr)
+            zcr_mean = graph.zero_crossing_rate_mean
 
             # 스펙트럴 중심 (고주파 성분)
-            spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            spectral_mean = np.mean(spectral_centroid)
+            spectral_mean = graph.spectral_centroid_mean
 
             # 댄서빌리티 계산 (여러 요소 조합)
             # 템포가 높고 온셋이 강하며 스펙트럴 중심이 높을수록 댄서빌리티 증가
@@ -567,36 +565,37 @@ class AudioAnalyzer:
             print(f"댄서빌리티 계산 실패: {e}")
             return 0.5
 
-    def calculate_energy(self, y: np.ndarray, sr: int) -> float:
+    def calculate_energy(
+        self, y: np.ndarray, sr: int, graph: Optional[AudioFeatureGraph] = None
+    ) -> float:
         """
         에너지를 계산합니다.
 
         Args:
             y: 오디오 시계열
             sr: 샘플링 레이트
+            graph: 공유 특징 그래프 (없으면 새로 생성)
 
         Returns:
             에너지 점수 (0.0-1.0)
         """
         try:
-            if y is None or len(y) == 0:
+            if graph is None and (y is None or len(y) == 0):
                 return 0.5
 
+            graph = graph or AudioFeatureGraph(y, sr)
+
             # RMS 에너지 계산
-            rms = librosa.feature.rms(y=y)[0]
-            rms_mean = np.mean(rms)
+            rms_mean = graph.rms_mean
 
             # 스펙트럴 중심 (고주파 성분)
-            spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            spectral_mean = np.mean(spectral_centroid)
+            spectral_mean = graph.spectral_centroid_mean
 
             # 스펙트럴 롤오프 (고주파 대역)
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
-            rolloff_mean = np.mean(spectral_rolloff)
+            rolloff_mean = graph.spectral_rolloff_mean
 
             # 제로 크로싱 레이트 (노이즈/에너지)
-            zcr = librosa.feature.zero_crossing_rate(y)[0]
-            zcr_mean = np.mean(zcr)
+            zcr_mean = graph.zero_crossing_rate_mean
 
             # 에너지 계산
             rms_factor = min(rms_mean * 5, 1.0)  # 정규화
@@ -617,24 +616,28 @@ class AudioAnalyzer:
             print(f"에너지 계산 실패: {e}")
             return 0.5
 
-    def calculate_valence(self, y: np.ndarray, sr: int) -> float:
+    def calculate_valence(
+        self, y: np.ndarray, sr: int, graph: Optional[AudioFeatureGraph] = None
+    ) -> float:
         """
         밸런스(감정적 긍정성)를 계산합니다.
 
         Args:
             y: 오디오 시계열
             sr: 샘플링 레이트
+            graph: 공유 특징 그래프 (없으면 새로 생성)
 
         Returns:
             밸런스 점수 (0.0-1.0)
         """
         try:
-            if y is None or len(y) == 0:
+            if graph is None and (y is None or len(y) == 0):
                 return 0.5
 
+            graph = graph or AudioFeatureGraph(y, sr)
+
             # 크로마 특징 (조성 분석)
-            chroma = librosa.feature.chroma_stft(y=y, sr=sr)
-            chroma_mean = np.mean(chroma, axis=1)
+            chroma_mean = graph.chroma_mean
 
             # 메이저/마이너 조성 추정
             # 메이저 스케일: C, D, E, F, G, A, B (0, 2, 4, 5, 7, 9, 11)
@@ -645,11 +648,10 @@ class AudioAnalyzer:
             minor_correlation = np.corrcoef(chroma_mean, minor_profile)[0, 1]
 
             # 스펙트럴 중심 (밝은 소리)
-            spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            spectral_mean = np.mean(spectral_centroid)
+            spectral_mean = graph.spectral_centroid_mean
 
             # 템포 (빠른 템포는 더 긍정적)
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+            tempo = graph.tempo
 
             # 밸런스 계산
             mode_factor = max(
@@ -677,91 +679,19 @@ class AudioAnalyzer:
             file_path: 오디오 파일 경로
 
         Returns:
-            감지된 형식 ('webm', 'mp4', 'wav', 'mp3', 'unknown')
+            감지된 형식 ('webm', 'mp4', 'wav', 'flac', 'mp3', 'aac', 'ogg', 'unknown')
         """
         try:
             # 파일 헤더 읽기
             with open(file_path, "rb") as f:
                 header = f.read(16)
 
-            # WebM 형식 감지
-            if header.startswith(b"\x1a\x45\xdf\xa3"):
-                return "webm"
-
-            # MP4 형식 감지
-            if b"ftyp" in header[:12]:
-                return "mp4"
-
-            # WAV 형식 감지
-            if header.startswith(b"RIFF") and b"WAVE" in header:
-                return "wav"
-
-            # MP3 형식 감지
-            if header.startswith(b"\xff\xfb") or header.startswith(b"\xff\xf3"):
-                return "mp3"
-
-            # OGG 형식 감지
-            if header.startswith(b"OggS"):
-                return "ogg"
-
-            return "unknown"
+            return detect_audio_format_from_header(header)
 
         except Exception as e:
             print(f"파일 형식 감지 실패: {e}")
             return "unknown"
 
-    def _convert_audio_format(
-        self, input_path: str, output_path: str, target_format: str = "wav"
-    ) -> bool:
-        """
-        오디오 파일을 다른 형식으로 변환합니다.
-
-        Args:
-            input_path: 입력 파일 경로
-            output_path: 출력 파일 경로
-            target_format: 목표 형식 ('wav', 'mp3', 'flac')
-
-        Returns:
-            변환 성공 여부
-        """
-        try:
-            import subprocess
-            import shutil
-
-            # ffmpeg가 설치되어 있는지 확인
-            if not shutil.which("ffmpeg"):
-                print("ffmpeg가 설치되지 않았습니다. 기본 로딩을 시도합니다.")
-                return False
-
-            # ffmpeg 명령어 구성
-            cmd = [
-                "ffmpeg",
-                "-i",
-                input_path,
-                "-acodec",
-                "pcm_s16le" if target_format == "wav" else "libmp3lame",
-                "-ar",
-                "48000",  # 샘플링 레이트
-                "-ac",
-                "1",  # 모노 채널
-                "-y",  # 덮어쓰기
-                output_path,
-            ]
-
-            # 변환 실행
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            if result.returncode == 0:
-                print(f"오디오 변환 성공: {input_path} -> {output_path}")
-                return True
-            else:
-                print(f"오디오 변환 실패: {result.stderr}")
-                return False
-
-        except Exception as e:
-            print(f"오디오 변환 중 오류: {e}")
-            return False
-
     def _print_ffmpeg_installation_guide(self):
         """ffmpeg 설치 가이드를 출력합니다."""
         print("\n" + "=" * 60)
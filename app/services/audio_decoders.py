@@ -0,0 +1,1001 @@
+import librosa
+import numpy as np
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+import io
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import warnings
+
+
+class AudioDecodeError(Exception):
+    """디코더가 실제로 오디오를 해석하지 못한 경우"""
+
+
+class DecoderUnavailableError(AudioDecodeError):
+    """디코더 실행에 필요한 도구/모듈이 없는 경우 (디코딩 실패로 집계하지 않음)"""
+
+
+def detect_audio_format_from_header(header: bytes) -> str:
+    """
+    파일 헤더(매직 바이트)로 오디오 형식을 감지합니다.
+
+    Args:
+        header: 파일 앞부분 바이트 (16바이트 이상 권장)
+
+    Returns:
+        감지된 형식 ('webm', 'mp4', 'wav', 'flac', 'mp3', 'aac', 'ogg', 'unknown')
+    """
+    # WebM (EBML) 형식 감지
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"
+
+    # MP4/M4A 형식 감지
+    if b"ftyp" in header[:12]:
+        return "mp4"
+
+    # WAV 형식 감지
+    if header.startswith(b"RIFF") and b"WAVE" in header:
+        return "wav"
+
+    # FLAC 형식 감지
+    if header.startswith(b"fLaC"):
+        return "flac"
+
+    # OGG 형식 감지
+    if header.startswith(b"OggS"):
+        return "ogg"
+
+    # MP3 형식 감지 (ID3 태그 또는 프레임 동기 비트)
+    if header.startswith(b"ID3"):
+        return "mp3"
+    if len(header) >= 2 and header[0] == 0xFF:
+        # ADTS AAC: 동기 비트 12개 + layer 00
+        if header[1] & 0xF6 == 0xF0:
+            return "aac"
+        if header[1] & 0xE0 == 0xE0:
+            return "mp3"
+
+    return "unknown"
+
+
+_ffmpeg_path_cache: Dict[str, Optional[str]] = {}
+
+# which로 찾지 못할 때 확인하는 Windows 기본 설치 경로
+_FFMPEG_FALLBACK_PATHS = [
+    r"C:\ffmpeg\bin\ffmpeg.exe",
+    r"C:\ProgramData\chocolatey\bin\ffmpeg.exe",
+    r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
+    r"C:\Program Files (x86)\ffmpeg\bin\ffmpeg.exe",
+    r"C:\tools\ffmpeg\bin\ffmpeg.exe",
+]
+
+
+def find_ffmpeg() -> Optional[str]:
+    """
+    ffmpeg 실행 파일 경로를 찾습니다 (프로세스당 한 번만 검색).
+
+    Returns:
+        ffmpeg 경로 (없으면 None)
+    """
+    if "ffmpeg" not in _ffmpeg_path_cache:
+        ffmpeg_path = shutil.which("ffmpeg")
+        if not ffmpeg_path:
+            for path in _FFMPEG_FALLBACK_PATHS:
+                if os.path.exists(path):
+                    ffmpeg_path = path
+                    break
+        _ffmpeg_path_cache["ffmpeg"] = ffmpeg_path
+        print(f"ffmpeg 경로: {ffmpeg_path}")
+    return _ffmpeg_path_cache["ffmpeg"]
+
+
+def _find_ffprobe(ffmpeg_path: str) -> str:
+    """ffmpeg 옆에 있는 ffprobe 경로를 찾습니다."""
+    candidates = [
+        ffmpeg_path.replace("ffmpeg", "ffprobe"),
+        os.path.join(os.path.dirname(ffmpeg_path), "ffprobe.exe"),
+        os.path.join(os.path.dirname(ffmpeg_path), "ffprobe"),
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return candidates[0]
+
+
+# soundfile 다채널 폴백에서 한 번에 읽는 프레임 수
+SOUNDFILE_BLOCK_FRAMES = 65536
+
+# 디코더 입력: 파일 경로 또는 업로드된 원본 바이트
+AudioSource = Union[str, bytes]
+
+
+def _as_file_like(source: AudioSource):
+    """바이트 입력은 파일 객체로 감싸서 반환합니다."""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+class PCMBuffer:
+    """
+    폴백 디코더용 모노 float32 PCM 버퍼
+
+    최대 길이만큼 float32 배열을 한 번만 할당하고, 디코더가 내놓는 정수 PCM
+    바이트나 float32 블록을 그 자리에서 변환/다운믹스해 채웁니다. 바이트는
+    np.frombuffer로 복사 없이 해석하고, 다채널은 합계를 출력 배열에 바로
+    누적하므로 (프레임, 채널) 크기의 중간 배열을 만들지 않습니다. 리샘플링은
+    finish에서 한 번만 수행합니다.
+    """
+
+    def __init__(self, max_frames: int, channels: int, sr: int):
+        """
+        Args:
+            max_frames: 담을 수 있는 최대 프레임 수 (넘치는 샘플은 버림)
+            channels: 입력 채널 수
+            sr: 입력 샘플링 레이트
+        """
+        self.channels = max(1, channels)
+        self.sr = sr
+        self._data = np.empty(max(0, max_frames), dtype=np.float32)
+        self._filled = 0
+        # 프레임 경계에서 잘린 바이트 (다음 조각 앞에 이어 붙임)
+        self._remainder = b""
+
+    @property
+    def full(self) -> bool:
+        return self._filled >= len(self._data)
+
+    def reset(self):
+        """같은 배열을 다시 채우도록 비웁니다."""
+        self._filled = 0
+        self._remainder = b""
+
+    def unfilled(self) -> np.ndarray:
+        """디코더가 모노 float32 샘플을 직접 써넣을 수 있는 남은 구간"""
+        return self._data[self._filled :]
+
+    def advance(self, count: int):
+        """unfilled()에 직접 써넣은 샘플 수만큼 채워진 길이를 늘립니다."""
+        self._filled = min(len(self._data), self._filled + count)
+
+    def append_int(self, raw: bytes, sample_width: int = 2):
+        """
+        리틀엔디언 부호 있는 정수 PCM 바이트(인터리브)를 추가합니다.
+
+        Args:
+            raw: PCM 바이트
+            sample_width: 샘플 하나의 바이트 수 (1, 2, 4)
+        """
+        frame_bytes = sample_width * self.channels
+        if self._remainder:
+            raw = self._remainder + raw
+        usable = len(raw) - len(raw) % frame_bytes
+        self._remainder = bytes(raw[usable:])
+        if usable == 0:
+            return
+
+        samples = np.frombuffer(
+            raw, dtype=f"<i{sample_width}", count=usable // sample_width
+        )
+        scale = 1.0 / float(1 << (8 * sample_width - 1))
+        self._append(samples.reshape(-1, self.channels), scale)
+
+    def append_float(self, block: np.ndarray):
+        """
+        (프레임, 채널) float32 블록을 추가합니다.
+
+        Args:
+            block: soundfile 등이 읽은 인터리브 블록 (다음 호출 전에 재사용되어도 됨)
+        """
+        self._append(block.reshape(len(block), -1), 1.0)
+
+    def _append(self, frames: np.ndarray, scale: float):
+        count = min(len(frames), len(self._data) - self._filled)
+        if count <= 0:
+            return
+        out = self._data[self._filled : self._filled + count]
+        frames = frames[:count]
+        if self.channels == 1:
+            np.multiply(frames[:, 0], np.float32(scale), out=out, casting="unsafe")
+        else:
+            # 채널별로 출력에 바로 누적한 뒤 한 번에 평균/정규화
+            # (채널 축 np.sum보다 짧은 축에서 훨씬 빠름)
+            np.copyto(out, frames[:, 0], casting="unsafe")
+            for channel in range(1, self.channels):
+                np.add(out, frames[:, channel], out=out, casting="unsafe")
+            out *= np.float32(scale / self.channels)
+        self._filled += count
+
+    def finish(self, sample_rate: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """
+        채워진 구간을 반환합니다.
+
+        Args:
+            sample_rate: 목표 샘플링 레이트 (None이면 입력 그대로)
+
+        Returns:
+            (모노 float32 신호, 샘플링 레이트) 튜플
+        """
+        y = self._data[: self._filled]
+        if sample_rate is None or sample_rate == self.sr:
+            return y, self.sr
+        return librosa.resample(y, orig_sr=self.sr, target_sr=sample_rate), sample_rate
+
+
+class FFmpegPCMStream:
+    """
+    ffmpeg 프로세스에 입력을 조각 단위로 넣고 모노 f32le PCM을 받아오는 스트림
+
+    출력은 최대 길이만큼 미리 할당한 float32 배열에 readinto로 바로 채워지며,
+    목표 길이를 다 채우면 ffmpeg를 종료하고 더 이상 입력을 받지 않습니다.
+    업로드 크기와 상관없이 메모리 사용량은 입력 조각 하나 + PCM 버퍼로 제한됩니다.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        duration: float,
+        input_path: Optional[str] = None,
+        timeout: float = 30,
+        offset: float = 0.0,
+        out: Optional[np.ndarray] = None,
+    ):
+        """
+        Args:
+            sample_rate: 목표 샘플링 레이트 (ffmpeg가 직접 변환)
+            duration: 최대 디코딩 길이 (초)
+            input_path: 파일 경로 입력 (None이면 feed로 stdin 입력)
+            timeout: ffmpeg 실행 제한 시간 (초)
+            offset: 디코딩 시작 위치 (초, 파일 입력이면 seek로 건너뜀)
+            out: PCM을 채울 float32 버퍼 (예: 구간 배치 배열의 한 행)
+        """
+        ffmpeg_path = find_ffmpeg()
+        if not ffmpeg_path:
+            raise DecoderUnavailableError("ffmpeg를 찾을 수 없습니다.")
+
+        self.sample_rate = sample_rate
+        cmd = [
+            ffmpeg_path,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            *(["-ss", str(offset)] if offset > 0 else []),
+            "-i",
+            input_path or "pipe:0",
+            "-t",
+            str(duration),
+            "-vn",
+            "-ac",
+            "1",  # 모노
+            "-rematrix_maxval",
+            "1.0",  # librosa와 같이 채널 평균으로 다운믹스 (기본값은 합산)
+            "-ar",
+            str(sample_rate),  # 샘플링 레이트
+            "-f",
+            "f32le",  # 32비트 float PCM
+            "pipe:1",
+        ]
+
+        if out is None:
+            out = np.empty(int(duration * sample_rate), dtype=np.float32)
+        self._buffer = out
+        self._filled = 0
+        self._stderr = b""
+        self._done = threading.Event()
+
+        try:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if input_path is None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except OSError as e:
+            raise DecoderUnavailableError(f"ffmpeg 실행 실패: {e}") from e
+
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._stderr_reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self._reader.start()
+        self._stderr_reader.start()
+        self._killer = threading.Timer(timeout, self._proc.kill)
+        self._killer.start()
+
+    def _read_stdout(self):
+        view = memoryview(self._buffer).cast("B")
+        try:
+            while self._filled < len(view):
+                n = self._proc.stdout.readinto(view[self._filled :])
+                if not n:
+                    break
+                self._filled += n
+        finally:
+            if self._filled >= len(view):
+                # 목표 길이를 모두 채웠으면 남은 입력은 더 디코딩하지 않음
+                self._proc.kill()
+            self._done.set()
+
+    def _read_stderr(self):
+        self._stderr = self._proc.stderr.read()
+
+    @property
+    def done(self) -> bool:
+        """목표 길이를 채웠거나 ffmpeg가 종료되었는지 여부"""
+        return self._done.is_set()
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        입력 조각을 ffmpeg에 전달합니다.
+
+        Returns:
+            더 많은 입력이 필요한지 여부 (False면 입력을 그만 보내도 됨)
+        """
+        if self.done:
+            return False
+        try:
+            self._proc.stdin.write(chunk)
+        except (BrokenPipeError, OSError, ValueError):
+            # 최대 길이만큼 디코딩한 ffmpeg가 먼저 종료한 경우
+            return False
+        return not self.done
+
+    def finish(self) -> np.ndarray:
+        """
+        입력을 닫고 디코딩이 끝나기를 기다린 뒤 PCM을 반환합니다.
+
+        Raises:
+            AudioDecodeError: 한 샘플도 디코딩하지 못한 경우
+        """
+        if self._proc.stdin is not None:
+            try:
+                self._proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        self._reader.join()
+        self._close()
+
+        samples = self._filled // 4
+        if samples == 0:
+            stderr = self._stderr.decode("utf-8", "replace")
+            raise AudioDecodeError(f"ffmpeg 디코딩 실패: {stderr[-500:]}")
+        return self._buffer[:samples]
+
+    def abort(self):
+        """디코딩을 중단하고 프로세스를 정리합니다."""
+        self._proc.kill()
+        self._reader.join()
+        self._close()
+
+    def _close(self):
+        self._proc.stdout.close()
+        self._proc.wait()
+        self._killer.cancel()
+        self._stderr_reader.join(timeout=1)
+
+
+class FFmpegLiveDecoder:
+    """
+    실시간 입력(WebM/Ogg Opus 등)을 조각 단위로 넣고 디코딩된 PCM을 바로 꺼내는 ffmpeg 디코더
+
+    FFmpegPCMStream과 달리 출력 길이를 미리 정하지 않고, 읽기 스레드가 받은
+    PCM 바이트를 read_available이 호출될 때마다 넘겨줍니다. 보관하는 것은
+    아직 꺼내지 않은 PCM뿐입니다.
+    """
+
+    # 한 번에 읽는 stdout 바이트 수
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, sample_rate: int):
+        """
+        Args:
+            sample_rate: 목표 샘플링 레이트 (ffmpeg가 직접 변환)
+        """
+        ffmpeg_path = find_ffmpeg()
+        if not ffmpeg_path:
+            raise DecoderUnavailableError("ffmpeg를 찾을 수 없습니다.")
+
+        self.sample_rate = sample_rate
+        cmd = [
+            ffmpeg_path,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-fflags",
+            "nobuffer",  # 입력을 받는 즉시 디코딩
+            "-i",
+            "pipe:0",
+            "-vn",
+            "-ac",
+            "1",
+            "-rematrix_maxval",
+            "1.0",
+            "-ar",
+            str(sample_rate),
+            "-f",
+            "f32le",
+            "-flush_packets",
+            "1",
+            "pipe:1",
+        ]
+        try:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise DecoderUnavailableError(f"ffmpeg 실행 실패: {e}") from e
+
+        self._pending = bytearray()
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._reader.start()
+
+    def _read_stdout(self):
+        while True:
+            try:
+                data = self._proc.stdout.read1(self.READ_SIZE)
+            except (OSError, ValueError):
+                return
+            if not data:
+                return
+            with self._lock:
+                self._pending += data
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        입력 조각을 ffmpeg에 전달합니다 (파이프 쓰기는 블로킹).
+
+        Returns:
+            입력을 전달했는지 여부 (ffmpeg가 이미 종료되었으면 False)
+        """
+        try:
+            self._proc.stdin.write(chunk)
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            return False
+        return True
+
+    def read_available(self) -> np.ndarray:
+        """지금까지 디코딩된 PCM을 꺼냅니다 (없으면 빈 배열)."""
+        with self._lock:
+            usable = len(self._pending) - len(self._pending) % 4
+            data = bytes(self._pending[:usable])
+            del self._pending[:usable]
+        return np.frombuffer(data, dtype=np.float32)
+
+    def close(self) -> np.ndarray:
+        """입력을 닫고 ffmpeg가 끝나기를 기다린 뒤 남은 PCM을 반환합니다."""
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        self._reader.join(timeout=10)
+        self.abort()
+        return self.read_available()
+
+    def abort(self):
+        """디코딩을 중단하고 프로세스를 정리합니다."""
+        self._proc.kill()
+        self._proc.wait()
+        self._reader.join(timeout=1)
+        for pipe in (self._proc.stdin, self._proc.stdout):
+            try:
+                pipe.close()
+            except (BrokenPipeError, OSError):
+                pass
+
+
+def _run_ffmpeg_to_pcm(
+    source: AudioSource, sample_rate: int, duration: float, timeout: float = 30
+) -> np.ndarray:
+    """
+    ffmpeg를 파이프로 실행해 모노 f32le PCM을 NumPy 버퍼로 바로 읽습니다.
+
+    바이트 입력은 stdin으로 전달하므로 임시 WAV 파일과 별도의 리샘플링
+    단계가 없습니다.
+    """
+    from_stdin = isinstance(source, bytes)
+    stream = FFmpegPCMStream(
+        sample_rate,
+        duration,
+        input_path=None if from_stdin else source,
+        timeout=timeout,
+    )
+    if from_stdin:
+        stream.feed(source)
+    return stream.finish()
+
+
+def probe_audio_duration(path: str) -> Optional[float]:
+    """
+    파일 전체 길이(초)를 디코딩 없이 알아냅니다.
+
+    soundfile 헤더, ffprobe, ffmpeg 출력의 Duration 순서로 시도합니다.
+
+    Args:
+        path: 오디오 파일 경로
+
+    Returns:
+        길이 (초) 또는 알 수 없는 경우 None
+    """
+    try:
+        import soundfile as sf
+
+        info = sf.info(path)
+        if info.frames > 0:
+            return info.frames / info.samplerate
+    except Exception:
+        pass
+
+    ffmpeg_path = find_ffmpeg()
+    if not ffmpeg_path:
+        return None
+
+    ffprobe_path = _find_ffprobe(ffmpeg_path)
+    if os.path.exists(ffprobe_path):
+        try:
+            result = subprocess.run(
+                [
+                    ffprobe_path,
+                    "-v",
+                    "error",
+                    "-show_entries",
+                    "format=duration",
+                    "-of",
+                    "default=noprint_wrappers=1:nokey=1",
+                    path,
+                ],
+                capture_output=True,
+                timeout=10,
+            )
+            return float(result.stdout.strip())
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            pass
+
+    # ffprobe가 없으면 ffmpeg -i의 헤더 출력에서 Duration을 읽음
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-i", path],
+            capture_output=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = re.search(rb"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def decode_segments(
+    path: str, offsets: List[float], duration: float, sample_rate: int
+) -> np.ndarray:
+    """
+    파일의 여러 구간을 seek로 디코딩해 (구간 수, 샘플 수) 배열에 바로 채웁니다.
+
+    Args:
+        path: 오디오 파일 경로
+        offsets: 구간 시작 위치 (초)
+        duration: 구간 길이 (초)
+        sample_rate: 목표 샘플링 레이트
+
+    Returns:
+        float32 배열 [shape=(len(offsets), duration * sample_rate)]
+
+    Raises:
+        AudioDecodeError: 구간 하나라도 디코딩하지 못한 경우
+    """
+    length = int(duration * sample_rate)
+    segments = np.zeros((len(offsets), length), dtype=np.float32)
+
+    if find_ffmpeg():
+        # 구간마다 ffmpeg를 동시에 실행하고 각자 배열의 행에 바로 기록
+        streams = [
+            FFmpegPCMStream(
+                sample_rate, duration, input_path=path, offset=offset, out=row
+            )
+            for offset, row in zip(offsets, segments)
+        ]
+        for index, stream in enumerate(streams):
+            try:
+                stream.finish()
+            except AudioDecodeError:
+                for remaining in streams[index + 1 :]:
+                    remaining.abort()
+                raise
+        return segments
+
+    for offset, row in zip(offsets, segments):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                y, _ = librosa.load(
+                    path, sr=sample_rate, mono=True, offset=offset, duration=duration
+                )
+        except Exception as e:
+            raise AudioDecodeError(f"구간 디코딩 실패 ({offset:.1f}초): {e}") from e
+        if len(y) == 0:
+            raise AudioDecodeError(f"구간 디코딩 실패 ({offset:.1f}초): 빈 구간")
+        row[: len(y)] = y[:length]
+    return segments
+
+
+def iter_pcm_blocks(
+    path: str,
+    sample_rate: int,
+    block_duration: float = 10.0,
+    max_duration: Optional[float] = None,
+) -> Tuple[int, Iterator[np.ndarray]]:
+    """
+    파일을 고정 크기 PCM 블록 단위로 디코딩하는 생성기를 엽니다.
+
+    ffmpeg가 있으면 목표 샘플링 레이트의 모노 f32le를 파이프로 받아 하나의
+    블록 버퍼에 반복해서 채웁니다. 없으면 soundfile로 원본 샘플링 레이트의
+    블록을 읽습니다. 어느 쪽이든 메모리는 블록 하나로 제한됩니다.
+
+    Args:
+        path: 오디오 파일 경로
+        sample_rate: 목표 샘플링 레이트 (ffmpeg 사용 시)
+        block_duration: 블록 길이 (초)
+        max_duration: 최대 디코딩 길이 (초, None이면 전체)
+
+    Returns:
+        (실제 샘플링 레이트, 블록 생성기) 튜플. 생성기가 내보내는 배열은 다음
+        블록에서 재사용되므로 필요하면 복사해야 함
+
+    Raises:
+        DecoderUnavailableError: 사용할 수 있는 블록 디코더가 없는 경우
+    """
+    ffmpeg_path = find_ffmpeg()
+    if ffmpeg_path:
+        return sample_rate, _iter_ffmpeg_blocks(
+            ffmpeg_path, path, sample_rate, block_duration, max_duration
+        )
+
+    try:
+        import soundfile as sf
+
+        native_sr = sf.info(path).samplerate
+    except Exception as e:
+        raise DecoderUnavailableError(f"블록 디코딩 불가: {e}") from e
+    return native_sr, _iter_soundfile_blocks(
+        path, native_sr, block_duration, max_duration
+    )
+
+
+def _iter_ffmpeg_blocks(
+    ffmpeg_path: str,
+    path: str,
+    sample_rate: int,
+    block_duration: float,
+    max_duration: Optional[float],
+) -> Iterator[np.ndarray]:
+    cmd = [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-i", path]
+    if max_duration:
+        cmd += ["-t", str(max_duration)]
+    cmd += [
+        "-vn",
+        "-ac",
+        "1",
+        "-rematrix_maxval",
+        "1.0",
+        "-ar",
+        str(sample_rate),
+        "-f",
+        "f32le",
+        "pipe:1",
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    block = np.empty(int(block_duration * sample_rate), dtype=np.float32)
+    view = memoryview(block).cast("B")
+    total = 0
+    try:
+        while True:
+            filled = 0
+            while filled < len(view):
+                n = proc.stdout.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+            samples = filled // 4
+            if samples:
+                total += samples
+                yield block[:samples]
+            if filled < len(view):
+                break
+    finally:
+        proc.kill()
+        proc.stdout.close()
+        proc.wait()
+
+    if total == 0:
+        raise AudioDecodeError("ffmpeg 블록 디코딩 실패: 디코딩된 샘플 없음")
+
+
+def _iter_soundfile_blocks(
+    path: str, sr: int, block_duration: float, max_duration: Optional[float]
+) -> Iterator[np.ndarray]:
+    import soundfile as sf
+
+    block_samples = int(block_duration * sr)
+    remaining = int(max_duration * sr) if max_duration else None
+    with sf.SoundFile(path) as f:
+        out = np.empty((block_samples, f.channels), dtype=np.float32)
+        mono = PCMBuffer(block_samples, f.channels, sr)
+        while remaining is None or remaining > 0:
+            frames = (
+                block_samples if remaining is None else min(block_samples, remaining)
+            )
+            read = f.read(
+                frames=frames, dtype="float32", always_2d=True, out=out[:frames]
+            )
+            if len(read) == 0:
+                break
+            if remaining is not None:
+                remaining -= len(read)
+            # 다운믹스 결과도 같은 배열을 재사용
+            mono.reset()
+            mono.append_float(read)
+            yield mono.finish()[0]
+
+
+# ---- 개별 디코더 ----
+# 모든 디코더는 (경로 또는 바이트, 목표 샘플링 레이트, 최대 길이) -> (모노 float32 신호, 샘플링 레이트)
+
+
+def decode_with_librosa(
+    source: AudioSource, sample_rate: int, duration: float
+) -> Tuple[np.ndarray, int]:
+    """librosa(soundfile/audioread)로 디코딩합니다."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            y, sr = librosa.load(
+                _as_file_like(source), sr=sample_rate, duration=duration, mono=True
+            )
+    except Exception as e:
+        raise AudioDecodeError(f"librosa 디코딩 실패: {e}") from e
+    return y, sr
+
+
+def decode_with_soundfile(
+    source: AudioSource, sample_rate: int, duration: float
+) -> Tuple[np.ndarray, int]:
+    """soundfile(libsndfile)로 직접 디코딩합니다."""
+    try:
+        import soundfile as sf
+    except ImportError as e:
+        raise DecoderUnavailableError("soundfile 모듈이 없습니다.") from e
+
+    try:
+        with sf.SoundFile(_as_file_like(source)) as f:
+            max_frames = int(duration * f.samplerate)
+            if f.frames > 0:
+                max_frames = min(f.frames, max_frames)
+            buffer = PCMBuffer(max_frames, f.channels, f.samplerate)
+            if f.channels == 1:
+                # 모노는 변환할 것이 없으므로 출력 배열에 바로 읽음
+                read = f.read(dtype="float32", out=buffer.unfilled())
+                buffer.advance(len(read))
+            else:
+                block = np.empty((SOUNDFILE_BLOCK_FRAMES, f.channels), np.float32)
+                while not buffer.full:
+                    read = f.read(dtype="float32", out=block)
+                    if len(read) == 0:
+                        break
+                    buffer.append_float(read)
+    except Exception as e:
+        raise AudioDecodeError(f"soundfile 디코딩 실패: {e}") from e
+
+    return buffer.finish(sample_rate)
+
+
+def decode_with_ffmpeg(
+    source: AudioSource, sample_rate: int, duration: float
+) -> Tuple[np.ndarray, int]:
+    """ffmpeg 파이프로 목표 샘플링 레이트의 모노 PCM을 바로 디코딩합니다."""
+    return _run_ffmpeg_to_pcm(source, sample_rate, duration), sample_rate
+
+
+def decode_with_pydub(
+    source: AudioSource, sample_rate: int, duration: float
+) -> Tuple[np.ndarray, int]:
+    """pydub(AudioSegment)로 디코딩합니다."""
+    try:
+        from pydub import AudioSegment
+    except ImportError as e:
+        raise DecoderUnavailableError("pydub 모듈이 없습니다.") from e
+
+    ffmpeg_path = find_ffmpeg()
+    if not ffmpeg_path:
+        raise DecoderUnavailableError("pydub에 필요한 ffmpeg를 찾을 수 없습니다.")
+    AudioSegment.converter = ffmpeg_path
+    AudioSegment.ffmpeg = ffmpeg_path
+    AudioSegment.ffprobe = _find_ffprobe(ffmpeg_path)
+
+    try:
+        audio_segment = AudioSegment.from_file(_as_file_like(source))
+    except Exception as e:
+        raise AudioDecodeError(f"pydub 디코딩 실패: {e}") from e
+
+    # 원본 PCM 바이트를 복사 없이 해석 (정수 샘플 -> -1.0~1.0, 최대 길이로 제한)
+    sr = audio_segment.frame_rate
+    max_frames = min(int(duration * sr), int(audio_segment.frame_count()))
+    buffer = PCMBuffer(max_frames, audio_segment.channels, sr)
+    buffer.append_int(audio_segment.raw_data, audio_segment.sample_width)
+    return buffer.finish(sample_rate)
+
+
+def decode_with_audioread(
+    source: AudioSource, sample_rate: int, duration: float
+) -> Tuple[np.ndarray, int]:
+    """audioread 백엔드로 디코딩합니다 (경로만 지원하므로 바이트는 임시 파일 사용)."""
+    try:
+        import audioread
+    except ImportError as e:
+        raise DecoderUnavailableError("audioread 모듈이 없습니다.") from e
+
+    if isinstance(source, bytes):
+        fd, temp_path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(source)
+            return decode_with_audioread(temp_path, sample_rate, duration)
+        finally:
+            os.remove(temp_path)
+
+    try:
+        with audioread.audio_open(source) as f:
+            max_frames = int(duration * f.samplerate)
+            if f.duration:
+                # 길이를 알면 실제 길이만큼만 할당 (추정 오차 여유 1초)
+                max_frames = min(max_frames, int((f.duration + 1) * f.samplerate))
+            buffer = PCMBuffer(max_frames, f.channels, f.samplerate)
+            # audioread는 16비트 리틀엔디언 PCM 바이트 조각을 반환
+            for frame in f:
+                buffer.append_int(frame, 2)
+                if buffer.full:
+                    break
+    except Exception as e:
+        raise AudioDecodeError(f"audioread 디코딩 실패: {e}") from e
+
+    return buffer.finish(sample_rate)
+
+
+Decoder = Callable[[AudioSource, int, float], Tuple[np.ndarray, int]]
+
+
+class AudioDecoderRegistry:
+    """
+    감지된 파일 형식별로 최적의 디코더를 바로 선택하는 레지스트리
+
+    형식마다 우선순위가 정해진 디코더 체인을 가지고 있으며, 첫 번째 디코더가
+    실제로 디코딩에 실패했을 때만 다음 디코더로 넘어갑니다. 형식/디코더별
+    시도 횟수, 실패 횟수, 누적 시간을 기록합니다.
+    """
+
+    def __init__(self):
+        self._decoders: Dict[str, Decoder] = {}
+        self._chains: Dict[str, List[str]] = {}
+        self._stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def register_decoder(self, name: str, decoder: Decoder):
+        """디코더를 이름으로 등록합니다."""
+        self._decoders[name] = decoder
+
+    def set_chain(self, audio_format: str, decoder_names: List[str]):
+        """형식별 디코더 우선순위를 설정합니다."""
+        unknown = [name for name in decoder_names if name not in self._decoders]
+        if unknown:
+            raise ValueError(f"등록되지 않은 디코더: {unknown}")
+        self._chains[audio_format] = list(decoder_names)
+
+    def chain_for(self, audio_format: str) -> List[str]:
+        """형식에 맞는 디코더 체인 (없으면 unknown 체인)"""
+        return self._chains.get(audio_format) or self._chains.get("unknown", [])
+
+    def decode(
+        self,
+        source: AudioSource,
+        audio_format: str,
+        sample_rate: int,
+        duration: float,
+        exclude: Tuple[str, ...] = (),
+    ) -> Tuple[np.ndarray, int]:
+        """
+        형식에 맞는 디코더로 오디오를 디코딩합니다.
+
+        Args:
+            source: 오디오 파일 경로 또는 업로드된 원본 바이트
+            audio_format: 감지된 형식
+            sample_rate: 목표 샘플링 레이트
+            duration: 최대 디코딩 길이 (초)
+            exclude: 이미 실패한 것으로 알려져 건너뛸 디코더 이름
+
+        Returns:
+            (모노 오디오 신호, 샘플링 레이트)
+
+        Raises:
+            AudioDecodeError: 체인의 모든 디코더가 실패한 경우
+        """
+        errors = []
+        for name in self.chain_for(audio_format):
+            if name in exclude:
+                continue
+            started = time.perf_counter()
+            try:
+                y, sr = self._decoders[name](source, sample_rate, duration)
+                if y is None or len(y) == 0:
+                    raise AudioDecodeError(f"{name}: 디코딩 결과가 비어있음")
+            except DecoderUnavailableError as e:
+                # 도구가 없는 것은 디코딩 실패가 아니므로 집계하지 않음
+                errors.append(f"{name}: {e}")
+                continue
+            except Exception as e:
+                self.record(audio_format, name, time.perf_counter() - started, False)
+                print(f"{audio_format} 디코더 '{name}' 실패: {e}")
+                errors.append(f"{name}: {e}")
+                continue
+
+            elapsed = time.perf_counter() - started
+            self.record(audio_format, name, elapsed, True)
+            print(
+                f"{audio_format} 디코더 '{name}' 성공: {len(y)/sr:.1f}초, {elapsed*1000:.0f}ms"
+            )
+            return y, sr
+
+        raise AudioDecodeError(
+            f"{audio_format} 형식 디코딩 실패 - " + "; ".join(errors)
+        )
+
+    def record(self, audio_format: str, name: str, elapsed: float, success: bool):
+        """레지스트리 밖에서 수행한 디코딩(스트리밍 등) 결과를 통계에 기록합니다."""
+        with self._lock:
+            entry = self._stats.setdefault(audio_format, {}).setdefault(
+                name, {"attempts": 0, "failures": 0, "total_time": 0.0}
+            )
+            entry["attempts"] += 1
+            entry["total_time"] += elapsed
+            if not success:
+                entry["failures"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """형식/디코더별 통계 (평균 디코딩 시간 포함)"""
+        with self._lock:
+            result = {}
+            for audio_format, decoders in self._stats.items():
+                result[audio_format] = {}
+                for name, entry in decoders.items():
+                    result[audio_format][name] = {
+                        **entry,
+                        "avg_time": entry["total_time"] / entry["attempts"],
+                    }
+            return result
+
+
+def create_default_registry() -> AudioDecoderRegistry:
+    """형식별 기본 디코더 체인을 가진 레지스트리를 생성합니다."""
+    registry = AudioDecoderRegistry()
+    registry.register_decoder("librosa", decode_with_librosa)
+    registry.register_decoder("soundfile", decode_with_soundfile)
+    registry.register_decoder("ffmpeg", decode_with_ffmpeg)
+    registry.register_decoder("pydub", decode_with_pydub)
+    registry.register_decoder("audioread", decode_with_audioread)
+
+    # 브라우저 녹음(webm/ogg opus, mp4 aac)은 ffmpeg가 가장 확실함
+    registry.set_chain("webm", ["ffmpeg", "pydub"])
+    registry.set_chain("ogg", ["ffmpeg", "soundfile", "pydub"])
+    registry.set_chain("mp4", ["ffmpeg", "pydub", "audioread"])
+    registry.set_chain("aac", ["ffmpeg", "pydub", "audioread"])
+    # libsndfile이 직접 읽을 수 있는 형식
+    registry.set_chain("wav", ["soundfile", "ffmpeg"])
+    registry.set_chain("flac", ["soundfile", "ffmpeg"])
+    registry.set_chain("mp3", ["librosa", "ffmpeg", "audioread"])
+    registry.set_chain("unknown", ["librosa", "ffmpeg", "pydub", "audioread"])
+    return registry
@@ -0,0 +1,334 @@
+import librosa
+import numpy as np
+from functools import cache, cached_property
+from typing import Iterable, Optional, FrozenSet, Tuple
+
+# extract_features가 반환할 수 있는 전체 특징 필드
+ALL_FEATURE_FIELDS: FrozenSet[str] = frozenset(
+    [
+        "tempo",
+        "beats",
+        "chroma_mean",
+        "tonnetz_mean",
+        "mfcc_mean",
+        "spectral_centroid_mean",
+        "spectral_rolloff_mean",
+        "zero_crossing_rate_mean",
+        "onset_count",
+        "rms_mean",
+        "duration",
+    ]
+)
+
+# Krumhansl-Kessler 조성 프로파일 (C 기준, 피치 클래스 C..B)
+MAJOR_KEY_PROFILE = np.array(
+    [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88]
+)
+MINOR_KEY_PROFILE = np.array(
+    [6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17]
+)
+
+
+def _zscore_rows(matrix: np.ndarray) -> np.ndarray:
+    centered = matrix - matrix.mean(axis=-1, keepdims=True)
+    norm = np.linalg.norm(centered, axis=-1, keepdims=True)
+    return centered / np.where(norm > 0, norm, 1.0)
+
+
+# 24개 조성(장조 0-11, 단조 12-23)의 정규화된 프로파일 행렬
+_KEY_PROFILE_MATRIX = _zscore_rows(
+    np.stack(
+        [np.roll(MAJOR_KEY_PROFILE, key) for key in range(12)]
+        + [np.roll(MINOR_KEY_PROFILE, key) for key in range(12)]
+    )
+)
+
+
+def estimate_key_from_chroma(chroma_mean: np.ndarray) -> Tuple[int, int, float]:
+    """
+    평균 크로마와 24개 조성 프로파일의 상관계수로 조성을 추정합니다.
+
+    이미 계산된 12차원 크로마만 사용하므로 추가 디코딩이나 STFT가 없습니다.
+
+    Args:
+        chroma_mean: 피치 클래스별 평균 크로마 (C..B)
+
+    Returns:
+        (key, mode, correlation) 튜플 (key: 0-11, mode: 0=단조, 1=장조)
+    """
+    chroma = np.asarray(chroma_mean, dtype=np.float64)
+    if chroma.shape != (12,) or np.allclose(chroma, chroma.mean()):
+        # 무음이나 모든 피치가 같은 크로마 등 조성을 판단할 수 없는 경우
+        # (평균을 빼도 부동소수점 오차가 남으므로 정확히 0인지로 판단하지 않음)
+        return 0, 1, 0.0
+
+    correlations = _KEY_PROFILE_MATRIX @ _zscore_rows(chroma)
+    best = int(np.argmax(correlations))
+    return best % 12, 1 if best < 12 else 0, float(correlations[best])
+
+
+def normalize_fields(fields: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """
+    필드 마스크를 정규화합니다.
+
+    Args:
+        fields: 요청된 특징 필드 (None이면 전체)
+
+    Returns:
+        알려진 필드만 포함한 frozenset
+    """
+    if fields is None:
+        return ALL_FEATURE_FIELDS
+    return frozenset(fields) & ALL_FEATURE_FIELDS
+
+
+@cache
+def ensure_scipy_windows():
+    """
+    scipy 호환성 문제 해결 (scipy.signal.windows에 hann이 없는 버전)
+
+    scipy.signal import는 약 0.4초가 걸리므로 모듈 import가 아닌 분석을
+    시작할 때 한 번만 실행합니다.
+    """
+    try:
+        from scipy.signal import windows
+
+        # scipy.signal.hann이 없는 경우 windows.hann 사용
+        if not hasattr(windows, "hann"):
+            import scipy.signal as signal
+
+            windows.hann = signal.hann
+    except ImportError:
+        pass
+
+
+def _feature_mean(feature: np.ndarray) -> np.ndarray:
+    """[..., 차원, 프레임] 특징을 프레임과 구간에 대해 평균낸 차원별 값"""
+    return feature.reshape(-1, *feature.shape[-2:]).mean(axis=(0, 2))
+
+
+class AudioFeatureGraph:
+    """
+    하나의 디코딩된 클립에 대한 특징 계산 그래프
+
+    STFT, 멜 스펙트로그램, 온셋 엔벨로프, 비트, 크로마 등 중간 결과를
+    처음 요청될 때 한 번만 계산하고 이후에는 캐시된 값을 재사용합니다.
+    extract_features와 calculate_* 메서드가 같은 그래프를 공유하면
+    동일한 30초 버퍼에 대한 중복 DSP가 사라집니다.
+
+    y가 (구간 수, 샘플 수) 배열이면 모든 구간의 STFT/멜/크로마 등을 librosa의
+    다채널 처리로 한 번에 계산하고, 요약 통계는 구간 전체에 대해 집계합니다
+    (템포는 구간별 추정값의 중앙값).
+    """
+
+    n_fft = 2048
+    hop_length = 512
+
+    def __init__(self, y: np.ndarray, sr: int):
+        ensure_scipy_windows()
+        self.y = y
+        self.sr = sr
+
+    @property
+    def duration(self) -> float:
+        """분석하는 오디오 길이 (초, 구간 배치는 구간 길이의 합)"""
+        return self.y.size / self.sr
+
+    @property
+    def segment_count(self) -> int:
+        """구간 수 (단일 클립이면 1)"""
+        return self.y.shape[0] if self.y.ndim > 1 else 1
+
+    # ---- 스펙트럼 기반 중간 결과 ----
+
+    @cached_property
+    def magnitude(self) -> np.ndarray:
+        """STFT 크기 스펙트로그램 (한 번만 계산)"""
+        return np.abs(
+            librosa.stft(self.y, n_fft=self.n_fft, hop_length=self.hop_length)
+        )
+
+    @cached_property
+    def power(self) -> np.ndarray:
+        """STFT 파워 스펙트로그램"""
+        return self.magnitude**2
+
+    @cached_property
+    def log_mel(self) -> np.ndarray:
+        """로그 멜 스펙트로그램 (온셋 엔벨로프와 MFCC가 공유)"""
+        mel = librosa.feature.melspectrogram(S=self.power, sr=self.sr)
+        return librosa.power_to_db(mel)
+
+    @cached_property
+    def onset_envelope(self) -> np.ndarray:
+        """온셋 강도 엔벨로프"""
+        return librosa.onset.onset_strength(
+            S=self.log_mel, sr=self.sr, hop_length=self.hop_length
+        )
+
+    @cached_property
+    def beat_onset_envelope(self) -> np.ndarray:
+        """
+        비트 추적용 온셋 강도 엔벨로프
+
+        librosa.beat.beat_track(y=...)처럼 멜 밴드를 중앙값으로 집계합니다
+        (평균으로 집계하는 onset_envelope와 템포 추정 결과가 다름).
+        """
+        return librosa.onset.onset_strength(
+            S=self.log_mel, sr=self.sr, hop_length=self.hop_length, aggregate=np.median
+        )
+
+    @cached_property
+    def _beat_track(self):
+        tempos = []
+        beats = []
+        envelopes = self.beat_onset_envelope
+        # beat_track은 다채널 입력을 지원하지 않으므로 구간별로 실행
+        for envelope in envelopes.reshape(-1, envelopes.shape[-1]):
+            tempo, segment_beats = librosa.beat.beat_track(
+                onset_envelope=envelope,
+                sr=self.sr,
+                hop_length=self.hop_length,
+            )
+            tempos.append(float(np.atleast_1d(tempo)[0]))
+            beats.append(segment_beats)
+        return float(np.median(tempos)), np.concatenate(beats)
+
+    @property
+    def tempo(self) -> float:
+        """추정 템포 (BPM)"""
+        return self._beat_track[0]
+
+    @property
+    def beats(self) -> np.ndarray:
+        """비트 프레임 인덱스"""
+        return self._beat_track[1]
+
+    @cached_property
+    def onsets(self) -> np.ndarray:
+        """온셋 프레임 인덱스 (구간 배치는 구간별 결과를 이어 붙임)"""
+        return np.concatenate(
+            [
+                librosa.onset.onset_detect(
+                    onset_envelope=envelope,
+                    sr=self.sr,
+                    hop_length=self.hop_length,
+                )
+                for envelope in self.onset_envelope.reshape(
+                    -1, self.onset_envelope.shape[-1]
+                )
+            ]
+        )
+
+    @cached_property
+    def chroma(self) -> np.ndarray:
+        """STFT 기반 크로마"""
+        return librosa.feature.chroma_stft(
+            S=self.power, sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+        )
+
+    @cached_property
+    def chroma_mean(self) -> np.ndarray:
+        """피치 클래스별 평균 크로마 (12차원)"""
+        return _feature_mean(self.chroma)
+
+    @cached_property
+    def key_mode(self) -> Tuple[int, int, float]:
+        """평균 크로마에서 추정한 (key, mode, correlation)"""
+        return estimate_key_from_chroma(self.chroma_mean)
+
+    @cached_property
+    def tonnetz(self) -> np.ndarray:
+        """토네츠 (요청된 경우에만 계산, 비용이 큼)"""
+        return librosa.feature.tonnetz(y=self.y, sr=self.sr)
+
+    @cached_property
+    def mfcc(self) -> np.ndarray:
+        """MFCC (13차원)"""
+        return librosa.feature.mfcc(S=self.log_mel, sr=self.sr, n_mfcc=13)
+
+    @cached_property
+    def spectral_centroid(self) -> np.ndarray:
+        """스펙트럴 중심"""
+        return librosa.feature.spectral_centroid(S=self.magnitude, sr=self.sr)[
+            ..., 0, :
+        ]
+
+    @cached_property
+    def spectral_rolloff(self) -> np.ndarray:
+        """스펙트럴 롤오프"""
+        return librosa.feature.spectral_rolloff(S=self.magnitude, sr=self.sr)[..., 0, :]
+
+    @cached_property
+    def zero_crossing_rate(self) -> np.ndarray:
+        """제로 크로싱 레이트"""
+        return librosa.feature.zero_crossing_rate(
+            self.y, frame_length=self.n_fft, hop_length=self.hop_length
+        )[..., 0, :]
+
+    @cached_property
+    def rms(self) -> np.ndarray:
+        """프레임별 RMS (시간 영역, 기존 에너지 스케일 유지)"""
+        return librosa.feature.rms(
+            y=self.y, frame_length=self.n_fft, hop_length=self.hop_length
+        )[..., 0, :]
+
+    # ---- 요약 통계 ----
+
+    @cached_property
+    def spectral_centroid_mean(self) -> float:
+        return float(np.mean(self.spectral_centroid))
+
+    @cached_property
+    def spectral_rolloff_mean(self) -> float:
+        return float(np.mean(self.spectral_rolloff))
+
+    @cached_property
+    def zero_crossing_rate_mean(self) -> float:
+        return float(np.mean(self.zero_crossing_rate))
+
+    @cached_property
+    def rms_mean(self) -> float:
+        return float(np.mean(self.rms))
+
+    @cached_property
+    def onset_strength_mean(self) -> float:
+        return float(np.mean(self.onset_envelope))
+
+    def summarize(self, fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        요청된 필드만 계산하여 특징 딕셔너리를 만듭니다.
+
+        Args:
+            fields: 계산할 필드 마스크 (None이면 전체)
+
+        Returns:
+            요청된 필드만 포함한 특징 딕셔너리
+        """
+        fields = normalize_fields(fields)
+        features = {}
+
+        if "tempo" in fields:
+            features["tempo"] = self.tempo
+        if "beats" in fields:
+            features["beats"] = len(self.beats)
+        if "chroma_mean" in fields:
+            features["chroma_mean"] = self.chroma_mean.tolist()
+        if "tonnetz_mean" in fields:
+            features["tonnetz_mean"] = _feature_mean(self.tonnetz).tolist()
+        if "mfcc_mean" in fields:
+            features["mfcc_mean"] = _feature_mean(self.mfcc).tolist()
+        if "spectral_centroid_mean" in fields:
+            features["spectral_centroid_mean"] = self.spectral_centroid_mean
+        if "spectral_rolloff_mean" in fields:
+            features["spectral_rolloff_mean"] = self.spectral_rolloff_mean
+        if "zero_crossing_rate_mean" in fields:
+            features["zero_crossing_rate_mean"] = self.zero_crossing_rate_mean
+        if "onset_count" in fields:
+            features["onset_count"] = len(self.onsets)
+        if "rms_mean" in fields:
+            features["rms_mean"] = self.rms_mean
+        if "duration" in fields:
+            features["duration"] = self.duration
+
+        return features
@@ -0,0 +1,144 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+
+# Spotify audio_features 엔드포인트가 한 번에 받는 최대 ID 수
+MAX_AUDIO_FEATURES_IDS = 100
+
+
+class _Batch:
+    """짧은 시간 창 동안 모인 ID 묶음 (한 번의 API 호출로 처리)"""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.id_set = set()
+        self.results: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.done = threading.Event()
+
+
+class AudioFeaturesLoader:
+    """
+    DataLoader 방식으로 Spotify audio_features 요청을 모아 보내는 로더
+
+    batch_window 동안 들어온 ID는 여러 요청(스레드)에서 왔더라도 하나의 묶음으로
+    합쳐 audio_features를 한 번(최대 100개) 호출하고, 결과를 요청한 쪽으로 나눠
+    돌려줍니다. 묶음을 처음 만든 스레드가 창이 끝난 뒤 호출을 실행하고 나머지는
+    결과를 기다립니다. 호출 하나가 실패해도 그 묶음의 ID만 실패로 표시하며,
+    잘못된 ID 때문에 400으로 실패한 묶음은 반씩 나눠 다시 호출해 다른 요청의
+    ID까지 함께 실패하지 않게 합니다.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[List[str]], List[Optional[Dict[str, Any]]]],
+        batch_window: float = 0.01,
+        max_batch_size: int = MAX_AUDIO_FEATURES_IDS,
+        timeout: float = 30.0,
+    ):
+        """
+        Args:
+            fetch: ID 목록을 받아 같은 순서의 특성 목록을 반환하는 함수 (sp.audio_features)
+            batch_window: 요청을 모으는 시간 (초)
+            max_batch_size: 호출 하나에 넣는 최대 ID 수
+            timeout: 다른 스레드가 실행하는 묶음을 기다리는 최대 시간 (초)
+        """
+        self._fetch = fetch
+        self.batch_window = batch_window
+        self.max_batch_size = max(1, min(max_batch_size, MAX_AUDIO_FEATURES_IDS))
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pending: Optional[_Batch] = None
+        self._counters = {
+            "requests": 0,
+            "ids": 0,
+            "calls": 0,
+            "failed_calls": 0,
+            "coalesced_ids": 0,
+        }
+
+    def load_many(
+        self, track_ids: Iterable[str]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Exception]]:
+        """
+        여러 트랙의 오디오 특성을 가져옵니다.
+
+        Args:
+            track_ids: Spotify 트랙 ID 목록 (중복은 한 번만 요청)
+
+        Returns:
+            (ID별 특성, ID별 오류) 튜플. Spotify에 특성이 없는 ID는 어느 쪽에도
+            들어가지 않음
+        """
+        unique_ids = list(dict.fromkeys(track_id for track_id in track_ids if track_id))
+        leading: List[_Batch] = []
+        batch_of: Dict[str, _Batch] = {}
+
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["ids"] += len(unique_ids)
+            for track_id in unique_ids:
+                pending = self._pending
+                if pending is not None and track_id in pending.id_set:
+                    # 다른 요청이 이미 넣은 ID는 그 결과를 함께 사용
+                    self._counters["coalesced_ids"] += 1
+                elif pending is None or len(pending.ids) >= self.max_batch_size:
+                    pending = _Batch()
+                    self._pending = pending
+                    leading.append(pending)
+                    pending.ids.append(track_id)
+                    pending.id_set.add(track_id)
+                else:
+                    pending.ids.append(track_id)
+                    pending.id_set.add(track_id)
+                batch_of[track_id] = pending
+
+        if leading:
+            # 다른 요청의 ID가 합류할 시간을 준 뒤 묶음을 닫고 호출
+            time.sleep(self.batch_window)
+            for batch in leading:
+                self._dispatch(batch)
+
+        features: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, Exception] = {}
+        for track_id, batch in batch_of.items():
+            if not batch.done.wait(self.timeout):
+                errors[track_id] = TimeoutError("audio_features 묶음 대기 시간 초과")
+            elif track_id in batch.errors:
+                errors[track_id] = batch.errors[track_id]
+            elif batch.results.get(track_id):
+                features[track_id] = batch.results[track_id]
+        return features, errors
+
+    def _dispatch(self, batch: _Batch):
+        with self._lock:
+            if self._pending is batch:
+                self._pending = None
+            self._counters["calls"] += 1
+        try:
+            self._fetch_into(batch, batch.ids)
+        finally:
+            batch.done.set()
+
+    def _fetch_into(self, batch: _Batch, track_ids: List[str]):
+        try:
+            results = self._fetch(track_ids) or []
+            batch.results.update(zip(track_ids, results))
+        except Exception as e:
+            with self._lock:
+                self._counters["failed_calls"] += 1
+            if getattr(e, "http_status", None) == 400 and len(track_ids) > 1:
+                # 잘못된 ID가 섞여 있으면 반씩 나눠 실패한 ID만 골라냄
+                middle = len(track_ids) // 2
+                with self._lock:
+                    self._counters["calls"] += 2
+                self._fetch_into(batch, track_ids[:middle])
+                self._fetch_into(batch, track_ids[middle:])
+                return
+            print(f"❌ audio_features 묶음 요청 실패 ({len(track_ids)}개): {e}")
+            batch.errors.update((track_id, e) for track_id in track_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        """요청 수, 요청된 ID 수, 실제 API 호출 수"""
+        with self._lock:
+            return dict(self._counters)
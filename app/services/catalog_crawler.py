@@ -0,0 +1,528 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import time
+import uuid
+import numpy as np
+
+from app.services.track_catalog import CATALOG_FEATURES
+
+CRAWL_STATE_VERSION = 1
+CRAWL_EXPORT_VERSION = 1
+
+# Spotify API 한 번에 가져올 수 있는 최대 개수
+_SEARCH_PAGE_SIZE = 50
+_PLAYLIST_PAGE_SIZE = 100
+_TRACKS_BATCH_SIZE = 50
+_FEATURES_BATCH_SIZE = 100
+
+# 작업 하나(또는 곡 하나)가 연속으로 실패하면 포기하는 횟수
+_MAX_ATTEMPTS = 3
+# 다시 시도해도 같은 결과인 응답 (잘못된 ID, 없는 플레이리스트/아티스트)
+_PERMANENT_STATUSES = (400, 404)
+
+
+class CrawlBudgetExhausted(Exception):
+    """이번 실행의 Spotify 요청 수 한도를 다 쓴 경우"""
+
+
+def _is_permanent(error: Exception) -> bool:
+    return getattr(error, "http_status", None) in _PERMANENT_STATUSES
+
+
+class RequestBudget:
+    """
+    Spotify 호출 속도와 횟수를 제한하는 토큰 버킷
+
+    초당 rate개까지(순간적으로는 burst개까지) 호출하고, max_requests를 주면
+    그만큼 쓴 뒤에는 CrawlBudgetExhausted를 발생시킵니다.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 1,
+        max_requests: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            rate: 초당 평균 요청 수 (0 이하면 속도 제한 없음)
+            burst: 쉬고 난 뒤 바로 보낼 수 있는 요청 수 (1이면 1/rate초 간격)
+            max_requests: 이번 실행의 전체 요청 수 한도 (None이면 무제한)
+            clock: 현재 시각 함수 (테스트용)
+            sleep: 대기 함수 (테스트용)
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_requests = max_requests
+        self.used = 0
+        self.waited = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def acquire(self, cost: int = 1):
+        """
+        요청 cost개를 보낼 수 있을 때까지 기다립니다.
+
+        Raises:
+            CrawlBudgetExhausted: 전체 요청 수 한도를 넘는 경우
+        """
+        if self.max_requests is not None and self.used + cost > self.max_requests:
+            raise CrawlBudgetExhausted()
+        if self.rate > 0:
+            while True:
+                now = self._clock()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= min(cost, self.burst):
+                    break
+                delay = (min(cost, self.burst) - self._tokens) / self.rate
+                self.waited += delay
+                self._sleep(delay)
+            self._tokens -= cost
+        self.used += cost
+
+
+class CatalogCrawler:
+    """
+    Spotify에서 카탈로그 후보 곡을 미리 모으는 수집기 (중단 후 이어서 실행 가능)
+
+    플레이리스트(페이지 단위), 검색어(페이지 단위), 아티스트(이름으로 검색,
+    선택적으로 장르 검색 추가), 트랙 ID 목록에서 곡을 찾고, 곡 정보는 50개씩,
+    Audio Features는 100개씩 묶어 가져옵니다. 모든 호출은 RequestBudget을
+    거칩니다. 호출이 실패한 곡은 목록 맨 뒤로 보내 _MAX_ATTEMPTS번까지 다시
+    시도하고, Spotify가 곡이나 특성이 없다고 답한 곡만 건너뜁니다. 특성을 모두 가져온 곡은 state_dir/rows.jsonl에 이어 쓰고, 단계마다
+    작업 목록과 확정된 rows.jsonl 길이를 state.json에 원자적으로 기록합니다.
+    중간에 죽어도 다음 실행이 state.json의 지점부터 이어서 수집하고, 기록되지 않은
+    rows.jsonl 뒷부분은 잘라냅니다. export는 모은 곡을 열 단위 .npz 파일로 씁니다.
+    """
+
+    def __init__(
+        self,
+        service,
+        state_dir: str,
+        budget: Optional[RequestBudget] = None,
+        search_pages: int = 4,
+        expand_genres: bool = False,
+    ):
+        """
+        Args:
+            service: SpotifyService (서버 인증 또는 사용자 토큰)
+            state_dir: 진행 상황과 수집한 곡을 저장할 디렉터리
+            budget: 요청 속도/횟수 제한 (기본값: 초당 5회)
+            search_pages: 검색어 하나에서 가져올 최대 페이지 수 (페이지당 50곡)
+            expand_genres: 아티스트의 장르도 검색어로 추가할지 여부
+        """
+        self.service = service
+        self.state_dir = state_dir
+        self.budget = budget or RequestBudget()
+        self.search_pages = max(1, search_pages)
+        self.expand_genres = expand_genres
+        os.makedirs(state_dir, exist_ok=True)
+        self._state = self._load_state()
+        self._seen_ids = self._collect_seen_ids()
+        self._queued_keys = {self._item_key(item) for item in self._state["queue"]}
+        self._queued_keys.update(self._state["done"])
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.state_dir, name)
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self._path("state.json"), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = None
+        if state is None or state.get("version") != CRAWL_STATE_VERSION:
+            state = {
+                "version": CRAWL_STATE_VERSION,
+                "queue": [],
+                "done": [],
+                "unresolved": [],
+                "pending": [],
+                "skipped": [],
+                "attempts": {},
+                "rows": 0,
+                "rows_bytes": 0,
+                "requests": 0,
+                "errors": 0,
+            }
+        # 트랙 ID별 연속 실패 횟수 (이전 버전 상태 파일에는 없음)
+        state.setdefault("attempts", {})
+        # 마지막 기록 이후에 쓰다 만 곡은 잘라냄 (state.json 기준으로 다시 수집)
+        rows_path = self._path("rows.jsonl")
+        if os.path.exists(rows_path) or state["rows_bytes"]:
+            with open(rows_path, "ab") as f:
+                if f.tell() != state["rows_bytes"]:
+                    print(
+                        f"수집 기록 정리: {f.tell() - state['rows_bytes']}바이트 잘라냄"
+                    )
+                    f.truncate(state["rows_bytes"])
+        return state
+
+    def _collect_seen_ids(self) -> set:
+        state = self._state
+        seen = set(state["unresolved"]) | set(state["skipped"])
+        seen.update(track["id"] for track in state["pending"])
+        for track_id, _, _ in self.iter_rows():
+            seen.add(track_id)
+        return seen
+
+    @staticmethod
+    def _item_key(item: Dict[str, Any]) -> str:
+        return f"{item['kind']}:{item['value']}"
+
+    def _enqueue(self, kind: str, value: str) -> bool:
+        item = {"kind": kind, "value": value, "offset": 0, "attempts": 0}
+        key = self._item_key(item)
+        if key in self._queued_keys:
+            return False
+        self._queued_keys.add(key)
+        self._state["queue"].append(item)
+        return True
+
+    def add_seeds(
+        self,
+        playlists: Iterable[str] = (),
+        queries: Iterable[str] = (),
+        artists: Iterable[str] = (),
+        track_ids: Iterable[str] = (),
+    ) -> int:
+        """
+        수집할 시작점을 추가합니다 (이미 추가했거나 끝낸 시작점은 무시).
+
+        Args:
+            playlists: Spotify 플레이리스트 ID
+            queries: 트랙 검색어
+            artists: Spotify 아티스트 ID
+            track_ids: Spotify 트랙 ID (곡 정보와 특성을 가져옴)
+
+        Returns:
+            새로 추가한 시작점 수
+        """
+        added = sum(self._enqueue("playlist", value) for value in playlists)
+        added += sum(self._enqueue("search", value) for value in queries)
+        added += sum(self._enqueue("artist", value) for value in artists)
+        for track_id in track_ids:
+            if track_id and track_id not in self._seen_ids:
+                self._seen_ids.add(track_id)
+                self._state["unresolved"].append(track_id)
+                added += 1
+        self._save_state()
+        return added
+
+    def run(self, max_tracks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        작업이 없거나, 요청 한도를 다 쓰거나, max_tracks곡을 모을 때까지 수집합니다.
+
+        Args:
+            max_tracks: 수집할 최대 곡 수 (이미 모은 곡 포함, None이면 제한 없음)
+
+        Returns:
+            stats()와 같은 진행 상황과 종료 이유("finished", "budget", "max_tracks")
+        """
+        state = self._state
+        stop_reason = "finished"
+        try:
+            while True:
+                found = state["rows"] + len(state["pending"]) + len(state["unresolved"])
+                discovering = max_tracks is None or found < max_tracks
+                if len(state["pending"]) >= _FEATURES_BATCH_SIZE:
+                    self._fetch_features()
+                elif len(state["unresolved"]) >= _TRACKS_BATCH_SIZE:
+                    self._resolve_tracks()
+                elif discovering and state["queue"]:
+                    self._process_item()
+                elif state["unresolved"]:
+                    self._resolve_tracks()
+                elif state["pending"]:
+                    self._fetch_features()
+                else:
+                    if not discovering:
+                        stop_reason = "max_tracks"
+                    break
+                self._save_state()
+        except CrawlBudgetExhausted:
+            stop_reason = "budget"
+        finally:
+            self._save_state()
+
+        if max_tracks is not None and state["rows"] >= max_tracks:
+            stop_reason = "max_tracks"
+        return {**self.stats(), "stop_reason": stop_reason}
+
+    def _charge(self, cost: int = 1):
+        self.budget.acquire(cost)
+        self._state["requests"] += cost
+
+    def _add_tracks(self, tracks: List[Dict[str, Any]]) -> int:
+        added = 0
+        for track in tracks:
+            if track.get("id") and track["id"] not in self._seen_ids:
+                self._seen_ids.add(track["id"])
+                self._state["pending"].append(track)
+                added += 1
+        return added
+
+    def _process_item(self):
+        """작업 목록 맨 앞의 페이지 하나를 처리합니다."""
+        state = self._state
+        item = state["queue"][0]
+        self._charge()
+        next_offset = None
+        try:
+            if item["kind"] == "playlist":
+                tracks, next_offset = self.service.get_playlist_tracks_page(
+                    item["value"], offset=item["offset"], limit=_PLAYLIST_PAGE_SIZE
+                )
+                self._add_tracks(tracks)
+            elif item["kind"] == "search":
+                tracks = self.service.search_track(
+                    item["value"],
+                    limit=_SEARCH_PAGE_SIZE,
+                    offset=item["offset"],
+                    raise_errors=True,
+                )
+                self._add_tracks(tracks)
+                page = item["offset"] // _SEARCH_PAGE_SIZE + 1
+                if len(tracks) == _SEARCH_PAGE_SIZE and page < self.search_pages:
+                    next_offset = item["offset"] + _SEARCH_PAGE_SIZE
+            elif item["kind"] == "artist":
+                artist = self.service.get_artist_info(item["value"], raise_errors=True)
+                if artist.get("name"):
+                    self._enqueue("search", f'artist:"{artist["name"]}"')
+                    if self.expand_genres:
+                        for genre in artist.get("genres", []):
+                            self._enqueue("search", f'genre:"{genre}"')
+        except Exception as e:
+            state["errors"] += 1
+            item["attempts"] += 1
+            print(f"수집 실패 ({self._item_key(item)}, offset {item['offset']}): {e}")
+            if item["attempts"] < _MAX_ATTEMPTS and not _is_permanent(e):
+                # 실패한 작업은 맨 뒤로 보내 다른 작업부터 진행
+                state["queue"].append(state["queue"].pop(0))
+                return
+
+        state["queue"].pop(0)
+        if next_offset is not None:
+            state["queue"].insert(0, {**item, "offset": next_offset, "attempts": 0})
+        else:
+            state["done"].append(self._item_key(item))
+
+    def _retry_or_skip(self, name: str, track_id: str, entry: Any, error: Exception):
+        """
+        호출이 실패한 곡을 state[name] 맨 뒤로 보내 다시 시도합니다.
+
+        _MAX_ATTEMPTS번 연속으로 실패했거나 다시 시도해도 같은 오류(400/404)면
+        건너뜁니다.
+        """
+        state = self._state
+        attempts = state["attempts"].get(track_id, 0) + 1
+        if attempts < _MAX_ATTEMPTS and not _is_permanent(error):
+            state["attempts"][track_id] = attempts
+            state[name].append(entry)
+            return
+        state["attempts"].pop(track_id, None)
+        state["skipped"].append(track_id)
+        print(f"곡 건너뜀 ({track_id}, {attempts}번 실패): {error}")
+
+    def _skip(self, track_id: str):
+        """Spotify에 곡이나 특성이 없는 곡을 건너뜁니다."""
+        self._state["attempts"].pop(track_id, None)
+        self._state["skipped"].append(track_id)
+
+    def _load_track_infos(
+        self, track_ids: List[str]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Exception]]:
+        """
+        곡 정보를 가져옵니다. 잘못된 ID가 섞여 400이면 반씩 나눠 그 ID만 골라냅니다.
+
+        Returns:
+            (ID별 곡 정보, ID별 오류) 튜플. 어느 쪽에도 없는 ID는 Spotify에 없는 곡
+        """
+        self._charge()
+        try:
+            return self.service.get_tracks_info(track_ids, raise_errors=True), {}
+        except Exception as e:
+            if getattr(e, "http_status", None) == 400 and len(track_ids) > 1:
+                middle = len(track_ids) // 2
+                infos, errors = self._load_track_infos(track_ids[:middle])
+                more_infos, more_errors = self._load_track_infos(track_ids[middle:])
+                return {**infos, **more_infos}, {**errors, **more_errors}
+            return {}, {track_id: e for track_id in track_ids}
+
+    def _resolve_tracks(self):
+        """ID만 아는 곡의 정보를 50개씩 가져옵니다."""
+        state = self._state
+        batch = state["unresolved"][:_TRACKS_BATCH_SIZE]
+        infos, errors = self._load_track_infos(batch)
+        if errors:
+            state["errors"] += 1
+            print(f"곡 정보 가져오기 실패: {len(errors)}/{len(batch)}개")
+
+        del state["unresolved"][: len(batch)]
+        for track_id in batch:
+            if track_id in infos:
+                state["attempts"].pop(track_id, None)
+                state["pending"].append(infos[track_id])
+            elif track_id in errors:
+                self._retry_or_skip("unresolved", track_id, track_id, errors[track_id])
+            else:
+                self._skip(track_id)
+
+    def _fetch_features(self):
+        """곡 100개의 Audio Features를 가져와 특성이 모두 있는 곡을 기록합니다."""
+        state = self._state
+        batch = state["pending"][:_FEATURES_BATCH_SIZE]
+        self._charge()
+        try:
+            features_by_id, errors = self.service.load_audio_features(
+                [track["id"] for track in batch]
+            )
+        except Exception as e:
+            features_by_id, errors = {}, {track["id"]: e for track in batch}
+        if errors:
+            state["errors"] += 1
+            print(f"Audio Features 가져오기 실패: {len(errors)}/{len(batch)}개")
+
+        lines = []
+        failed = []
+        for track in batch:
+            if track["id"] in errors:
+                failed.append(track)
+                continue
+            features = features_by_id.get(track["id"]) or {}
+            values = {name: features.get(name) for name in CATALOG_FEATURES}
+            if any(value is None for value in values.values()):
+                self._skip(track["id"])
+                continue
+            state["attempts"].pop(track["id"], None)
+            metadata = {key: value for key, value in track.items() if key != "id"}
+            row = {"id": track["id"], "features": values, "metadata": metadata}
+            lines.append((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+
+        # 곡을 먼저 디스크에 쓰고 state.json에 길이를 기록 (그 사이에 죽으면 다시 수집)
+        with open(self._path("rows.jsonl"), "ab") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+            state["rows_bytes"] = f.tell()
+        state["rows"] += len(lines)
+        del state["pending"][: len(batch)]
+        for track in failed:
+            self._retry_or_skip("pending", track["id"], track, errors[track["id"]])
+
+    def _save_state(self):
+        self._state["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        tmp_path = self._path(f"state.json.{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path("state.json"))
+
+    def stats(self) -> Dict[str, Any]:
+        """수집한 곡 수, 남은 작업 수, 사용한 요청 수"""
+        state = self._state
+        return {
+            "tracks": state["rows"],
+            "pending_tracks": len(state["pending"]) + len(state["unresolved"]),
+            "skipped_tracks": len(state["skipped"]),
+            "retrying_tracks": len(state["attempts"]),
+            "queued_items": len(state["queue"]),
+            "done_items": len(state["done"]),
+            "requests": state["requests"],
+            "run_requests": self.budget.used,
+            "throttled_seconds": round(self.budget.waited, 1),
+            "errors": state["errors"],
+        }
+
+    def iter_rows(self) -> Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """기록된 곡을 (트랙 ID, 특성, 곡 정보)로 읽습니다."""
+        rows_path = self._path("rows.jsonl")
+        if not os.path.exists(rows_path):
+            return
+        remaining = self._state["rows_bytes"]
+        with open(rows_path, "rb") as f:
+            for line in f:
+                remaining -= len(line)
+                if remaining < 0:
+                    break
+                row = json.loads(line)
+                yield row["id"], row["features"], row["metadata"]
+
+    def export(self, output_path: str) -> Dict[str, Any]:
+        """
+        기록된 곡을 열 단위 카탈로그 파일(.npz)로 씁니다 (기존 파일과 원자적으로 교체).
+
+        파일에는 ids(S22), features((특성 수, 곡 수) float32, CATALOG_FEATURES 순서),
+        metadata(곡 정보 JSON 줄을 이어 붙인 UTF-8 바이트)와 metadata_offsets가
+        들어 있습니다. iter_crawl_rows로 읽어 build_catalog/add_tracks에 넘깁니다.
+
+        Args:
+            output_path: 출력 파일 경로
+
+        Returns:
+            곡 수와 파일 크기
+        """
+        ids, columns, blobs = [], [], []
+        for track_id, features, metadata in self.iter_rows():
+            ids.append(track_id.encode("ascii"))
+            columns.append([features[name] for name in CATALOG_FEATURES])
+            blobs.append(json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+
+        offsets = np.zeros(len(blobs) + 1, dtype=np.uint64)
+        np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+        features = np.array(columns, dtype=np.float32).reshape(
+            len(ids), len(CATALOG_FEATURES)
+        )
+
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{output_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                version=np.array(CRAWL_EXPORT_VERSION),
+                feature_names=np.array(CATALOG_FEATURES),
+                ids=np.array(ids, dtype="S22"),
+                features=np.ascontiguousarray(features.T),
+                metadata=np.frombuffer(b"".join(blobs), dtype=np.uint8),
+                metadata_offsets=offsets,
+            )
+        os.replace(tmp_path, output_path)
+        size = os.path.getsize(output_path)
+        print(f"수집한 곡 {len(ids)}개 내보내기: {output_path} ({size}바이트)")
+        return {"tracks": len(ids), "path": output_path, "bytes": size}
+
+
+def iter_crawl_rows(
+    path: str,
+) -> Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """
+    CatalogCrawler.export가 쓴 파일에서 카탈로그 행을 읽습니다.
+
+    Raises:
+        ValueError: 파일 형식이나 특성 목록이 다른 경우
+    """
+    with np.load(path) as data:
+        if int(data["version"]) != CRAWL_EXPORT_VERSION:
+            raise ValueError(f"수집 파일 형식이 다릅니다: {path}")
+        names = tuple(str(name) for name in data["feature_names"])
+        if names != CATALOG_FEATURES:
+            raise ValueError(f"수집 파일의 특성 목록이 다릅니다: {names}")
+        ids = data["ids"]
+        features = data["features"]
+        metadata = data["metadata"].tobytes()
+        offsets = data["metadata_offsets"]
+
+    for row, track_id in enumerate(ids):
+        yield (
+            track_id.decode("ascii"),
+            dict(zip(CATALOG_FEATURES, features[:, row].tolist())),
+            json.loads(metadata[int(offsets[row]) : int(offsets[row + 1])]),
+        )
@@ -0,0 +1,246 @@
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+import multiprocessing
+import os
+import threading
+import time
+import numpy as np
+
+# 워커 프로세스마다 하나씩 여는 카탈로그 (TrackCatalog, 특성은 mmap으로 공유)
+_worker_catalog = None
+
+
+def _init_worker(catalog_dir: str):
+    """워커 프로세스 초기화: 카탈로그를 열어 둠 (다시 빌드되면 검색 시 새로 엶)"""
+    global _worker_catalog
+    from app.services.track_catalog import TrackCatalog
+
+    _worker_catalog = TrackCatalog(catalog_dir, nprobe=0)
+    _worker_catalog._ensure_loaded()
+
+
+def _ping() -> bool:
+    return True
+
+
+def _scan_in_worker(
+    build_id: str,
+    start: int,
+    stop: int,
+    query: np.ndarray,
+    used: np.ndarray,
+    caps: np.ndarray,
+    wanted: int,
+    max_value: Optional[Tuple[int, float]],
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    catalog = _worker_catalog
+    # 부모와 다른 빌드를 보고 있으면 (다시 빌드되는 중) 부모가 직접 계산
+    if not catalog._ensure_loaded() or catalog._meta.get("build_id") != build_id:
+        return None
+    rows, scores = catalog.score_range(
+        start, stop, query, used, caps, wanted, max_value
+    )
+    # 샤드의 상위 wanted개만 돌려보냄
+    if len(scores) > wanted:
+        best = np.argpartition(scores, wanted - 1)[:wanted]
+        rows, scores = rows[best], scores[best]
+    return rows, scores
+
+
+class CatalogShardPool:
+    """
+    곡 카탈로그의 정확한 검색을 여러 코어로 나눠 실행하는 프로세스 풀
+
+    빌드된 곡을 워커 수만큼의 연속 구간(샤드)으로 나누고, 워커마다 자기 샤드의
+    점수를 계산해 상위 후보만 돌려보내면 부모가 합쳐 전체 상위 곡을 고릅니다.
+    특성 배열은 워커마다 같은 파일을 np.load(mmap_mode="r")로 열므로 페이지
+    캐시를 공유하고 복사되지 않습니다. 워커는 곡 수가 min_tracks 이상인 첫
+    검색에서 백그라운드로 띄우므로, 카탈로그가 없거나 작으면 프로세스를 만들지
+    않습니다. 풀이 준비되기 전이거나, 곡 수가 min_tracks 미만이거나, 워커가 제한
+    시간 안에 끝나지 않거나 비정상 종료되면 scan이 None을 반환하고 호출한 쪽이
+    현재 스레드에서 계산합니다.
+    """
+
+    def __init__(
+        self,
+        catalog_dir: str,
+        shards: int = 0,
+        min_tracks: int = 100_000,
+        timeout: float = 2.0,
+    ):
+        """
+        Args:
+            catalog_dir: 카탈로그 디렉터리
+            shards: 샤드(워커 프로세스) 수 (0이면 CPU 수, 1 이하면 나누지 않음)
+            min_tracks: 이보다 곡이 적으면 나누지 않음 (프로세스 간 통신 비용이 더 큼)
+            timeout: 검색 하나의 샤드 계산 제한 시간 (초)
+        """
+        self.catalog_dir = catalog_dir
+        self.shards = shards if shards > 0 else (os.cpu_count() or 1)
+        self.min_tracks = min_tracks
+        self.timeout = timeout
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._starting = False
+        self._lock = threading.Lock()
+        self._latency_ms_total = 0.0
+        self._counters = {
+            "scans": 0,
+            "fallbacks": 0,
+            "timeouts": 0,
+            "restarts": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.shards > 1
+
+    @property
+    def ready(self) -> bool:
+        return self._executor is not None
+
+    def start(self):
+        """워커를 모두 띄우고 카탈로그를 열 때까지 기다립니다 (나누지 않으면 무시)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._executor is not None:
+                return
+            started = time.perf_counter()
+            # fork는 스레드가 있는 서버 프로세스에서 안전하지 않으므로 spawn 사용
+            executor = ProcessPoolExecutor(
+                max_workers=self.shards,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.catalog_dir,),
+            )
+            # 워커 수만큼 동시에 제출해 모든 워커를 초기화
+            for future in [executor.submit(_ping) for _ in range(self.shards)]:
+                future.result()
+            self._executor = executor
+        print(
+            f"카탈로그 샤드 워커 {self.shards}개 준비 완료 "
+            f"({time.perf_counter() - started:.1f}초)"
+        )
+
+    def shutdown(self):
+        """대기 중인 계산을 취소하고 워커를 종료합니다."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def scan(
+        self,
+        build_id: str,
+        track_count: int,
+        query: np.ndarray,
+        used: np.ndarray,
+        caps: np.ndarray,
+        wanted: int,
+        max_value: Optional[Tuple[int, float]] = None,
+    ) -> Optional[List[Tuple[np.ndarray, np.ndarray]]]:
+        """
+        빌드된 곡 [0, track_count)를 샤드로 나눠 동시에 점수를 계산합니다.
+
+        Args:
+            build_id: 호출한 쪽이 연 카탈로그의 build_id (워커와 다르면 계산하지 않음)
+            track_count: 빌드된 곡 수
+            query, used, caps, wanted, max_value: TrackCatalog.score_range 인자
+
+        Returns:
+            샤드별 (행 번호, 점수) 상위 wanted개 목록, 나눠 계산하지 못하면 None
+        """
+        if not self.enabled or track_count < self.min_tracks:
+            return None
+        executor = self._executor
+        if executor is None:
+            # 나눌 만큼 큰 카탈로그의 첫 검색: 워커를 띄우는 동안은 직접 계산
+            self._start_in_background()
+            return None
+
+        started = time.perf_counter()
+        bounds = np.linspace(0, track_count, self.shards + 1).astype(np.int64)
+        try:
+            futures = [
+                executor.submit(
+                    _scan_in_worker,
+                    build_id,
+                    int(start),
+                    int(stop),
+                    query,
+                    used,
+                    caps,
+                    wanted,
+                    max_value,
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+                if stop > start
+            ]
+            done, pending = wait(futures, timeout=self.timeout)
+            if pending:
+                for future in pending:
+                    future.cancel()
+                self._count("timeouts")
+                print(f"카탈로그 샤드 계산 시간 초과 ({self.timeout}초), 직접 계산")
+                return None
+            parts = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            self._restart(e)
+            return None
+        except RuntimeError:
+            # 종료 중인 풀
+            return None
+
+        if any(part is None for part in parts):
+            self._count("fallbacks")
+            return None
+        with self._lock:
+            self._counters["scans"] += 1
+            self._latency_ms_total += (time.perf_counter() - started) * 1000
+        return parts
+
+    def stats(self) -> Dict[str, Any]:
+        """샤드 수, 준비 상태, 계산 카운터와 평균 소요 시간"""
+        with self._lock:
+            scans = self._counters["scans"]
+            return {
+                "shards": self.shards,
+                "ready": self.ready,
+                "min_tracks": self.min_tracks,
+                **self._counters,
+                "avg_latency_ms": (
+                    round(self._latency_ms_total / scans, 2) if scans else None
+                ),
+            }
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _start_in_background(self):
+        """워커 풀을 백그라운드 스레드에서 한 번만 시작합니다."""
+        with self._lock:
+            if self._executor is not None or self._starting:
+                return
+            self._starting = True
+        threading.Thread(
+            target=self._start_once, name="catalog-shards-start", daemon=True
+        ).start()
+
+    def _start_once(self):
+        try:
+            self.start()
+        except Exception as e:
+            print(f"카탈로그 샤드 워커 시작 실패: {e}")
+        finally:
+            with self._lock:
+                self._starting = False
+
+    def _restart(self, error: Exception):
+        """깨진 풀을 버리고 백그라운드에서 다시 시작합니다 (그동안은 직접 계산)."""
+        print(f"카탈로그 샤드 워커 풀 재시작: {error}")
+        self._count("restarts")
+        self.shutdown()
+        self._start_in_background()
@@ -1,4 +1,3 @@
-import openai
 from typing import Dict, Any, List, Optional
 from app.core.config import settings
 
@@ -8,31 +7,37 @@ class ChatGPTService:
 
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY
-        self.client = None
+        # OpenAI 클라이언트는 처음 사용할 때 생성 (openai 패키지 import 비용을 부팅에서 제외)
+        self._client = None
+        self._client_initialized = False
 
-        print(f"ChatGPT 서비스 초기화 시작 - API 키 존재: {self.api_key is not None}")
-        if self.api_key:
-            print(f"API 키 길이: {len(self.api_key)}")
-            print(f"API 키 시작 부분: {self.api_key[:10]}...")
+    @property
+    def client(self):
+        """OpenAI 클라이언트 (API 키가 없거나 초기화에 실패하면 None)"""
+        if self._client_initialized:
+            return self._client
+        self._client_initialized = True
 
         if self.api_key:
             try:
+                import openai
+
                 # 환경변수에 API 키 설정 후 클라이언트 초기화
                 import os
 
                 os.environ["OPENAI_API_KEY"] = self.api_key
 
                 # 간단한 클라이언트 초기화 (proxies 인수 문제 회피)
-                self.client = openai.OpenAI()
+                self._client = openai.OpenAI()
                 print(f"ChatGPT 서비스 초기화 성공 - 클라이언트 생성됨")
             except Exception as e:
                 print(f"OpenAI 클라이언트 초기화 실패: {e}")
                 # 최종 대안: 직접 API 호출 방식 사용
-                self.client = None
+                self._client = None
                 print("ChatGPT 서비스는 직접 API 호출 방식으로 작동합니다.")
         else:
-            print("OpenAI API 키가 설정되지 않았습니다.")
-            print(f"Settings에서 가져온 API 키: {settings.OPENAI_API_KEY}")
+            print("OpenAI API 키가 설정되지 않았습니다. 기본 문구를 사용합니다.")
+        return self._client
 
     def analyze_audio_features(
         self,
@@ -0,0 +1,245 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, Optional
+import os
+import threading
+
+from app.core.config import settings
+
+# Spotify audio_features 키 -> AudioFeatures 열
+_COLUMN_FOR_KEY = {
+    "danceability": "danceability",
+    "energy": "energy",
+    "valence": "valence",
+    "tempo": "tempo",
+    "key": "key_value",
+    "mode": "mode_value",
+    "loudness": "loudness",
+    "acousticness": "acousticness",
+    "instrumentalness": "instrumentalness",
+    "speechiness": "speechiness",
+    "liveness": "liveness",
+    "duration_ms": "duration_ms",
+    "time_signature": "time_signature",
+}
+
+# SQLite 변수 수 제한을 넘지 않도록 IN 조회/upsert를 나누는 크기
+_CHUNK_SIZE = 500
+
+
+class AudioFeatureStore:
+    """
+    Spotify Audio Features 영구 저장소 (audio_features 테이블, write-through)
+
+    Spotify에서 가져온 특성은 바로 저장하고, 이후 요청은 저장된 값을 먼저
+    사용합니다. updated_at이 ttl보다 오래된 행은 없는 것으로 보고 다시
+    가져옵니다. database_url이 없으면 SQLite 파일을 WAL 모드로 사용해 읽기와
+    쓰기가 서로 막지 않게 하고, PostgreSQL URL이 주어지면 그 DB를 사용합니다.
+    엔진은 첫 사용 시 만듭니다 (sqlalchemy는 부팅 시 import하지 않음).
+    """
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        sqlite_path: str = "data/audio_features.db",
+        ttl: float = 30 * 24 * 3600,
+    ):
+        """
+        Args:
+            database_url: SQLAlchemy DB URL (PostgreSQL 등, 없으면 SQLite)
+            sqlite_path: database_url이 없을 때 사용할 SQLite 파일 경로
+            ttl: 저장된 특성을 사용하는 기간 (초)
+        """
+        self.database_url = database_url or f"sqlite:///{sqlite_path}"
+        self.sqlite_path = None if database_url else sqlite_path
+        self.ttl = ttl
+        self._engine = None
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stale": 0, "writes": 0}
+
+    def _get_engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = self._create_engine()
+        return self._engine
+
+    def _create_engine(self):
+        from sqlalchemy import create_engine, event
+        from app.models.database import AudioFeatures
+
+        if self.sqlite_path is not None:
+            directory = os.path.dirname(os.path.abspath(self.sqlite_path))
+            os.makedirs(directory, exist_ok=True)
+            engine = create_engine(
+                self.database_url, connect_args={"check_same_thread": False}
+            )
+
+            @event.listens_for(engine, "connect")
+            def _set_sqlite_pragmas(dbapi_connection, _):
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA busy_timeout=5000")
+                cursor.close()
+
+        else:
+            engine = create_engine(self.database_url, pool_pre_ping=True)
+
+        AudioFeatures.__table__.create(engine, checkfirst=True)
+        print(f"✅ Audio Features 저장소 연결: {engine.url.render_as_string()}")
+        return engine
+
+    def get_many(self, track_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        저장된 특성을 한 번에 조회합니다.
+
+        Args:
+            track_ids: Spotify 트랙 ID 목록
+
+        Returns:
+            TTL 안에 저장된 트랙의 ID별 특성 (Spotify audio_features 형식)
+        """
+        from sqlalchemy import select
+        from app.models.database import AudioFeatures
+
+        track_ids = list(dict.fromkeys(track_ids))
+        if not track_ids:
+            return {}
+
+        fresh_after = datetime.utcnow() - timedelta(seconds=self.ttl)
+        found: Dict[str, Dict[str, Any]] = {}
+        stale = 0
+        with self._get_engine().connect() as connection:
+            for start in range(0, len(track_ids), _CHUNK_SIZE):
+                chunk = track_ids[start : start + _CHUNK_SIZE]
+                rows = connection.execute(
+                    select(AudioFeatures.__table__).where(
+                        AudioFeatures.spotify_track_id.in_(chunk)
+                    )
+                )
+                for row in rows.mappings():
+                    if row["updated_at"] is None or row["updated_at"] < fresh_after:
+                        stale += 1
+                        continue
+                    found[row["spotify_track_id"]] = self._row_to_features(row)
+
+        with self._lock:
+            self._counters["hits"] += len(found)
+            self._counters["misses"] += len(track_ids) - len(found)
+            self._counters["stale"] += stale
+        return found
+
+    def put_many(self, features_list: Iterable[Dict[str, Any]]) -> int:
+        """
+        Spotify에서 가져온 특성을 한 번에 저장합니다 (있으면 갱신).
+
+        Args:
+            features_list: Spotify audio_features 결과 목록 ("id" 필요)
+
+        Returns:
+            저장한 행 수
+        """
+        from app.models.database import AudioFeatures
+
+        now = datetime.utcnow()
+        rows = {}
+        for features in features_list:
+            if not features or not features.get("id"):
+                continue
+            row = {"spotify_track_id": features["id"], "updated_at": now}
+            for key, column in _COLUMN_FOR_KEY.items():
+                row[column] = features.get(key)
+            rows[features["id"]] = row
+        if not rows:
+            return 0
+
+        engine = self._get_engine()
+        if engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        rows = list(rows.values())
+        table = AudioFeatures.__table__
+        with engine.begin() as connection:
+            for start in range(0, len(rows), _CHUNK_SIZE):
+                statement = insert(table).values(rows[start : start + _CHUNK_SIZE])
+                statement = statement.on_conflict_do_update(
+                    index_elements=[table.c.spotify_track_id],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in list(_COLUMN_FOR_KEY.values()) + ["updated_at"]
+                    },
+                )
+                connection.execute(statement)
+
+        with self._lock:
+            self._counters["writes"] += len(rows)
+        return len(rows)
+
+    def iter_all(self, batch_size: int = 10000) -> Iterator[Dict[str, Any]]:
+        """
+        저장된 모든 특성을 트랙 ID 순서로 읽습니다 (TTL과 관계없이, 카탈로그 빌드용).
+
+        Args:
+            batch_size: 한 번에 읽는 행 수
+
+        Yields:
+            Spotify audio_features 형식의 특성
+        """
+        from sqlalchemy import select
+        from app.models.database import AudioFeatures
+
+        table = AudioFeatures.__table__
+        last_id = ""
+        while True:
+            with self._get_engine().connect() as connection:
+                rows = (
+                    connection.execute(
+                        select(table)
+                        .where(table.c.spotify_track_id > last_id)
+                        .order_by(table.c.spotify_track_id)
+                        .limit(batch_size)
+                    )
+                    .mappings()
+                    .all()
+                )
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_features(row)
+            last_id = rows[-1]["spotify_track_id"]
+
+    @staticmethod
+    def _row_to_features(row) -> Dict[str, Any]:
+        track_id = row["spotify_track_id"]
+        features = {key: row[column] for key, column in _COLUMN_FOR_KEY.items()}
+        features.update(
+            {
+                "id": track_id,
+                "uri": f"spotify:track:{track_id}",
+                "track_href": f"https://api.spotify.com/v1/tracks/{track_id}",
+                "analysis_url": (
+                    f"https://api.spotify.com/v1/audio-analysis/{track_id}"
+                ),
+                "type": "audio_features",
+            }
+        )
+        return features
+
+    def stats(self) -> Dict[str, Any]:
+        """조회 적중/누락/만료 수와 저장한 행 수"""
+        with self._lock:
+            return {
+                "backend": self.database_url.split(":", 1)[0],
+                "ttl": self.ttl,
+                **self._counters,
+            }
+
+
+# 공유 인스턴스
+audio_feature_store = AudioFeatureStore(
+    settings.DATABASE_URL,
+    sqlite_path=settings.FEATURE_STORE_SQLITE_PATH,
+    ttl=settings.FEATURE_STORE_TTL,
+)
@@ -0,0 +1,502 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+import uuid
+import librosa
+import numpy as np
+from scipy.ndimage import maximum_filter
+
+# 핑거프린트 추출 파라미터 (바꾸면 인덱스를 다시 만들어야 함)
+FINGERPRINT_SAMPLE_RATE = 11025
+FINGERPRINT_N_FFT = 1024
+FINGERPRINT_HOP = 256  # 약 23ms
+PEAK_NEIGHBORHOOD = (15, 15)  # (주파수 빈, 프레임) 지역 최대값 범위
+PEAKS_PER_SECOND = 30  # 초당 남기는 최대 피크 수
+FAN_OUT = 8  # 앵커 피크마다 짝지을 다음 피크 수
+MAX_PAIR_FRAMES = 63  # 짝 사이 최대 프레임 간격 (6비트)
+
+# 해시: 앵커 주파수 9비트 | 타깃 주파수 9비트 | 프레임 간격 6비트
+HASH_BITS = 24
+HASH_COUNT = 1 << HASH_BITS
+
+# 스테이징 파티션: 해시 상위 8비트 (빌드 시 파티션 하나씩 정렬)
+PARTITION_BITS = 8
+PARTITION_SHIFT = HASH_BITS - PARTITION_BITS
+PARTITION_COUNT = 1 << PARTITION_BITS
+
+INDEX_FORMAT_VERSION = 1
+
+
+def extract_landmarks(y: np.ndarray, sr: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    스펙트럼 피크 쌍(랜드마크)으로 핑거프린트 해시를 만듭니다.
+
+    로그 스펙트로그램의 지역 최대값 중 강한 피크만 초당 PEAKS_PER_SECOND개
+    남기고, 각 피크를 뒤따르는 FAN_OUT개 피크와 짝지어
+    (앵커 주파수, 타깃 주파수, 시간 간격)을 24비트 해시로 묶습니다.
+
+    Args:
+        y: 모노 오디오 신호
+        sr: 샘플링 레이트 (FINGERPRINT_SAMPLE_RATE가 아니면 리샘플링)
+
+    Returns:
+        (해시 uint32 배열, 앵커 프레임 위치 uint32 배열) 튜플
+    """
+    empty = (np.zeros(0, np.uint32), np.zeros(0, np.uint32))
+    if y is None or len(y) < FINGERPRINT_N_FFT:
+        return empty
+    if sr != FINGERPRINT_SAMPLE_RATE:
+        y = librosa.resample(y, orig_sr=sr, target_sr=FINGERPRINT_SAMPLE_RATE)
+
+    spectrum = np.abs(
+        librosa.stft(y, n_fft=FINGERPRINT_N_FFT, hop_length=FINGERPRINT_HOP)
+    )
+    # DC를 제외한 512개 빈만 사용 (주파수 9비트)
+    log_spectrum = np.log(spectrum[1:513] + 1e-6, dtype=np.float32)
+
+    # 지역 최대값이면서 평균보다 충분히 큰 지점만 피크 후보
+    local_max = maximum_filter(log_spectrum, size=PEAK_NEIGHBORHOOD, mode="constant")
+    is_peak = (log_spectrum == local_max) & (log_spectrum > log_spectrum.mean() + 1.0)
+    freqs, frames = np.nonzero(is_peak)
+    if len(frames) == 0:
+        return empty
+    strengths = log_spectrum[freqs, frames]
+
+    # 초 단위 구간마다 강한 피크만 남겨 밀도를 일정하게 유지
+    frames_per_second = FINGERPRINT_SAMPLE_RATE / FINGERPRINT_HOP
+    second = (frames / frames_per_second).astype(np.int64)
+    order = np.lexsort((-strengths, second))
+    second_sorted = second[order]
+    starts = np.searchsorted(second_sorted, second_sorted, side="left")
+    keep = order[np.arange(len(order)) - starts < PEAKS_PER_SECOND]
+    keep = keep[np.lexsort((freqs[keep], frames[keep]))]
+    freqs, frames = freqs[keep].astype(np.int64), frames[keep].astype(np.int64)
+
+    hashes, offsets = [], []
+    for k in range(1, FAN_OUT + 1):
+        dt = frames[k:] - frames[:-k]
+        valid = (dt >= 1) & (dt <= MAX_PAIR_FRAMES)
+        if not valid.any():
+            continue
+        anchor = np.nonzero(valid)[0]
+        hashes.append((freqs[anchor] << 15) | (freqs[anchor + k] << 6) | dt[anchor])
+        offsets.append(frames[anchor])
+    if not hashes:
+        return empty
+    return (
+        np.concatenate(hashes).astype(np.uint32),
+        np.concatenate(offsets).astype(np.uint32),
+    )
+
+
+class FingerprintMatch:
+    """핑거프린트 조회 결과"""
+
+    def __init__(
+        self,
+        track: Dict[str, Any],
+        matches: int,
+        query_hashes: int,
+        confidence: float,
+        offset_seconds: float,
+    ):
+        self.track = track  # 참조 곡 메타데이터 (title, artist, album, spotify_id ...)
+        self.matches = matches  # 시간 정렬이 맞은 해시 수
+        self.query_hashes = query_hashes
+        self.confidence = confidence
+        self.offset_seconds = offset_seconds  # 참조 곡에서 쿼리가 시작되는 위치
+
+
+class FingerprintIndex:
+    """
+    메모리 매핑된 역색인으로 핑거프린트를 조회하는 읽기 전용 인덱스
+
+    해시마다 게시 목록(곡 번호, 앵커 프레임)이 연속으로 저장되어 있고,
+    bucket_offsets[hash]..bucket_offsets[hash + 1]이 그 범위입니다. 모든 배열은
+    np.load(mmap_mode="r")로 열어 필요한 페이지만 읽으므로 참조 곡이 많아도
+    파이썬 객체로 올리지 않으며, 여러 프로세스가 페이지 캐시를 공유합니다.
+    인덱스가 다시 빌드되면 다음 조회에서 새 파일을 엽니다.
+    """
+
+    def __init__(
+        self,
+        index_dir: str,
+        min_matches: int = 10,
+        max_bucket_size: int = 20000,
+    ):
+        """
+        Args:
+            index_dir: FingerprintIndexBuilder가 만든 인덱스 디렉터리
+            min_matches: 일치로 인정하는 최소 정렬 해시 수
+            max_bucket_size: 이보다 게시 목록이 긴 흔한 해시는 조회에서 제외
+        """
+        self.index_dir = index_dir
+        self.min_matches = min_matches
+        self.max_bucket_size = max_bucket_size
+        self._lock = threading.Lock()
+        self._loaded_mtime: Optional[float] = None
+        self._meta: Dict[str, Any] = {}
+        self._tracks: List[Dict[str, Any]] = []
+        self._bucket_offsets: Optional[np.ndarray] = None
+        self._posting_tracks: Optional[np.ndarray] = None
+        self._posting_offsets: Optional[np.ndarray] = None
+
+    @property
+    def build_id(self) -> Optional[str]:
+        """현재 열린 인덱스의 빌드 ID (인덱스가 없으면 None)"""
+        self._ensure_loaded()
+        return self._meta.get("build_id")
+
+    def _ensure_loaded(self) -> bool:
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        try:
+            mtime = os.path.getmtime(meta_path)
+        except OSError:
+            return False
+        if mtime == self._loaded_mtime:
+            return True
+
+        with self._lock:
+            if mtime == self._loaded_mtime:
+                return True
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != INDEX_FORMAT_VERSION:
+                print(f"핑거프린트 인덱스 형식이 다릅니다: {meta.get('version')}")
+                return False
+            with open(
+                os.path.join(self.index_dir, "tracks.json"), "r", encoding="utf-8"
+            ) as f:
+                tracks = json.load(f)
+
+            def load(name: str) -> np.ndarray:
+                return np.load(os.path.join(self.index_dir, name), mmap_mode="r")
+
+            self._bucket_offsets = load("bucket_offsets.npy")
+            self._posting_tracks = load("posting_tracks.npy")
+            self._posting_offsets = load("posting_offsets.npy")
+            self._tracks = tracks
+            self._meta = meta
+            self._loaded_mtime = mtime
+            print(
+                f"핑거프린트 인덱스 로드: 곡 {len(tracks)}개, 해시 {meta['postings']}개"
+            )
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """인덱스 크기와 빌드 정보"""
+        if not self._ensure_loaded():
+            return {"loaded": False, "index_dir": self.index_dir}
+        return {
+            "loaded": True,
+            "index_dir": self.index_dir,
+            "build_id": self._meta["build_id"],
+            "built_at": self._meta["built_at"],
+            "tracks": len(self._tracks),
+            "postings": self._meta["postings"],
+        }
+
+    def lookup(self, y: np.ndarray, sr: int) -> Optional[FingerprintMatch]:
+        """
+        오디오 클립과 시간 정렬이 가장 잘 맞는 참조 곡을 찾습니다.
+
+        쿼리 해시의 게시 목록에서 (곡, 참조 위치 - 쿼리 위치) 쌍을 세어 같은
+        간격으로 가장 많이 겹친 곡을 고릅니다. 신뢰도는 1등과 2등 곡의 정렬
+        해시 수 차이로 계산합니다.
+
+        Args:
+            y: 모노 오디오 클립
+            sr: 샘플링 레이트
+
+        Returns:
+            FingerprintMatch (인덱스가 없거나 min_matches 미만이면 None)
+        """
+        if not self._ensure_loaded():
+            return None
+        hashes, query_offsets = extract_landmarks(y, sr)
+        if len(hashes) == 0:
+            return None
+
+        bucket_offsets = self._bucket_offsets
+        starts = bucket_offsets[hashes].astype(np.int64)
+        lengths = bucket_offsets[hashes + 1].astype(np.int64) - starts
+        usable = (lengths > 0) & (lengths <= self.max_bucket_size)
+        starts, lengths = starts[usable], lengths[usable]
+        query_offsets = query_offsets[usable].astype(np.int64)
+        total = int(lengths.sum())
+        if total == 0:
+            return None
+
+        # 게시 목록 범위들을 한 번에 읽는 인덱스 (범위별 arange를 이어 붙인 것)
+        group_starts = np.cumsum(lengths) - lengths
+        positions = np.arange(total) - np.repeat(group_starts - starts, lengths)
+        tracks = np.asarray(self._posting_tracks[positions], dtype=np.int64)
+        deltas = np.asarray(self._posting_offsets[positions], dtype=np.int64)
+        deltas -= np.repeat(query_offsets, lengths)
+
+        # (곡, 시간 간격)별 정렬 해시 수
+        keys = (tracks << 32) | (deltas + (1 << 31))
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        best = int(np.argmax(counts))
+        best_count = int(counts[best])
+        if best_count < self.min_matches:
+            return None
+
+        best_track = int(unique_keys[best] >> 32)
+        other = (unique_keys >> 32) != best_track
+        second_count = int(counts[other].max()) if other.any() else 0
+        delta = int(unique_keys[best] & 0xFFFFFFFF) - (1 << 31)
+        return FingerprintMatch(
+            track=self._tracks[best_track],
+            matches=best_count,
+            query_hashes=len(hashes),
+            confidence=1.0 - (second_count + 1) / (best_count + 1),
+            offset_seconds=delta * FINGERPRINT_HOP / FINGERPRINT_SAMPLE_RATE,
+        )
+
+
+class FingerprintIndexBuilder:
+    """
+    참조 곡 핑거프린트를 모아 FingerprintIndex 파일을 만드는 빌더
+
+    곡을 추가할 때마다 (해시, 곡 번호, 앵커 프레임)을 해시 상위 비트로 나눈
+    스테이징 파티션 파일 뒤에 붙입니다. build는 파티션을 하나씩 읽어 정렬하고
+    메모리 매핑 배열에 써 넣으므로, 빌드 중 메모리는 파티션 하나 크기입니다.
+    스테이징 파일은 유지되어 이후 곡을 더 추가하고 다시 빌드할 수 있습니다.
+
+    tracks.jsonl의 곡 줄마다 그 곡을 쓴 뒤의 파티션 파일 크기를 기록합니다.
+    곡 줄이 기록되기 전에 중단되면, 다시 열 때 파티션을 마지막으로 기록된
+    크기로 잘라 번호 없는 게시 목록(과 쓰다 만 레코드)을 버립니다.
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        Args:
+            index_dir: 인덱스 디렉터리 (없으면 생성)
+        """
+        self.index_dir = index_dir
+        self.staging_dir = os.path.join(index_dir, "staging")
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self._tracks_path = os.path.join(self.staging_dir, "tracks.jsonl")
+        self._tracks: List[Dict[str, Any]] = []
+        if os.path.exists(self._tracks_path):
+            committed = 0
+            with open(self._tracks_path, "rb") as f:
+                for line in f:
+                    # 줄바꿈이 없는 마지막 줄은 쓰다 만 곡
+                    if not line.endswith(b"\n"):
+                        break
+                    committed += len(line)
+                    if line.strip():
+                        self._tracks.append(json.loads(line))
+            if os.path.getsize(self._tracks_path) != committed:
+                with open(self._tracks_path, "r+b") as f:
+                    f.truncate(committed)
+        self._known_sha256 = {track.get("sha256") for track in self._tracks}
+        self._truncate_partitions()
+
+    @property
+    def track_count(self) -> int:
+        return len(self._tracks)
+
+    def contains(self, sha256: str) -> bool:
+        """같은 내용의 곡이 이미 추가되었는지 여부"""
+        return sha256 in self._known_sha256
+
+    def add_track(
+        self, hashes: np.ndarray, offsets: np.ndarray, metadata: Dict[str, Any]
+    ) -> int:
+        """
+        곡 하나의 핑거프린트를 스테이징에 추가합니다.
+
+        Args:
+            hashes: extract_landmarks의 해시
+            offsets: extract_landmarks의 앵커 프레임 위치
+            metadata: 곡 정보 (title, artist, album, spotify_id, release_year, sha256 등)
+
+        Returns:
+            부여된 곡 번호
+        """
+        track_id = len(self._tracks)
+        postings = np.empty((len(hashes), 3), dtype=np.uint32)
+        postings[:, 0] = hashes
+        postings[:, 1] = track_id
+        postings[:, 2] = offsets
+
+        partitions = hashes >> PARTITION_SHIFT
+        order = np.argsort(partitions, kind="stable")
+        postings = postings[order]
+        bounds = np.searchsorted(
+            partitions[order], np.arange(PARTITION_COUNT + 1), side="left"
+        )
+        partition_bytes = {}
+        for partition in np.nonzero(np.diff(bounds))[0]:
+            with open(self._partition_path(partition), "ab") as f:
+                postings[bounds[partition] : bounds[partition + 1]].tofile(f)
+                partition_bytes[f"{partition:02x}"] = f.tell()
+
+        # 게시 목록을 먼저 기록한 뒤 메타데이터를 남겨, 중단되면 같은 곡을 다시 추가
+        # (다시 열 때 파티션을 이 곡 이전 크기로 잘라 번호 없는 게시 목록을 버림)
+        metadata = {
+            **metadata,
+            "hashes": int(len(hashes)),
+            "partitions": partition_bytes,
+        }
+        with open(self._tracks_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(metadata, ensure_ascii=False) + "\n")
+        self._tracks.append(metadata)
+        self._known_sha256.add(metadata.get("sha256"))
+        return track_id
+
+    def build(self) -> Dict[str, Any]:
+        """
+        스테이징 파티션으로 인덱스 파일을 만들고 원자적으로 교체합니다.
+
+        Returns:
+            meta.json 내용
+        """
+        started = time.perf_counter()
+        track_count = len(self._tracks)
+        per_partition = 1 << PARTITION_SHIFT
+
+        # 1단계: 해시별 게시 수 -> 버킷 시작 위치
+        counts = np.zeros(HASH_COUNT, dtype=np.int64)
+        for partition in range(PARTITION_COUNT):
+            postings = self._load_partition(partition, track_count)
+            if postings is None:
+                continue
+            base = partition * per_partition
+            counts[base : base + per_partition] += np.bincount(
+                postings[:, 0] - base, minlength=per_partition
+            )
+        bucket_offsets = np.zeros(HASH_COUNT + 1, dtype=np.uint64)
+        np.cumsum(counts, out=bucket_offsets[1:])
+        total = int(bucket_offsets[-1])
+        del counts
+
+        # 2단계: 파티션별로 정렬해 해당 범위에 기록
+        suffix = f".{uuid.uuid4().hex[:8]}.tmp"
+        paths = {
+            name: os.path.join(self.index_dir, name)
+            for name in (
+                "bucket_offsets.npy",
+                "posting_tracks.npy",
+                "posting_offsets.npy",
+            )
+        }
+        with open(paths["bucket_offsets.npy"] + suffix, "wb") as f:
+            np.save(f, bucket_offsets)
+        posting_tracks = np.lib.format.open_memmap(
+            paths["posting_tracks.npy"] + suffix,
+            mode="w+",
+            dtype=np.uint32,
+            shape=(total,),
+        )
+        posting_offsets = np.lib.format.open_memmap(
+            paths["posting_offsets.npy"] + suffix,
+            mode="w+",
+            dtype=np.uint32,
+            shape=(total,),
+        )
+        for partition in range(PARTITION_COUNT):
+            postings = self._load_partition(partition, track_count)
+            if postings is None:
+                continue
+            postings = postings[np.argsort(postings[:, 0], kind="stable")]
+            start = int(bucket_offsets[partition * per_partition])
+            posting_tracks[start : start + len(postings)] = postings[:, 1]
+            posting_offsets[start : start + len(postings)] = postings[:, 2]
+        posting_tracks.flush()
+        posting_offsets.flush()
+        del posting_tracks, posting_offsets
+
+        tracks = [
+            {
+                key: value
+                for key, value in track.items()
+                if key not in ("hashes", "partitions")
+            }
+            for track in self._tracks
+        ]
+        tracks_tmp = os.path.join(self.index_dir, "tracks.json" + suffix)
+        with open(tracks_tmp, "w", encoding="utf-8") as f:
+            json.dump(tracks, f, ensure_ascii=False)
+
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "build_id": uuid.uuid4().hex,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "tracks": track_count,
+            "postings": total,
+            "sample_rate": FINGERPRINT_SAMPLE_RATE,
+            "n_fft": FINGERPRINT_N_FFT,
+            "hop_length": FINGERPRINT_HOP,
+            "hash_bits": HASH_BITS,
+        }
+        meta_tmp = os.path.join(self.index_dir, "meta.json" + suffix)
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        # 조회 중인 프로세스는 기존 파일을 계속 사용하고, meta.json이 바뀌면 새로 엶
+        for path in paths.values():
+            os.replace(path + suffix, path)
+        os.replace(tracks_tmp, os.path.join(self.index_dir, "tracks.json"))
+        os.replace(meta_tmp, os.path.join(self.index_dir, "meta.json"))
+        print(
+            f"핑거프린트 인덱스 빌드 완료: 곡 {track_count}개, 해시 {total}개 "
+            f"({time.perf_counter() - started:.1f}초)"
+        )
+        return meta
+
+    def _partition_path(self, partition: int) -> str:
+        return os.path.join(self.staging_dir, f"part-{partition:02x}.bin")
+
+    def _truncate_partitions(self):
+        """파티션 파일을 tracks.jsonl에 마지막으로 기록된 크기로 자릅니다."""
+        if any("partitions" not in track for track in self._tracks):
+            print("핑거프린트 스테이징에 파티션 크기 기록이 없어 정리를 건너뜁니다.")
+            return
+        committed: Dict[str, int] = {}
+        for track in self._tracks:
+            committed.update(track["partitions"])
+        for partition in range(PARTITION_COUNT):
+            path = self._partition_path(partition)
+            if not os.path.exists(path):
+                continue
+            size = os.path.getsize(path)
+            length = int(committed.get(f"{partition:02x}", 0))
+            if size > length:
+                print(
+                    f"핑거프린트 스테이징 정리: {os.path.basename(path)} "
+                    f"{size - length}바이트 잘라냄"
+                )
+                with open(path, "r+b") as f:
+                    f.truncate(length)
+
+    def _load_partition(self, partition: int, track_count: int) -> Optional[np.ndarray]:
+        path = self._partition_path(partition)
+        if not os.path.exists(path):
+            return None
+        postings = np.fromfile(path, dtype=np.uint32)
+        postings = postings[: len(postings) - len(postings) % 3].reshape(-1, 3)
+        # 열 때 잘라내므로 보통은 없지만, 빌드 중 다른 프로세스가 추가한 곡은 제외
+        postings = postings[postings[:, 1] < track_count]
+        return postings if len(postings) else None
+
+
+def iter_reference_files(
+    paths: Iterable[str], extensions: Iterable[str]
+) -> Iterable[str]:
+    """경로 목록(파일 또는 디렉터리)에서 오디오 파일을 정렬된 순서로 나열합니다."""
+    allowed = {extension.lower() for extension in extensions}
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in allowed:
+                        yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
@@ -0,0 +1,315 @@
+from typing import Any, Dict, Optional, Tuple
+import json
+import os
+import threading
+import time
+import uuid
+import numpy as np
+
+IVF_FORMAT_VERSION = 1
+
+# 거리 행렬을 나눠 계산하는 행 수 (행 수 x 리스트 수 float32가 수십 MB 이내)
+_ASSIGN_CHUNK = 4096
+
+
+def default_nlist(track_count: int) -> int:
+    """곡 수에 맞는 역리스트 수 (약 2 * sqrt(곡 수))"""
+    return int(min(4096, max(1, 2 * np.sqrt(max(track_count, 1)))))
+
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """각 벡터에서 가장 가까운(L2) 중심의 번호"""
+    centroid_norms = (centroids**2).sum(axis=1)
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        chunk = np.asarray(vectors[start : start + _ASSIGN_CHUNK], dtype=np.float32)
+        # ||x - c||^2에서 ||x||^2는 순위에 영향이 없으므로 생략
+        distances = centroid_norms - 2.0 * (chunk @ centroids.T)
+        assignments[start : start + len(chunk)] = distances.argmin(axis=1)
+    return assignments
+
+
+def train_centroids(
+    sample: np.ndarray, nlist: int, iterations: int = 12, seed: int = 0
+) -> np.ndarray:
+    """표본 벡터로 k-means 중심을 학습합니다 (빈 리스트는 먼 표본으로 다시 채움)."""
+    rng = np.random.default_rng(seed)
+    nlist = min(nlist, len(sample))
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = nearest_centroids(sample, centroids)
+        counts = np.bincount(assignments, minlength=nlist)
+        sums = np.zeros_like(centroids, dtype=np.float64)
+        np.add.at(sums, assignments, sample)
+        filled = counts > 0
+        centroids[filled] = (sums[filled] / counts[filled, None]).astype(np.float32)
+        empty = np.nonzero(~filled)[0]
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), len(empty))]
+    return centroids
+
+
+class IVFIndex:
+    """
+    역파일(IVF) 근사 최근접 이웃 인덱스
+
+    곡 벡터를 k-means 중심(역리스트)으로 나누고, 검색 때는 질의와 가까운
+    nprobe개 리스트에 속한 곡만 점수를 계산합니다. nprobe를 늘리면 재현율이
+    오르고 지연 시간도 늘어납니다 (리스트 수와 같으면 전체 검색과 동일).
+    벡터는 리스트별로 연속으로 저장되어 있어 np.load(mmap_mode="r")로 열고
+    리스트 범위만 읽습니다. 인덱스를 빌드한 뒤 추가된 벡터는 add로 가장 가까운
+    리스트에 배정되어(메모리) 같은 방식으로 검색됩니다.
+
+    점수는 거리 합 sum(min(|v - q|, cap))이며 낮을수록 가깝습니다. 벡터 공간과
+    cap은 호출하는 쪽(TrackCatalog)이 정합니다.
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        Args:
+            index_dir: build가 만든 인덱스 디렉터리
+        """
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self._loaded_mtime: Optional[float] = None
+        self._meta: Dict[str, Any] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+        self._list_rows: Optional[np.ndarray] = None
+        self._list_vectors: Optional[np.ndarray] = None
+        # 빌드 후 추가된 벡터 (행 번호, 벡터, 리스트 번호)
+        self._added_rows = np.empty(0, dtype=np.int64)
+        self._added_vectors = np.empty((0, 0), dtype=np.float32)
+        self._added_lists = np.empty(0, dtype=np.int32)
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return self._meta
+
+    @property
+    def nlist(self) -> int:
+        return 0 if self._centroids is None else len(self._centroids)
+
+    def load(self) -> bool:
+        """인덱스 파일을 열거나, 다시 빌드되었으면 새로 엽니다."""
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        try:
+            mtime = os.path.getmtime(meta_path)
+        except OSError:
+            return False
+        if mtime == self._loaded_mtime:
+            return True
+
+        with self._lock:
+            if mtime == self._loaded_mtime:
+                return True
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != IVF_FORMAT_VERSION:
+                print(f"IVF 인덱스 형식이 다릅니다: {meta.get('version')}")
+                return False
+
+            def load(name: str) -> np.ndarray:
+                return np.load(os.path.join(self.index_dir, name), mmap_mode="r")
+
+            self._centroids = np.array(load("centroids.npy"))
+            self._list_offsets = np.array(load("list_offsets.npy"))
+            self._list_rows = load("list_rows.npy")
+            self._list_vectors = load("list_vectors.npy")
+            self._added_rows = np.empty(0, dtype=np.int64)
+            self._added_vectors = np.empty(
+                (0, self._centroids.shape[1]), dtype=np.float32
+            )
+            self._added_lists = np.empty(0, dtype=np.int32)
+            self._meta = meta
+            self._loaded_mtime = mtime
+            print(
+                f"IVF 인덱스 로드: 벡터 {meta['vectors']}개, 리스트 {meta['nlist']}개"
+            )
+        return True
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray):
+        """
+        빌드 후 추가된 벡터를 가장 가까운 리스트에 배정합니다 (증분 추가).
+
+        Args:
+            rows: 벡터의 행 번호 (검색 결과로 반환됨)
+            vectors: (개수, 차원) 벡터
+        """
+        if self._centroids is None or len(rows) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        lists = nearest_centroids(vectors, self._centroids)
+        with self._lock:
+            self._added_rows = np.concatenate(
+                [self._added_rows, np.asarray(rows, dtype=np.int64)]
+            )
+            self._added_vectors = np.concatenate([self._added_vectors, vectors])
+            self._added_lists = np.concatenate([self._added_lists, lists])
+
+    @property
+    def added_count(self) -> int:
+        return len(self._added_rows)
+
+    def search(
+        self,
+        query: np.ndarray,
+        dims: np.ndarray,
+        caps: np.ndarray,
+        count: int,
+        nprobe: int,
+        max_values: Optional[Tuple[int, float]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        질의와 가까운 리스트만 검색해 점수가 낮은 count개를 찾습니다.
+
+        Args:
+            query: 질의 벡터 (dims 차원만 사용)
+            dims: 비교할 차원 번호
+            caps: 차원별 거리 상한
+            count: 반환할 개수
+            nprobe: 검색할 리스트 수
+            max_values: (차원, 최댓값) 이 값보다 큰 벡터는 제외
+
+        Returns:
+            (점수 오름차순 행 번호, 점수)
+        """
+        centroids = self._centroids
+        nprobe = max(1, min(nprobe, len(centroids)))
+        q = query[dims]
+        centroid_distances = ((centroids[:, dims] - q) ** 2).sum(axis=1)
+        if nprobe < len(centroids):
+            probes = np.argpartition(centroid_distances, nprobe - 1)[:nprobe]
+        else:
+            probes = np.arange(len(centroids))
+
+        # 선택한 리스트 범위들을 한 번에 읽는 위치 (범위별 arange를 이어 붙인 것)
+        starts = self._list_offsets[probes]
+        lengths = self._list_offsets[probes + 1] - starts
+        total = int(lengths.sum())
+        group_starts = np.cumsum(lengths) - lengths
+        positions = np.arange(total) - np.repeat(group_starts - starts, lengths)
+        rows = np.asarray(self._list_rows[positions], dtype=np.int64)
+        vectors = np.asarray(self._list_vectors[positions])
+
+        if self.added_count:
+            added = np.isin(self._added_lists, probes)
+            rows = np.concatenate([rows, self._added_rows[added]])
+            vectors = np.concatenate([vectors, self._added_vectors[added]])
+        if len(rows) == 0:
+            return rows, np.empty(0, dtype=np.float32)
+
+        scores = np.minimum(np.abs(vectors[:, dims] - q), caps).sum(axis=1)
+        if max_values is not None:
+            dim, max_value = max_values
+            scores[vectors[:, dim] > max_value] = np.inf
+
+        count = min(count, len(scores))
+        best = np.argpartition(scores, count - 1)[:count]
+        best = best[np.argsort(scores[best], kind="stable")]
+        return rows[best], scores[best]
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.load():
+            return {"loaded": False}
+        sizes = np.diff(self._list_offsets)
+        return {
+            "loaded": True,
+            "build_id": self._meta["build_id"],
+            "built_at": self._meta["built_at"],
+            "vectors": self._meta["vectors"],
+            "added": self.added_count,
+            "nlist": self._meta["nlist"],
+            "largest_list": int(sizes.max()) if len(sizes) else 0,
+        }
+
+
+def build_ivf_index(
+    index_dir: str,
+    vectors: np.ndarray,
+    source_build_id: str,
+    nlist: Optional[int] = None,
+    sample_size: int = 100_000,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    벡터 전체로 IVF 인덱스 파일을 만들고 원자적으로 교체합니다.
+
+    Args:
+        index_dir: 인덱스 디렉터리 (없으면 생성)
+        vectors: (개수, 차원) 벡터 (행 번호 = 검색 결과 행 번호, 메모리 매핑 배열 가능)
+        source_build_id: 벡터를 만든 카탈로그의 빌드 ID (다시 빌드되면 인덱스도 무효)
+        nlist: 역리스트 수 (기본값: default_nlist)
+        sample_size: k-means 학습에 사용할 표본 수
+        seed: 표본과 초기 중심 선택 시드
+
+    Returns:
+        meta.json 내용
+    """
+    started = time.perf_counter()
+    os.makedirs(index_dir, exist_ok=True)
+    count, dims = vectors.shape
+    nlist = min(nlist or default_nlist(count), count)
+
+    rng = np.random.default_rng(seed)
+    sample_rows = np.sort(rng.choice(count, min(sample_size, count), replace=False))
+    sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+    centroids = train_centroids(sample, nlist, seed=seed)
+    del sample
+
+    assignments = nearest_centroids(vectors, centroids)
+    order = np.argsort(assignments, kind="stable")
+    list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignments, minlength=nlist), out=list_offsets[1:])
+    del assignments
+
+    suffix = f".{uuid.uuid4().hex[:8]}.tmp"
+
+    def path(name: str) -> str:
+        return os.path.join(index_dir, name)
+
+    with open(path("centroids.npy" + suffix), "wb") as f:
+        np.save(f, centroids)
+    with open(path("list_offsets.npy" + suffix), "wb") as f:
+        np.save(f, list_offsets)
+    with open(path("list_rows.npy" + suffix), "wb") as f:
+        np.save(f, order.astype(np.int64))
+    list_vectors = np.lib.format.open_memmap(
+        path("list_vectors.npy" + suffix),
+        mode="w+",
+        dtype=np.float32,
+        shape=(count, dims),
+    )
+    for start in range(0, count, 1 << 16):
+        list_vectors[start : start + (1 << 16)] = vectors[
+            order[start : start + (1 << 16)]
+        ]
+    list_vectors.flush()
+    del list_vectors
+
+    meta = {
+        "version": IVF_FORMAT_VERSION,
+        "build_id": uuid.uuid4().hex,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source_build_id": source_build_id,
+        "vectors": int(count),
+        "dims": int(dims),
+        "nlist": int(nlist),
+    }
+    with open(path("meta.json" + suffix), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    # 검색 중인 프로세스는 기존 파일을 계속 사용하고, meta.json이 바뀌면 새로 엶
+    for name in (
+        "centroids.npy",
+        "list_offsets.npy",
+        "list_rows.npy",
+        "list_vectors.npy",
+    ):
+        os.replace(path(name + suffix), path(name))
+    os.replace(path("meta.json" + suffix), path("meta.json"))
+    print(
+        f"IVF 인덱스 빌드 완료: 벡터 {count}개, 리스트 {nlist}개 "
+        f"({time.perf_counter() - started:.1f}초)"
+    )
+    return meta
@@ -0,0 +1,238 @@
+from typing import Any, Dict, Optional
+import threading
+import numpy as np
+
+from app.services.audio_decoders import FFmpegLiveDecoder
+from app.services.streaming_features import StreamingFeatureAccumulator
+
+# 실시간 입력 형식
+# pcm_s16le / pcm_f32le: 인터리브 원시 PCM, opus: MediaRecorder의 WebM/Ogg Opus 조각
+LIVE_INPUT_FORMATS = ("pcm_s16le", "pcm_f32le", "opus")
+
+_PCM_DTYPES = {"pcm_s16le": "<i2", "pcm_f32le": "<f4"}
+
+
+class PCMRingBuffer:
+    """
+    수신한 모노 PCM을 특징 누적기로 넘기기 전까지 보관하는 고정 크기 링 버퍼
+
+    수신(이벤트 루프)과 특징 계산(스레드풀)이 서로 다른 스레드에서 실행되므로
+    잠금으로 보호합니다. 특징 계산이 실시간보다 뒤처져 버퍼가 가득 차면
+    가장 오래된 샘플을 버리고 버린 샘플 수를 기록합니다.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: 보관할 수 있는 최대 샘플 수
+        """
+        self._data = np.zeros(max(1, capacity), dtype=np.float32)
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def write(self, samples: np.ndarray):
+        """샘플을 뒤에 추가합니다 (넘치면 가장 오래된 샘플부터 버림)."""
+        capacity = len(self._data)
+        with self._lock:
+            if len(samples) > capacity:
+                self.dropped += len(samples) - capacity
+                samples = samples[-capacity:]
+            overflow = self._size + len(samples) - capacity
+            if overflow > 0:
+                self.dropped += overflow
+                self._start = (self._start + overflow) % capacity
+                self._size -= overflow
+
+            end = (self._start + self._size) % capacity
+            first = min(len(samples), capacity - end)
+            self._data[end : end + first] = samples[:first]
+            self._data[: len(samples) - first] = samples[first:]
+            self._size += len(samples)
+
+    @property
+    def size(self) -> int:
+        """보관 중인 샘플 수"""
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def read_all(self) -> np.ndarray:
+        """보관 중인 샘플을 순서대로 꺼내고 버퍼를 비웁니다."""
+        capacity = len(self._data)
+        with self._lock:
+            end = self._start + self._size
+            if end <= capacity:
+                samples = self._data[self._start : end].copy()
+            else:
+                samples = np.concatenate(
+                    [self._data[self._start :], self._data[: end - capacity]]
+                )
+            self._start = 0
+            self._size = 0
+        return samples
+
+
+class LiveAnalysisSession:
+    """
+    WebSocket으로 들어오는 녹음 조각을 실시간으로 분석하는 세션
+
+    수신한 PCM 조각은 모노로 바꿔 링 버퍼에 넣고(opus는 ffmpeg로 디코딩),
+    update가 호출될 때마다 쌓인 만큼만 StreamingFeatureAccumulator에 누적합니다. 템포, 에너지,
+    밸런스, 크로마는 누적된 통계에서 바로 계산하므로 녹음이 끝나도 전체를
+    다시 디코딩하거나 분석하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        audio_analyzer,
+        input_format: str = "pcm_s16le",
+        sample_rate: int = 48000,
+        channels: int = 1,
+        ring_seconds: float = 10.0,
+    ):
+        """
+        Args:
+            audio_analyzer: 특징 계산에 사용할 AudioAnalyzer
+            input_format: 입력 형식 (LIVE_INPUT_FORMATS 중 하나)
+            sample_rate: PCM 입력의 샘플링 레이트 (opus는 분석기 샘플링 레이트로 디코딩)
+            channels: PCM 입력의 채널 수
+            ring_seconds: 링 버퍼 길이 (초)
+
+        Raises:
+            ValueError: 지원하지 않는 입력 형식이나 잘못된 PCM 파라미터
+            DecoderUnavailableError: opus 입력인데 ffmpeg가 없는 경우
+        """
+        if input_format not in LIVE_INPUT_FORMATS:
+            raise ValueError(
+                f"지원하지 않는 입력 형식입니다. 지원 형식: {', '.join(LIVE_INPUT_FORMATS)}"
+            )
+        if sample_rate <= 0 or channels <= 0:
+            raise ValueError("sample_rate와 channels는 0보다 커야 합니다.")
+
+        self.audio_analyzer = audio_analyzer
+        self.input_format = input_format
+        self.channels = channels
+        self._decoder: Optional[FFmpegLiveDecoder] = None
+        if input_format == "opus":
+            self.sr = audio_analyzer.sample_rate
+            self._decoder = FFmpegLiveDecoder(self.sr)
+        else:
+            self.sr = sample_rate
+
+        self._ring = PCMRingBuffer(int(ring_seconds * self.sr))
+        self._remainder = b""
+        self.accumulator = StreamingFeatureAccumulator(self.sr)
+
+    @property
+    def duration(self) -> float:
+        """특징에 반영된 오디오 길이 (초)"""
+        return self.accumulator.duration
+
+    def feed(self, chunk: bytes):
+        """
+        수신한 조각을 링 버퍼(opus는 ffmpeg)에 넣습니다.
+
+        opus 입력은 ffmpeg 파이프 쓰기가 블로킹이므로 스레드풀에서 호출해야 합니다.
+        """
+        if self._decoder is not None:
+            self._decoder.feed(chunk)
+            return
+
+        dtype = np.dtype(_PCM_DTYPES[self.input_format])
+        frame_bytes = dtype.itemsize * self.channels
+        if self._remainder:
+            chunk = self._remainder + chunk
+        usable = len(chunk) - len(chunk) % frame_bytes
+        self._remainder = chunk[usable:]
+        if usable == 0:
+            return
+
+        frames = np.frombuffer(chunk, dtype=dtype, count=usable // dtype.itemsize)
+        frames = frames.reshape(-1, self.channels)
+        mono = frames.mean(axis=1, dtype=np.float32)
+        if dtype.kind == "i":
+            mono *= np.float32(1.0 / 32768.0)
+        self._ring.write(mono)
+
+    @property
+    def needs_drain(self) -> bool:
+        """링 버퍼가 절반 이상 찼는지 여부 (실시간보다 빠르게 보내는 클라이언트)"""
+        return self._ring.size * 2 >= self._ring.capacity
+
+    def drain(self):
+        """쌓인 PCM을 특징에 누적합니다 (스레드풀에서 호출)."""
+        self._drain()
+
+    def update(self) -> Dict[str, Any]:
+        """
+        쌓인 PCM을 특징에 누적하고 현재 특징을 반환합니다 (스레드풀에서 호출).
+
+        Returns:
+            경과 시간과 템포, 에너지, 밸런스, 댄서빌리티, 조성, 크로마
+        """
+        self._drain()
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """지금까지 누적된 통계로 계산한 특징"""
+        analyzer = self.audio_analyzer
+        accumulator = self.accumulator
+        if accumulator.duration == 0:
+            return {"elapsed": 0.0, "dropped_seconds": self.dropped_seconds}
+
+        key, mode, _ = accumulator.key_mode
+        return {
+            "elapsed": accumulator.duration,
+            "tempo": accumulator.tempo,
+            "energy": analyzer.calculate_energy(None, self.sr, graph=accumulator),
+            "valence": analyzer.calculate_valence(None, self.sr, graph=accumulator),
+            "danceability": analyzer.calculate_danceability(
+                None, self.sr, graph=accumulator
+            ),
+            "key": key,
+            "mode": mode,
+            "chroma": accumulator.chroma_mean.tolist(),
+            "dropped_seconds": self.dropped_seconds,
+        }
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """
+        입력을 닫고 남은 PCM까지 누적해 최종 특징을 계산합니다 (스레드풀에서 호출).
+
+        Returns:
+            AudioFeaturesResponse 필드와 같은 키를 가진 딕셔너리
+            (분석할 오디오가 없으면 None)
+        """
+        self._drain()
+        if self._decoder is not None:
+            tail = self._decoder.close()
+            self._decoder = None
+            if len(tail):
+                self.accumulator.update(tail)
+        self.accumulator.finish()
+        if self.accumulator.duration == 0:
+            return None
+        return self.audio_analyzer.analyze_graph(self.accumulator)
+
+    def close(self):
+        """세션 자원을 정리합니다 (연결이 중간에 끊긴 경우)."""
+        if self._decoder is not None:
+            self._decoder.abort()
+            self._decoder = None
+
+    @property
+    def dropped_seconds(self) -> float:
+        """특징 계산이 뒤처져 버려진 오디오 길이 (초)"""
+        return self._ring.dropped / self.sr
+
+    def _drain(self):
+        samples = self._ring.read_all()
+        if self._decoder is not None:
+            # opus는 디코딩된 PCM이 ffmpeg 읽기 스레드에 쌓여 있으므로 바로 누적
+            samples = self._decoder.read_available()
+        if len(samples):
+            self.accumulator.update(samples)
@@ -0,0 +1,258 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import json
+import math
+import threading
+import time
+
+# 양자화할 특성 (key, mode는 값 그대로 사용)
+_QUANTIZED_FEATURES = (
+    "danceability",
+    "energy",
+    "valence",
+    "tempo",
+    "key",
+    "mode",
+    "loudness",
+    "acousticness",
+    "instrumentalness",
+    "speechiness",
+    "liveness",
+)
+_EXACT_FEATURES = ("key", "mode")
+
+
+def quantize_features(
+    target_features: Dict[str, Any],
+    step: float = 0.05,
+    tempo_step: float = 4.0,
+    loudness_step: float = 1.0,
+) -> Dict[str, Any]:
+    """
+    목표 특성을 구간 중앙값으로 양자화합니다.
+
+    같은 구간에 들어가는 분석 결과는 같은 특성으로 추천을 계산하므로, 캐시된
+    결과와 새로 계산한 결과가 같은 검색어와 유사도 기준을 사용합니다.
+
+    Args:
+        target_features: 분석된 오디오 특성
+        step: 0-1 범위 특성의 구간 크기
+        tempo_step: 템포 구간 크기 (BPM)
+        loudness_step: 음량 구간 크기 (dB)
+
+    Returns:
+        양자화된 특성 (값이 없는 특성은 빠짐)
+    """
+    quantized = {}
+    for name in _QUANTIZED_FEATURES:
+        value = target_features.get(name)
+        if value is None:
+            continue
+        if name in _EXACT_FEATURES:
+            quantized[name] = int(value)
+            continue
+        size = {"tempo": tempo_step, "loudness": loudness_step}.get(name, step)
+        # 0.15 / 0.05 = 2.9999999999999996처럼 경계 값이 아래 구간으로 가지 않도록
+        # 나눈 값을 반올림한 뒤 내림
+        bucket = math.floor(round(float(value) / size, 9))
+        quantized[name] = round((bucket + 0.5) * size, 4)
+    return quantized
+
+
+def make_recommendation_key(
+    quantized_features: Dict[str, Any],
+    limit: int,
+    filters: Optional[Dict[str, Any]] = None,
+    variant: str = "similar",
+) -> str:
+    """양자화된 특성, 추천 개수, 필터로 캐시 키(SHA-256)를 만듭니다."""
+    payload = json.dumps(
+        {
+            "variant": variant,
+            "features": quantized_features,
+            "limit": limit,
+            "filters": filters or {},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def seed_for_key(key: str) -> int:
+    """캐시 키에서 추천 계산용 난수 시드를 만듭니다 (같은 키면 같은 시드)."""
+    return int(key[:16], 16)
+
+
+class RecommendationCache:
+    """
+    양자화된 목표 특성으로 주소를 정하는 추천 결과 캐시 (메모리 LRU)
+
+    ttl 안의 결과는 그대로 반환합니다. ttl이 지났지만 stale_ttl 안이면 이전 결과를
+    바로 반환하고 백그라운드 스레드에서 새로 계산합니다 (stale-while-revalidate).
+    같은 키를 동시에 계산하지 않도록 키마다 한 번만 계산하고 나머지 요청은 그
+    결과를 기다립니다. 계산 결과가 비어 있으면 (Spotify 실패 등) 저장하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600,
+        stale_ttl: float = 3600,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            ttl: 결과를 새로 계산하지 않고 그대로 쓰는 시간 (초, 0이면 캐시 사용 안 함)
+            stale_ttl: ttl이 지난 뒤 이전 결과를 반환하며 백그라운드에서 갱신하는 시간 (초)
+            max_entries: 최대 항목 수
+            clock: 현재 시각(초)을 반환하는 함수 (테스트에서 교체)
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+
+        # 키 -> (저장 시각, 결과)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # 계산 중인 키 -> {"event": 완료 이벤트, "value": 결과, "ok": 성공 여부}
+        self._inflight: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "waits": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        refresh: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        캐시된 결과를 반환하거나 compute()로 계산해 저장합니다.
+
+        Args:
+            key: make_recommendation_key로 만든 키
+            compute: 결과를 계산하는 함수 (요청 스레드에서 실행)
+            refresh: 오래된 결과를 백그라운드 스레드에서 갱신하는 함수 (기본값은
+                compute). 갱신은 요청이 끝난 뒤에도 실행되므로 요청자의 사용자
+                토큰처럼 만료될 수 있는 자원에 묶이지 않은 함수를 넘깁니다.
+
+        Returns:
+            캐시된 결과 또는 compute()의 결과
+
+        Raises:
+            compute()가 발생시킨 예외 (결과는 저장되지 않음)
+        """
+        if not self.enabled:
+            return compute()
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                now = self.clock()
+                if entry is not None:
+                    age = now - entry[0]
+                    if age < self.ttl:
+                        self._entries.move_to_end(key)
+                        self._counters["hits"] += 1
+                        return entry[1]
+                    if age < self.ttl + self.stale_ttl:
+                        self._entries.move_to_end(key)
+                        self._counters["stale_hits"] += 1
+                        if key not in self._inflight:
+                            self._inflight[key] = self._new_flight()
+                            self._counters["refreshes"] += 1
+                            threading.Thread(
+                                target=self._refresh,
+                                args=(key, refresh or compute),
+                                name="recommendation-cache-refresh",
+                                daemon=True,
+                            ).start()
+                        return entry[1]
+                    del self._entries[key]
+
+                flight = self._inflight.get(key)
+                if flight is None:
+                    self._inflight[key] = self._new_flight()
+                    self._counters["misses"] += 1
+                    break
+                self._counters["waits"] += 1
+            # 다른 요청이 같은 키를 계산 중이면 그 결과를 함께 사용 (실패했으면 다시 시도)
+            flight["event"].wait()
+            if flight["ok"]:
+                return flight["value"]
+
+        value, ok = None, False
+        try:
+            value = compute()
+            ok = True
+            self._store(key, value)
+            return value
+        finally:
+            self._finish(key, value, ok)
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 카운터와 항목 수"""
+        with self._lock:
+            hits = self._counters["hits"] + self._counters["stale_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _new_flight() -> Dict[str, Any]:
+        return {"event": threading.Event(), "value": None, "ok": False}
+
+    def _refresh(self, key: str, compute: Callable[[], Any]):
+        value, ok = None, False
+        try:
+            value = compute()
+            ok = True
+            self._store(key, value)
+        except Exception as e:
+            print(f"추천 캐시 갱신 실패 (이전 결과 유지): {e}")
+            with self._lock:
+                self._counters["refresh_errors"] += 1
+        finally:
+            self._finish(key, value, ok)
+
+    def _store(self, key: str, value: Any):
+        if not value:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _finish(self, key: str, value: Any, ok: bool):
+        with self._lock:
+            flight = self._inflight.pop(key, None)
+        if flight is not None:
+            flight["value"], flight["ok"] = value, ok
+            flight["event"].set()
@@ -0,0 +1,190 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+import time
+
+
+class SearchFanout:
+    """
+    여러 검색어를 동시에 실행해 후보 곡을 모으는 팬아웃 실행기
+
+    요청 하나가 동시에 실행하는 검색은 max_parallel개로 제한하고, 하나가 끝날
+    때마다 다음 검색어를 넣습니다. 결과는 도착 순서가 아니라 검색어 순서대로
+    합치므로, 앞에서부터 끝난 검색어들만으로 고유 후보가 목표 수만큼 모이면
+    (검색 결과가 같으면 항상 같은 검색어에서) 멈춥니다. 후보가 모이거나
+    deadline이 지나면 아직 시작하지 않은 검색어는 실행하지 않고 바로 반환합니다. 검색어별
+    결과(성공, 실패, 시간 초과, 조기 종료로 취소, 건너뜀)는 반환값과 누적 통계에
+    남깁니다.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        max_parallel: int = 4,
+        deadline: float = 4.0,
+    ):
+        """
+        Args:
+            max_workers: 모든 요청이 공유하는 검색 스레드 수
+            max_parallel: 요청 하나가 동시에 실행하는 최대 검색 수
+            deadline: 요청 하나의 후보 수집 제한 시간 (초)
+        """
+        self.max_parallel = max(1, max_parallel)
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="spotify-search"
+        )
+        self._lock = threading.Lock()
+        self._counters = {
+            "requests": 0,
+            "early_stops": 0,
+            "deadline_hits": 0,
+            "ok": 0,
+            "error": 0,
+            "timeout": 0,
+            "cancelled": 0,
+            "skipped": 0,
+        }
+        self._latency_ms_total = 0.0
+
+    def run(
+        self,
+        search: Callable[[str], List[Dict[str, Any]]],
+        queries: List[str],
+        min_candidates: int,
+        deadline: Optional[float] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        검색어들을 동시에 실행해 고유 트랙을 모읍니다.
+
+        Args:
+            search: 검색어 하나를 받아 트랙 목록을 반환하는 함수
+            queries: 검색어 목록 (앞에서부터 실행)
+            min_candidates: 앞 검색어들의 결과로 이만큼 고유 트랙이 모이면
+                남은 검색어는 건너뜀
+            deadline: 제한 시간 (초, 기본값은 생성 시 설정). 지나면 그때까지 끝난
+                결과를 검색어 순서대로 모두 합침
+
+        Returns:
+            (검색어 순서대로 중복을 제거한 트랙 목록, 검색어별 결과 목록)
+        """
+        deadline = self.deadline if deadline is None else deadline
+        started = time.monotonic()
+        expires_at = started + deadline
+
+        reports = [{"query": query, "status": "skipped"} for query in queries]
+        tracks: List[Dict[str, Any]] = []
+        seen_ids = set()
+        running: Dict[Future, int] = {}
+        finished: Dict[int, List[Dict[str, Any]]] = {}  # 끝났지만 합치지 않은 결과
+        next_index = 0
+        merged = 0  # 앞에서부터 합친 검색어 수
+        stop_reason = None
+
+        def merge(found: List[Dict[str, Any]]):
+            for track in found:
+                track_id = track.get("id")
+                if track_id and track_id not in seen_ids:
+                    seen_ids.add(track_id)
+                    tracks.append(track)
+
+        while True:
+            while (
+                stop_reason is None
+                and next_index < len(queries)
+                and len(running) < self.max_parallel
+            ):
+                future = self._executor.submit(
+                    self._timed_search, search, queries[next_index]
+                )
+                running[future] = next_index
+                next_index += 1
+            if not running:
+                break
+
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                stop_reason = "deadline"
+                break
+            done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                found, elapsed_ms, error = future.result()
+                report = reports[index]
+                report["ms"] = round(elapsed_ms, 1)
+                if error is not None:
+                    report["status"] = "error"
+                    report["error"] = error
+                    finished[index] = []
+                    continue
+                report["status"] = "ok"
+                report["tracks"] = len(found)
+                finished[index] = found
+
+            # 앞 검색어가 모두 끝난 결과만 순서대로 합쳐 도착 순서와 무관하게 멈춤
+            while merged in finished and len(tracks) < min_candidates:
+                merge(finished.pop(merged))
+                merged += 1
+            if len(tracks) >= min_candidates:
+                stop_reason = "enough"
+                break
+
+        if stop_reason == "deadline":
+            # 제한 시간 초과: 앞 검색어가 끝나지 않았어도 끝난 결과는 모두 사용
+            for index in sorted(finished):
+                merge(finished[index])
+
+        # 제한 시간이 지났거나 후보가 충분하면 실행 중인 검색은 기다리지 않음
+        for future, index in running.items():
+            if not future.cancel():
+                reports[index]["status"] = (
+                    "timeout" if stop_reason == "deadline" else "cancelled"
+                )
+
+        self._record(reports, stop_reason, time.monotonic() - started)
+        return tracks, reports
+
+    @staticmethod
+    def _timed_search(
+        search: Callable[[str], List[Dict[str, Any]]], query: str
+    ) -> Tuple[List[Dict[str, Any]], float, Optional[str]]:
+        started = time.perf_counter()
+        try:
+            found = search(query)
+            return found, (time.perf_counter() - started) * 1000, None
+        except Exception as e:
+            return [], (time.perf_counter() - started) * 1000, str(e)
+
+    def _record(self, reports: List[Dict[str, Any]], stop_reason, elapsed: float):
+        failed = [r for r in reports if r["status"] in ("error", "timeout")]
+        for report in failed:
+            print(
+                f"검색 쿼리 '{report['query']}' {report['status']}: "
+                f"{report.get('error', '제한 시간 초과')}"
+            )
+        with self._lock:
+            self._counters["requests"] += 1
+            if stop_reason == "enough":
+                self._counters["early_stops"] += 1
+            elif stop_reason == "deadline":
+                self._counters["deadline_hits"] += 1
+            for report in reports:
+                self._counters[report["status"]] += 1
+            self._latency_ms_total += elapsed * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        """검색어별 결과 누적 수와 요청당 평균 소요 시간"""
+        with self._lock:
+            requests = self._counters["requests"]
+            return {
+                **self._counters,
+                "max_parallel": self.max_parallel,
+                "deadline": self.deadline,
+                "avg_latency_ms": (
+                    round(self._latency_ms_total / requests, 1) if requests else None
+                ),
+            }
+
+    def shutdown(self):
+        """검색 스레드를 정리합니다 (실행 중인 검색은 기다리지 않음)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
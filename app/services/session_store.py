@@ -0,0 +1,4 @@
+# 분석 결과 저장소 (메모리 기반)
+# 오디오 분석 라우트가 저장하고 추천 라우트가 읽음. 추천 라우트가 오디오 분석
+# 모듈(librosa, 분석 워커 등)을 import하지 않고도 세션을 조회할 수 있도록 분리
+analysis_sessions = {}
@@ -0,0 +1,12 @@
+# SpotifyService.calculate_similarity와 곡 카탈로그 검색이 함께 쓰는 특성과 가중치
+# (numpy 없이 import되도록 카탈로그 모듈과 분리)
+SIMILARITY_WEIGHTS = {
+    "danceability": 0.25,  # 가장 중요한 특성
+    "energy": 0.25,  # 가장 중요한 특성
+    "valence": 0.20,  # 감정적 유사성
+    "tempo": 0.15,  # 리듬적 유사성
+    "acousticness": 0.05,  # 음향적 특성
+    "instrumentalness": 0.05,  # 악기 vs 가사
+    "speechiness": 0.03,  # 말하기 vs 노래
+    "liveness": 0.02,  # 라이브 vs 녹음
+}
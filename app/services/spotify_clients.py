@@ -0,0 +1,297 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import threading
+import time
+import weakref
+import requests
+import spotipy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
+
+from app.core.config import settings
+from app.services.audio_features_loader import AudioFeaturesLoader
+from app.services.search_fanout import SearchFanout
+
+
+class SpotifyClientManager:
+    """
+    프로세스 전체에서 공유하는 Spotify 클라이언트 관리자
+
+    서버 인증(Client Credentials) 클라이언트는 하나만 만들어 토큰을 메모리에
+    캐시하고 만료될 때만 다시 발급받습니다. 사용자 토큰 클라이언트는 토큰별로
+    TTL 동안 재사용합니다. 모든 클라이언트는 requests 세션 하나(연결 풀)를
+    공유하므로 요청마다 TCP/TLS 연결을 새로 맺지 않습니다. 연결 확인(토큰 발급,
+    검색, Audio Features 호출)은 요청 경로가 아닌 백그라운드 스레드에서
+    주기적으로 실행합니다.
+    """
+
+    def __init__(
+        self,
+        client_id: Optional[str],
+        client_secret: Optional[str],
+        user_client_ttl: float = 3600.0,
+        max_user_clients: int = 256,
+        pool_size: int = 32,
+        features_batch_window: float = 0.01,
+        search_fanout: Optional[SearchFanout] = None,
+        api_url: Optional[str] = None,
+        token_url: Optional[str] = None,
+        retries: int = 0,
+    ):
+        """
+        Args:
+            client_id: Spotify 앱 Client ID
+            client_secret: Spotify 앱 Client Secret
+            user_client_ttl: 사용자 토큰 클라이언트 재사용 시간 (초, Spotify 토큰 유효 시간)
+            max_user_clients: 보관할 최대 사용자 클라이언트 수 (넘으면 오래 안 쓴 것부터 삭제)
+            pool_size: 공유 연결 풀 크기
+            features_batch_window: audio_features 요청을 모으는 시간 (초)
+            search_fanout: 추천 후보 검색을 동시에 실행하는 팬아웃 실행기
+            api_url: Web API 주소 (기본값: https://api.spotify.com/v1/, 모의 서버 테스트용)
+            token_url: Client Credentials 토큰 발급 주소 (기본값: Spotify 계정 서버)
+            retries: 429/5xx 응답 재시도 횟수 (Retry-After만큼 기다림, 요청 경로에서는
+                응답이 늦어지므로 0, 오프라인 수집 등에서 사용)
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.user_client_ttl = user_client_ttl
+        self.max_user_clients = max(1, max_user_clients)
+        self.features_batch_window = features_batch_window
+        self.search_fanout = search_fanout or SearchFanout()
+        self.api_url = api_url
+        self.token_url = token_url
+
+        self._session = requests.Session()
+        retry = 0
+        if retries > 0:
+            retry = Retry(
+                total=retries,
+                status=retries,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=False,
+                backoff_factor=0.5,
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=pool_size, max_retries=retry
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._credentials: Optional[SpotifyClientCredentials] = None
+        self._app_client: Optional[spotipy.Spotify] = None
+        # sha256(토큰) -> (클라이언트, 만료 시각)
+        self._user_clients: "OrderedDict[str, Tuple[spotipy.Spotify, float]]" = (
+            OrderedDict()
+        )
+        self._counters = {"user_hits": 0, "user_misses": 0, "user_evictions": 0}
+        # 클라이언트별 audio_features 로더 (클라이언트가 풀에서 빠지면 함께 정리)
+        self._features_loaders: (
+            "weakref.WeakKeyDictionary[spotipy.Spotify, AudioFeaturesLoader]"
+        ) = weakref.WeakKeyDictionary()
+
+        self._health: Dict[str, Any] = {"ok": None, "checked_at": None}
+        self._health_thread: Optional[threading.Thread] = None
+        self._health_stop = threading.Event()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.client_id and self.client_secret)
+
+    def app_client(self) -> Optional[spotipy.Spotify]:
+        """서버 인증 클라이언트 (API 키가 없으면 None)"""
+        if not self.configured:
+            return None
+        if self._app_client is None:
+            with self._lock:
+                if self._app_client is None:
+                    self._credentials = SpotifyClientCredentials(
+                        client_id=self.client_id,
+                        client_secret=self.client_secret,
+                        cache_handler=MemoryCacheHandler(),
+                        requests_session=self._session,
+                    )
+                    if self.token_url:
+                        self._credentials.OAUTH_TOKEN_URL = self.token_url
+                    self._app_client = self._with_api_url(
+                        spotipy.Spotify(
+                            client_credentials_manager=self._credentials,
+                            requests_session=self._session,
+                        )
+                    )
+        return self._app_client
+
+    def user_client(self, access_token: str) -> spotipy.Spotify:
+        """
+        사용자 토큰 클라이언트 (같은 토큰이면 TTL 동안 같은 클라이언트)
+
+        Args:
+            access_token: Spotify 사용자 액세스 토큰
+
+        Returns:
+            spotipy.Spotify (사용자 토큰만으로 동작하므로 API 키가 없어도 생성)
+        """
+        key = hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._user_clients.get(key)
+            if entry is not None and entry[1] > now:
+                self._user_clients.move_to_end(key)
+                self._counters["user_hits"] += 1
+                return entry[0]
+
+            self._counters["user_misses"] += 1
+            client = self._with_api_url(
+                spotipy.Spotify(auth=access_token, requests_session=self._session)
+            )
+            self._user_clients[key] = (client, now + self.user_client_ttl)
+            self._user_clients.move_to_end(key)
+            while len(self._user_clients) > self.max_user_clients:
+                self._user_clients.popitem(last=False)
+                self._counters["user_evictions"] += 1
+        return client
+
+    def _with_api_url(self, client: spotipy.Spotify) -> spotipy.Spotify:
+        if self.api_url:
+            client.prefix = self.api_url.rstrip("/") + "/"
+        return client
+
+    def features_loader(self, client: spotipy.Spotify) -> AudioFeaturesLoader:
+        """
+        클라이언트의 audio_features 로더 (같은 클라이언트를 쓰는 요청끼리 묶음을 공유)
+
+        Args:
+            client: app_client 또는 user_client가 반환한 클라이언트
+
+        Returns:
+            AudioFeaturesLoader
+        """
+        with self._lock:
+            loader = self._features_loaders.get(client)
+            if loader is None:
+                # 로더가 클라이언트를 강하게 참조하면 WeakKeyDictionary 항목이 정리되지 않음
+                audio_features = weakref.WeakMethod(client.audio_features)
+
+                def fetch(track_ids):
+                    method = audio_features()
+                    if method is None:
+                        raise RuntimeError("Spotify 클라이언트가 이미 정리되었습니다.")
+                    return method(track_ids)
+
+                loader = AudioFeaturesLoader(
+                    fetch, batch_window=self.features_batch_window
+                )
+                self._features_loaders[client] = loader
+        return loader
+
+    def check_health(self) -> Dict[str, Any]:
+        """
+        토큰 발급, 검색, Audio Features를 한 번씩 호출해 연결 상태를 기록합니다.
+
+        Returns:
+            단계별 성공 여부와 소요 시간
+        """
+        client = self.app_client()
+        if client is None:
+            self._health = {
+                "ok": False,
+                "checked_at": time.time(),
+                "error": "API 키 없음",
+            }
+            return self._health
+
+        started = time.perf_counter()
+        health: Dict[str, Any] = {"ok": False, "checked_at": time.time()}
+        try:
+            self._credentials.get_access_token(as_dict=False)
+            health["token"] = True
+            result = client.search(q="test", type="track", limit=1)
+            health["search"] = True
+            items = result["tracks"]["items"]
+            if items:
+                try:
+                    features = client.audio_features([items[0]["id"]])
+                    health["audio_features"] = bool(features and features[0])
+                except Exception as features_error:
+                    # Client Credentials로는 Audio Features가 막혀 있을 수 있음 (검색은 정상)
+                    health["audio_features"] = False
+                    health["audio_features_error"] = str(features_error)
+            health["ok"] = True
+        except Exception as e:
+            health["error"] = str(e)
+        health["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        if health["ok"] != self._health.get("ok"):
+            print(
+                f"{'✅' if health['ok'] else '❌'} Spotify API 연결 상태: "
+                f"{'정상' if health['ok'] else health.get('error')}"
+            )
+        self._health = health
+        return health
+
+    def start_health_checks(self, interval: float):
+        """백그라운드 스레드에서 interval초마다 check_health를 실행합니다."""
+        if interval <= 0 or not self.configured or self._health_thread is not None:
+            return
+        self._health_stop.clear()
+
+        def run():
+            while True:
+                self.check_health()
+                if self._health_stop.wait(interval):
+                    return
+
+        self._health_thread = threading.Thread(
+            target=run, name="spotify-health", daemon=True
+        )
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        """백그라운드 연결 확인을 멈춥니다."""
+        thread, self._health_thread = self._health_thread, None
+        if thread is not None:
+            self._health_stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """토큰 만료까지 남은 시간, 사용자 클라이언트 풀 상태, 마지막 연결 확인 결과"""
+        token_expires_in = None
+        if self._credentials is not None:
+            token_info = self._credentials.cache_handler.get_cached_token()
+            if token_info:
+                token_expires_in = max(0, int(token_info["expires_at"] - time.time()))
+        app_loader = None
+        if self._app_client is not None:
+            app_loader = self.features_loader(self._app_client).stats()
+        with self._lock:
+            return {
+                "configured": self.configured,
+                "token_expires_in": token_expires_in,
+                "user_clients": len(self._user_clients),
+                "max_user_clients": self.max_user_clients,
+                **self._counters,
+                "audio_features": app_loader,
+                "search": self.search_fanout.stats(),
+                "health": dict(self._health),
+            }
+
+
+# 공유 인스턴스 (main.py lifespan에서 연결 확인 시작/종료)
+spotify_client_manager = SpotifyClientManager(
+    settings.SPOTIFY_CLIENT_ID,
+    settings.SPOTIFY_CLIENT_SECRET,
+    user_client_ttl=settings.SPOTIFY_USER_CLIENT_TTL,
+    max_user_clients=settings.SPOTIFY_MAX_USER_CLIENTS,
+    features_batch_window=settings.SPOTIFY_FEATURES_BATCH_WINDOW,
+    search_fanout=SearchFanout(
+        max_workers=settings.SPOTIFY_SEARCH_WORKERS,
+        max_parallel=settings.SPOTIFY_SEARCH_CONCURRENCY,
+        deadline=settings.SPOTIFY_SEARCH_DEADLINE,
+    ),
+    api_url=settings.SPOTIFY_API_URL,
+    token_url=settings.SPOTIFY_TOKEN_URL,
+)
@@ -1,101 +1,74 @@
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-from typing import List, Dict, Any, Optional
-import requests
+from typing import List, Dict, Any, Optional, Tuple
 import random
 from app.core.config import settings
+from app.services.feature_store import AudioFeatureStore, audio_feature_store
+from app.services.spotify_clients import SpotifyClientManager, spotify_client_manager
+from app.services.similarity import SIMILARITY_WEIGHTS
 
 
 class SpotifyService:
     """Spotify API 연동을 위한 서비스 클래스"""
 
-    def __init__(self, access_token: str = None):
+    def __init__(
+        self,
+        access_token: str = None,
+        client_manager: Optional[SpotifyClientManager] = None,
+        feature_store: Optional[AudioFeatureStore] = None,
+        catalog=None,
+    ):
         self.client_id = settings.SPOTIFY_CLIENT_ID
         self.client_secret = settings.SPOTIFY_CLIENT_SECRET
         self.access_token = access_token
 
-        print(f"Spotify API 설정 확인:")
-        print(
-            f"  Client ID: {self.client_id[:10] + '...' if self.client_id else 'None'}"
-        )
-        print(
-            f"  Client Secret: {self.client_secret[:10] + '...' if self.client_secret else 'None'}"
+        # 클라이언트와 토큰은 프로세스 전체에서 공유
+        # (연결 확인은 생성자가 아닌 SpotifyClientManager 백그라운드 스레드에서 실행)
+        self.client_manager = client_manager or spotify_client_manager
+        if not self.client_manager.configured:
+            self.sp = None
+        elif self.access_token:
+            # Authorization Code Flow (사용자 인증)
+            self.sp = self.client_manager.user_client(self.access_token)
+        else:
+            # Client Credentials Flow (서버 인증)
+            self.sp = self.client_manager.app_client()
+
+        # audio_features 요청은 짧은 시간 창 동안 모아 한 번에 호출 (최대 100개)
+        self.features_loader = (
+            self.client_manager.features_loader(self.sp) if self.sp else None
         )
+        # 한 번 가져온 특성은 DB에 저장해 재시작 후에도 Spotify를 다시 호출하지 않음
+        self.feature_store = feature_store or audio_feature_store
+        # 유사곡 후보는 로컬 카탈로그(TrackCatalog)에서 먼저 찾음 (Spotify 검색 없이)
+        self._catalog = catalog
 
-        if self.client_id and self.client_secret:
-            try:
-                if self.access_token:
-                    # Authorization Code Flow (사용자 인증)
-                    self.sp = spotipy.Spotify(auth=self.access_token)
-                    print("✅ Spotify API 연결 성공 (사용자 인증)")
-
-                    # 사용자 정보 테스트
-                    try:
-                        user_info = self.sp.current_user()
-                        print(f"✅ 사용자 인증 성공: {user_info['display_name']}")
-                    except Exception as user_error:
-                        print(f"❌ 사용자 인증 실패: {user_error}")
-                        self.sp = None
-                        return
+    @property
+    def catalog(self):
+        """
+        로컬 곡 카탈로그 (생성 시 주지 않으면 공유 카탈로그)
 
-                else:
-                    # Client Credentials Flow (서버 인증)
-                    client_credentials_manager = SpotifyClientCredentials(
-                        client_id=self.client_id, client_secret=self.client_secret
-                    )
-                    self.sp = spotipy.Spotify(
-                        client_credentials_manager=client_credentials_manager
-                    )
-                    print("✅ Spotify API 연결 성공 (서버 인증)")
-
-                    # 토큰 발급 테스트
-                    try:
-                        token = client_credentials_manager.get_access_token()
-                        if isinstance(token, str):
-                            print(f"✅ 토큰 발급 성공: {token[:20]}...")
-                        else:
-                            print(f"✅ 토큰 발급 성공: {type(token)} 타입")
-                    except Exception as token_error:
-                        print(f"❌ 토큰 발급 실패: {token_error}")
-                        self.sp = None
-                        return
-
-                # 연결 테스트
-                test_result = self.sp.search(q="test", type="track", limit=1)
-                print(
-                    f"✅ Spotify API 테스트 성공: {len(test_result['tracks']['items'])}개 결과"
-                )
+        카탈로그 모듈은 numpy와 샤드 풀까지 불러오므로 라우트 import 시점이 아니라
+        처음 쓸 때 import합니다.
+        """
+        if self._catalog is None:
+            from app.services.track_catalog import track_catalog
 
-                # Audio Features 테스트
-                if test_result["tracks"]["items"]:
-                    test_track_id = test_result["tracks"]["items"][0]["id"]
-                    try:
-                        test_features = self.sp.audio_features(test_track_id)
-                        if test_features and test_features[0]:
-                            print(
-                                f"✅ Audio Features 테스트 성공: {len(test_features[0])}개 특성"
-                            )
-                        else:
-                            print("❌ Audio Features 테스트 실패: 결과가 비어있음")
-                    except Exception as features_error:
-                        print(f"❌ Audio Features 테스트 실패: {features_error}")
-
-            except Exception as e:
-                print(f"❌ Spotify API 연결 실패: {e}")
-                self.sp = None
-        else:
-            print("❌ Spotify API 키가 설정되지 않음")
-            self.sp = None
+            self._catalog = track_catalog
+        return self._catalog
 
-    def search_track(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def search_track(
+        self, query: str, limit: int = 10, offset: int = 0, raise_errors: bool = False
+    ) -> List[Dict[str, Any]]:
         """
-        트랙 검색
+        트랙 검색 (offset으로 다음 페이지, Spotify 검색은 offset 1000까지)
+
+        raise_errors가 True면 실패를 빈 결과로 바꾸지 않고 예외를 발생시킵니다
+        (카탈로그 수집처럼 실패한 페이지를 다시 시도해야 하는 경우).
         """
         if not self.sp:
             raise Exception("Spotify API 설정이 필요합니다.")
 
         try:
-            results = self.sp.search(q=query, type="track", limit=limit)
+            results = self.sp.search(q=query, type="track", limit=limit, offset=offset)
             tracks = []
 
             for track in results["tracks"]["items"]:
@@ -116,6 +89,8 @@ class SpotifyService:
             return tracks
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Spotify 트랙 검색 오류: {e}")
             return []
 
@@ -123,42 +98,98 @@ class SpotifyService:
         """
         트랙의 오디오 특성 가져오기 (Client Credentials Flow 제한 대응)
         """
-        if not self.sp:
-            print("❌ Spotify API가 설정되지 않음")
+        print(f"🎵 Audio Features 요청: {track_id}")
+        features_by_id = self.get_audio_features_batch([{"id": track_id}])
+        features = features_by_id.get(track_id, {})
+        if features:
+            print(f"✅ Audio Features 성공: {len(features)}개 특성")
+        return features
+
+    def get_audio_features_batch(
+        self, tracks: List[Dict[str, Any]], estimate: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 트랙의 오디오 특성을 한 번에 가져오기
+
+        저장소(audio_features 테이블)에 있는 트랙은 저장된 값을 사용하고, 나머지만
+        동시에 들어온 다른 요청의 ID와 합쳐 audio_features를 묶음으로 호출한 뒤
+        저장합니다. Client Credentials Flow 제한(403)으로 실패한 트랙은 트랙 정보로 추정하고,
+        그 밖의 이유로 실패하거나 특성이 없는 트랙은 빈 딕셔너리를 반환합니다.
+
+        Args:
+            tracks: "id"를 포함한 트랙 딕셔너리 목록 (검색 결과 등, 추정에도 사용)
+            estimate: False면 403으로 실패한 트랙도 추정하지 않고 빈 딕셔너리 반환
+                (카탈로그 수집처럼 실제 특성만 필요한 경우)
+
+        Returns:
+            트랙 ID별 오디오 특성
+        """
+        track_ids = [track["id"] for track in tracks if track.get("id")]
+        if not track_ids:
             return {}
 
-        try:
-            print(f"🎵 Audio Features 요청: {track_id}")
-
-            # 토큰 상태 확인 및 갱신
-            try:
-                token = self.sp.client_credentials_manager.get_access_token()
-                print(f"토큰 상태 확인: {type(token)}")
-            except Exception as token_error:
-                print(f"토큰 확인 실패: {token_error}")
-                return {}
-
-            # Audio Features 요청
-            features = self.sp.audio_features(track_id)
-            if features and features[0]:
-                print(f"✅ Audio Features 성공: {len(features[0])}개 특성")
-                return features[0]
+        features_by_id, errors = self.load_audio_features(track_ids)
+
+        result = {}
+        for track in tracks:
+            track_id = track.get("id")
+            if not track_id:
+                continue
+            if track_id in features_by_id:
+                result[track_id] = features_by_id[track_id]
+            elif estimate and "403" in str(errors.get(track_id, "")):
+                # Client Credentials Flow 제한: 트랙 정보 기반 추정 (이름/인기도가 없으면 조회)
+                if "name" in track and "popularity" in track:
+                    result[track_id] = self._estimate_audio_features(track)
+                else:
+                    result[track_id] = self._estimate_audio_features_from_track(
+                        track_id
+                    )
             else:
-                print("❌ Audio Features 결과가 비어있음")
-                return {}
+                result[track_id] = {}
+        return result
 
-        except Exception as e:
-            print(f"❌ Spotify 오디오 특성 가져오기 오류: {e}")
-            print(f"오류 타입: {type(e)}")
-            print(f"오류 상세: {str(e)}")
+    def load_audio_features(
+        self, track_ids: List[str]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Exception]]:
+        """
+        저장소와 Spotify에서 오디오 특성을 가져오고, 가져오지 못한 트랙의 오류를 함께 반환
 
-            # 403 오류인 경우 Client Credentials Flow 제한으로 판단
-            if "403" in str(e):
-                print("⚠️ Client Credentials Flow로는 Audio Features 접근이 제한됩니다.")
-                print("💡 대안: 트랙 정보를 기반으로 추정된 Audio Features 생성")
-                return self._estimate_audio_features_from_track(track_id)
+        저장소에 없는 트랙만 features_loader로 묶어 호출하고 결과를 저장합니다.
 
-            return {}
+        Args:
+            track_ids: Spotify 트랙 ID 목록
+
+        Returns:
+            (ID별 특성, ID별 오류) 튜플. 어느 쪽에도 없는 ID는 Spotify에 특성이
+            없는 트랙
+        """
+        try:
+            features_by_id = self.feature_store.get_many(track_ids)
+        except Exception as e:
+            print(f"❌ Audio Features 저장소 조회 실패: {e}")
+            features_by_id = {}
+
+        missing_ids = [
+            track_id for track_id in track_ids if track_id not in features_by_id
+        ]
+        errors: Dict[str, Exception] = {}
+        if missing_ids and not self.sp:
+            error = Exception("Spotify API 설정이 필요합니다.")
+            errors = {track_id: error for track_id in missing_ids}
+        elif missing_ids:
+            fetched, errors = self.features_loader.load_many(missing_ids)
+            if errors:
+                print(
+                    f"❌ Audio Features 실패: {len(errors)}/{len(missing_ids)}개 트랙"
+                )
+            if fetched:
+                try:
+                    self.feature_store.put_many(fetched.values())
+                except Exception as e:
+                    print(f"❌ Audio Features 저장 실패: {e}")
+                features_by_id.update(fetched)
+        return features_by_id, errors
 
     def _estimate_audio_features_from_track(self, track_id: str) -> Dict[str, Any]:
         """
@@ -170,6 +201,17 @@ class SpotifyService:
             if not track_info:
                 return self._get_default_audio_features()
 
+            return self._estimate_audio_features(track_info)
+
+        except Exception as e:
+            print(f"❌ 추정된 Audio Features 생성 실패: {e}")
+            return self._get_default_audio_features()
+
+    def _estimate_audio_features(self, track_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        이미 가져온 트랙 정보(이름, 아티스트, 인기도)로 Audio Features 추정
+        """
+        try:
             # 트랙 정보를 기반으로 추정
             name = track_info.get("name", "").lower()
             artists = [
@@ -240,64 +282,59 @@ class SpotifyService:
         target_features: Dict[str, Any],
         limit: int = 5,
         filters: Optional[Dict] = None,
+        seed: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """
         Spotify 추천 API를 사용하여 유사한 곡 추천
+
+        Args:
+            target_features: 목표 오디오 특성
+            limit: 추천 곡 수
+            filters: 추천 필터
+            seed: 검색어 선택, 검색어별 개수, 결과 섞기에 쓰는 난수 시드
+                (같은 시드와 특성이면 같은 검색어로 검색해 같은 순서로 고름, None이면 매번 다름)
         """
         if not self.sp:
             raise Exception("Spotify API 설정이 필요합니다.")
 
+        rng = random.Random(seed)
         try:
             # 토큰 상태 확인
             print(f"Spotify Client ID: {self.client_id[:10]}...")
             print(f"Spotify Client Secret: {self.client_secret[:10]}...")
 
-            # 토큰 발급 테스트
-            try:
-                token_response = self.sp.client_credentials_manager.get_access_token()
-                if isinstance(token_response, str):
-                    print(f"토큰 발급 성공: {token_response[:20]}...")
-                else:
-                    print(f"토큰 발급 성공: {type(token_response)} 타입")
-            except Exception as token_error:
-                print(f"토큰 발급 실패: {token_error}")
-                raise token_error
-
             # Client Credentials Flow는 추천 API를 지원하지 않음
             # 대신 분석된 특징을 기반으로 한 맞춤형 검색
             print("분석된 특징 기반 맞춤형 추천 생성...")
 
             # 분석된 특징을 기반으로 검색어 생성
             search_queries = self._generate_search_queries_from_features(
-                target_features
+                target_features, rng
             )
             print(f"생성된 맞춤형 검색어: {search_queries}")
 
-            all_tracks = []
-            for query in search_queries:
-                try:
-                    # 각 검색어마다 다른 개수로 검색 (더 다양한 결과)
-                    search_limit = random.randint(2, 5)
-                    search_results = self.sp.search(
-                        q=query, type="track", limit=search_limit
-                    )
-                    tracks = search_results["tracks"]["items"]
-                    all_tracks.extend(tracks)
-                    print(f"검색어 '{query}': {len(tracks)}개 트랙 발견")
-                except Exception as e:
-                    print(f"검색 쿼리 '{query}' 실패: {e}")
-                    continue
+            # 각 검색어마다 다른 개수로 검색 (더 다양한 결과)
+            # 검색은 동시에 실행되므로 개수는 미리 정해 두어야 시드가 같을 때 결과도 같음
+            search_limits = {query: rng.randint(2, 5) for query in search_queries}
 
-            # 중복 제거 및 랜덤 셔플
-            unique_tracks = []
-            seen_ids = set()
-            for track in all_tracks:
-                if track["id"] not in seen_ids:
-                    unique_tracks.append(track)
-                    seen_ids.add(track["id"])
+            def search(query: str) -> List[Dict[str, Any]]:
+                search_results = self.sp.search(
+                    q=query, type="track", limit=search_limits[query]
+                )
+                return search_results["tracks"]["items"]
+
+            # 검색어를 동시에 실행하고, 필터링에 충분한 후보가 모이면 중단 (중복 제거됨)
+            # 결과는 검색어 순서대로 합쳐지므로 시드가 같으면 같은 검색어에서 멈춤
+            unique_tracks, query_reports = self.client_manager.search_fanout.run(
+                search, search_queries, min_candidates=limit * 2
+            )
+            for report in query_reports:
+                if report["status"] == "ok":
+                    print(f"검색어 '{report['query']}': {report['tracks']}개 트랙 발견")
 
-            # 결과를 랜덤하게 섞고 제한
-            random.shuffle(unique_tracks)
+            # 결과를 랜덤하게 섞고 제한 (도착 순서와 무관하도록 ID 순으로 정렬 후 섞음)
+            unique_tracks.sort(key=lambda track: track["id"])
+            rng.shuffle(unique_tracks)
             unique_tracks = unique_tracks[: limit * 2]  # 필터링을 위해 더 많이 가져오기
 
             recommendations = {"tracks": unique_tracks}
@@ -305,11 +342,13 @@ class SpotifyService:
 
             print(f"Spotify SDK 추천 성공: {len(recommendations['tracks'])}개 트랙")
 
+            # 후보 곡의 Audio Features를 한 번에 가져오기 (가사 유무 확인을 위해)
+            features_by_id = self.get_audio_features_batch(recommendations["tracks"])
+
             tracks = []
             for track in recommendations["tracks"]:
-                # Audio Features 가져오기 (가사 유무 확인을 위해)
                 try:
-                    audio_features = self.get_audio_features(track["id"])
+                    audio_features = features_by_id.get(track["id"], {})
                     # instrumentalness가 0.5 이상이면 가사 없는 곡으로 판단하여 제외
                     if (
                         audio_features
@@ -357,6 +396,57 @@ class SpotifyService:
             print(f"Spotify 추천 API 오류: {e}")
             raise Exception(f"추천 생성 실패: {e}")
 
+    def get_catalog_recommendations(
+        self,
+        target_features: Dict[str, Any],
+        limit: int = 5,
+        exclude_ids: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        로컬 카탈로그에서 목표 특성과 가장 비슷한 곡 추천 (Spotify 검색 없음)
+
+        get_recommendations와 같은 형식의 곡 목록에 "similarity"(0-100)가 더해져
+        반환됩니다. 가사 없는 곡(instrumentalness > 0.5)은 제외합니다. 카탈로그에
+        곡 정보가 없는 곡(Audio Features 저장소로 만든 경우)은 Spotify 트랙 정보를
+        한 번에 가져와 채우고, 가져올 수 없으면 건너뜁니다.
+
+        Args:
+            target_features: 목표 오디오 특성
+            limit: 추천 곡 수
+            exclude_ids: 제외할 Spotify 트랙 ID
+
+        Returns:
+            추천 곡 목록 (카탈로그가 없으면 빈 목록)
+        """
+        if not self.catalog.available:
+            return []
+
+        matches = self.catalog.search(
+            target_features,
+            k=limit * 2,  # 곡 정보를 채우지 못하는 곡을 대비해 더 많이 가져오기
+            exclude_ids=exclude_ids or (),
+            max_instrumentalness=0.5,
+        )
+
+        missing_ids = [track["id"] for track in matches if not track.get("name")]
+        track_infos = {}
+        if missing_ids and self.sp:
+            track_infos = self.get_tracks_info(missing_ids)
+
+        tracks = []
+        for track in matches:
+            if not track.get("name"):
+                info = track_infos.get(track["id"])
+                if not info:
+                    continue
+                track.update(info)
+            tracks.append(track)
+            if len(tracks) >= limit:
+                break
+
+        print(f"카탈로그 기반 추천 {len(tracks)}개")
+        return tracks
+
     def calculate_similarity(
         self, target_features: Dict[str, Any], track_features: Dict[str, Any]
     ) -> float:
@@ -371,28 +461,16 @@ class SpotifyService:
             print("  Missing features, returning default 50%")
             return 50.0
 
-        # 더 많은 특성들을 비교하여 정확도 향상
+        # 더 많은 특성들을 비교하여 정확도 향상 (카탈로그 검색과 같은 가중치)
+        # 값이 없는(None) 특성은 비교하지 않음 (카탈로그 검색과 같은 기준)
         features_to_compare = [
-            "danceability",
-            "energy",
-            "valence",
-            "tempo",
-            "acousticness",
-            "instrumentalness",
-            "speechiness",
-            "liveness",
+            feature
+            for feature in SIMILARITY_WEIGHTS
+            if target_features.get(feature) is not None
+            and track_features.get(feature) is not None
         ]
         similarities = []
-        weights = {
-            "danceability": 0.25,  # 가장 중요한 특성
-            "energy": 0.25,  # 가장 중요한 특성
-            "valence": 0.20,  # 감정적 유사성
-            "tempo": 0.15,  # 리듬적 유사성
-            "acousticness": 0.05,  # 음향적 특성
-            "instrumentalness": 0.05,  # 악기 vs 가사
-            "speechiness": 0.03,  # 말하기 vs 노래
-            "liveness": 0.02,  # 라이브 vs 녹음
-        }
+        weights = SIMILARITY_WEIGHTS
 
         for feature in features_to_compare:
             if feature in target_features and feature in track_features:
@@ -439,11 +517,14 @@ class SpotifyService:
             return 50.0
 
     def _generate_search_queries_from_features(
-        self, target_features: Dict[str, Any]
+        self, target_features: Dict[str, Any], rng: Optional[random.Random] = None
     ) -> List[str]:
         """
         분석된 오디오 특징을 기반으로 맞춤형 검색어 생성 (개선된 버전)
+
+        rng를 주면 그 난수 생성기로 검색어를 고릅니다 (시드가 같으면 같은 검색어).
         """
+        rng = rng or random.Random()
         search_queries = []
 
         # Danceability 기반 장르 선택
@@ -539,10 +620,10 @@ class SpotifyService:
 
         # 검색어 조합 생성 (더 다양하고 정확한 검색어)
         for _ in range(8):  # 더 많은 검색어 생성
-            genre = random.choice(dance_genres)
-            mood = random.choice(energy_moods + valence_moods)
-            tempo_desc = random.choice(tempo_descriptors)
-            acoustic_desc = random.choice(acoustic_descriptors)
+            genre = rng.choice(dance_genres)
+            mood = rng.choice(energy_moods + valence_moods)
+            tempo_desc = rng.choice(tempo_descriptors)
+            acoustic_desc = rng.choice(acoustic_descriptors)
 
             patterns = [
                 f"{genre} {mood}",
@@ -554,7 +635,7 @@ class SpotifyService:
                 f"{genre} {acoustic_desc}",
                 f"{mood} {acoustic_desc} {genre}",
             ]
-            search_queries.append(random.choice(patterns))
+            search_queries.append(rng.choice(patterns))
 
         return search_queries
 
@@ -595,11 +676,13 @@ class SpotifyService:
 
             print(f"Spotify SDK 추천 성공: {len(recommendations['tracks'])}개 트랙")
 
+            # 후보 곡의 Audio Features를 한 번에 가져오기 (가사 유무 확인을 위해)
+            features_by_id = self.get_audio_features_batch(recommendations["tracks"])
+
             tracks = []
             for track in recommendations["tracks"]:
-                # Audio Features 가져오기 (가사 유무 확인을 위해)
                 try:
-                    audio_features = self.get_audio_features(track["id"])
+                    audio_features = features_by_id.get(track["id"], {})
                     # instrumentalness가 0.5 이상이면 가사 없는 곡으로 판단하여 제외
                     if (
                         audio_features
@@ -670,9 +753,61 @@ class SpotifyService:
             print(f"Spotify 트랙 정보 가져오기 오류: {e}")
             return {}
 
-    def get_artist_info(self, artist_id: str) -> Dict[str, Any]:
+    def get_tracks_info(
+        self, track_ids: List[str], raise_errors: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 트랙 정보를 한 번에 가져오기 (50개씩 묶어 호출)
+
+        Args:
+            track_ids: Spotify 트랙 ID 목록
+            raise_errors: True면 호출이 실패했을 때 그때까지의 결과 대신 예외 발생
+                (카탈로그 수집처럼 없는 트랙과 실패를 구분해야 하는 경우)
+
+        Returns:
+            트랙 ID별 트랙 정보 (get_track_info 형식, 가져오지 못한 트랙은 빠짐)
+
+        Raises:
+            spotipy.SpotifyException: raise_errors가 True이고 Spotify 호출이 실패한 경우
+        """
+        if not self.sp:
+            raise Exception("Spotify API 설정이 필요합니다.")
+
+        track_ids = list(dict.fromkeys(track_ids))
+        infos = {}
+        try:
+            for start in range(0, len(track_ids), 50):
+                result = self.sp.tracks(track_ids[start : start + 50])
+                for track in result.get("tracks") or []:
+                    if track and track.get("id"):
+                        infos[track["id"]] = self._format_track(track)
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Spotify 트랙 정보 묶음 가져오기 오류: {e}")
+        return infos
+
+    @staticmethod
+    def _format_track(track: Dict[str, Any]) -> Dict[str, Any]:
+        """Spotify 트랙 객체를 API 응답의 트랙 정보 형식으로 변환"""
+        return {
+            "id": track["id"],
+            "name": track["name"],
+            "artists": [artist["name"] for artist in track["artists"]],
+            "album": {
+                "name": track["album"]["name"],
+                "images": track["album"]["images"],
+            },
+            "preview_url": track.get("preview_url"),
+            "external_urls": track.get("external_urls", {}),
+            "popularity": track.get("popularity", 0),
+        }
+
+    def get_artist_info(
+        self, artist_id: str, raise_errors: bool = False
+    ) -> Dict[str, Any]:
         """
-        아티스트 정보 가져오기
+        아티스트 정보 가져오기 (raise_errors가 True면 실패 시 예외 발생)
         """
         if not self.sp:
             raise Exception("Spotify API 설정이 필요합니다.")
@@ -689,43 +824,67 @@ class SpotifyService:
             }
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Spotify 아티스트 정보 가져오기 오류: {e}")
             return {}
 
     def get_playlist_tracks(
-        self, playlist_id: str, limit: int = 50
+        self, playlist_id: str, limit: Optional[int] = 50
     ) -> List[Dict[str, Any]]:
         """
-        플레이리스트 트랙 가져오기
+        플레이리스트 트랙 가져오기 (페이지를 넘겨 limit개까지, None이면 전체)
         """
         if not self.sp:
             raise Exception("Spotify API 설정이 필요합니다.")
 
+        tracks = []
+        offset = 0
         try:
-            results = self.sp.playlist_tracks(playlist_id, limit=limit)
-            tracks = []
-
-            for item in results["items"]:
-                track = item["track"]
-                track_info = {
-                    "id": track["id"],
-                    "name": track["name"],
-                    "artists": [artist["name"] for artist in track["artists"]],
-                    "album": {
-                        "name": track["album"]["name"],
-                        "images": track["album"]["images"],
-                    },
-                    "preview_url": track["preview_url"],
-                    "external_urls": track["external_urls"],
-                    "popularity": track["popularity"],
-                }
-                tracks.append(track_info)
-
-            return tracks
+            while offset is not None and (limit is None or len(tracks) < limit):
+                page_size = 100 if limit is None else min(100, limit - len(tracks))
+                page, offset = self.get_playlist_tracks_page(
+                    playlist_id, offset=offset, limit=page_size
+                )
+                tracks.extend(page)
+            return tracks if limit is None else tracks[:limit]
 
         except Exception as e:
             print(f"Spotify 플레이리스트 트랙 가져오기 오류: {e}")
-            return []
+            return tracks
+
+    def get_playlist_tracks_page(
+        self, playlist_id: str, offset: int = 0, limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        플레이리스트 트랙 한 페이지 가져오기
+
+        삭제되었거나 로컬 파일인 항목(트랙 ID 없음)은 건너뜁니다.
+
+        Args:
+            playlist_id: Spotify 플레이리스트 ID
+            offset: 시작 위치
+            limit: 페이지 크기 (최대 100)
+
+        Returns:
+            (트랙 정보 목록, 다음 페이지 offset (마지막 페이지면 None))
+
+        Raises:
+            spotipy.SpotifyException: Spotify 호출이 실패한 경우
+        """
+        if not self.sp:
+            raise Exception("Spotify API 설정이 필요합니다.")
+
+        results = self.sp.playlist_tracks(playlist_id, limit=limit, offset=offset)
+        tracks = []
+        for item in results["items"]:
+            track = item.get("track")
+            if track and track.get("id") and track.get("type", "track") == "track":
+                tracks.append(self._format_track(track))
+        next_offset = None
+        if results.get("next") and results["items"]:
+            next_offset = offset + len(results["items"])
+        return tracks, next_offset
 
     def get_user_top_tracks(
         self, time_range: str = "medium_term", limit: int = 20
@@ -0,0 +1,268 @@
+import librosa
+import numpy as np
+from typing import Iterable, List, Optional, Tuple
+
+from app.services.audio_feature_graph import (
+    ensure_scipy_windows,
+    estimate_key_from_chroma,
+    normalize_fields,
+)
+
+
+class StreamingFeatureAccumulator:
+    """
+    PCM 블록을 차례로 받아 곡 전체의 요약 통계를 누적하는 특징 추출기
+
+    블록 경계에서 프레임이 끊기지 않도록 마지막 (n_fft - hop) 샘플을 다음
+    블록 앞에 이어 붙여 center=False STFT를 계산합니다. RMS, 스펙트럴 특징,
+    크로마, MFCC는 합계만, 온셋 엔벨로프는 템포 창 하나만큼만 보관하므로
+    메모리는 곡 길이와 상관없이 일정합니다. 템포는 창마다 비트 트래킹한 값의
+    가중 중앙값입니다. finish 전에는 진행 중인 창도 잠정 템포로 포함하므로
+    실시간 입력에서도 중간 결과를 바로 조회할 수 있습니다.
+
+    AudioFeatureGraph와 같은 이름의 요약 속성(tempo, rms_mean, chroma_mean,
+    key_mode 등)을 제공하므로 calculate_* 메서드에 graph로 그대로 넘길 수 있습니다.
+    """
+
+    n_fft = 2048
+    hop_length = 512
+    n_mfcc = 13
+
+    def __init__(self, sr: int, tempo_window: float = 20.0):
+        """
+        Args:
+            sr: 샘플링 레이트
+            tempo_window: 템포를 한 번 추정하는 온셋 엔벨로프 길이 (초)
+        """
+        ensure_scipy_windows()
+        self.sr = sr
+        self._tempo_window_frames = max(1, int(tempo_window * sr / self.hop_length))
+
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._samples = 0
+        self._frames = 0
+        self._tuning: Optional[float] = None
+        self._prev_log_mel: Optional[np.ndarray] = None
+
+        # 프레임 합계
+        self._rms_sum = 0.0
+        self._zcr_sum = 0.0
+        self._centroid_sum = 0.0
+        self._rolloff_sum = 0.0
+        self._onset_sum = 0.0
+        self._onset_frames = 0
+        self._chroma_sum = np.zeros(12)
+        self._mfcc_sum = np.zeros(self.n_mfcc)
+
+        # 템포 창 단위 결과
+        self._onset_window: List[np.ndarray] = []
+        self._onset_window_frames = 0
+        self._window_tempos: List[Tuple[float, int]] = []  # (템포, 창 프레임 수)
+        self._beat_count = 0
+        self._onset_count = 0
+        self._finished = False
+        self._tempo_cache: Optional[Tuple[int, float]] = None  # (누적 프레임 수, 템포)
+
+    def update(self, block: np.ndarray):
+        """
+        PCM 블록 하나를 누적합니다.
+
+        Args:
+            block: 모노 float32 PCM (다음 호출 전에 재사용되어도 됨)
+        """
+        self._samples += len(block)
+        x = np.concatenate([self._carry, block])
+        if len(x) < self.n_fft:
+            self._carry = x
+            return
+
+        n_frames = 1 + (len(x) - self.n_fft) // self.hop_length
+        used = (n_frames - 1) * self.hop_length + self.n_fft
+        frames_input = x[:used]
+        self._carry = x[n_frames * self.hop_length :].copy()
+        self._accumulate(frames_input, n_frames)
+
+    def finish(self):
+        """남은 온셋 엔벨로프로 마지막 템포 창을 처리합니다."""
+        if not self._finished:
+            self._flush_tempo_window(final=True)
+            self._finished = True
+
+    def _accumulate(self, x: np.ndarray, n_frames: int):
+        magnitude = np.abs(
+            librosa.stft(x, n_fft=self.n_fft, hop_length=self.hop_length, center=False)
+        )
+        power = magnitude**2
+
+        rms = librosa.feature.rms(
+            y=x, frame_length=self.n_fft, hop_length=self.hop_length, center=False
+        )[0]
+        zcr = librosa.feature.zero_crossing_rate(
+            x, frame_length=self.n_fft, hop_length=self.hop_length, center=False
+        )[0]
+        centroid = librosa.feature.spectral_centroid(S=magnitude, sr=self.sr)[0]
+        rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=self.sr)[0]
+
+        if self._tuning is None:
+            # 블록마다 튜닝이 달라지지 않도록 첫 블록에서 한 번만 추정
+            self._tuning = librosa.estimate_tuning(S=power, sr=self.sr)
+        chroma = librosa.feature.chroma_stft(
+            S=power, sr=self.sr, n_fft=self.n_fft, tuning=self._tuning
+        )
+
+        # 블록마다 기준이 달라지는 top_db 클리핑은 사용하지 않음
+        log_mel = librosa.power_to_db(
+            librosa.feature.melspectrogram(S=power, sr=self.sr), top_db=None
+        )
+        mfcc = librosa.feature.mfcc(S=log_mel, sr=self.sr, n_mfcc=self.n_mfcc)
+
+        # 온셋 강도: 이전 블록의 마지막 멜 프레임과 이어서 1프레임 차분
+        previous = log_mel[:, :1] if self._prev_log_mel is None else self._prev_log_mel
+        onset = np.maximum(
+            0.0, np.diff(np.concatenate([previous, log_mel], axis=1), axis=1)
+        ).mean(axis=0)
+        self._prev_log_mel = log_mel[:, -1:].copy()
+
+        self._frames += n_frames
+        self._rms_sum += float(rms.sum())
+        self._zcr_sum += float(zcr.sum())
+        self._centroid_sum += float(centroid.sum())
+        self._rolloff_sum += float(rolloff.sum())
+        self._chroma_sum += chroma.sum(axis=1)
+        self._mfcc_sum += mfcc.sum(axis=1)
+        self._onset_sum += float(onset.sum())
+        self._onset_frames += len(onset)
+
+        self._onset_window.append(onset)
+        self._onset_window_frames += len(onset)
+        if self._onset_window_frames >= self._tempo_window_frames:
+            self._flush_tempo_window()
+
+    def _flush_tempo_window(self, final: bool = False):
+        if not self._onset_window:
+            return
+        envelope = np.concatenate(self._onset_window)
+        self._onset_window = []
+        self._onset_window_frames = 0
+
+        # 너무 짧은 마지막 창은 앞 창들이 있으면 템포 추정에서 제외
+        if (
+            final
+            and self._window_tempos
+            and len(envelope) < self._tempo_window_frames // 4
+        ):
+            return
+
+        tempo, beats = self._beat_track(envelope)
+        onsets = librosa.onset.onset_detect(
+            onset_envelope=envelope, sr=self.sr, hop_length=self.hop_length
+        )
+        self._window_tempos.append((tempo, len(envelope)))
+        self._beat_count += len(beats)
+        self._onset_count += len(onsets)
+
+    def _beat_track(self, envelope: np.ndarray) -> Tuple[float, np.ndarray]:
+        tempo, beats = librosa.beat.beat_track(
+            onset_envelope=envelope, sr=self.sr, hop_length=self.hop_length
+        )
+        return float(np.atleast_1d(tempo)[0]), beats
+
+    # ---- 요약 통계 (AudioFeatureGraph와 같은 이름) ----
+
+    def _mean(self, total: float) -> float:
+        return total / self._frames if self._frames else 0.0
+
+    @property
+    def duration(self) -> float:
+        """누적된 오디오 길이 (초)"""
+        return self._samples / self.sr
+
+    @property
+    def segment_count(self) -> int:
+        return 1
+
+    @property
+    def tempo(self) -> float:
+        """창별 템포의 가중 중앙값 (BPM, 새 프레임이 누적될 때만 다시 계산)"""
+        if self._tempo_cache is None or self._tempo_cache[0] != self._frames:
+            self._tempo_cache = (self._frames, self._weighted_median_tempo())
+        return self._tempo_cache[1]
+
+    def _weighted_median_tempo(self) -> float:
+        tempos = list(self._window_tempos)
+        # finish 전: 진행 중인 창이 충분히 길면 잠정 템포로 포함
+        if (
+            not self._finished
+            and self._onset_window_frames >= self._tempo_window_frames // 4
+        ):
+            envelope = np.concatenate(self._onset_window)
+            tempos.append((self._beat_track(envelope)[0], len(envelope)))
+        if not tempos:
+            return 120.0
+        tempos.sort()
+        half = sum(weight for _, weight in tempos) / 2
+        running = 0
+        for tempo, weight in tempos:
+            running += weight
+            if running >= half:
+                return tempo
+        return tempos[-1][0]
+
+    @property
+    def rms_mean(self) -> float:
+        return self._mean(self._rms_sum)
+
+    @property
+    def zero_crossing_rate_mean(self) -> float:
+        return self._mean(self._zcr_sum)
+
+    @property
+    def spectral_centroid_mean(self) -> float:
+        return self._mean(self._centroid_sum)
+
+    @property
+    def spectral_rolloff_mean(self) -> float:
+        return self._mean(self._rolloff_sum)
+
+    @property
+    def onset_strength_mean(self) -> float:
+        return self._onset_sum / self._onset_frames if self._onset_frames else 0.0
+
+    @property
+    def chroma_mean(self) -> np.ndarray:
+        return self._chroma_sum / self._frames if self._frames else np.zeros(12)
+
+    @property
+    def mfcc_mean(self) -> np.ndarray:
+        return self._mfcc_sum / self._frames if self._frames else np.zeros(self.n_mfcc)
+
+    @property
+    def key_mode(self) -> Tuple[int, int, float]:
+        """평균 크로마에서 추정한 (key, mode, correlation)"""
+        return estimate_key_from_chroma(self.chroma_mean)
+
+    def summarize(self, fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        누적된 통계로 특징 딕셔너리를 만듭니다 (tonnetz는 지원하지 않음).
+
+        Args:
+            fields: 포함할 필드 마스크 (None이면 전체)
+
+        Returns:
+            요청된 필드만 포함한 특징 딕셔너리
+        """
+        fields = normalize_fields(fields)
+        self.finish()
+        features = {
+            "tempo": self.tempo,
+            "beats": self._beat_count,
+            "chroma_mean": self.chroma_mean.tolist(),
+            "mfcc_mean": self.mfcc_mean.tolist(),
+            "spectral_centroid_mean": self.spectral_centroid_mean,
+            "spectral_rolloff_mean": self.spectral_rolloff_mean,
+            "zero_crossing_rate_mean": self.zero_crossing_rate_mean,
+            "onset_count": self._onset_count,
+            "rms_mean": self.rms_mean,
+            "duration": self.duration,
+        }
+        return {key: value for key, value in features.items() if key in fields}
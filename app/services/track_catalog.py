@@ -0,0 +1,775 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import csv
+import json
+import os
+import threading
+import time
+import uuid
+import numpy as np
+
+from app.core.config import settings
+from app.services.catalog_shards import CatalogShardPool
+from app.services.ivf_index import build_ivf_index, IVFIndex
+from app.services.similarity import SIMILARITY_WEIGHTS
+
+CATALOG_FORMAT_VERSION = 1
+
+# SpotifyService.calculate_similarity와 같은 특성 (저장 순서)
+CATALOG_FEATURES = tuple(SIMILARITY_WEIGHTS)
+
+# 특성 차이를 0-1 범위로 맞추는 배율 (템포는 0-200 BPM 범위 가정)
+_FEATURE_SCALE = np.array(
+    [1.0 / 200.0 if name == "tempo" else 1.0 for name in CATALOG_FEATURES],
+    dtype=np.float32,
+)
+
+_FULL_WEIGHTS = np.array(
+    [SIMILARITY_WEIGHTS[name] for name in CATALOG_FEATURES], dtype=np.float32
+)
+# 검색 공간 배율 (특성 * 배율 * 가중치)
+_VECTOR_SCALE = _FEATURE_SCALE * _FULL_WEIGHTS
+_INSTRUMENTAL_ROW = CATALOG_FEATURES.index("instrumentalness")
+
+# 한 번에 점수를 계산하는 곡 수 (임시 배열이 CPU 캐시에 머무는 크기)
+_SEARCH_CHUNK = 1 << 16
+
+# CSV 열 이름 후보 (Spotify 데이터셋마다 이름이 다름)
+_CSV_ID_COLUMNS = ("id", "track_id", "spotify_id")
+_CSV_NAME_COLUMNS = ("name", "track_name", "title")
+_CSV_ARTIST_COLUMNS = ("artists", "artist", "artist_name")
+_CSV_ALBUM_COLUMNS = ("album", "album_name")
+
+# 증분 추가(delta_* 파일 쓰기)는 한 번에 하나씩
+_delta_write_lock = threading.Lock()
+
+_DELTA_FILES = (
+    "delta.json",
+    "delta_features.f32",
+    "delta_ids.bin",
+    "delta_offsets.u64",
+    "delta_tracks.jsonl",
+)
+
+
+def _parse_row(
+    track_id: Optional[str], features: Dict[str, Any]
+) -> Optional[Tuple[bytes, np.ndarray]]:
+    """(인코딩된 트랙 ID, 특성 벡터), 특성이 빠졌거나 ID가 잘못되면 None"""
+    values = [features.get(name) for name in CATALOG_FEATURES]
+    if not track_id or any(value in (None, "") for value in values):
+        return None
+    try:
+        encoded_id = track_id.encode("ascii")
+        vector = np.array([float(value) for value in values], dtype=np.float32)
+    except (TypeError, ValueError, UnicodeEncodeError):
+        return None
+    if len(encoded_id) > 22 or not np.isfinite(vector).all():
+        return None
+    return encoded_id, vector
+
+
+class TrackCatalog:
+    """
+    로컬 곡 카탈로그에서 목표 특성과 가까운 곡을 찾는 검색기
+
+    특성은 (특성 수, 곡 수) float32 배열로 특성마다 연속으로 저장되어 있고,
+    np.load(mmap_mode="r")로 열어 여러 프로세스가 페이지 캐시를 공유합니다.
+    곡 정보는 tracks.jsonl에 있고, 결과로 나갈 곡의 줄만 읽습니다. 카탈로그가
+    다시 빌드되면 다음 검색에서 새 파일을 엽니다.
+
+    빌드 후 추가된 곡(add_tracks)은 delta_* 파일에 이어 쓰이고 모든 프로세스의
+    다음 검색부터 포함됩니다. compact_catalog로 본 카탈로그에 합칩니다.
+
+    검색은 두 가지입니다. nprobe가 0이거나 IVF 인덱스(build_catalog_index)가
+    없으면 calculate_similarity와 같은 가중치로 모든 곡의 점수를 NumPy로 계산하는
+    정확한 검색이고, 인덱스가 있으면 가까운 nprobe개 역리스트의 곡만 같은
+    점수로 계산하는 근사 검색입니다. 정확한 검색은 shard_pool이 있으면 곡을
+    샤드로 나눠 여러 코어에서 동시에 계산한 뒤 합칩니다.
+    """
+
+    def __init__(
+        self,
+        catalog_dir: str,
+        nprobe: int = 32,
+        shard_pool: Optional[CatalogShardPool] = None,
+    ):
+        """
+        Args:
+            catalog_dir: build_catalog가 만든 카탈로그 디렉터리
+            nprobe: IVF 검색에서 살펴볼 역리스트 수 (0이면 항상 정확한 검색)
+            shard_pool: 정확한 검색을 여러 프로세스로 나눠 실행하는 풀
+                (없거나 시작 전이면 현재 스레드에서 실행)
+        """
+        self.catalog_dir = catalog_dir
+        self.nprobe = nprobe
+        self.shard_pool = shard_pool
+        self.ivf = IVFIndex(os.path.join(catalog_dir, "ivf"))
+        self._lock = threading.Lock()
+        self._loaded_mtime: Optional[float] = None
+        self._meta: Dict[str, Any] = {}
+        self._features: Optional[np.ndarray] = None
+        self._ids: Optional[np.ndarray] = None
+        self._track_offsets: Optional[np.ndarray] = None
+        self._reset_delta()
+
+    def _reset_delta(self):
+        self._delta_mtime: Optional[float] = None
+        self._delta_vectors = np.empty((0, len(CATALOG_FEATURES)), dtype=np.float32)
+        self._delta_ids = np.empty(0, dtype="S22")
+        self._delta_offsets = np.zeros(1, dtype=np.uint64)
+
+    @property
+    def available(self) -> bool:
+        """검색할 곡이 있는 카탈로그가 열려 있는지 여부"""
+        return self._ensure_loaded() and self.track_count > 0
+
+    @property
+    def track_count(self) -> int:
+        """빌드된 곡과 추가된 곡 수의 합"""
+        return self._meta.get("tracks", 0) + len(self._delta_ids)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.catalog_dir, name)
+
+    def _ensure_loaded(self) -> bool:
+        meta_path = self._path("meta.json")
+        try:
+            mtime = os.path.getmtime(meta_path)
+        except OSError:
+            return False
+        if mtime != self._loaded_mtime:
+            with self._lock:
+                if mtime != self._loaded_mtime:
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        meta = json.load(f)
+                    if (
+                        meta.get("version") != CATALOG_FORMAT_VERSION
+                        or tuple(meta.get("features", ())) != CATALOG_FEATURES
+                    ):
+                        print(f"곡 카탈로그 형식이 다릅니다: {meta.get('version')}")
+                        return False
+
+                    def load(name: str) -> np.ndarray:
+                        return np.load(self._path(name), mmap_mode="r")
+
+                    self._features = load("features.npy")
+                    self._ids = load("ids.npy")
+                    self._track_offsets = load("track_offsets.npy")
+                    self._meta = meta
+                    self._reset_delta()
+                    self._loaded_mtime = mtime
+                    print(f"곡 카탈로그 로드: 곡 {meta['tracks']}개")
+        self._refresh_delta()
+        return True
+
+    def _read_delta_state(self) -> Dict[str, Any]:
+        try:
+            with open(self._path("delta.json"), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {"tracks": 0}
+        # 다시 빌드(compact)되기 전의 추가 곡은 무시
+        if state.get("build_id") != self._meta.get("build_id"):
+            return {"tracks": 0}
+        return state
+
+    def _refresh_delta(self):
+        try:
+            mtime = os.path.getmtime(self._path("delta.json"))
+        except OSError:
+            mtime = None
+        if mtime != self._delta_mtime:
+            with self._lock:
+                if mtime != self._delta_mtime:
+                    count = self._read_delta_state()["tracks"]
+                    dims = len(CATALOG_FEATURES)
+                    # delta.json에 기록된 곡 수까지만 읽음 (쓰는 중인 뒤쪽은 제외)
+                    if count:
+                        vectors = np.fromfile(
+                            self._path("delta_features.f32"),
+                            dtype=np.float32,
+                            count=count * dims,
+                        ).reshape(count, dims)
+                        ids = np.fromfile(
+                            self._path("delta_ids.bin"), dtype="S22", count=count
+                        )
+                        offsets = np.fromfile(
+                            self._path("delta_offsets.u64"),
+                            dtype=np.uint64,
+                            count=count + 1,
+                        )
+                    else:
+                        vectors = np.empty((0, dims), dtype=np.float32)
+                        ids = np.empty(0, dtype="S22")
+                        offsets = np.zeros(1, dtype=np.uint64)
+                    self._delta_vectors = vectors
+                    self._delta_ids = ids
+                    self._delta_offsets = offsets
+                    self._delta_mtime = mtime
+        self._sync_ivf()
+
+    def _sync_ivf(self) -> bool:
+        """IVF 인덱스를 열고, 아직 배정하지 않은 추가 곡을 역리스트에 배정합니다."""
+        if not self.ivf.load():
+            return False
+        if self.ivf.meta.get("source_build_id") != self._meta.get("build_id"):
+            return False
+        with self._lock:
+            added = self.ivf.added_count
+            if added < len(self._delta_vectors):
+                base_count = self._meta["tracks"]
+                self.ivf.add(
+                    np.arange(
+                        base_count + added, base_count + len(self._delta_vectors)
+                    ),
+                    self._delta_vectors[added:] * _VECTOR_SCALE,
+                )
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """카탈로그 크기, 빌드 정보, IVF 인덱스 상태"""
+        if not self._ensure_loaded():
+            return {"loaded": False, "catalog_dir": self.catalog_dir}
+        return {
+            "loaded": True,
+            "catalog_dir": self.catalog_dir,
+            "build_id": self._meta["build_id"],
+            "built_at": self._meta["built_at"],
+            "tracks": self.track_count,
+            "added_tracks": len(self._delta_ids),
+            "features": list(CATALOG_FEATURES),
+            "nprobe": self.nprobe,
+            "shards": self.shard_pool.stats() if self.shard_pool else None,
+            "ivf": {**self.ivf.stats(), "in_use": self._sync_ivf()},
+        }
+
+    def search(
+        self,
+        target_features: Dict[str, Any],
+        k: int = 10,
+        exclude_ids: Sequence[str] = (),
+        max_instrumentalness: Optional[float] = None,
+        nprobe: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        목표 특성과 가장 비슷한 곡 k개를 찾습니다.
+
+        목표에 없는 특성은 calculate_similarity처럼 가중치 합에서 빠집니다.
+
+        Args:
+            target_features: 목표 오디오 특성 (Spotify audio_features 형식)
+            k: 반환할 곡 수
+            exclude_ids: 결과에서 뺄 Spotify 트랙 ID (원곡 등)
+            max_instrumentalness: 이보다 instrumentalness가 높은 곡은 제외
+            nprobe: IVF 검색 역리스트 수 (기본값은 생성 시 설정, 0이면 정확한 검색)
+
+        Returns:
+            유사도 순 곡 목록 (곡 정보, "id", "similarity"(0-100), "audio_features")
+        """
+        if k <= 0 or not self._ensure_loaded() or self.track_count == 0:
+            return []
+
+        used = np.array(
+            [
+                row
+                for row, name in enumerate(CATALOG_FEATURES)
+                if target_features.get(name) is not None
+            ],
+            dtype=np.int64,
+        )
+        if not len(used):
+            return []
+        target = np.zeros(len(CATALOG_FEATURES), dtype=np.float32)
+        for row in used:
+            target[row] = float(target_features[CATALOG_FEATURES[row]])
+        # 특성 차이에 배율과 가중치를 곱한 공간: w * min(|x - t| * scale, 1)
+        # = min(|x * scale * w - t * scale * w|, w)
+        query = target * _VECTOR_SCALE
+        caps = _FULL_WEIGHTS[used]
+        total_weight = float(caps.sum())
+        max_value = None
+        if max_instrumentalness is not None:
+            max_value = (
+                _INSTRUMENTAL_ROW,
+                max_instrumentalness * _VECTOR_SCALE[_INSTRUMENTAL_ROW],
+            )
+
+        # 제외할 곡만큼 더 뽑아 둠
+        wanted = min(k + len(exclude_ids), self.track_count)
+        nprobe = self.nprobe if nprobe is None else nprobe
+        if nprobe > 0 and self._sync_ivf():
+            rows, scores = self.ivf.search(
+                query, used, caps, wanted, nprobe, max_values=max_value
+            )
+        else:
+            rows, scores = self._exact_search(query, used, caps, wanted, max_value)
+
+        exclude = set(exclude_ids)
+        results = []
+        for row, score in zip(rows, scores):
+            if not np.isfinite(score):
+                break
+            row = int(row)
+            track_id = self._row_id(row)
+            if track_id in exclude:
+                continue
+            track = self._read_track(row)
+            track["id"] = track_id
+            track["similarity"] = float((1.0 - score / total_weight) * 100.0)
+            track["audio_features"] = dict(
+                zip(CATALOG_FEATURES, self._row_vector(row).tolist())
+            )
+            results.append(track)
+            if len(results) >= k:
+                break
+        return results
+
+    def _exact_search(
+        self,
+        query: np.ndarray,
+        used: np.ndarray,
+        caps: np.ndarray,
+        wanted: int,
+        max_value: Optional[Tuple[int, float]],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """모든 곡의 점수를 계산해 낮은 순으로 wanted개를 찾습니다."""
+        base_count = self._features.shape[1]
+        parts = None
+        if self.shard_pool is not None:
+            # 샤드별 상위 wanted개를 워커 프로세스에서 동시에 계산
+            parts = self.shard_pool.scan(
+                self._meta["build_id"], base_count, query, used, caps, wanted, max_value
+            )
+        if parts is None:
+            parts = [
+                self.score_range(0, base_count, query, used, caps, wanted, max_value)
+            ]
+        best_rows = [rows for rows, _ in parts]
+        best_scores = [scores for _, scores in parts]
+
+        if len(self._delta_vectors):
+            vectors = self._delta_vectors * _VECTOR_SCALE
+            delta_penalty = np.minimum(
+                np.abs(vectors[:, used] - query[used]), caps
+            ).sum(axis=1)
+            if max_value is not None:
+                dim, limit = max_value
+                delta_penalty[vectors[:, dim] > limit] = np.inf
+            best_scores.append(delta_penalty.astype(np.float32))
+            best_rows.append(np.arange(len(vectors)) + base_count)
+
+        scores = np.concatenate(best_scores)
+        rows = np.concatenate(best_rows)
+        order = np.argsort(scores, kind="stable")[:wanted]
+        return rows[order], scores[order]
+
+    def score_range(
+        self,
+        start: int,
+        stop: int,
+        query: np.ndarray,
+        used: np.ndarray,
+        caps: np.ndarray,
+        wanted: int,
+        max_value: Optional[Tuple[int, float]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        빌드된 곡 [start, stop) 범위의 점수를 계산해 낮은 순 후보를 찾습니다.
+
+        Args:
+            start: 시작 행 번호
+            stop: 끝 행 번호 (포함하지 않음)
+            query: 검색 공간의 질의 벡터 (특성 * 배율 * 가중치)
+            used: 비교할 특성 번호
+            caps: 특성별 가중치 (거리 상한)
+            wanted: 찾을 곡 수
+            max_value: (특성 번호, 검색 공간 최댓값) 이 값보다 큰 곡은 제외
+
+        Returns:
+            (행 번호, 점수) 범위 안의 점수 하위 wanted개 (정렬되지 않음)
+        """
+        features = self._features
+        scaled_weights = _VECTOR_SCALE[used]
+        target = query[used] / scaled_weights
+
+        best_scores: List[np.ndarray] = []
+        best_rows: List[np.ndarray] = []
+        penalty = np.empty(max(1, min(_SEARCH_CHUNK, stop - start)), dtype=np.float32)
+        diff = np.empty_like(penalty)
+        for chunk_start in range(start, stop, _SEARCH_CHUNK):
+            chunk_stop = min(chunk_start + _SEARCH_CHUNK, stop)
+            size = chunk_stop - chunk_start
+            chunk_penalty = penalty[:size]
+            chunk_diff = diff[:size]
+            chunk_penalty.fill(0.0)
+            for position, row in enumerate(used):
+                # min(|x - t| * scale * w, w)를 누적 (유사도 = 1 - 누적 / 가중치 합)
+                np.subtract(
+                    features[row, chunk_start:chunk_stop],
+                    target[position],
+                    out=chunk_diff,
+                )
+                np.abs(chunk_diff, out=chunk_diff)
+                chunk_diff *= scaled_weights[position]
+                np.minimum(chunk_diff, caps[position], out=chunk_diff)
+                chunk_penalty += chunk_diff
+            if max_value is not None:
+                dim, limit = max_value
+                chunk_penalty[
+                    features[dim, chunk_start:chunk_stop] * _VECTOR_SCALE[dim] > limit
+                ] = np.inf
+
+            take = min(wanted, size)
+            rows = np.argpartition(chunk_penalty, take - 1)[:take]
+            best_scores.append(chunk_penalty[rows].copy())
+            best_rows.append(rows + chunk_start)
+
+        if not best_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(best_rows), np.concatenate(best_scores)
+
+    def _row_id(self, row: int) -> str:
+        base_count = self._meta["tracks"]
+        if row < base_count:
+            return self._ids[row].decode("ascii")
+        return self._delta_ids[row - base_count].decode("ascii")
+
+    def _row_vector(self, row: int) -> np.ndarray:
+        base_count = self._meta["tracks"]
+        if row < base_count:
+            return np.asarray(self._features[:, row], dtype=np.float32)
+        return self._delta_vectors[row - base_count]
+
+    def _read_track(self, row: int) -> Dict[str, Any]:
+        base_count = self._meta["tracks"]
+        if row < base_count:
+            name, offsets = "tracks.jsonl", self._track_offsets
+        else:
+            name, offsets = "delta_tracks.jsonl", self._delta_offsets
+            row -= base_count
+        start, end = int(offsets[row]), int(offsets[row + 1])
+        with open(self._path(name), "rb") as f:
+            f.seek(start)
+            return json.loads(f.read(end - start))
+
+    def iter_rows(self) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """빌드된 곡과 추가된 곡을 (트랙 ID, 특성, 곡 정보)로 읽습니다 (compact용)."""
+        if not self._ensure_loaded():
+            return
+        base_count = self._meta["tracks"]
+        ids, offsets = self._delta_ids, self._delta_offsets
+        for name, count, id_of in (
+            ("tracks.jsonl", base_count, lambda row: self._ids[row]),
+            ("delta_tracks.jsonl", len(ids), lambda row: ids[row]),
+        ):
+            if not count:
+                continue
+            with open(self._path(name), "rb") as f:
+                for row in range(count):
+                    metadata = json.loads(f.readline())
+                    global_row = row if name == "tracks.jsonl" else base_count + row
+                    yield (
+                        id_of(row).decode("ascii"),
+                        dict(
+                            zip(
+                                CATALOG_FEATURES,
+                                self._row_vector(global_row).tolist(),
+                            )
+                        ),
+                        metadata,
+                    )
+
+    def add_tracks(
+        self, rows: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]
+    ) -> int:
+        """
+        빌드된 카탈로그에 곡을 추가합니다 (증분 추가, 다시 빌드하지 않음).
+
+        이미 있는 트랙 ID와 특성이 빠진 곡은 건너뜁니다. 추가된 곡은 IVF
+        인덱스가 있으면 가장 가까운 역리스트에 배정됩니다. 카탈로그가 없으면
+        build_catalog로 새로 만듭니다.
+
+        Args:
+            rows: (Spotify 트랙 ID, 특성 딕셔너리, 곡 정보 딕셔너리) 목록
+
+        Returns:
+            추가한 곡 수
+        """
+        if not self._ensure_loaded():
+            return build_catalog(self.catalog_dir, rows)["tracks"]
+
+        with _delta_write_lock:
+            self._refresh_delta()
+            count = len(self._delta_ids)
+            known = set(self._delta_ids.tolist())
+            new_ids: List[bytes] = []
+            vectors: List[np.ndarray] = []
+            lines: List[bytes] = []
+            for track_id, features, metadata in rows:
+                parsed = _parse_row(track_id, features)
+                if parsed is None or parsed[0] in known:
+                    continue
+                encoded_id, vector = parsed
+                known.add(encoded_id)
+                new_ids.append(encoded_id)
+                vectors.append(vector)
+                lines.append(
+                    (json.dumps(metadata, ensure_ascii=False) + "\n").encode("utf-8")
+                )
+            if not new_ids:
+                return 0
+
+            # 빌드된 카탈로그에 이미 있는 곡 제외
+            new_id_array = np.array(new_ids, dtype="S22")
+            fresh = ~np.isin(new_id_array, self._ids)
+            if not fresh.any():
+                return 0
+            new_id_array = new_id_array[fresh]
+            vector_array = np.stack(vectors)[fresh]
+            lines = [line for line, keep in zip(lines, fresh) if keep]
+
+            # 기록된 곡 수 뒤에 남은(중단된 추가의) 내용을 잘라낸 뒤 이어 씀
+            dims = len(CATALOG_FEATURES)
+            offsets = self._delta_offsets
+            sizes = {
+                "delta_features.f32": count * dims * 4,
+                "delta_ids.bin": count * 22,
+                "delta_offsets.u64": (count + 1) * 8,
+                "delta_tracks.jsonl": int(offsets[-1]),
+            }
+            for name, size in sizes.items():
+                with open(self._path(name), "ab") as f:
+                    f.truncate(size)
+            if count == 0:
+                with open(self._path("delta_offsets.u64"), "wb") as f:
+                    np.zeros(1, dtype=np.uint64).tofile(f)
+
+            line_offsets = int(offsets[-1]) + np.cumsum(
+                [len(line) for line in lines], dtype=np.uint64
+            )
+            with open(self._path("delta_features.f32"), "ab") as f:
+                vector_array.astype(np.float32).tofile(f)
+            with open(self._path("delta_ids.bin"), "ab") as f:
+                new_id_array.tofile(f)
+            with open(self._path("delta_tracks.jsonl"), "ab") as f:
+                f.writelines(lines)
+            with open(self._path("delta_offsets.u64"), "ab") as f:
+                line_offsets.astype(np.uint64).tofile(f)
+
+            # 내용을 먼저 쓰고 곡 수를 마지막에 기록 (읽는 쪽은 곡 수까지만 읽음)
+            state = {
+                "build_id": self._meta["build_id"],
+                "tracks": count + len(new_id_array),
+            }
+            state_tmp = self._path(f"delta.json.{uuid.uuid4().hex[:8]}.tmp")
+            with open(state_tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(state_tmp, self._path("delta.json"))
+
+        self._refresh_delta()
+        print(
+            f"곡 카탈로그에 {len(new_id_array)}곡 추가 (추가된 곡 {state['tracks']}개)"
+        )
+        return len(new_id_array)
+
+
+def build_catalog(
+    catalog_dir: str, rows: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    (트랙 ID, 오디오 특성, 곡 정보) 목록으로 카탈로그 파일을 만들고 원자적으로 교체합니다.
+
+    특성이 하나라도 없는 곡과 이미 나온 트랙 ID는 건너뜁니다. 이전 빌드에
+    add_tracks로 추가된 곡은 사라지므로, 유지하려면 compact_catalog를 사용합니다. 특성과 곡 정보는
+    임시 파일에 이어 쓰므로 메모리는 곡 수만큼의 ID 목록만 사용합니다.
+
+    Args:
+        catalog_dir: 카탈로그 디렉터리 (없으면 생성)
+        rows: (Spotify 트랙 ID, 특성 딕셔너리, 곡 정보 딕셔너리) 목록
+
+    Returns:
+        meta.json 내용
+    """
+    started = time.perf_counter()
+    os.makedirs(catalog_dir, exist_ok=True)
+    suffix = f".{uuid.uuid4().hex[:8]}.tmp"
+
+    def path(name: str) -> str:
+        return os.path.join(catalog_dir, name)
+
+    seen_ids = set()
+    ids: List[bytes] = []
+    offsets = [0]
+    skipped = 0
+    raw_path = path("features.raw" + suffix)
+    with open(raw_path, "wb") as raw, open(
+        path("tracks.jsonl" + suffix), "wb"
+    ) as tracks_file:
+        for track_id, features, metadata in rows:
+            parsed = _parse_row(track_id, features)
+            if parsed is None or parsed[0] in seen_ids:
+                skipped += 1
+                continue
+            encoded_id, vector = parsed
+            seen_ids.add(encoded_id)
+            vector.tofile(raw)
+            ids.append(encoded_id)
+            line = (json.dumps(metadata, ensure_ascii=False) + "\n").encode("utf-8")
+            tracks_file.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+    # 곡별로 이어 쓴 특성을 특성별 연속 배열로 바꿈
+    track_count = len(ids)
+    vectors = np.fromfile(raw_path, dtype=np.float32).reshape(
+        track_count, len(CATALOG_FEATURES)
+    )
+    with open(path("features.npy" + suffix), "wb") as f:
+        np.save(f, np.ascontiguousarray(vectors.T))
+    del vectors
+    os.remove(raw_path)
+    with open(path("ids.npy" + suffix), "wb") as f:
+        np.save(f, np.array(ids, dtype="S22"))
+    with open(path("track_offsets.npy" + suffix), "wb") as f:
+        np.save(f, np.array(offsets, dtype=np.uint64))
+
+    meta = {
+        "version": CATALOG_FORMAT_VERSION,
+        "build_id": uuid.uuid4().hex,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tracks": track_count,
+        "skipped": skipped,
+        "features": list(CATALOG_FEATURES),
+    }
+    with open(path("meta.json" + suffix), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    # 검색 중인 프로세스는 기존 파일을 계속 사용하고, meta.json이 바뀌면 새로 엶
+    for name in ("features.npy", "ids.npy", "track_offsets.npy", "tracks.jsonl"):
+        os.replace(path(name + suffix), path(name))
+    os.replace(path("meta.json" + suffix), path("meta.json"))
+    # 이전 빌드에 추가된 곡 파일 정리 (build_id가 달라 이미 무시되는 상태)
+    for name in _DELTA_FILES:
+        if os.path.exists(path(name)):
+            os.remove(path(name))
+    print(
+        f"곡 카탈로그 빌드 완료: 곡 {track_count}개, 건너뜀 {skipped}개 "
+        f"({time.perf_counter() - started:.1f}초)"
+    )
+    return meta
+
+
+def compact_catalog(catalog_dir: str) -> Dict[str, Any]:
+    """
+    추가된 곡을 본 카탈로그에 합쳐 다시 빌드합니다 (IVF 인덱스가 있었으면 함께 다시 빌드).
+
+    실행 중에 add_tracks로 추가되는 곡은 빠질 수 있으므로 추가를 멈춘 뒤 실행합니다.
+
+    Args:
+        catalog_dir: 카탈로그 디렉터리
+
+    Returns:
+        새 meta.json 내용
+    """
+    catalog = TrackCatalog(catalog_dir)
+    had_index = catalog.ivf.load()
+    nlist = catalog.ivf.nlist if had_index else None
+    meta = build_catalog(catalog_dir, catalog.iter_rows())
+    if had_index:
+        build_catalog_index(catalog_dir, nlist=nlist)
+    return meta
+
+
+def build_catalog_index(
+    catalog_dir: str, nlist: Optional[int] = None, sample_size: int = 100_000
+) -> Dict[str, Any]:
+    """
+    카탈로그의 빌드된 곡으로 IVF 인덱스를 만듭니다 (추가된 곡은 검색 시 배정).
+
+    Args:
+        catalog_dir: 카탈로그 디렉터리
+        nlist: 역리스트 수 (기본값: 약 2 * sqrt(곡 수))
+        sample_size: k-means 학습 표본 수
+
+    Returns:
+        IVF 인덱스 meta.json 내용
+    """
+    catalog = TrackCatalog(catalog_dir)
+    if not catalog._ensure_loaded() or catalog._meta["tracks"] == 0:
+        raise ValueError(f"곡 카탈로그가 없습니다: {catalog_dir}")
+    vectors = np.empty((catalog._meta["tracks"], len(CATALOG_FEATURES)), np.float32)
+    for start in range(0, len(vectors), _SEARCH_CHUNK):
+        chunk = catalog._features[:, start : start + _SEARCH_CHUNK]
+        vectors[start : start + chunk.shape[1]] = chunk.T * _VECTOR_SCALE
+    return build_ivf_index(
+        catalog.ivf.index_dir,
+        vectors,
+        source_build_id=catalog._meta["build_id"],
+        nlist=nlist,
+        sample_size=sample_size,
+    )
+
+
+def _first_value(row: Dict[str, str], columns: Sequence[str]) -> Optional[str]:
+    for column in columns:
+        value = row.get(column)
+        if value:
+            return value
+    return None
+
+
+def iter_csv_rows(
+    csv_path: str,
+) -> Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """
+    CSV에서 카탈로그 행을 읽습니다.
+
+    필요한 열: id(또는 track_id, spotify_id)와 CATALOG_FEATURES 특성 열.
+    곡 정보 열(name/track_name, artists, album/album_name, popularity,
+    preview_url)은 있으면 사용합니다. artists는 ";"로 구분합니다.
+    """
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            track_id = _first_value(row, _CSV_ID_COLUMNS)
+            features = {name: row.get(name) for name in CATALOG_FEATURES}
+            metadata: Dict[str, Any] = {}
+            name = _first_value(row, _CSV_NAME_COLUMNS)
+            if name:
+                artists = _first_value(row, _CSV_ARTIST_COLUMNS) or ""
+                popularity = row.get("popularity")
+                metadata = {
+                    "name": name,
+                    "artists": [
+                        artist.strip() for artist in artists.split(";") if artist
+                    ]
+                    or ["Unknown"],
+                    "album": {"name": _first_value(row, _CSV_ALBUM_COLUMNS) or ""},
+                    "popularity": int(float(popularity)) if popularity else 0,
+                    "preview_url": row.get("preview_url") or None,
+                    "external_urls": {
+                        "spotify": f"https://open.spotify.com/track/{track_id}"
+                    },
+                }
+            yield track_id, features, metadata
+
+
+def iter_feature_store_rows(
+    feature_store,
+) -> Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """
+    Audio Features 저장소(audio_features 테이블)의 모든 곡을 카탈로그 행으로 읽습니다.
+
+    테이블에는 곡 정보가 없으므로, 검색 결과로 나갈 때 Spotify에서 가져옵니다.
+    """
+    for features in feature_store.iter_all():
+        yield features["id"], features, {}
+
+
+# 공유 인스턴스 (python -m app.tools.catalog로 생성)
+catalog_shard_pool = CatalogShardPool(
+    settings.TRACK_CATALOG_DIR, shards=settings.TRACK_CATALOG_SHARDS
+)
+track_catalog = TrackCatalog(
+    settings.TRACK_CATALOG_DIR,
+    nprobe=settings.TRACK_CATALOG_NPROBE,
+    shard_pool=catalog_shard_pool,
+)
@@ -0,0 +1,581 @@
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional
+import hashlib
+import os
+import tempfile
+import time
+import zipfile
+import numpy as np
+
+from app.services.audio_decoders import (
+    AudioDecodeError,
+    DecoderUnavailableError,
+    detect_audio_format_from_header,
+)
+
+# 업로드를 읽는 조각 크기
+UPLOAD_CHUNK_SIZE = 256 * 1024  # 256KB
+
+# multipart 경계와 폼 필드에 파일 크기 외로 허용하는 바이트 수
+UPLOAD_FORM_OVERHEAD = 64 * 1024  # 64KB
+
+# zip 로컬 파일 헤더 시그니처
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class UploadTooLargeError(Exception):
+    """업로드 크기가 허용 한도를 넘은 경우"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            f"파일 크기가 너무 큽니다. 최대 {max_bytes // (1024 * 1024)}MB"
+        )
+        self.max_bytes = max_bytes
+
+
+class UploadSizeLimitMiddleware:
+    """
+    지정한 경로의 요청 본문을 받는 동안 크기를 제한하는 ASGI 미들웨어
+
+    Starlette는 multipart 본문을 라우트 실행 전에 모두 받아 임시 파일에 두므로,
+    라우트 안의 검사만으로는 한도를 넘은 업로드도 끝까지 수신됩니다.
+    Content-Length가 한도를 넘으면 본문을 읽지 않고 413으로 거절하고,
+    헤더가 없거나 실제 본문이 더 긴 경우에도 받은 바이트를 세다가 한도를
+    넘는 순간 413으로 중단합니다.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Args:
+            app: 감쌀 ASGI 앱
+            limits: 경로별 최대 본문 크기 (바이트)
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = str(UploadTooLargeError(max_bytes))
+        headers = dict(scope["headers"])
+        try:
+            content_length = int(headers.get(b"content-length", b""))
+        except ValueError:
+            content_length = None
+        if content_length is not None and content_length > max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # 폼 파싱 중에 발생하므로 FastAPI가 그대로 413 응답으로 변환
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class IngestedUpload:
+    """스트리밍으로 수집한 업로드의 해시, 크기, 디코딩 결과"""
+
+    def __init__(
+        self,
+        sha256: str,
+        size: int,
+        audio_format: str,
+        y: Optional[np.ndarray],
+        sr: int,
+        cached: Optional[dict] = None,
+        analysis_window: str = "prefix",
+        audio_path: Optional[str] = None,
+        pending_decode: bool = False,
+    ):
+        self.sha256 = sha256
+        self.size = size
+        self.audio_format = audio_format
+        self.y = y
+        self.sr = sr
+        # 캐시 조회 결과 (히트한 경우 디코딩을 생략함)
+        self.cached = cached
+        # 분석 구간 선택 방식 (prefix | segments | full)
+        self.analysis_window = analysis_window
+        # full: 분석 워커가 블록 단위로 디코딩할 임시 파일 (분석 후 close로 삭제)
+        self.audio_path = audio_path
+        # spool_upload로 받기만 하고 아직 디코딩하지 않음 (audio_path에 임시 파일)
+        self.pending_decode = pending_decode
+
+    def close(self):
+        """full 분석용(또는 디코딩 전) 임시 파일을 삭제합니다."""
+        path, self.audio_path = self.audio_path, None
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+
+async def ingest_upload(
+    file: UploadFile,
+    audio_analyzer,
+    max_bytes: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    lookup: Optional[Callable[[str], Optional[dict]]] = None,
+    analysis_window: str = "prefix",
+) -> IngestedUpload:
+    """
+    업로드를 조각 단위로 읽으면서 크기 제한, 해시, 디코딩을 동시에 처리합니다.
+
+    각 조각은 SHA-256에 반영되고 ffmpeg 스트림 디코더에 바로 전달됩니다.
+    디코더가 최대 분석 길이만큼 PCM을 채우면 나머지 조각은 해시만 계산합니다.
+    전체 바이트를 메모리에 올리지 않으므로 요청당 메모리는 조각 하나와
+    PCM 버퍼로 제한됩니다. 스트림 디코딩이 실패한 경우에만 업로드를 처음부터
+    조각 단위로 임시 파일에 복사해 디코더 레지스트리로 넘깁니다.
+
+    Args:
+        file: 업로드 파일
+        audio_analyzer: 디코더와 레지스트리를 제공하는 AudioAnalyzer
+        max_bytes: 허용되는 최대 업로드 크기
+        chunk_size: 한 번에 읽을 바이트 수
+        lookup: 업로드 해시로 캐시된 결과를 찾는 함수 (히트하면 디코딩을 중단)
+        analysis_window: "segments"이면 업로드를 임시 파일에 받은 뒤
+            곡 전체에서 구간을 seek로 디코딩. "full"이면 임시 파일 경로만
+            audio_path로 넘기고 디코딩은 분석 워커가 블록 단위로 수행
+
+    Returns:
+        IngestedUpload
+
+    Raises:
+        UploadTooLargeError: 업로드가 max_bytes를 넘은 경우
+    """
+    # 클라이언트가 알려준 크기로 먼저 거절
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    if analysis_window in ("segments", "full"):
+        return await _ingest_upload_spooled(
+            file, audio_analyzer, max_bytes, chunk_size, lookup, analysis_window
+        )
+
+    try:
+        stream = audio_analyzer.open_pcm_stream()
+    except DecoderUnavailableError as e:
+        print(f"스트림 디코더 사용 불가, 업로드 후 디코딩: {e}")
+        stream = None
+
+    hasher = hashlib.sha256()
+    size = 0
+    audio_format = "unknown"
+    feeding = stream is not None
+    started = time.perf_counter()
+
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+
+            if size == len(chunk):
+                audio_format = detect_audio_format_from_header(chunk[:16])
+                print(f"감지된 파일 형식: {audio_format}")
+
+            hasher.update(chunk)
+            if feeding:
+                # 파이프 쓰기는 블로킹이므로 스레드풀에서 실행
+                feeding = await run_in_threadpool(stream.feed, chunk)
+    except BaseException:
+        if stream is not None:
+            stream.abort()
+        raise
+
+    sha256 = hasher.hexdigest()
+    if lookup is not None:
+        cached = lookup(sha256)
+        if cached is not None:
+            if stream is not None:
+                stream.abort()
+            print(f"분석 캐시 히트: {sha256[:12]}...")
+            return IngestedUpload(
+                sha256=sha256,
+                size=size,
+                audio_format=audio_format,
+                y=None,
+                sr=audio_analyzer.sample_rate,
+                cached=cached,
+            )
+
+    y = None
+    sr = audio_analyzer.sample_rate
+    exclude = ()
+    if stream is not None:
+        try:
+            y = await run_in_threadpool(stream.finish)
+            audio_analyzer.decoder_registry.record(
+                audio_format, "ffmpeg_stream", time.perf_counter() - started, True
+            )
+            print(f"스트림 디코딩 성공: {len(y)/sr:.1f}초, 업로드 {size} bytes")
+        except AudioDecodeError as e:
+            audio_analyzer.decoder_registry.record(
+                audio_format, "ffmpeg_stream", time.perf_counter() - started, False
+            )
+            print(f"스트림 디코딩 실패, 레지스트리로 재시도: {e}")
+            # 같은 입력을 파이프 ffmpeg로 다시 시도하지 않음
+            exclude = ("ffmpeg",)
+
+    if y is None and size > 0:
+        # 드문 경로: 파이프로 해석할 수 없는 입력(moov가 뒤에 있는 mp4 등)
+        # 업로드 전체를 메모리에 올리지 않도록 조각 단위로 임시 파일에 복사
+        path = await _spool_upload(file, chunk_size)
+        try:
+            y, sr = await run_in_threadpool(
+                audio_analyzer.load_audio_file, path, exclude
+            )
+        finally:
+            os.remove(path)
+
+    return IngestedUpload(
+        sha256=sha256,
+        size=size,
+        audio_format=audio_format,
+        y=y,
+        sr=sr,
+    )
+
+
+async def _spool_upload(file: UploadFile, chunk_size: int) -> str:
+    """업로드를 처음부터 조각 단위로 임시 파일에 복사하고 경로를 반환합니다."""
+    await file.seek(0)
+    spool = tempfile.NamedTemporaryFile(suffix=".audio", delete=False)
+    try:
+        with spool:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                spool.write(chunk)
+    except BaseException:
+        os.remove(spool.name)
+        raise
+    return spool.name
+
+
+async def _ingest_upload_spooled(
+    file: UploadFile,
+    audio_analyzer,
+    max_bytes: int,
+    chunk_size: int,
+    lookup: Optional[Callable[[str], Optional[dict]]],
+    analysis_window: str,
+) -> IngestedUpload:
+    """
+    구간 샘플링/전체 분석용 업로드 수집: 해시를 계산하며 임시 파일에 기록합니다.
+
+    구간 위치를 정하려면 곡 전체 길이가 필요하고 파이프 입력은 seek할 수
+    없으므로, 스트림 디코딩 대신 파일로 받은 뒤 구간만 디코딩합니다.
+    전체 분석은 임시 파일을 워커 프로세스에 경로로 넘겨 PCM을 부모 프로세스로
+    옮기지 않습니다.
+    """
+    path, sha256, size, audio_format = await _spool_and_hash(
+        file, max_bytes, chunk_size
+    )
+    return await _finish_spooled_upload(
+        path,
+        sha256,
+        size,
+        audio_format,
+        audio_analyzer,
+        lookup,
+        analysis_window,
+    )
+
+
+async def spool_upload(
+    file: UploadFile,
+    audio_analyzer,
+    max_bytes: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    lookup: Optional[Callable[[str], Optional[dict]]] = None,
+    analysis_window: str = "prefix",
+) -> IngestedUpload:
+    """
+    업로드를 임시 파일로 받으며 해시만 계산하고 디코딩은 미룹니다.
+
+    비동기 분석에서 작업 ID를 빨리 돌려주기 위해 요청 안에서는 수신, 해시,
+    캐시 조회만 합니다. 캐시 미스이면 임시 파일을 audio_path에 남기고
+    pending_decode로 표시하며, 디코딩은 decode_spooled_upload가 분석 작업
+    안에서 합니다 (full은 지금처럼 분석 워커가 디코딩).
+
+    Args:
+        file: 업로드 파일
+        audio_analyzer: 샘플링 레이트를 제공하는 AudioAnalyzer
+        max_bytes: 허용되는 최대 업로드 크기
+        chunk_size: 한 번에 읽을 바이트 수
+        lookup: 업로드 해시로 캐시된 결과를 찾는 함수
+        analysis_window: 분석 구간 선택 방식 (prefix | segments | full)
+
+    Returns:
+        IngestedUpload (캐시 미스이면 y 없이 임시 파일 경로만 가짐)
+
+    Raises:
+        UploadTooLargeError: 업로드가 max_bytes를 넘은 경우
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    path, sha256, size, audio_format = await _spool_and_hash(
+        file, max_bytes, chunk_size
+    )
+    sr = audio_analyzer.sample_rate
+    keep = False
+    try:
+        if lookup is not None:
+            cached = lookup(sha256)
+            if cached is not None:
+                print(f"분석 캐시 히트: {sha256[:12]}...")
+                return IngestedUpload(
+                    sha256, size, audio_format, None, sr, cached, analysis_window
+                )
+        keep = size > 0
+        return IngestedUpload(
+            sha256,
+            size,
+            audio_format,
+            None,
+            sr,
+            None,
+            analysis_window,
+            audio_path=path if keep else None,
+            pending_decode=keep and analysis_window != "full",
+        )
+    finally:
+        if not keep:
+            os.remove(path)
+
+
+async def decode_spooled_upload(upload: IngestedUpload, audio_analyzer):
+    """
+    spool_upload로 받은 업로드를 분석 구간 방식에 맞게 디코딩합니다.
+
+    prefix는 앞부분, segments는 곡 전체에서 샘플링한 구간을 디코딩해 upload.y에
+    채우고 임시 파일을 삭제합니다. 디코딩할 것이 없으면 아무것도 하지 않습니다.
+
+    Args:
+        upload: spool_upload 결과
+        audio_analyzer: 디코더를 제공하는 AudioAnalyzer
+    """
+    if not upload.pending_decode:
+        return
+    try:
+        if upload.analysis_window == "segments":
+            upload.y, upload.sr = await run_in_threadpool(
+                audio_analyzer.load_audio_segments, upload.audio_path
+            )
+        else:
+            upload.y, upload.sr = await run_in_threadpool(
+                audio_analyzer.load_audio_file, upload.audio_path
+            )
+    finally:
+        upload.pending_decode = False
+        upload.close()
+
+
+async def _spool_and_hash(file: UploadFile, max_bytes: int, chunk_size: int):
+    """
+    업로드를 조각 단위로 임시 파일에 기록하며 크기 제한과 해시를 처리합니다.
+
+    Returns:
+        (임시 파일 경로, SHA-256, 크기, 감지된 형식) 튜플
+
+    Raises:
+        UploadTooLargeError: 업로드가 max_bytes를 넘은 경우
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    audio_format = "unknown"
+    spool = tempfile.NamedTemporaryFile(suffix=".audio", delete=False)
+    try:
+        with spool:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+
+                if size == len(chunk):
+                    audio_format = detect_audio_format_from_header(chunk[:16])
+                    print(f"감지된 파일 형식: {audio_format}")
+
+                hasher.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        os.remove(spool.name)
+        raise
+    return spool.name, hasher.hexdigest(), size, audio_format
+
+
+async def _finish_spooled_upload(
+    path: str,
+    sha256: str,
+    size: int,
+    audio_format: str,
+    audio_analyzer,
+    lookup: Optional[Callable[[str], Optional[dict]]],
+    analysis_window: str,
+) -> IngestedUpload:
+    """
+    임시 파일로 받은 업로드를 분석 구간 방식에 맞게 마무리합니다.
+
+    full이고 캐시 미스이면 임시 파일을 남겨 audio_path로 넘기고, 그 밖의
+    경우에는 임시 파일을 삭제합니다.
+    """
+    keep = False
+    try:
+        if analysis_window == "segments":
+            return await _decode_spooled_segments(
+                path, sha256, size, audio_format, audio_analyzer, lookup
+            )
+
+        sr = audio_analyzer.sample_rate
+        if lookup is not None:
+            cached = lookup(sha256)
+            if cached is not None:
+                print(f"분석 캐시 히트: {sha256[:12]}...")
+                return IngestedUpload(
+                    sha256, size, audio_format, None, sr, cached, analysis_window
+                )
+        keep = size > 0
+        return IngestedUpload(
+            sha256,
+            size,
+            audio_format,
+            None,
+            sr,
+            None,
+            analysis_window,
+            audio_path=path if keep else None,
+        )
+    finally:
+        if not keep:
+            os.remove(path)
+
+
+async def _decode_spooled_segments(
+    path: str,
+    sha256: str,
+    size: int,
+    audio_format: str,
+    audio_analyzer,
+    lookup: Optional[Callable[[str], Optional[dict]]],
+) -> IngestedUpload:
+    """임시 파일로 받은 업로드를 캐시 조회 후 구간 샘플링으로 디코딩합니다."""
+    sr = audio_analyzer.sample_rate
+    if lookup is not None:
+        cached = lookup(sha256)
+        if cached is not None:
+            print(f"분석 캐시 히트: {sha256[:12]}...")
+            return IngestedUpload(
+                sha256, size, audio_format, None, sr, cached, "segments"
+            )
+
+    y = None
+    if size > 0:
+        y, sr = await run_in_threadpool(audio_analyzer.load_audio_segments, path)
+    return IngestedUpload(sha256, size, audio_format, y, sr, None, "segments")
+
+
+async def ingest_bytes(
+    data: bytes,
+    audio_analyzer,
+    lookup: Optional[Callable[[str], Optional[dict]]] = None,
+    analysis_window: str = "prefix",
+) -> IngestedUpload:
+    """
+    이미 메모리에 있는 오디오 바이트(zip 항목 등)를 해시하고 디코딩합니다.
+
+    Args:
+        data: 오디오 파일 바이트
+        audio_analyzer: 디코더와 레지스트리를 제공하는 AudioAnalyzer
+        lookup: 해시로 캐시된 결과를 찾는 함수 (히트하면 디코딩하지 않음)
+        analysis_window: 분석 구간 선택 방식 (prefix | segments | full)
+
+    Returns:
+        IngestedUpload
+    """
+    sha256 = hashlib.sha256(data).hexdigest()
+    audio_format = detect_audio_format_from_header(data[:16])
+    sr = audio_analyzer.sample_rate
+
+    if analysis_window in ("segments", "full"):
+        with tempfile.NamedTemporaryFile(suffix=".audio", delete=False) as spool:
+            spool.write(data)
+        return await _finish_spooled_upload(
+            spool.name,
+            sha256,
+            len(data),
+            audio_format,
+            audio_analyzer,
+            lookup,
+            analysis_window,
+        )
+
+    if lookup is not None:
+        cached = lookup(sha256)
+        if cached is not None:
+            print(f"분석 캐시 히트: {sha256[:12]}...")
+            return IngestedUpload(sha256, len(data), audio_format, None, sr, cached)
+
+    y, sr = await run_in_threadpool(audio_analyzer.load_audio_bytes, data)
+    return IngestedUpload(sha256, len(data), audio_format, y, sr)
+
+
+def is_zip_archive(file_obj: BinaryIO) -> bool:
+    """파일 시작 부분이 zip 시그니처인지 확인합니다 (읽기 위치는 되돌림)."""
+    position = file_obj.tell()
+    try:
+        return file_obj.read(len(ZIP_MAGIC)) == ZIP_MAGIC
+    finally:
+        file_obj.seek(position)
+
+
+def list_zip_audio_entries(
+    archive: zipfile.ZipFile, allowed_extensions: Iterable[str]
+) -> List[zipfile.ZipInfo]:
+    """
+    zip에서 분석할 오디오 항목만 고릅니다.
+
+    디렉터리, macOS 메타데이터(__MACOSX, ._*), 허용되지 않는 확장자는 제외합니다.
+
+    Args:
+        archive: 열린 zip 파일
+        allowed_extensions: 허용 확장자 목록
+
+    Returns:
+        오디오 항목 목록 (zip 안의 순서)
+    """
+    allowed = {extension.lower() for extension in allowed_extensions}
+    entries = []
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        name = info.filename
+        basename = os.path.basename(name)
+        if name.startswith("__MACOSX/") or basename.startswith("._"):
+            continue
+        if os.path.splitext(basename)[1].lower() in allowed:
+            entries.append(info)
+    return entries
@@ -0,0 +1,46 @@
+import time
+import numpy as np
+
+from app.services.fingerprint import extract_landmarks
+from app.services.streaming_features import StreamingFeatureAccumulator
+
+# 워밍업에 사용하는 합성 신호 길이 (비트 트래킹이 실행되도록 5초보다 길게)
+WARMUP_DURATION = 6.0
+
+
+def warmup_signal(sr: int) -> np.ndarray:
+    """120 BPM 클릭과 약한 노이즈로 된 워밍업용 신호"""
+    rng = np.random.default_rng(0)
+    y = rng.standard_normal(int(sr * WARMUP_DURATION)).astype(np.float32) * 0.01
+    click = np.hanning(256).astype(np.float32)
+    for start in range(0, len(y) - len(click), sr // 2):
+        y[start : start + len(click)] += click
+    return y
+
+
+def warm_up_analyzer(audio_analyzer) -> float:
+    """
+    합성 신호로 분석 경로를 한 번씩 실행해 librosa의 numba JIT 컴파일을 끝냅니다.
+
+    AudioFeatureGraph 분석(prefix/segments), 스트리밍 누적 분석(full, 실시간),
+    핑거프린트 추출을 모두 실행합니다. NUMBA_CACHE_DIR에 컴파일 결과가 남아
+    있으면 다시 컴파일하지 않고 캐시에서 읽습니다.
+
+    Args:
+        audio_analyzer: 워밍업할 AudioAnalyzer
+
+    Returns:
+        워밍업에 걸린 시간 (초)
+    """
+    started = time.perf_counter()
+    sr = audio_analyzer.sample_rate
+    y = warmup_signal(sr)
+
+    audio_analyzer.analyze_signal(y, sr)
+    accumulator = StreamingFeatureAccumulator(sr)
+    accumulator.update(y)
+    accumulator.finish()
+    audio_analyzer.analyze_graph(accumulator)
+    extract_landmarks(y, sr)
+
+    return time.perf_counter() - started
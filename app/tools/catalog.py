@@ -0,0 +1,154 @@
+"""
+유사곡 추천용 로컬 곡 카탈로그를 만들고 검색하는 CLI
+
+사용법:
+    python -m app.tools.catalog build [--csv 곡목록.csv ...] [--crawl tracks.npz ...] [--feature-store]
+    python -m app.tools.catalog add [--csv 곡목록.csv ...] [--crawl tracks.npz ...] [--feature-store]
+    python -m app.tools.catalog build-index [--nlist N]
+    python -m app.tools.catalog compact
+    python -m app.tools.catalog search --features '{"danceability": 0.7, ...}' [-k 10] [--nprobe N]
+    python -m app.tools.catalog stats
+
+build는 CSV 파일과 Audio Features 저장소(audio_features 테이블)의 곡을 모아
+카탈로그를 새로 만들고 기존 카탈로그와 원자적으로 교체합니다. 같은 트랙 ID는
+먼저 나온 행을 사용하므로, 곡 정보가 있는 CSV를 저장소보다 앞에 둡니다.
+--crawl은 python -m app.tools.crawl이 내보낸 열 단위 파일입니다 (CSV 다음에 읽음).
+
+add는 카탈로그에 없는 곡만 다시 빌드하지 않고 추가하며, 실행 중인 서버도 다음
+검색부터 사용합니다. build-index는 근사 검색용 IVF 인덱스를 만들고(검색 시
+TRACK_CATALOG_NPROBE개 역리스트만 살펴봄), compact는 추가된 곡을 합쳐 카탈로그와
+인덱스를 다시 빌드합니다. build로 다시 빌드하면 인덱스도 다시 만들어야 합니다.
+
+CSV 열: id(또는 track_id, spotify_id), danceability, energy, valence, tempo,
+acousticness, instrumentalness, speechiness, liveness
+곡 정보 열(선택): name(또는 track_name), artists(";" 구분), album, popularity, preview_url
+"""
+
+from itertools import chain
+import argparse
+import json
+import time
+
+from app.core.config import settings
+from app.services.catalog_crawler import iter_crawl_rows
+from app.services.track_catalog import (
+    TrackCatalog,
+    build_catalog,
+    build_catalog_index,
+    compact_catalog,
+    iter_csv_rows,
+    iter_feature_store_rows,
+)
+
+
+def _sources(args):
+    sources = [iter_csv_rows(path) for path in args.csv or []]
+    sources.extend(iter_crawl_rows(path) for path in args.crawl or [])
+    if args.feature_store:
+        from app.services.feature_store import audio_feature_store
+
+        sources.append(iter_feature_store_rows(audio_feature_store))
+    if not sources:
+        raise SystemExit("--csv, --crawl, --feature-store 중 하나 이상이 필요합니다.")
+    return chain.from_iterable(sources)
+
+
+def build(args):
+    meta = build_catalog(args.catalog, _sources(args))
+    print(json.dumps(meta, ensure_ascii=False, indent=2))
+
+
+def add(args):
+    added = TrackCatalog(args.catalog).add_tracks(_sources(args))
+    print(f"{added}곡 추가")
+
+
+def build_index(args):
+    meta = build_catalog_index(args.catalog, nlist=args.nlist)
+    print(json.dumps(meta, ensure_ascii=False, indent=2))
+
+
+def compact(args):
+    meta = compact_catalog(args.catalog)
+    print(json.dumps(meta, ensure_ascii=False, indent=2))
+
+
+def search(args):
+    catalog = TrackCatalog(args.catalog, nprobe=settings.TRACK_CATALOG_NPROBE)
+    target_features = json.loads(args.features)
+    started = time.perf_counter()
+    results = catalog.search(target_features, k=args.k, nprobe=args.nprobe)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for track in results:
+        print(
+            f"{track['similarity']:6.2f}%  {track['id']}  "
+            f"{', '.join(track.get('artists', []))} - {track.get('name', '')}"
+        )
+    print(f"{len(results)}곡 ({elapsed_ms:.1f}ms)")
+
+
+def stats(args):
+    print(json.dumps(TrackCatalog(args.catalog).stats(), ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--catalog",
+        default=settings.TRACK_CATALOG_DIR,
+        help="카탈로그 디렉터리 (기본값: TRACK_CATALOG_DIR)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, func, help_text in (
+        ("build", build, "카탈로그 새로 빌드"),
+        ("add", add, "카탈로그에 없는 곡 추가"),
+    ):
+        source_parser = subparsers.add_parser(name, help=help_text)
+        source_parser.add_argument(
+            "--csv", action="append", help="곡 목록 CSV (여러 번 지정 가능)"
+        )
+        source_parser.add_argument(
+            "--crawl",
+            action="append",
+            help="app.tools.crawl이 내보낸 곡 파일 (여러 번 지정 가능)",
+        )
+        source_parser.add_argument(
+            "--feature-store",
+            action="store_true",
+            help="Audio Features 저장소의 곡도 포함 (곡 정보는 추천 시 Spotify에서 가져옴)",
+        )
+        source_parser.set_defaults(func=func)
+
+    index_parser = subparsers.add_parser("build-index", help="IVF 인덱스 빌드")
+    index_parser.add_argument(
+        "--nlist", type=int, help="역리스트 수 (기본값: 약 2 * sqrt(곡 수))"
+    )
+    index_parser.set_defaults(func=build_index)
+
+    compact_parser = subparsers.add_parser(
+        "compact", help="추가된 곡을 합쳐 카탈로그와 인덱스 다시 빌드"
+    )
+    compact_parser.set_defaults(func=compact)
+
+    search_parser = subparsers.add_parser("search", help="목표 특성으로 곡 검색")
+    search_parser.add_argument(
+        "--features", required=True, help="목표 오디오 특성 JSON"
+    )
+    search_parser.add_argument("-k", type=int, default=10, help="결과 곡 수")
+    search_parser.add_argument(
+        "--nprobe",
+        type=int,
+        help="IVF 검색 역리스트 수 (기본값: TRACK_CATALOG_NPROBE, 0이면 정확한 검색)",
+    )
+    search_parser.set_defaults(func=search)
+
+    stats_parser = subparsers.add_parser("stats", help="카탈로그 정보 출력")
+    stats_parser.set_defaults(func=stats)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+카탈로그 후보 곡을 Spotify에서 미리 모으는 수집 CLI (중단 후 이어서 실행 가능)
+
+사용법:
+    python -m app.tools.crawl run [--playlist ID ...] [--search 검색어 ...] [--artist ID ...]
+                                  [--tracks ids.txt] [--rate 5] [--max-requests N]
+                                  [--max-tracks N] [--search-pages 4] [--genres]
+    python -m app.tools.crawl status
+    python -m app.tools.crawl export [--output data/crawl/tracks.npz]
+
+run은 시작점(플레이리스트, 검색어, 아티스트, 트랙 ID 파일)에서 곡을 찾아 곡 정보와
+Audio Features를 묶음으로 가져옵니다. 진행 상황은 --state-dir에 단계마다 기록되므로
+중단되거나 --max-requests를 다 쓴 뒤 같은 명령(또는 시작점 없이 run)을 다시 실행하면
+이어서 수집합니다. 끝나면 --output에 열 단위 파일을 쓰고, 카탈로그는
+`python -m app.tools.catalog build --crawl data/crawl/tracks.npz`로 만듭니다.
+
+Spotify 대신 로컬 모의 서버로 시험하려면 SPOTIFY_API_URL/SPOTIFY_TOKEN_URL을
+설정합니다 (python -m app.tools.mock_spotify 참고).
+"""
+
+import argparse
+import json
+import os
+
+from app.services.catalog_crawler import CatalogCrawler, RequestBudget
+
+DEFAULT_STATE_DIR = os.path.join("data", "crawl")
+
+
+def _crawler(args, service=None, budget=None) -> CatalogCrawler:
+    return CatalogCrawler(
+        service,
+        args.state_dir,
+        budget=budget,
+        search_pages=getattr(args, "search_pages", 4),
+        expand_genres=getattr(args, "genres", False),
+    )
+
+
+def _output_path(args) -> str:
+    return args.output or os.path.join(args.state_dir, "tracks.npz")
+
+
+def run(args):
+    from app.core.config import settings
+    from app.services.spotify_clients import SpotifyClientManager
+    from app.services.spotify_service import SpotifyService
+
+    # 요청 경로와 달리 429/5xx는 Retry-After만큼 기다렸다 다시 시도
+    client_manager = SpotifyClientManager(
+        settings.SPOTIFY_CLIENT_ID,
+        settings.SPOTIFY_CLIENT_SECRET,
+        api_url=settings.SPOTIFY_API_URL,
+        token_url=settings.SPOTIFY_TOKEN_URL,
+        retries=5,
+    )
+    service = SpotifyService(
+        access_token=args.access_token, client_manager=client_manager
+    )
+    if not service.sp:
+        raise SystemExit("Spotify API 설정이 필요합니다 (SPOTIFY_CLIENT_ID/SECRET).")
+
+    budget = RequestBudget(rate=args.rate, max_requests=args.max_requests)
+    crawler = _crawler(args, service, budget)
+    track_ids = []
+    if args.tracks:
+        with open(args.tracks, "r", encoding="utf-8") as f:
+            track_ids = [line.strip() for line in f if line.strip()]
+    added = crawler.add_seeds(
+        playlists=args.playlist or [],
+        queries=args.search or [],
+        artists=args.artist or [],
+        track_ids=track_ids,
+    )
+    print(f"새 시작점 {added}개, 이어서 수집: {json.dumps(crawler.stats())}")
+
+    try:
+        result = crawler.run(max_tracks=args.max_tracks)
+    except KeyboardInterrupt:
+        print("중단됨. 같은 --state-dir로 다시 실행하면 이어서 수집합니다.")
+        return
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    crawler.export(_output_path(args))
+
+
+def status(args):
+    print(json.dumps(_crawler(args).stats(), ensure_ascii=False, indent=2))
+
+
+def export(args):
+    meta = _crawler(args).export(_output_path(args))
+    print(json.dumps(meta, ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--state-dir",
+        default=DEFAULT_STATE_DIR,
+        help=f"진행 상황과 수집한 곡을 저장할 디렉터리 (기본값: {DEFAULT_STATE_DIR})",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="수집 시작 또는 이어서 수집")
+    run_parser.add_argument(
+        "--playlist", action="append", help="플레이리스트 ID (여러 번 지정 가능)"
+    )
+    run_parser.add_argument(
+        "--search", action="append", help="트랙 검색어 (여러 번 지정 가능)"
+    )
+    run_parser.add_argument(
+        "--artist", action="append", help="아티스트 ID (여러 번 지정 가능)"
+    )
+    run_parser.add_argument("--tracks", help="트랙 ID 파일 (한 줄에 하나)")
+    run_parser.add_argument(
+        "--rate", type=float, default=5.0, help="초당 Spotify 요청 수 (기본값: 5)"
+    )
+    run_parser.add_argument(
+        "--max-requests", type=int, help="이번 실행의 최대 Spotify 요청 수"
+    )
+    run_parser.add_argument("--max-tracks", type=int, help="수집할 최대 곡 수")
+    run_parser.add_argument(
+        "--search-pages",
+        type=int,
+        default=4,
+        help="검색어 하나에서 가져올 최대 페이지 수 (페이지당 50곡)",
+    )
+    run_parser.add_argument(
+        "--genres", action="store_true", help="아티스트의 장르도 검색어로 추가"
+    )
+    run_parser.add_argument(
+        "--access-token", help="사용자 토큰 (없으면 서버 인증 사용)"
+    )
+    run_parser.add_argument(
+        "--output", help="열 단위 출력 파일 (기본값: STATE_DIR/tracks.npz)"
+    )
+    run_parser.set_defaults(func=run)
+
+    status_parser = subparsers.add_parser("status", help="진행 상황 출력")
+    status_parser.set_defaults(func=status)
+
+    export_parser = subparsers.add_parser(
+        "export", help="지금까지 수집한 곡을 열 단위 파일로 쓰기"
+    )
+    export_parser.add_argument(
+        "--output", help="출력 파일 (기본값: STATE_DIR/tracks.npz)"
+    )
+    export_parser.set_defaults(func=export)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
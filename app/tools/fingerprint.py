@@ -0,0 +1,254 @@
+"""
+참조 곡 라이브러리로 핑거프린트 인덱스를 만들고 조회하는 CLI
+
+사용법:
+    python -m app.tools.fingerprint ingest <파일 또는 디렉터리 ...> [--metadata 곡정보.csv] [--workers N]
+    python -m app.tools.fingerprint build
+    python -m app.tools.fingerprint lookup <오디오 파일>
+    python -m app.tools.fingerprint stats
+
+ingest는 파일마다 SHA-256을 계산해 이미 추가된 곡은 건너뛰므로, 중단된 뒤
+같은 명령을 다시 실행하면 이어서 진행합니다. 추가가 끝나면 인덱스를 다시
+빌드합니다 (--no-build로 생략 가능).
+
+곡 정보 CSV 열: path, title, artist, album, release_year, spotify_id
+CSV에 없는 파일은 "아티스트 - 제목.확장자" 형식의 파일명에서 정보를 가져옵니다.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+
+from app.core.config import settings
+from app.services.audio_decoders import (
+    AudioDecodeError,
+    create_default_registry,
+    detect_audio_format_from_header,
+)
+from app.services.fingerprint import (
+    FINGERPRINT_SAMPLE_RATE,
+    FingerprintIndex,
+    FingerprintIndexBuilder,
+    extract_landmarks,
+    iter_reference_files,
+)
+
+REFERENCE_EXTENSIONS = (
+    ".mp3",
+    ".wav",
+    ".flac",
+    ".m4a",
+    ".aac",
+    ".ogg",
+    ".webm",
+    ".mp4",
+)
+
+# 워커 프로세스마다 하나씩 만드는 디코더 레지스트리
+_worker_registry = None
+
+
+def _file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _decode_reference(path: str, max_duration: float) -> Tuple[np.ndarray, int]:
+    global _worker_registry
+    if _worker_registry is None:
+        _worker_registry = create_default_registry()
+    with open(path, "rb") as f:
+        audio_format = detect_audio_format_from_header(f.read(16))
+    return _worker_registry.decode(
+        path, audio_format, FINGERPRINT_SAMPLE_RATE, max_duration
+    )
+
+
+def _fingerprint_file(
+    path: str, max_duration: float
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], float, Optional[str]]:
+    """워커에서 곡 하나를 디코딩하고 랜드마크를 추출합니다."""
+    try:
+        y, sr = _decode_reference(path, max_duration)
+    except AudioDecodeError as e:
+        return None, None, 0.0, str(e)
+    hashes, offsets = extract_landmarks(y, sr)
+    return hashes, offsets, len(y) / sr, None
+
+
+def _load_metadata(csv_path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    if not csv_path:
+        return {}
+    metadata = {}
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            path = row.get("path")
+            if path:
+                metadata[os.path.abspath(path)] = row
+    return metadata
+
+
+def _track_metadata(path: str, row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """CSV 행 또는 파일명으로 곡 정보를 만듭니다."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    artist, _, title = stem.partition(" - ")
+    if not title:
+        artist, title = "Unknown", stem
+    row = row or {}
+    release_year = row.get("release_year")
+    return {
+        "title": row.get("title") or title.strip(),
+        "artist": row.get("artist") or artist.strip(),
+        "album": row.get("album") or "Unknown",
+        "release_year": int(release_year) if release_year else None,
+        "spotify_id": row.get("spotify_id") or None,
+        "path": path,
+    }
+
+
+def ingest(args):
+    builder = FingerprintIndexBuilder(args.index)
+    metadata = _load_metadata(args.metadata)
+    started = time.perf_counter()
+
+    # 이미 추가된 곡은 디코딩 전에 건너뜀 (중단 후 재실행 시 이어서 진행)
+    pending = []
+    skipped = 0
+    for path in iter_reference_files(args.paths, REFERENCE_EXTENSIONS):
+        path = os.path.abspath(path)
+        sha256 = _file_sha256(path)
+        if builder.contains(sha256):
+            skipped += 1
+            continue
+        pending.append((path, sha256))
+    print(f"추가할 곡 {len(pending)}개 (이미 추가됨 {skipped}개)")
+
+    added = failed = 0
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as executor:
+        results = executor.map(
+            _fingerprint_file,
+            [path for path, _ in pending],
+            [args.max_duration] * len(pending),
+            chunksize=4,
+        )
+        for (path, sha256), (hashes, offsets, duration, error) in zip(pending, results):
+            if error is not None or len(hashes) == 0:
+                failed += 1
+                print(f"건너뜀: {path} ({error or '랜드마크 없음'})")
+                continue
+            builder.add_track(
+                hashes,
+                offsets,
+                {
+                    **_track_metadata(path, metadata.get(path)),
+                    "sha256": sha256,
+                    "duration": round(duration, 2),
+                },
+            )
+            added += 1
+            if added % 100 == 0:
+                elapsed = time.perf_counter() - started
+                print(f"{added}/{len(pending)}곡 추가 ({added / elapsed:.1f}곡/초)")
+
+    print(
+        f"추가 {added}개, 실패 {failed}개, 전체 {builder.track_count}개 "
+        f"({time.perf_counter() - started:.1f}초)"
+    )
+    if not args.no_build and added:
+        builder.build()
+
+
+def build(args):
+    FingerprintIndexBuilder(args.index).build()
+
+
+def lookup(args):
+    index = FingerprintIndex(args.index, min_matches=args.min_matches)
+    y, sr = _decode_reference(args.path, args.max_duration)
+    started = time.perf_counter()
+    match = index.lookup(y, sr)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if match is None:
+        print(f"일치하는 곡 없음 ({elapsed_ms:.0f}ms)")
+        return
+    print(
+        json.dumps(
+            {
+                "track": match.track,
+                "matches": match.matches,
+                "query_hashes": match.query_hashes,
+                "confidence": round(match.confidence, 3),
+                "offset_seconds": round(match.offset_seconds, 2),
+                "lookup_ms": round(elapsed_ms, 1),
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+
+
+def stats(args):
+    print(
+        json.dumps(FingerprintIndex(args.index).stats(), ensure_ascii=False, indent=2)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--index",
+        default=settings.FINGERPRINT_INDEX_DIR,
+        help="인덱스 디렉터리 (기본값: FINGERPRINT_INDEX_DIR)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="참조 곡 추가 후 인덱스 빌드")
+    ingest_parser.add_argument("paths", nargs="+", help="오디오 파일 또는 디렉터리")
+    ingest_parser.add_argument("--metadata", help="곡 정보 CSV 경로")
+    ingest_parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="디코딩 프로세스 수"
+    )
+    ingest_parser.add_argument(
+        "--max-duration", type=float, default=900.0, help="곡당 최대 길이 (초)"
+    )
+    ingest_parser.add_argument(
+        "--no-build", action="store_true", help="추가만 하고 인덱스는 빌드하지 않음"
+    )
+    ingest_parser.set_defaults(func=ingest)
+
+    build_parser = subparsers.add_parser("build", help="스테이징된 곡으로 인덱스 빌드")
+    build_parser.set_defaults(func=build)
+
+    lookup_parser = subparsers.add_parser("lookup", help="오디오 파일로 곡 조회")
+    lookup_parser.add_argument("path", help="오디오 파일 경로")
+    lookup_parser.add_argument(
+        "--max-duration", type=float, default=30.0, help="조회에 사용할 길이 (초)"
+    )
+    lookup_parser.add_argument(
+        "--min-matches",
+        type=int,
+        default=settings.FINGERPRINT_MIN_MATCHES,
+        help="일치로 인정하는 최소 정렬 해시 수",
+    )
+    lookup_parser.set_defaults(func=lookup)
+
+    stats_parser = subparsers.add_parser("stats", help="인덱스 정보 출력")
+    stats_parser.set_defaults(func=stats)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+수집기(app.tools.crawl) 시험용 로컬 모의 Spotify Web API 서버
+
+사용법:
+    python -m app.tools.mock_spotify [--port 8765] [--tracks 20000] [--max-rps 0]
+                                     [--error-every 0]
+
+    SPOTIFY_CLIENT_ID=mock SPOTIFY_CLIENT_SECRET=mock \\
+    SPOTIFY_API_URL=http://127.0.0.1:8765/v1/ \\
+    SPOTIFY_TOKEN_URL=http://127.0.0.1:8765/api/token \\
+    python -m app.tools.crawl --state-dir /tmp/crawl run --playlist mockplaylist0 --search love
+
+합성 곡으로 토큰 발급, 트랙 검색, 플레이리스트 트랙(페이지), 아티스트, 트랙 묶음,
+Audio Features 묶음 API를 흉내 냅니다. 같은 인자면 항상 같은 응답을 돌려줍니다.
+플레이리스트에는 삭제된 항목(track이 null)이 섞여 있고, 97번째 곡마다 Audio
+Features가 null입니다. --max-rps를 주면 초당 요청 수를 넘는 요청에 429와
+Retry-After를 돌려줍니다. --error-every N을 주면 API 요청 N개마다 하나에 503을
+돌려줍니다 (일시적 장애). 받은 요청 수는 GET /stats로 확인합니다.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import threading
+import time
+import zlib
+import numpy as np
+
+ARTIST_COUNT = 200
+PLAYLIST_SIZE = 250
+SEARCH_RESULT_LIMIT = 1000
+
+
+class MockSpotifyData:
+    """곡 번호로 결정되는 합성 곡, 아티스트, 플레이리스트, Audio Features"""
+
+    def __init__(self, track_count: int = 20000):
+        self.track_count = track_count
+        rng = np.random.default_rng(0)
+        self.features = rng.random((track_count, 7))
+        self.tempo = 60.0 + rng.random(track_count) * 140.0
+
+    @staticmethod
+    def track_id(index: int) -> str:
+        return f"mocktrack{index:013d}"
+
+    @staticmethod
+    def artist_id(index: int) -> str:
+        return f"mockartist{index:012d}"
+
+    def index_of(self, track_id: str) -> Optional[int]:
+        if not track_id.startswith("mocktrack"):
+            return None
+        try:
+            index = int(track_id[len("mocktrack") :])
+        except ValueError:
+            return None
+        return index if 0 <= index < self.track_count else None
+
+    def artist(self, index: int) -> Dict[str, Any]:
+        return {
+            "id": self.artist_id(index),
+            "name": f"Mock Artist {index}",
+            "type": "artist",
+            "genres": [f"mock genre {index % 10}"],
+            "images": [],
+            "popularity": index % 100,
+            "followers": {"total": index * 10},
+        }
+
+    def track(self, index: int) -> Dict[str, Any]:
+        track_id = self.track_id(index)
+        artist = self.artist(index % ARTIST_COUNT)
+        return {
+            "id": track_id,
+            "type": "track",
+            "name": f"Mock Track {index}",
+            "artists": [{"id": artist["id"], "name": artist["name"]}],
+            "album": {"name": f"Mock Album {index // 10}", "images": []},
+            "preview_url": None,
+            "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+            "popularity": index % 100,
+        }
+
+    def audio_features(self, index: int) -> Optional[Dict[str, Any]]:
+        if index % 97 == 96:
+            return None
+        values = self.features[index]
+        return {
+            "id": self.track_id(index),
+            "danceability": float(values[0]),
+            "energy": float(values[1]),
+            "valence": float(values[2]),
+            "tempo": float(self.tempo[index]),
+            "acousticness": float(values[3]),
+            "instrumentalness": float(values[4] ** 4),
+            "speechiness": float(values[5] * 0.3),
+            "liveness": float(values[6] * 0.5),
+            "loudness": -8.0,
+            "key": index % 12,
+            "mode": index % 2,
+            "duration_ms": 180000,
+            "time_signature": 4,
+            "type": "audio_features",
+        }
+
+    def search(self, query: str) -> List[int]:
+        """검색어별 결과 곡 번호 (아티스트 검색은 그 아티스트의 곡)"""
+        if query.startswith('artist:"Mock Artist '):
+            artist = int(query[len('artist:"Mock Artist ') :].rstrip('"'))
+            return list(range(artist, self.track_count, ARTIST_COUNT))
+        seed = zlib.crc32(query.encode("utf-8"))
+        count = min(SEARCH_RESULT_LIMIT, self.track_count, 50 + seed % 400)
+        return [(seed + k * 7919) % self.track_count for k in range(count)]
+
+    def playlist(self, playlist_id: str) -> Optional[List[Optional[int]]]:
+        """플레이리스트 항목 곡 번호 (None은 삭제된 항목)"""
+        if not playlist_id.startswith("mockplaylist"):
+            return None
+        number = int(playlist_id[len("mockplaylist") :] or 0)
+        start = number * PLAYLIST_SIZE
+        return [
+            None if k % 50 == 49 else (start + k) % self.track_count
+            for k in range(PLAYLIST_SIZE)
+        ]
+
+
+class MockSpotifyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        data: MockSpotifyData,
+        max_rps: float = 0,
+        error_every: int = 0,
+    ):
+        super().__init__(address, MockSpotifyHandler)
+        self.data = data
+        self.max_rps = max_rps
+        self.error_every = error_every
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self._requests = 0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    def fails(self) -> bool:
+        """error_every번째 API 요청마다 True (일시적 장애)"""
+        if self.error_every <= 0:
+            return False
+        with self.lock:
+            self._requests += 1
+            if self._requests % self.error_every:
+                return False
+            self.counts["errors"] = self.counts.get("errors", 0) + 1
+            return True
+
+    def count(self, endpoint: str) -> bool:
+        """요청을 세고, 초당 요청 수를 넘었으면 False"""
+        with self.lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+            if self.max_rps <= 0:
+                return True
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            if self._window_count > self.max_rps:
+                self.counts["rate_limited"] = self.counts.get("rate_limited", 0) + 1
+                return False
+            return True
+
+
+class MockSpotifyHandler(BaseHTTPRequestHandler):
+    server: MockSpotifyServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: int, message: str):
+        self._send(status, {"error": {"status": status, "message": message}})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if urlparse(self.path).path != "/api/token":
+            return self._error(404, "Not found")
+        self.server.count("token")
+        self._send(
+            200,
+            {"access_token": "mock-token", "token_type": "Bearer", "expires_in": 3600},
+        )
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        if parts == ["stats"]:
+            with self.server.lock:
+                return self._send(200, dict(self.server.counts))
+        if len(parts) < 2 or parts[0] != "v1":
+            return self._error(404, "Not found")
+        endpoint = parts[1]
+        if not self.server.count(endpoint):
+            return self._send(429, {"error": "rate limited"}, {"Retry-After": "1"})
+        if self.server.fails():
+            return self._error(503, "Service unavailable")
+
+        data = self.server.data
+        limit = int(params.get("limit", 20))
+        offset = int(params.get("offset", 0))
+
+        if endpoint == "search":
+            results = data.search(params.get("q", ""))
+            items = [data.track(i) for i in results[offset : offset + limit]]
+            return self._send(
+                200, {"tracks": self._paging(items, len(results), offset, limit)}
+            )
+
+        if endpoint == "playlists" and len(parts) == 4 and parts[3] == "tracks":
+            entries = data.playlist(parts[2])
+            if entries is None:
+                return self._error(404, "Playlist not found")
+            items = [
+                {"track": None if index is None else data.track(index)}
+                for index in entries[offset : offset + limit]
+            ]
+            return self._send(200, self._paging(items, len(entries), offset, limit))
+
+        if endpoint == "artists" and len(parts) == 3:
+            if not parts[2].startswith("mockartist"):
+                return self._error(404, "Artist not found")
+            index = int(parts[2][len("mockartist") :])
+            return self._send(200, data.artist(index % ARTIST_COUNT))
+
+        if endpoint in ("tracks", "audio-features") and len(parts) == 2:
+            ids = [i for i in params.get("ids", "").split(",") if i]
+            if len(ids) > (50 if endpoint == "tracks" else 100):
+                return self._error(400, "Too many ids requested")
+            indexes = [data.index_of(track_id) for track_id in ids]
+            if endpoint == "tracks":
+                found = [None if i is None else data.track(i) for i in indexes]
+                return self._send(200, {"tracks": found})
+            found = [None if i is None else data.audio_features(i) for i in indexes]
+            return self._send(200, {"audio_features": found})
+
+        self._error(404, "Not found")
+
+    def _paging(self, items: List[Any], total: int, offset: int, limit: int):
+        has_next = offset + limit < total
+        return {
+            "items": items,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "next": f"{self.path}#next" if has_next else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tracks", type=int, default=20000, help="합성 곡 수")
+    parser.add_argument(
+        "--max-rps", type=float, default=0, help="초당 최대 요청 수 (0이면 제한 없음)"
+    )
+    parser.add_argument(
+        "--error-every",
+        type=int,
+        default=0,
+        help="API 요청 N개마다 503 응답 (0이면 없음)",
+    )
+    args = parser.parse_args()
+
+    server = MockSpotifyServer(
+        (args.host, args.port),
+        MockSpotifyData(args.tracks),
+        max_rps=args.max_rps,
+        error_every=args.error_every,
+    )
+    print(f"모의 Spotify API: http://{args.host}:{args.port}/v1/ (곡 {args.tracks}개)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
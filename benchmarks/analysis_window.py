@@ -0,0 +1,143 @@
+"""
+분석 구간 방식 벤치마크: 앞부분 30초(prefix) vs 구간 샘플링(segments)
+
+사용법:
+    python -m benchmarks.analysis_window [오디오 파일 ...] [--repeat N]
+
+파일을 주지 않으면 조용한 인트로가 있는 3분짜리 합성 곡을 만들어 사용합니다.
+방식별로 디코딩과 특징 분석의 벽시계 시간, CPU 시간(ffmpeg 자식 프로세스 포함),
+주요 특징 값을 출력합니다.
+"""
+
+from typing import Callable, Dict, List, Tuple
+import argparse
+import os
+import resource
+import statistics
+import tempfile
+import time
+import numpy as np
+import soundfile as sf
+
+from app.services.audio_analyzer_simple import AudioAnalyzer
+
+REPORTED_FEATURES = ("tempo", "key", "mode", "danceability", "energy", "valence")
+
+
+def synthesize_track(path: str, sr: int = 44100, duration: float = 180.0):
+    """20초짜리 조용한 패드 인트로 뒤에 128 BPM 비트와 화음이 이어지는 합성 곡"""
+    t = np.arange(int(sr * duration)) / sr
+    intro = t < 20.0
+
+    # 인트로: 느린 A 단조 패드
+    pad = sum(np.sin(2 * np.pi * f * t) for f in (220.0, 261.63, 329.63)) * 0.03
+
+    # 본문: 128 BPM 킥 + E 장조 I-IV-V-I 화음 진행 (2초마다 변경)
+    beat_period = 60.0 / 128
+    phase = np.mod(t, beat_period)
+    kick = np.sin(2 * np.pi * 60 * phase) * np.exp(-phase * 25) * 0.3
+    progression = np.array(
+        [
+            (329.63, 415.30, 493.88),  # E
+            (440.00, 554.37, 659.25),  # A
+            (493.88, 622.25, 739.99),  # B
+            (329.63, 415.30, 493.88),  # E
+        ]
+    )
+    freqs = progression[(t // 2.0).astype(int) % len(progression)]
+    chord = np.sin(2 * np.pi * freqs * t[:, None]).sum(axis=1) * 0.15
+    body = kick + chord
+
+    y = np.where(intro, pad, body).astype(np.float32)
+    sf.write(path, np.stack([y, y], axis=1), sr)
+
+
+def _cpu_seconds() -> float:
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (
+        self_usage.ru_utime
+        + self_usage.ru_stime
+        + child_usage.ru_utime
+        + child_usage.ru_stime
+    )
+
+
+def run_once(
+    load: Callable[[str], Tuple[np.ndarray, int]],
+    analyzer: AudioAnalyzer,
+    path: str,
+) -> Dict[str, float]:
+    wall = time.perf_counter()
+    cpu = _cpu_seconds()
+    y, sr = load(path)
+    decoded_wall = time.perf_counter()
+    decoded_cpu = _cpu_seconds()
+    features = analyzer.analyze_signal(y, sr)
+    return {
+        "decode_s": decoded_wall - wall,
+        "analysis_s": time.perf_counter() - decoded_wall,
+        "analysis_cpu_s": _cpu_seconds() - decoded_cpu,
+        "total_cpu_s": _cpu_seconds() - cpu,
+        **{name: features[name] for name in REPORTED_FEATURES},
+    }
+
+
+def benchmark(paths: List[str], repeat: int):
+    analyzer = AudioAnalyzer()
+    modes = {
+        "prefix": analyzer._load_audio_safely,
+        "segments": analyzer.load_audio_segments,
+    }
+
+    # 첫 실행의 import/JIT 비용 제외
+    run_once(modes["prefix"], analyzer, paths[0])
+
+    for path in paths:
+        print(f"\n== {os.path.basename(path)}")
+        for mode, load in modes.items():
+            runs = [run_once(load, analyzer, path) for _ in range(repeat)]
+            timing = {
+                key: statistics.median(run[key] for run in runs)
+                for key in ("decode_s", "analysis_s", "analysis_cpu_s", "total_cpu_s")
+            }
+            features = runs[-1]
+            print(
+                f"{mode:>8}: decode {timing['decode_s']:.3f}s, "
+                f"analysis {timing['analysis_s']:.3f}s "
+                f"(cpu {timing['analysis_cpu_s']:.3f}s), "
+                f"total cpu {timing['total_cpu_s']:.3f}s | "
+                + ", ".join(
+                    (
+                        f"{name}={features[name]:.3f}"
+                        if isinstance(features[name], float)
+                        else f"{name}={features[name]}"
+                    )
+                    for name in REPORTED_FEATURES
+                )
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", help="오디오 파일 경로")
+    parser.add_argument("--repeat", type=int, default=3, help="방식별 반복 횟수")
+    args = parser.parse_args()
+
+    paths = args.paths
+    temp_dir = None
+    if not paths:
+        temp_dir = tempfile.TemporaryDirectory()
+        synthetic = os.path.join(temp_dir.name, "synthetic_intro_track.wav")
+        synthesize_track(synthetic)
+        paths = [synthetic]
+
+    try:
+        benchmark(paths, args.repeat)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
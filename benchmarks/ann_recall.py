@@ -0,0 +1,137 @@
+"""
+유사곡 검색 벤치마크: IVF 근사 검색의 recall@10과 지연 시간 (정확한 검색 대비)
+
+사용법:
+    python -m benchmarks.ann_recall [--catalog 디렉터리] [--tracks N] [--queries N]
+                                    [--nprobe 8 16 32 64] [--nlist N]
+
+--catalog를 주지 않으면 임시 디렉터리에 합성 곡 카탈로그를 만들어 사용합니다.
+카탈로그의 IVF 인덱스를 (다시) 빌드한 뒤, 카탈로그 곡의 특성에 잡음을 더한
+질의로 정확한 검색(nprobe 0)과 nprobe별 근사 검색을 실행해, 정확한 검색의
+상위 10곡 중 근사 검색이 찾은 비율(recall@10)과 질의당 지연 시간의 중앙값,
+p99를 출력합니다.
+"""
+
+from typing import Any, Dict, Iterator, List, Tuple
+import argparse
+import statistics
+import tempfile
+import time
+import numpy as np
+
+from app.services.track_catalog import (
+    CATALOG_FEATURES,
+    TrackCatalog,
+    build_catalog,
+    build_catalog_index,
+)
+
+# 합성 곡 특성 범위 (tempo 외에는 0-1)
+_TEMPO_RANGE = (60.0, 200.0)
+
+
+def synthetic_rows(
+    count: int, seed: int = 0
+) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """장르처럼 몇 개의 무리로 모인 합성 곡 (트랙 ID, 특성, 곡 정보)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.random((64, len(CATALOG_FEATURES)))
+    low, high = _TEMPO_RANGE
+    tempo = CATALOG_FEATURES.index("tempo")
+    for start in range(0, count, 10000):
+        size = min(10000, count - start)
+        values = centers[rng.integers(0, len(centers), size)]
+        values = np.clip(values + rng.normal(0, 0.12, values.shape), 0, 1)
+        values[:, tempo] = low + values[:, tempo] * (high - low)
+        for offset, vector in enumerate(values.tolist()):
+            row = start + offset
+            yield (
+                f"{row:022d}",
+                dict(zip(CATALOG_FEATURES, vector)),
+                {"name": f"Track {row}", "artists": ["Synthetic"]},
+            )
+
+
+def make_queries(
+    catalog: TrackCatalog, count: int, seed: int = 1
+) -> List[Dict[str, Any]]:
+    """카탈로그 곡의 특성에 잡음을 더한 질의"""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for row in rng.integers(0, catalog.track_count, count):
+        vector = catalog._row_vector(int(row)).astype(np.float64)
+        noise = rng.normal(0, 0.05, len(vector))
+        noise[CATALOG_FEATURES.index("tempo")] *= 100.0
+        queries.append(dict(zip(CATALOG_FEATURES, (vector + noise).tolist())))
+    return queries
+
+
+def run_queries(
+    catalog: TrackCatalog, queries: List[Dict[str, Any]], k: int, nprobe: int
+) -> Tuple[List[List[str]], List[float]]:
+    results, latencies = [], []
+    for target in queries:
+        started = time.perf_counter()
+        found = catalog.search(target, k=k, nprobe=nprobe)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append([track["id"] for track in found])
+    return results, latencies
+
+
+def benchmark(catalog_dir: str, queries: int, nprobes: List[int], nlist, k: int = 10):
+    started = time.perf_counter()
+    meta = build_catalog_index(catalog_dir, nlist=nlist)
+    print(
+        f"IVF 인덱스 빌드: 곡 {meta['vectors']}개, 리스트 {meta['nlist']}개 "
+        f"({time.perf_counter() - started:.1f}초)"
+    )
+
+    catalog = TrackCatalog(catalog_dir)
+    if not catalog.available:
+        raise SystemExit(f"곡 카탈로그가 없습니다: {catalog_dir}")
+    targets = make_queries(catalog, queries)
+    # 첫 질의의 파일 열기/페이지 캐시 비용은 제외
+    run_queries(catalog, targets[:5], k, 0)
+    run_queries(catalog, targets[:5], k, max(nprobes))
+
+    exact, exact_latencies = run_queries(catalog, targets, k, 0)
+    print(f"\n{'nprobe':>8} {'recall@10':>10} {'p50 ms':>9} {'p99 ms':>9}")
+
+    def report(label: str, latencies: List[float], recall: float):
+        p99 = np.percentile(latencies, 99)
+        print(
+            f"{label:>8} {recall:>10.3f} {statistics.median(latencies):>9.2f} "
+            f"{p99:>9.2f}"
+        )
+
+    report("exact", exact_latencies, 1.0)
+    for nprobe in nprobes:
+        found, latencies = run_queries(catalog, targets, k, nprobe)
+        hits = sum(len(set(a) & set(e)) for a, e in zip(found, exact))
+        report(str(nprobe), latencies, hits / max(1, sum(len(e) for e in exact)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--catalog", help="카탈로그 디렉터리 (없으면 합성 카탈로그)")
+    parser.add_argument("--tracks", type=int, default=200_000, help="합성 곡 수")
+    parser.add_argument("--queries", type=int, default=200, help="질의 수")
+    parser.add_argument(
+        "--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64], help="nprobe 값"
+    )
+    parser.add_argument("--nlist", type=int, help="역리스트 수 (기본값: 자동)")
+    args = parser.parse_args()
+
+    if args.catalog:
+        benchmark(args.catalog, args.queries, args.nprobe, args.nlist)
+        return
+
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        started = time.perf_counter()
+        build_catalog(catalog_dir, synthetic_rows(args.tracks))
+        print(f"합성 카탈로그 빌드 ({time.perf_counter() - started:.1f}초)")
+        benchmark(catalog_dir, args.queries, args.nprobe, args.nlist)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+유사곡 정확한 검색 벤치마크: 샤드(워커 프로세스) 수별 지연 시간
+
+사용법:
+    python -m benchmarks.catalog_shards [--catalog 디렉터리] [--tracks N] [--queries N]
+                                        [--shards 1 2 4 8 16]
+
+--catalog를 주지 않으면 임시 디렉터리에 합성 곡 카탈로그를 만들어 사용합니다.
+샤드 수마다 CatalogShardPool을 띄우고 같은 질의로 정확한 검색(nprobe 0)을 실행해
+질의당 지연 시간의 중앙값과 p99, 샤드 1개 대비 속도, 결과가 샤드 1개와 같은지를
+출력합니다. 샤드 1개는 워커 없이 요청 스레드에서 계산하는 기본 경로입니다.
+CPU 수보다 많은 샤드는 빨라지지 않습니다.
+"""
+
+from typing import List
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import numpy as np
+
+from app.services.catalog_shards import CatalogShardPool
+from app.services.track_catalog import TrackCatalog, build_catalog
+from benchmarks.ann_recall import make_queries, run_queries, synthetic_rows
+
+
+def benchmark(catalog_dir: str, queries: int, shard_counts: List[int], k: int = 10):
+    probe = TrackCatalog(catalog_dir)
+    if not probe.available:
+        raise SystemExit(f"곡 카탈로그가 없습니다: {catalog_dir}")
+    targets = make_queries(probe, queries)
+    print(f"곡 {probe.track_count}개, 질의 {len(targets)}개, CPU {os.cpu_count()}개")
+    print(f"\n{'shards':>7} {'p50 ms':>9} {'p99 ms':>9} {'speedup':>8} {'same':>5}")
+
+    baseline = None
+    for shards in shard_counts:
+        pool = CatalogShardPool(catalog_dir, shards=shards, min_tracks=0)
+        pool.start()
+        try:
+            catalog = TrackCatalog(catalog_dir, nprobe=0, shard_pool=pool)
+            # 첫 질의의 파일 열기/페이지 캐시 비용은 제외
+            run_queries(catalog, targets[:5], k, 0)
+            results, latencies = run_queries(catalog, targets, k, 0)
+        finally:
+            pool.shutdown()
+
+        p50 = statistics.median(latencies)
+        if baseline is None:
+            baseline = (p50, results)
+        print(
+            f"{shards:>7} {p50:>9.2f} {np.percentile(latencies, 99):>9.2f} "
+            f"{baseline[0] / p50:>7.2f}x {str(results == baseline[1]):>5}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--catalog", help="카탈로그 디렉터리 (없으면 합성 카탈로그)")
+    parser.add_argument("--tracks", type=int, default=1_000_000, help="합성 곡 수")
+    parser.add_argument("--queries", type=int, default=100, help="질의 수")
+    parser.add_argument(
+        "--shards", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="샤드 수"
+    )
+    args = parser.parse_args()
+
+    if args.catalog:
+        benchmark(args.catalog, args.queries, args.shards)
+        return
+
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        started = time.perf_counter()
+        build_catalog(catalog_dir, synthetic_rows(args.tracks))
+        print(f"합성 카탈로그 빌드 ({time.perf_counter() - started:.1f}초)")
+        benchmark(catalog_dir, args.queries, args.shards)
+
+
+if __name__ == "__main__":
+    main()
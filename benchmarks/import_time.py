@@ -0,0 +1,138 @@
+"""
+부팅(import) 시간 벤치마크: 라우트 모듈별 import 시간과 무거운 모듈 유입 확인
+
+사용법:
+    python -m benchmarks.import_time [모듈 ...] [--repeat N] [--top N] [--check]
+
+모듈마다 새 인터프리터에서 `python -X importtime -c "import 모듈"`을 실행해
+모듈 import 누적 시간과 프로세스 전체 시간의 중앙값, 최상위 패키지별 import
+시간 상위 항목을 출력합니다. Spotify/추천 라우트는 librosa, scipy, numba,
+openai, torch 같은 무거운 모듈과 곡 카탈로그(numpy)를 import하지 않아야
+하며, --check를 주면 목표 시간을 넘거나 금지된 모듈이 import된 경우 종료
+코드 1로 끝납니다.
+분석 라우트(main)의 librosa/numba 비용은 lifespan 워밍업에서 따로 측정됩니다.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# 첫 요청 전에 필요하지 않은 무거운 모듈
+HEAVY_MODULES = (
+    "librosa",
+    "numba",
+    "scipy",
+    "soundfile",
+    "openai",
+    "torch",
+    "torchaudio",
+    "transformers",
+)
+
+# Spotify/추천 라우트: 곡 카탈로그(numpy, 샤드 풀)는 처음 검색할 때 import
+SPOTIFY_ROUTE_FORBIDDEN = HEAVY_MODULES + ("numpy", "app.services.track_catalog")
+
+# 모듈: (import 시간 목표(초), import되면 안 되는 패키지 또는 모듈)
+BOOT_TARGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    # scipy.signal은 약 0.4초 (분석을 시작할 때 ensure_scipy_windows로 import)
+    "main": (2.0, ("openai", "torch", "torchaudio", "transformers", "scipy.signal")),
+    "app.api.spotify": (1.0, SPOTIFY_ROUTE_FORBIDDEN),
+    "app.api.recommendations": (1.0, SPOTIFY_ROUTE_FORBIDDEN),
+}
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """-X importtime 출력에서 (모듈, self us, 누적 us) 목록을 만듭니다."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 헤더 줄
+        rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return rows
+
+
+def run_once(module: str) -> Dict[str, object]:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{result.stderr[-2000:]}")
+
+    rows = parse_importtime(result.stderr)
+    import_us = next(cumulative for name, _, cumulative in rows if name == module)
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    return {
+        "import_s": import_us / 1e6,
+        "process_s": wall,
+        "packages": {name: us / 1e6 for name, us in by_package.items()},
+        "modules": {name for name, _, _ in rows},
+    }
+
+
+def benchmark(modules: List[str], repeat: int, top: int) -> bool:
+    within_budget = True
+    for module in modules:
+        runs = [run_once(module) for _ in range(repeat)]
+        import_s = statistics.median(run["import_s"] for run in runs)
+        process_s = statistics.median(run["process_s"] for run in runs)
+        packages = runs[-1]["packages"]
+
+        budget, forbidden = BOOT_TARGETS.get(module, (None, ()))
+        imported = runs[-1]["modules"]
+        leaked = sorted(name for name in forbidden if name in imported)
+        over = budget is not None and import_s > budget
+        within_budget = within_budget and not over and not leaked
+
+        target = f" / 목표 {budget:.2f}s" if budget is not None else ""
+        print(f"\n== {module}")
+        print(
+            f"import {import_s:.3f}s{target}, 프로세스 {process_s:.3f}s "
+            f"(중앙값, {repeat}회){' [초과]' if over else ''}"
+        )
+        for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            print(f"  {name:<24} {seconds:.3f}s")
+        if leaked:
+            print(f"  금지된 모듈 import: {', '.join(leaked)}")
+    return within_budget
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        default=list(BOOT_TARGETS),
+        help="측정할 모듈 (기본값: main과 Spotify/추천 라우트)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="모듈별 반복 횟수")
+    parser.add_argument("--top", type=int, default=8, help="출력할 패키지 수")
+    parser.add_argument(
+        "--check", action="store_true", help="목표를 넘으면 종료 코드 1로 끝냄"
+    )
+    args = parser.parse_args()
+
+    ok = benchmark(args.modules, args.repeat, args.top)
+    if args.check and not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
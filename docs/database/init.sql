@@ -38,17 +38,17 @@ CREATE TABLE recommendations (
 -- Audio Features 테이블
 CREATE TABLE audio_features (
     spotify_track_id VARCHAR(22) PRIMARY KEY,
-    danceability DECIMAL(3,2),
-    energy DECIMAL(3,2),
-    valence DECIMAL(3,2),
-    tempo DECIMAL(6,2),
+    danceability DOUBLE PRECISION,
+    energy DOUBLE PRECISION,
+    valence DOUBLE PRECISION,
+    tempo DOUBLE PRECISION,
     key_value INTEGER,
     mode_value INTEGER,
-    loudness DECIMAL(6,2),
-    acousticness DECIMAL(3,2),
-    instrumentalness DECIMAL(3,2),
-    speechiness DECIMAL(3,2),
-    liveness DECIMAL(3,2),
+    loudness DOUBLE PRECISION,
+    acousticness DOUBLE PRECISION,
+    instrumentalness DOUBLE PRECISION,
+    speechiness DOUBLE PRECISION,
+    liveness DOUBLE PRECISION,
     duration_ms INTEGER,
     time_signature INTEGER,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -0,0 +1,20 @@
+-- audio_features 특성 열을 DECIMAL에서 DOUBLE PRECISION으로 변경
+-- DECIMAL(3,2)/(6,2)는 Spotify 값(예: 0.735)을 소수 둘째 자리로 반올림해 저장함
+-- 이미 init.sql로 만든 PostgreSQL DB에서 한 번 실행하세요
+
+\c musicmatch;
+
+ALTER TABLE audio_features
+    ALTER COLUMN danceability TYPE DOUBLE PRECISION,
+    ALTER COLUMN energy TYPE DOUBLE PRECISION,
+    ALTER COLUMN valence TYPE DOUBLE PRECISION,
+    ALTER COLUMN tempo TYPE DOUBLE PRECISION,
+    ALTER COLUMN loudness TYPE DOUBLE PRECISION,
+    ALTER COLUMN acousticness TYPE DOUBLE PRECISION,
+    ALTER COLUMN instrumentalness TYPE DOUBLE PRECISION,
+    ALTER COLUMN speechiness TYPE DOUBLE PRECISION,
+    ALTER COLUMN liveness TYPE DOUBLE PRECISION;
+
+-- 이미 반올림되어 저장된 행은 FEATURE_STORE_TTL이 지나면 Spotify에서 다시 가져옴.
+-- 바로 다시 가져오려면 아래 문장으로 만료 처리 (카탈로그 빌드는 만료와 관계없이 사용)
+-- UPDATE audio_features SET updated_at = NULL;
@@ -1,10 +1,46 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import uvicorn
 
 from app.api import audio, recommendations, spotify
 from app.core.config import settings
+from app.services.spotify_clients import spotify_client_manager
+from app.services.track_catalog import catalog_shard_pool
+from app.services.upload_ingest import UPLOAD_FORM_OVERHEAD, UploadSizeLimitMiddleware
+from app.services.warmup import warm_up_analyzer
+
+# API 프로세스 워밍업 시간 (초, 끝나기 전에는 None)
+warmup_seconds = None
+_background_tasks = set()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global warmup_seconds
+    # 설정 상태는 import 시점이 아닌 서버 시작 시 한 번만 출력
+    print(
+        f"Spotify API 키: {'설정됨' if spotify_client_manager.configured else '없음'}, "
+        f"OpenAI API 키: {'설정됨' if settings.OPENAI_API_KEY else '없음'}"
+    )
+    # 실시간 분석과 곡 식별은 API 프로세스에서 실행되므로 여기서도 JIT 컴파일을 끝냄.
+    # 먼저 실행해 numba 캐시를 채우면 뒤이어 뜨는 분석 워커는 캐시에서 읽음
+    warmup_seconds = await run_in_threadpool(warm_up_analyzer, audio.audio_analyzer)
+    print(f"API 프로세스 워밍업 완료 ({warmup_seconds:.1f}초)")
+    # 분석 워커를 미리 띄워 첫 요청에서 초기화 비용이 들지 않게 함
+    await audio.analysis_pool.start()
+    # Spotify 연결 확인은 요청 경로가 아닌 백그라운드에서 주기적으로 실행
+    spotify_client_manager.start_health_checks(settings.SPOTIFY_HEALTH_CHECK_INTERVAL)
+    yield
+    spotify_client_manager.stop_health_checks()
+    spotify_client_manager.search_fanout.shutdown()
+    audio.analysis_pool.shutdown()
+    catalog_shard_pool.shutdown()
+
 
 app = FastAPI(
     title="DJ계티Match API",
@@ -12,6 +48,18 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+)
+
+# 업로드 크기 제한: 라우트가 실행되기 전, 본문을 받는 중에 한도를 넘으면 413
+# (나중에 등록한 CORS가 바깥에서 감싸므로 413 응답에도 CORS 헤더가 붙음)
+batch_max_bytes = settings.MAX_FILE_SIZE * settings.BATCH_MAX_FILES
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/v1/audio/analyze": settings.MAX_FILE_SIZE + UPLOAD_FORM_OVERHEAD,
+        "/api/v1/audio/analyze/batch": batch_max_bytes + UPLOAD_FORM_OVERHEAD,
+    },
 )
 
 # CORS 설정
@@ -45,7 +93,29 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "version": "1.0.0"}
+    """
+    워밍업이 끝나 첫 요청부터 빠르게 처리할 수 있을 때만 200을 반환합니다.
+
+    분석 워커가 비정상 종료되어 내려간 경우에는 다시 띄우기 시작하고
+    준비될 때까지 503을 반환합니다.
+    """
+    pool = audio.analysis_pool
+    ready = warmup_seconds is not None and pool.ready
+    content = {
+        "status": "healthy" if ready else "warming_up",
+        "version": "1.0.0",
+        "warmup_seconds": warmup_seconds,
+        "worker_warmup_seconds": pool.stats()["warmup_seconds"],
+    }
+    if ready:
+        return content
+
+    if warmup_seconds is not None and not pool.ready:
+        # 요청이 들어오지 않아도 워커가 다시 준비되도록 백그라운드에서 시작
+        task = asyncio.create_task(pool.start())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return JSONResponse(status_code=503, content=content)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+import os
+
+from app.services.analysis_cache import AnalysisResultCache
+
+
+def _result(tempo: float, padding: int = 0) -> dict:
+    return {
+        "audio_features": {"tempo": tempo, "key": 9, "mode": 0},
+        "analysis_reason": "x" * padding,
+    }
+
+
+def _age_files(cache: AnalysisResultCache, *shas, variant: str = "prefix"):
+    """디스크 항목의 최근 사용 시간을 shas 순서대로 오래된 것부터 설정"""
+    for age, sha in enumerate(reversed(shas), start=1):
+        path = cache._path(cache.make_key(sha, variant))
+        old = os.stat(path).st_mtime - 100 * age
+        os.utime(path, (old, old))
+
+
+def test_hit_after_put_and_memory_lru():
+    cache = AnalysisResultCache("v1", max_memory_entries=2)
+
+    assert cache.get("a") is None
+    cache.put("a", _result(120.0))
+    assert cache.get("a") == _result(120.0)
+
+    cache.put("b", _result(100.0))
+    cache.get("a")  # a를 최근 사용으로
+    cache.put("c", _result(90.0))
+
+    # 메모리만 쓰면 가장 오래 사용되지 않은 b가 밀려남
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["memory_evictions"] == 1
+    assert stats["memory_entries"] == 2
+    assert stats["misses"] == 2 and stats["memory_hits"] == 4
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    disk_dir = str(tmp_path / "cache")
+    AnalysisResultCache("v1", disk_dir=disk_dir).put("a", _result(128.0))
+
+    reopened = AnalysisResultCache("v1", disk_dir=disk_dir)
+    assert reopened.stats()["disk_bytes"] > 0
+    assert reopened.get("a") == _result(128.0)
+    # 디스크에서 읽은 항목은 메모리 계층으로 올라감
+    assert reopened.get("a") == _result(128.0)
+    stats = reopened.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+    # 분석기 버전이 바뀌면 이전 결과는 쓰지 않음
+    assert AnalysisResultCache("v2", disk_dir=disk_dir).get("a") is None
+
+
+def test_disk_eviction_keeps_recently_used_within_byte_cap(tmp_path):
+    disk_dir = str(tmp_path / "cache")
+    cache = AnalysisResultCache("v1", disk_dir=disk_dir, max_disk_bytes=1600)
+    for sha in ("a", "b", "c"):
+        cache.put(sha, _result(1.0, padding=300))
+    entry_size = cache.stats()["disk_bytes"] // 3
+    # 4개까지는 한도 안, 5개가 되면 한도의 90% 이하(3개)로 줄어듦
+    assert 4 * entry_size <= 1600 < 5 * entry_size
+    _age_files(cache, "a", "b", "c")
+
+    # 다른 인스턴스(프로세스)에서 a를 읽으면 최근 사용 시간이 갱신됨
+    assert AnalysisResultCache("v1", disk_dir=disk_dir).get("a") is not None
+    cache.put("d", _result(1.0, padding=300))
+    cache.put("e", _result(1.0, padding=300))
+
+    remaining = sorted(name.split("-")[-1] for name in os.listdir(disk_dir))
+    assert remaining == ["a.json", "d.json", "e.json"]
+    stats = cache.stats()
+    assert stats["disk_evictions"] == 2
+    assert stats["disk_bytes"] == 3 * entry_size <= 1600 * 0.9
+
+
+def test_variants_never_collide(tmp_path):
+    cache = AnalysisResultCache("v1", disk_dir=str(tmp_path / "cache"))
+    cache.put("same-sha", _result(120.0), variant="prefix")
+    cache.put("same-sha", _result(126.0), variant="full")
+
+    assert cache.make_key("same-sha", "prefix") != cache.make_key("same-sha", "full")
+    assert cache.get("same-sha", variant="prefix")["audio_features"]["tempo"] == 120.0
+    assert cache.get("same-sha", variant="full")["audio_features"]["tempo"] == 126.0
+    assert cache.get("same-sha", variant="segments") is None
+
+    # 디스크 계층에서도 분석 방식별로 따로 저장됨
+    reopened = AnalysisResultCache("v1", disk_dir=str(tmp_path / "cache"))
+    assert reopened.get("same-sha", variant="full")["audio_features"]["tempo"] == 126.0
+    assert reopened.get("same-sha")["audio_features"]["tempo"] == 120.0
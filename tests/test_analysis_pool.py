@@ -0,0 +1,69 @@
+import asyncio
+import signal
+import time
+
+import pytest
+
+from app.services.analysis_pool import AnalysisPool, AnalysisTimeoutError
+
+
+def _sleep_job(seconds, token=None):
+    time.sleep(seconds)
+    return seconds
+
+
+def _stuck_job(seconds, token=None):
+    """제한 시간 타이머(SIGALRM)를 막고 멈춘 작업 (C 코드 안에서 멈춘 경우처럼)"""
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+    time.sleep(seconds)
+    return seconds
+
+
+def _run(pool, coroutine_factory):
+    async def main():
+        try:
+            return await coroutine_factory()
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_timed_out_job_releases_its_worker():
+    pool = AnalysisPool(workers=1, max_queue=1, job_timeout=0.5)
+
+    async def scenario():
+        await pool.start()
+        started = time.perf_counter()
+        with pytest.raises(AnalysisTimeoutError):
+            await pool._submit(_sleep_job, (30.0,), None)
+        # 유일한 워커가 30초 작업에 묶여 있지 않고 바로 다음 작업을 실행
+        assert await pool._submit(_sleep_job, (0.01,), None, timeout=5) == 0.01
+        return time.perf_counter() - started
+
+    elapsed = _run(pool, scenario)
+    assert elapsed < 5
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["killed_workers"] == 0
+    assert stats["completed"] == 1 and stats["pending"] == 0
+
+
+@pytest.mark.skipif(not hasattr(signal, "pthread_sigmask"), reason="POSIX only")
+def test_stuck_job_worker_is_killed_and_pool_restarts():
+    pool = AnalysisPool(workers=1, max_queue=1, job_timeout=0.5, overrun_grace=0.2)
+
+    async def scenario():
+        await pool.start()
+        with pytest.raises(AnalysisTimeoutError):
+            await pool._submit(_stuck_job, (30.0,), None)
+        # 워커가 종료되고 풀이 내려갈 때까지 기다린 뒤 다음 작업은 새 풀에서 실행
+        deadline = time.monotonic() + 10
+        while pool._executor is not None:
+            assert time.monotonic() < deadline
+            await asyncio.sleep(0.05)
+        return await pool._submit(_sleep_job, (0.01,), None, timeout=60)
+
+    assert _run(pool, scenario) == 0.01
+    stats = pool.stats()
+    assert stats["killed_workers"] == 1 and stats["restarts"] == 1
+    assert stats["pending"] == 0
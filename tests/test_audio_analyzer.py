@@ -0,0 +1,28 @@
+import pytest
+
+from app.services.audio_analyzer_simple import AudioAnalyzer
+from tests.test_audio_feature_graph import SR, _bursts, _chord
+
+
+def test_analyze_signal_reports_tempo_key_and_mode():
+    # A minor 화음 위에 120 BPM 버스트
+    y = _chord([57, 60, 64, 69], duration=20.0, amplitude=0.3) + _bursts(120)
+    stages = []
+
+    result = AudioAnalyzer().analyze_signal(
+        y, SR, progress=lambda stage, partial: stages.append(stage)
+    )
+
+    assert stages == ["features", "key_tempo"]
+    assert result["tempo"] == pytest.approx(120, rel=0.05)
+    assert (result["key"], result["mode"]) == (9, 0)
+    assert result["duration_ms"] == 20000
+    for name in ("danceability", "energy", "valence"):
+        assert 0.0 <= result[name] <= 1.0
+
+
+def test_analyze_signal_without_audio_uses_defaults():
+    result = AudioAnalyzer().analyze_signal(None, SR)
+
+    assert (result["key"], result["mode"]) == (0, 1)
+    assert result["danceability"] == result["energy"] == result["valence"] == 0.5
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.services.audio_decoders import (
+    FFmpegPCMStream,
+    PCMBuffer,
+    find_ffmpeg,
+    iter_pcm_blocks,
+)
+
+SR = 44100
+
+requires_ffmpeg = pytest.mark.skipif(find_ffmpeg() is None, reason="ffmpeg 없음")
+
+
+@pytest.fixture
+def stereo_wav(tmp_path):
+    """왼쪽/오른쪽 채널이 다른 2초 16비트 스테레오 WAV와 soundfile 모노 기준값"""
+    t = np.arange(2 * SR) / SR
+    left = 0.5 * np.sin(2 * np.pi * 440 * t)
+    right = 0.25 * np.sin(2 * np.pi * 660 * t)
+    path = str(tmp_path / "stereo.wav")
+    sf.write(path, np.stack([left, right], axis=1), SR, subtype="PCM_16")
+    reference, sr = sf.read(path, dtype="float32")
+    assert sr == SR and reference.shape == (2 * SR, 2)
+    return path, reference.mean(axis=1)
+
+
+@requires_ffmpeg
+def test_ffmpeg_pipe_decodes_wav_to_mono_float32(stereo_wav):
+    path, reference = stereo_wav
+    stream = FFmpegPCMStream(SR, duration=30)
+    with open(path, "rb") as f:
+        # 헤더가 잘리도록 작은 조각으로 나눠 파이프에 넣음
+        while chunk := f.read(3001):
+            if not stream.feed(chunk):
+                break
+    y = stream.finish()
+
+    assert y.dtype == np.float32 and y.ndim == 1
+    assert len(y) == len(reference)
+    np.testing.assert_allclose(y, reference, atol=1e-3)
+
+
+@requires_ffmpeg
+def test_ffmpeg_pipe_stops_at_duration_and_resamples(stereo_wav):
+    path, _ = stereo_wav
+    stream = FFmpegPCMStream(22050, duration=1.0)
+    with open(path, "rb") as f:
+        while chunk := f.read(64 * 1024):
+            if not stream.feed(chunk):
+                break
+    y = stream.finish()
+
+    assert y.dtype == np.float32
+    assert len(y) == 22050
+
+
+def test_pcm_buffer_downmixes_int16_split_across_frames(stereo_wav):
+    path, reference = stereo_wav
+    raw = sf.read(path, dtype="int16")[0].tobytes()  # 인터리브 정수 PCM
+
+    buffer = PCMBuffer(max_frames=2 * SR, channels=2, sr=SR)
+    # 프레임(4바이트) 경계와 어긋나게 나눠 넣어도 남은 바이트를 이어 붙임
+    for start in range(0, len(raw), 1001):
+        buffer.append_int(raw[start : start + 1001], sample_width=2)
+    y, sr = buffer.finish()
+
+    assert sr == SR and buffer.full
+    assert y.dtype == np.float32 and len(y) == len(reference)
+    np.testing.assert_allclose(y, reference, atol=1e-6)
+
+
+def test_pcm_buffer_float_blocks_truncate_and_resample(stereo_wav):
+    path, reference = stereo_wav
+    buffer = PCMBuffer(max_frames=SR, channels=2, sr=SR)
+    with sf.SoundFile(path) as f:
+        for block in f.blocks(blocksize=4096, dtype="float32"):
+            buffer.append_float(block)
+
+    # 최대 프레임(1초)을 넘는 샘플은 버림
+    y, sr = buffer.finish()
+    assert len(y) == SR
+    np.testing.assert_allclose(y, reference[:SR], atol=1e-6)
+
+    resampled, sr = buffer.finish(sample_rate=22050)
+    assert sr == 22050 and len(resampled) == 22050
+    assert resampled.dtype == np.float32
+
+
+def test_iter_pcm_blocks_covers_the_whole_file(stereo_wav):
+    path, reference = stereo_wav
+    sr, blocks = iter_pcm_blocks(path, SR, block_duration=0.5)
+    decoded = np.concatenate([block.copy() for block in blocks])
+
+    assert sr == SR
+    assert decoded.dtype == np.float32
+    assert len(decoded) == len(reference)
+    np.testing.assert_allclose(decoded, reference, atol=1e-3)
@@ -0,0 +1,141 @@
+import librosa
+import numpy as np
+import pytest
+
+from app.services.audio_feature_graph import (
+    MAJOR_KEY_PROFILE,
+    MINOR_KEY_PROFILE,
+    AudioFeatureGraph,
+    estimate_key_from_chroma,
+)
+
+SR = 22050
+
+
+def _bursts(bpm: float, duration: float = 20.0, seed: int = 0) -> np.ndarray:
+    """bpm 간격의 짧은 노이즈 버스트 (광대역이라 멜 밴드 중앙값에도 온셋이 보임)"""
+    rng = np.random.default_rng(seed)
+    y = np.zeros(int(SR * duration), dtype=np.float32)
+    length = int(0.05 * SR)
+    envelope = np.exp(-np.arange(length) / (0.01 * SR))
+    for start in np.arange(0.5, duration - 0.1, 60.0 / bpm):
+        i = int(start * SR)
+        y[i : i + length] += rng.standard_normal(length) * envelope * 0.5
+    return y
+
+
+def _chord(midi_notes, duration: float = 10.0, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(SR * duration)) / SR
+    y = sum(np.sin(2 * np.pi * librosa.midi_to_hz(note) * t) for note in midi_notes)
+    return (y / len(midi_notes) * amplitude).astype(np.float32)
+
+
+@pytest.mark.parametrize("bpm", [90, 120, 140])
+def test_tempo_matches_per_feature_beat_track(bpm):
+    y = _bursts(bpm)
+    graph = AudioFeatureGraph(y, SR)
+
+    # 그래프 이전의 특징별 계산과 같은 값
+    expected, _ = librosa.beat.beat_track(y=y, sr=SR)
+    assert graph.tempo == pytest.approx(float(np.atleast_1d(expected)[0]))
+    assert graph.tempo == pytest.approx(bpm, rel=0.05)
+    assert len(graph.beats) > 0
+
+
+def test_segment_batch_tempo_is_median_of_segments():
+    segments = np.stack([_bursts(120, 10.0, seed) for seed in range(3)])
+    graph = AudioFeatureGraph(segments, SR)
+
+    assert graph.segment_count == 3
+    assert graph.duration == pytest.approx(30.0)
+    assert graph.tempo == pytest.approx(120, rel=0.05)
+
+
+@pytest.mark.parametrize(
+    "notes, key, mode",
+    [
+        ([60, 64, 67, 72], 0, 1),  # C major
+        ([55, 59, 62, 67], 7, 1),  # G major
+        ([62, 66, 69, 74], 2, 1),  # D major
+        ([57, 60, 64, 69], 9, 0),  # A minor
+        ([52, 55, 59, 64], 4, 0),  # E minor
+    ],
+)
+def test_key_mode_from_chord(notes, key, mode):
+    graph = AudioFeatureGraph(_chord(notes), SR)
+
+    estimated_key, estimated_mode, correlation = graph.key_mode
+    assert (estimated_key, estimated_mode) == (key, mode)
+    assert correlation > 0.5
+
+    # 그래프 이전처럼 신호에서 직접 계산한 크로마와 같음
+    expected = librosa.feature.chroma_stft(y=graph.y, sr=SR).mean(axis=1)
+    np.testing.assert_allclose(graph.chroma_mean, expected, rtol=1e-5)
+
+
+def test_silence_defaults_to_c_major():
+    graph = AudioFeatureGraph(np.zeros(SR * 6, dtype=np.float32), SR)
+
+    assert graph.key_mode == (0, 1, 0.0)
+
+
+def test_rms_mean_of_sine():
+    y = _chord([69], duration=5.0, amplitude=0.5)
+    graph = AudioFeatureGraph(y, SR)
+
+    assert graph.rms_mean == pytest.approx(
+        float(librosa.feature.rms(y=y).mean()), rel=1e-6
+    )
+    # 진폭 A인 사인파의 RMS는 A / sqrt(2)
+    assert graph.rms_mean == pytest.approx(0.5 / np.sqrt(2), rel=0.01)
+    assert graph.summarize(["rms_mean", "duration"]) == {
+        "rms_mean": graph.rms_mean,
+        "duration": pytest.approx(5.0),
+    }
+
+
+def _scale_chroma(tonic: int, scale, triad) -> np.ndarray:
+    """음계 음에 작은 값, 으뜸화음 음에 큰 값을 준 합성 크로마"""
+    chroma = np.full(12, 0.05)
+    chroma[[(tonic + step) % 12 for step in scale]] = 0.4
+    chroma[[(tonic + step) % 12 for step in triad]] = 1.0
+    return chroma
+
+
+MAJOR_SCALE = (0, 2, 4, 5, 7, 9, 11)
+MINOR_SCALE = (0, 2, 3, 5, 7, 8, 10)
+
+
+@pytest.mark.parametrize(
+    "chroma, key, mode",
+    [
+        (_scale_chroma(0, MAJOR_SCALE, (0, 4, 7)), 0, 1),  # C major
+        (_scale_chroma(9, MINOR_SCALE, (0, 3, 7)), 9, 0),  # A minor (같은 음계)
+        (_scale_chroma(7, MAJOR_SCALE, (0, 4, 7)), 7, 1),  # G major
+        (_scale_chroma(4, MINOR_SCALE, (0, 3, 7)), 4, 0),  # E minor
+    ],
+)
+def test_estimate_key_from_synthetic_chroma(chroma, key, mode):
+    found_key, found_mode, correlation = estimate_key_from_chroma(chroma)
+
+    assert (found_key, found_mode) == (key, mode)
+    assert 0.5 < correlation <= 1.0
+
+
+@pytest.mark.parametrize("key", range(12))
+def test_rotated_profiles_map_to_their_key(key):
+    assert estimate_key_from_chroma(np.roll(MAJOR_KEY_PROFILE, key)) == pytest.approx(
+        (key, 1, 1.0)
+    )
+    assert estimate_key_from_chroma(np.roll(MINOR_KEY_PROFILE, key)) == pytest.approx(
+        (key, 0, 1.0)
+    )
+
+
+@pytest.mark.parametrize(
+    "chroma",
+    [np.zeros(12), np.full(12, 0.3), np.ones(6), [0.1] * 12],
+    ids=["silent", "flat", "wrong-shape", "flat-list"],
+)
+def test_estimate_key_without_tonal_content_falls_back_to_c_major(chroma):
+    assert estimate_key_from_chroma(chroma) == (0, 1, 0.0)
@@ -0,0 +1,139 @@
+import gc
+import threading
+
+from spotipy import SpotifyException
+
+from app.services.audio_features_loader import AudioFeaturesLoader
+from app.services.spotify_clients import SpotifyClientManager
+
+
+class FakeAudioFeatures:
+    """호출된 ID 묶음을 기록하는 가짜 sp.audio_features"""
+
+    def __init__(self, bad_ids=(), error=None):
+        self.calls = []
+        self.bad_ids = set(bad_ids)
+        self.error = error
+        self._lock = threading.Lock()
+
+    def __call__(self, track_ids):
+        with self._lock:
+            self.calls.append(list(track_ids))
+        if self.error is not None:
+            raise self.error
+        if self.bad_ids & set(track_ids):
+            raise SpotifyException(400, -1, "invalid request")
+        return [{"id": track_id, "energy": 0.5} for track_id in track_ids]
+
+
+def _run_concurrently(*targets):
+    results = [None] * len(targets)
+    start = threading.Barrier(len(targets))
+
+    def run(index, target):
+        start.wait()
+        results[index] = target()
+
+    threads = [
+        threading.Thread(target=run, args=(index, target))
+        for index, target in enumerate(targets)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_requests_in_window_share_one_fetch():
+    fetch = FakeAudioFeatures()
+    loader = AudioFeaturesLoader(fetch, batch_window=0.2)
+
+    first, second = _run_concurrently(
+        lambda: loader.load_many(["a", "b"]), lambda: loader.load_many(["b", "c"])
+    )
+
+    assert len(fetch.calls) == 1
+    assert sorted(fetch.calls[0]) == ["a", "b", "c"]
+    assert set(first[0]) == {"a", "b"} and first[1] == {}
+    assert set(second[0]) == {"b", "c"} and second[1] == {}
+    assert loader.stats()["coalesced_ids"] == 1
+
+
+def test_batches_over_100_ids_are_split():
+    fetch = FakeAudioFeatures()
+    loader = AudioFeaturesLoader(fetch, batch_window=0)
+    track_ids = [f"t{i}" for i in range(250)]
+
+    features, errors = loader.load_many(track_ids + track_ids[:10])
+
+    assert [len(call) for call in fetch.calls] == [100, 100, 50]
+    assert set(features) == set(track_ids)
+    assert errors == {}
+
+
+def test_bad_request_is_bisected_to_the_bad_id():
+    fetch = FakeAudioFeatures(bad_ids={"t5"})
+    loader = AudioFeaturesLoader(fetch, batch_window=0)
+    track_ids = [f"t{i}" for i in range(8)]
+
+    features, errors = loader.load_many(track_ids)
+
+    assert set(features) == set(track_ids) - {"t5"}
+    assert list(errors) == ["t5"]
+    assert errors["t5"].http_status == 400
+    # 8 -> 4 -> 2 -> 1로 나눠 잘못된 ID 하나만 실패
+    assert ["t5"] in fetch.calls
+    assert len(fetch.calls) == 7
+
+
+def test_failed_call_marks_every_id_in_the_batch():
+    error = SpotifyException(503, -1, "unavailable")
+    loader = AudioFeaturesLoader(FakeAudioFeatures(error=error), batch_window=0)
+
+    features, errors = loader.load_many(["a", "b"])
+
+    assert features == {}
+    assert errors == {"a": error, "b": error}
+    assert loader.stats()["failed_calls"] == 1
+
+
+def test_waiters_time_out_when_the_leading_fetch_is_late():
+    fetch = FakeAudioFeatures()
+    loader = AudioFeaturesLoader(fetch, batch_window=0.5, timeout=0.05)
+    leading = {}
+    leader = threading.Thread(target=lambda: leading.update(loader.load_many(["a"])[0]))
+    leader.start()
+    # 리더가 묶음을 만든 뒤, 창이 닫히기 전에 같은 묶음에 합류
+    while loader.stats()["requests"] == 0:
+        threading.Event().wait(0.001)
+
+    features, errors = loader.load_many(["a", "b"])
+    leader.join()
+
+    assert features == {}
+    assert set(errors) == {"a", "b"}
+    assert all(isinstance(error, TimeoutError) for error in errors.values())
+    # 리더는 제한 시간과 상관없이 자기가 실행한 묶음의 결과를 받음
+    assert set(leading) == {"a"}
+    assert len(fetch.calls) == 1
+
+
+def test_features_loaders_are_released_with_evicted_user_clients():
+    manager = SpotifyClientManager("id", "secret", max_user_clients=2)
+    for index in range(10):
+        manager.features_loader(manager.user_client(f"token-{index}"))
+    gc.collect()
+
+    assert len(manager._user_clients) == 2
+    assert len(manager._features_loaders) == 2
+
+
+def test_features_loader_is_shared_per_client():
+    manager = SpotifyClientManager("id", "secret")
+    client = manager.user_client("token")
+
+    assert manager.features_loader(client) is manager.features_loader(client)
+    assert manager.features_loader(client) is not manager.features_loader(
+        manager.user_client("other")
+    )
@@ -0,0 +1,166 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from app.services.catalog_crawler import CatalogCrawler, RequestBudget, iter_crawl_rows
+from app.services.feature_store import AudioFeatureStore
+from app.services.spotify_clients import SpotifyClientManager
+from app.services.spotify_service import SpotifyService
+from app.tools.mock_spotify import MockSpotifyData, MockSpotifyServer
+
+TRACK_COUNT = 3000
+PLAYLISTS = [f"mockplaylist{number}" for number in range(4)]
+QUERIES = ["love", "night"]
+ARTISTS = ["mockartist000000000007"]
+# 없는 트랙 ID (Spotify가 null을 돌려줌) 포함
+TRACK_IDS = [MockSpotifyData.track_id(index) for index in (2500, 2596, 2999)] + [
+    "mocktrack9999999999999"
+]
+
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(error_every=0):
+        server = MockSpotifyServer(
+            ("127.0.0.1", 0), MockSpotifyData(TRACK_COUNT), error_every=error_every
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _urls(server):
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return f"{base}/v1/", f"{base}/api/token"
+
+
+def _crawler(server, tmp_path, name, budget=None):
+    api_url, token_url = _urls(server)
+    client_manager = SpotifyClientManager(
+        "mock", "mock", api_url=api_url, token_url=token_url
+    )
+    service = SpotifyService(
+        client_manager=client_manager,
+        feature_store=AudioFeatureStore(sqlite_path=str(tmp_path / f"{name}.db")),
+    )
+    crawler = CatalogCrawler(
+        service, str(tmp_path / name), budget=budget or RequestBudget(rate=0)
+    )
+    crawler.add_seeds(
+        playlists=PLAYLISTS, queries=QUERIES, artists=ARTISTS, track_ids=TRACK_IDS
+    )
+    return crawler
+
+
+def _exported_ids(crawler, tmp_path, name):
+    path = str(tmp_path / f"{name}.npz")
+    crawler.export(path)
+    ids = [track_id for track_id, _, _ in iter_crawl_rows(path)]
+    assert len(ids) == len(set(ids))
+    return ids
+
+
+@pytest.fixture
+def expected(start_server, tmp_path):
+    """중단 없이 한 번에 수집한 결과"""
+    crawler = _crawler(start_server(), tmp_path, "expected")
+    assert crawler.run()["stop_reason"] == "finished"
+    ids = _exported_ids(crawler, tmp_path, "expected")
+    skipped = crawler._state["skipped"]
+    # 특성이 null인 곡(97번째마다)과 없는 ID만 건너뜀
+    for track_id in skipped:
+        index = MockSpotifyData(TRACK_COUNT).index_of(track_id)
+        assert index is None or index % 97 == 96, track_id
+    assert "mocktrack9999999999999" in skipped
+    assert len(ids) > 1000
+    return set(ids), set(skipped)
+
+
+def test_budget_interrupted_runs_resume_without_loss(start_server, tmp_path, expected):
+    server = start_server()
+    runs = 0
+    while True:
+        runs += 1
+        crawler = _crawler(
+            server, tmp_path, "resumed", budget=RequestBudget(rate=0, max_requests=7)
+        )
+        if crawler.run()["stop_reason"] == "finished":
+            break
+    assert runs > 3
+    assert set(_exported_ids(crawler, tmp_path, "resumed")) == expected[0]
+    assert set(crawler._state["skipped"]) == expected[1]
+
+
+def test_transient_errors_are_retried(start_server, tmp_path, expected):
+    server = start_server(error_every=5)
+    crawler = _crawler(server, tmp_path, "flaky")
+    result = crawler.run()
+
+    assert result["stop_reason"] == "finished"
+    assert result["errors"] > 0 and result["retrying_tracks"] == 0
+    assert server.counts["errors"] > 0
+    assert set(_exported_ids(crawler, tmp_path, "flaky")) == expected[0]
+    assert set(crawler._state["skipped"]) == expected[1]
+
+
+def test_killed_crawl_resumes_without_loss(start_server, tmp_path, expected):
+    server = start_server()
+    api_url, token_url = _urls(server)
+    state_dir = tmp_path / "killed"
+    env = {
+        **os.environ,
+        "SPOTIFY_CLIENT_ID": "mock",
+        "SPOTIFY_CLIENT_SECRET": "mock",
+        "SPOTIFY_API_URL": api_url,
+        "SPOTIFY_TOKEN_URL": token_url,
+        "FEATURE_STORE_SQLITE_PATH": str(tmp_path / "killed.db"),
+    }
+    env.pop("DATABASE_URL", None)
+    command = [sys.executable, "-m", "app.tools.crawl", "--state-dir", str(state_dir)]
+    seeds = [arg for playlist in PLAYLISTS for arg in ("--playlist", playlist)] + [
+        arg for query in QUERIES for arg in ("--search", query)
+    ]
+    process = subprocess.Popen(
+        command + ["run", "--rate", "20"] + seeds,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        # 곡이 기록되기 시작하면 강제 종료 (state.json 기록 전에 죽을 수 있음)
+        deadline = time.monotonic() + 30
+        while True:
+            assert time.monotonic() < deadline, "crawl did not start"
+            assert process.poll() is None, "crawl finished before it was killed"
+            rows_path = state_dir / "rows.jsonl"
+            if rows_path.exists() and rows_path.stat().st_size > 0:
+                break
+            time.sleep(0.005)
+        process.send_signal(signal.SIGKILL)
+    finally:
+        process.wait(10)
+
+    # 쓰다 만 곡 줄이 남은 경우
+    with open(state_dir / "rows.jsonl", "ab") as f:
+        f.write(b'{"id": "mocktrack00000')
+    with open(state_dir / "state.json", "r", encoding="utf-8") as f:
+        interrupted = json.load(f)
+    assert interrupted["rows"] < len(expected[0])
+
+    crawler = _crawler(server, tmp_path, "killed")
+    assert crawler.run()["stop_reason"] == "finished"
+    assert set(_exported_ids(crawler, tmp_path, "killed")) == expected[0]
+    assert set(crawler._state["skipped"]) == expected[1]
@@ -0,0 +1,94 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.services.catalog_shards import CatalogShardPool
+from app.services.track_catalog import CATALOG_FEATURES, TrackCatalog, build_catalog
+from benchmarks.ann_recall import make_queries, synthetic_rows
+
+TRACKS = 3000
+
+
+@pytest.fixture
+def catalog_dir(tmp_path):
+    catalog_dir = str(tmp_path / "catalog")
+    build_catalog(catalog_dir, synthetic_rows(TRACKS))
+    return catalog_dir
+
+
+@pytest.fixture
+def shard_pool(catalog_dir):
+    pool = CatalogShardPool(catalog_dir, shards=2, min_tracks=0)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def _ids(tracks):
+    return [track["id"] for track in tracks]
+
+
+def _assert_same_results(sharded, single):
+    assert _ids(sharded) == _ids(single)
+    assert [track["similarity"] for track in sharded] == pytest.approx(
+        [track["similarity"] for track in single], abs=1e-4
+    )
+
+
+def test_sharded_exact_search_matches_single_thread(catalog_dir, shard_pool):
+    sharded = TrackCatalog(catalog_dir, nprobe=0, shard_pool=shard_pool)
+    single = TrackCatalog(catalog_dir, nprobe=0)
+    assert sharded.available and single.available
+
+    # 질의 근처에 빌드 후 추가된 곡(delta)을 넣어 합친 결과에도 섞이게 함
+    targets = make_queries(single, 10, seed=5)
+    added = [
+        (
+            f"delta{index:017d}",
+            {
+                name: value + 0.002 * (index % 3 + 1)
+                for name, value in target.items()
+                if name in CATALOG_FEATURES
+            },
+            {"name": f"Delta {index}", "artists": ["Synthetic"]},
+        )
+        for index, target in enumerate(targets)
+    ]
+    assert sharded.add_tracks(added) == len(added)
+
+    for target in targets:
+        expected = single.search(target, k=10)
+        assert any(track_id.startswith("delta") for track_id in _ids(expected))
+        _assert_same_results(sharded.search(target, k=10), expected)
+        _assert_same_results(
+            sharded.search(target, k=10, max_instrumentalness=0.3),
+            single.search(target, k=10, max_instrumentalness=0.3),
+        )
+
+    stats = shard_pool.stats()
+    assert stats["scans"] == 2 * len(targets)
+    assert stats["fallbacks"] == stats["timeouts"] == 0
+
+
+def test_pool_starts_lazily_once_catalog_is_large_enough(catalog_dir):
+    pool = CatalogShardPool(catalog_dir, shards=2, min_tracks=TRACKS + 1)
+    catalog = TrackCatalog(catalog_dir, nprobe=0, shard_pool=pool)
+    assert catalog.available
+    target = make_queries(catalog, 1)[0]
+    try:
+        # 곡 수가 min_tracks 미만이면 워커를 띄우지 않고 직접 계산
+        assert catalog.search(target, k=5)
+        assert not pool.ready and not pool._starting
+
+        pool.min_tracks = TRACKS
+        # 첫 검색은 워커를 띄우는 동안 직접 계산하고, 준비된 뒤부터 나눠 계산
+        first = catalog.search(target, k=5)
+        deadline = time.monotonic() + 60
+        while not pool.ready and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert pool.ready
+        _assert_same_results(catalog.search(target, k=5), first)
+        assert pool.stats()["scans"] == 1
+    finally:
+        pool.shutdown()
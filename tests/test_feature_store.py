@@ -0,0 +1,50 @@
+from sqlalchemy import Float
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.models.database import AudioFeatures
+from app.services.feature_store import AudioFeatureStore
+
+SPOTIFY_FEATURES = {
+    "id": "4uLU6hMCjMI75M1A2tKUQC",
+    "danceability": 0.735,
+    "energy": 0.578,
+    "valence": 0.624,
+    "tempo": 118.211,
+    "key": 5,
+    "mode": 0,
+    "loudness": -11.84,
+    "acousticness": 0.0142,
+    "instrumentalness": 0.000102,
+    "speechiness": 0.0461,
+    "liveness": 0.159,
+}
+
+
+def test_feature_columns_are_not_fixed_point():
+    table = AudioFeatures.__table__
+    for column in (
+        "danceability",
+        "energy",
+        "valence",
+        "tempo",
+        "loudness",
+        "acousticness",
+        "instrumentalness",
+        "speechiness",
+        "liveness",
+    ):
+        assert isinstance(table.c[column].type, Float), column
+
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    assert "NUMERIC" not in ddl
+
+
+def test_put_many_get_many_keeps_spotify_precision(tmp_path):
+    store = AudioFeatureStore(sqlite_path=str(tmp_path / "features.db"))
+    assert store.put_many([SPOTIFY_FEATURES]) == 1
+
+    stored = store.get_many([SPOTIFY_FEATURES["id"]])[SPOTIFY_FEATURES["id"]]
+    for key, value in SPOTIFY_FEATURES.items():
+        assert stored[key] == value, key
+    assert list(store.iter_all()) == [stored]
@@ -0,0 +1,81 @@
+import json
+import os
+
+import numpy as np
+
+from app.services.fingerprint import (
+    FINGERPRINT_SAMPLE_RATE,
+    PARTITION_SHIFT,
+    FingerprintIndex,
+    FingerprintIndexBuilder,
+    extract_landmarks,
+)
+
+
+def _hashes(*values):
+    hashes = np.array(values, dtype=np.uint32)
+    return hashes, np.arange(len(hashes), dtype=np.uint32)
+
+
+def _write_orphan_postings(builder, track_id, hashes):
+    """add_track이 게시 목록만 쓰고 곡 줄을 남기기 전에 중단된 상태"""
+    for value in hashes:
+        record = np.array([[value, track_id, 0]], dtype=np.uint32)
+        with open(builder._partition_path(int(value) >> PARTITION_SHIFT), "ab") as f:
+            record.tofile(f)
+
+
+def test_orphan_postings_are_dropped_on_reopen(tmp_path):
+    index_dir = str(tmp_path)
+    _write_orphan_postings(FingerprintIndexBuilder(index_dir), 0, [5, 6, 7])
+
+    builder = FingerprintIndexBuilder(index_dir)
+    assert builder.add_track(*_hashes(5), {"title": "new", "sha256": "a"}) == 0
+    meta = builder.build()
+
+    assert meta["tracks"] == 1
+    assert meta["postings"] == 1
+
+
+def test_torn_record_does_not_misalign_later_tracks(tmp_path):
+    index_dir = str(tmp_path)
+    builder = FingerprintIndexBuilder(index_dir)
+    builder.add_track(*_hashes(1, 2), {"title": "first", "sha256": "a"})
+    # 레코드(12바이트) 중간에서 끊긴 쓰기
+    with open(builder._partition_path(0), "ab") as f:
+        f.write(b"\x09\x00\x00\x00\x01")
+    with open(builder._tracks_path, "a", encoding="utf-8") as f:
+        f.write('{"title": "torn"')
+
+    builder = FingerprintIndexBuilder(index_dir)
+    assert builder.track_count == 1
+    builder.add_track(*_hashes(3, 4), {"title": "second", "sha256": "b"})
+    builder.build()
+
+    index = FingerprintIndex(index_dir)
+    index._ensure_loaded()
+    assert list(index._bucket_offsets[:6]) == [0, 0, 1, 2, 3, 4]
+    assert list(index._posting_tracks) == [0, 0, 1, 1]
+    with open(os.path.join(index_dir, "tracks.json"), encoding="utf-8") as f:
+        assert [track["title"] for track in json.load(f)] == ["first", "second"]
+
+
+def test_lookup_finds_reference_track_from_excerpt(tmp_path):
+    sr = FINGERPRINT_SAMPLE_RATE
+    rng = np.random.default_rng(0)
+    songs = [rng.standard_normal(sr * 20).astype(np.float32) for _ in range(3)]
+
+    builder = FingerprintIndexBuilder(str(tmp_path))
+    for number, y in enumerate(songs):
+        builder.add_track(
+            *extract_landmarks(y, sr),
+            {"title": f"song {number}", "sha256": str(number)},
+        )
+    builder.build()
+
+    index = FingerprintIndex(str(tmp_path), min_matches=5)
+    match = index.lookup(songs[1][sr * 5 : sr * 15], sr)
+    assert match is not None
+    assert match.track["title"] == "song 1"
+    assert "partitions" not in match.track
+    assert abs(match.offset_seconds - 5.0) < 0.1
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from app.services.track_catalog import (
+    CATALOG_FEATURES,
+    SIMILARITY_WEIGHTS,
+    TrackCatalog,
+    build_catalog,
+    build_catalog_index,
+)
+from benchmarks.ann_recall import make_queries, synthetic_rows
+
+TRACKS = 3000
+NLIST = 24
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog_dir = str(tmp_path / "catalog")
+    build_catalog(catalog_dir, synthetic_rows(TRACKS))
+    build_catalog_index(catalog_dir, nlist=NLIST)
+    catalog = TrackCatalog(catalog_dir)
+    assert catalog.available and catalog.ivf.nlist == NLIST
+    return catalog
+
+
+def _ids(tracks):
+    return [track["id"] for track in tracks]
+
+
+def _assert_same_results(approximate, exact):
+    assert _ids(approximate) == _ids(exact)
+    assert [track["similarity"] for track in approximate] == pytest.approx(
+        [track["similarity"] for track in exact], abs=1e-4
+    )
+
+
+def test_full_probe_matches_exact_search(catalog):
+    for target in make_queries(catalog, 40):
+        _assert_same_results(
+            catalog.search(target, k=10, nprobe=NLIST),
+            catalog.search(target, k=10, nprobe=0),
+        )
+
+
+def test_full_probe_matches_exact_search_with_partial_target_and_filter(catalog):
+    for target in make_queries(catalog, 20, seed=2):
+        partial = {name: target[name] for name in ("danceability", "energy", "tempo")}
+        _assert_same_results(
+            catalog.search(partial, k=10, nprobe=NLIST),
+            catalog.search(partial, k=10, nprobe=0),
+        )
+        _assert_same_results(
+            catalog.search(target, k=10, max_instrumentalness=0.3, nprobe=NLIST),
+            catalog.search(target, k=10, max_instrumentalness=0.3, nprobe=0),
+        )
+
+
+def test_exact_search_ranks_every_row(catalog):
+    """_exact_search 상위 결과가 전체 점수의 정렬 결과와 같음 (비교 기준 확인)"""
+    target = make_queries(catalog, 1, seed=3)[0]
+    found = catalog.search(target, k=5, nprobe=0)
+
+    vectors = np.stack([catalog._row_vector(row) for row in range(TRACKS)])
+    scale = np.array(
+        [1.0 / 200.0 if name == "tempo" else 1.0 for name in CATALOG_FEATURES]
+    )
+    weights = np.array([SIMILARITY_WEIGHTS[name] for name in CATALOG_FEATURES])
+    query = np.array([target[name] for name in CATALOG_FEATURES])
+    penalty = np.minimum(np.abs(vectors - query) * scale, 1.0) @ weights
+    expected = [catalog._row_id(int(row)) for row in np.argsort(penalty)[:5]]
+    assert _ids(found) == expected
+
+
+def test_added_tracks_are_found(catalog):
+    base = catalog._row_vector(0).astype(np.float64)
+    added = []
+    for offset in range(3):
+        vector = base + 0.001 * (offset + 1)
+        added.append(
+            (
+                f"added{offset:017d}",
+                dict(zip(CATALOG_FEATURES, vector.tolist())),
+                {"name": f"Added {offset}", "artists": ["Synthetic"]},
+            )
+        )
+    assert catalog.add_tracks(added) == 3
+    assert catalog.track_count == TRACKS + 3
+    # 다시 추가해도 중복되지 않음
+    assert catalog.add_tracks(added) == 0
+
+    for track_id, features, metadata in added:
+        nearest = catalog.search(features, k=1, nprobe=1)
+        assert _ids(nearest) == [track_id]
+        assert nearest[0]["name"] == metadata["name"]
+        assert nearest[0]["similarity"] == pytest.approx(100.0, abs=1e-3)
+
+    target = dict(zip(CATALOG_FEATURES, base.tolist()))
+    full_probe = catalog.search(target, k=10, nprobe=NLIST)
+    _assert_same_results(full_probe, catalog.search(target, k=10, nprobe=0))
+    assert {track_id for track_id, _, _ in added} <= set(_ids(full_probe))
+
+    # 새로 연 카탈로그(다른 프로세스)도 추가된 곡을 IVF 역리스트에 배정해 찾음
+    reopened = TrackCatalog(catalog.catalog_dir)
+    _assert_same_results(
+        reopened.search(target, k=10, nprobe=NLIST),
+        reopened.search(target, k=10, nprobe=0),
+    )
+    assert reopened.ivf.added_count == 3
@@ -0,0 +1,189 @@
+import threading
+import time
+
+import pytest
+
+from app.services.recommendation_cache import RecommendationCache, quantize_features
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _counting(value):
+    calls = []
+
+    def compute():
+        calls.append(threading.current_thread().name)
+        return value
+
+    return compute, calls
+
+
+def test_quantize_puts_bucket_boundaries_in_the_upper_bucket():
+    quantized = quantize_features(
+        {
+            "danceability": 0.15,
+            "energy": 0.1,
+            "valence": 0.0,
+            "acousticness": 0.149,
+            "liveness": 1.0,
+            "tempo": 120.0,
+            "loudness": -11.84,
+            "key": 5,
+            "mode": 1.0,
+            "speechiness": None,
+        }
+    )
+    assert quantized == {
+        "danceability": 0.175,
+        "energy": 0.125,
+        "valence": 0.025,
+        "acousticness": 0.125,
+        "liveness": 1.025,
+        "tempo": 122.0,
+        "loudness": -11.5,
+        "key": 5,
+        "mode": 1,
+    }
+
+
+def test_fresh_then_stale_then_expired():
+    clock = FakeClock()
+    cache = RecommendationCache(ttl=10, stale_ttl=20, clock=clock)
+    compute, compute_calls = _counting(["first"])
+    assert cache.get_or_compute("k", compute) == ["first"]
+
+    clock.now += 9
+    assert cache.get_or_compute("k", compute) == ["first"]
+    assert len(compute_calls) == 1
+
+    # ttl이 지나면 이전 결과를 바로 반환하고 refresh로 백그라운드 갱신
+    clock.now += 2
+    refresh, refresh_calls = _counting(["refreshed"])
+    assert cache.get_or_compute("k", compute, refresh) == ["first"]
+    _wait_until(lambda: cache.stats()["inflight"] == 0)
+    assert len(compute_calls) == 1
+    assert refresh_calls == ["recommendation-cache-refresh"]
+    assert cache.get_or_compute("k", compute) == ["refreshed"]
+
+    # 갱신 시각부터 ttl + stale_ttl이 지나면 요청 스레드에서 다시 계산
+    clock.now += 30
+    assert cache.get_or_compute("k", compute, refresh) == ["first"]
+    assert len(compute_calls) == 2 and len(refresh_calls) == 1
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (2, 1, 2)
+    assert stats["refreshes"] == 1
+
+
+def test_failed_refresh_keeps_the_stale_result():
+    clock = FakeClock()
+    cache = RecommendationCache(ttl=10, stale_ttl=20, clock=clock)
+    cache.get_or_compute("k", lambda: ["first"])
+    clock.now += 11
+
+    def refresh():
+        raise RuntimeError("token expired")
+
+    assert cache.get_or_compute("k", lambda: ["unused"], refresh) == ["first"]
+    _wait_until(lambda: cache.stats()["inflight"] == 0)
+    assert cache.stats()["refresh_errors"] == 1
+    assert cache.get_or_compute("k", lambda: ["unused"]) == ["first"]
+
+
+def test_concurrent_misses_compute_once():
+    cache = RecommendationCache(ttl=10, stale_ttl=20, clock=FakeClock())
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return ["shared"]
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute("k", compute))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: cache.stats()["waits"] == 7)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [["shared"]] * 8
+    assert cache.stats()["misses"] == 1
+
+
+def test_waiter_retries_after_the_leader_fails():
+    cache = RecommendationCache(ttl=10, stale_ttl=20, clock=FakeClock())
+    release = threading.Event()
+    leader_errors = []
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("spotify down")
+
+    def lead():
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute("k", failing)
+        leader_errors.append(True)
+
+    waiter_result = []
+    waiter_compute, waiter_calls = _counting(["retried"])
+    leader = threading.Thread(target=lead)
+    leader.start()
+    _wait_until(lambda: cache.stats()["inflight"] == 1)
+    waiter = threading.Thread(
+        target=lambda: waiter_result.append(cache.get_or_compute("k", waiter_compute))
+    )
+    waiter.start()
+    _wait_until(lambda: cache.stats()["waits"] == 1)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert leader_errors == [True]
+    assert waiter_result == [["retried"]]
+    assert len(waiter_calls) == 1
+    assert cache.get_or_compute("k", failing) == ["retried"]
+
+
+def test_empty_results_are_not_stored():
+    cache = RecommendationCache(ttl=10, stale_ttl=20, clock=FakeClock())
+    compute, calls = _counting([])
+    assert cache.get_or_compute("k", compute) == []
+    assert cache.get_or_compute("k", compute) == []
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = RecommendationCache(ttl=10, stale_ttl=20, max_entries=2, clock=FakeClock())
+    cache.get_or_compute("a", lambda: ["a"])
+    cache.get_or_compute("b", lambda: ["b"])
+    # a를 다시 사용했으므로 c를 넣으면 b가 빠짐
+    cache.get_or_compute("a", lambda: ["unused"])
+    cache.get_or_compute("c", lambda: ["c"])
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_compute("a", lambda: ["recomputed"]) == ["a"]
+    assert cache.get_or_compute("c", lambda: ["recomputed"]) == ["c"]
+    assert cache.get_or_compute("b", lambda: ["recomputed"]) == ["recomputed"]
@@ -0,0 +1,193 @@
+import threading
+import time
+
+from app.services.search_fanout import SearchFanout
+
+
+def _fake_search(results, delays):
+    """검색어별 결과를 정해진 시간 뒤에 반환하는 가짜 검색 함수"""
+
+    def search(query):
+        time.sleep(delays.get(query, 0.0))
+        return [{"id": track_id} for track_id in results[query]]
+
+    return search
+
+
+def _ids(tracks):
+    return [track["id"] for track in tracks]
+
+
+def test_results_merge_in_query_order_regardless_of_arrival():
+    queries = ["q0", "q1", "q2", "q3", "q4", "q5"]
+    results = {query: [f"{query}-a", f"{query}-b"] for query in queries}
+    results["q1"].append("q0-a")  # 중복은 먼저 나온 검색어 쪽에만 남음
+    fanout = SearchFanout(max_workers=6, max_parallel=6)
+    try:
+        # 뒤쪽 검색어가 먼저 도착하는 경우와 앞쪽이 먼저 도착하는 경우
+        late_first = {
+            query: 0.05 * (len(queries) - i) for i, query in enumerate(queries)
+        }
+        early_first = {query: 0.05 * i for i, query in enumerate(queries)}
+        outcomes = [
+            fanout.run(_fake_search(results, delays), queries, min_candidates=4)
+            for delays in (late_first, early_first)
+        ]
+    finally:
+        fanout.shutdown()
+
+    for tracks, reports in outcomes:
+        # 앞 두 검색어만으로 4개가 모이므로 항상 같은 후보에서 멈춤
+        assert _ids(tracks) == ["q0-a", "q0-b", "q1-a", "q1-b"]
+        assert [r["status"] for r in reports[:2]] == ["ok", "ok"]
+
+
+def test_parallel_searches_are_bounded():
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def search(query):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return [{"id": query}]
+
+    fanout = SearchFanout(max_workers=16, max_parallel=3)
+    try:
+        queries = [f"q{i}" for i in range(9)]
+        tracks, reports = fanout.run(search, queries, min_candidates=100)
+    finally:
+        fanout.shutdown()
+
+    # 스레드는 16개지만 요청 하나는 동시에 3개까지만 실행
+    assert peak[0] == 3
+    assert _ids(tracks) == queries
+    assert all(report["status"] == "ok" for report in reports)
+
+
+def test_early_stop_skips_queries_not_yet_started():
+    started = []
+
+    def search(query):
+        started.append(query)
+        return [{"id": f"{query}-{i}"} for i in range(3)]
+
+    fanout = SearchFanout(max_workers=4, max_parallel=1)
+    try:
+        queries = [f"q{i}" for i in range(5)]
+        tracks, reports = fanout.run(search, queries, min_candidates=5)
+    finally:
+        fanout.shutdown()
+
+    # 두 번째 검색어에서 6개가 모여 나머지는 실행하지 않음
+    assert started == ["q0", "q1"]
+    assert len(tracks) == 6
+    assert [r["status"] for r in reports] == ["ok", "ok"] + ["skipped"] * 3
+    assert reports[0]["tracks"] == 3
+    assert fanout.stats()["early_stops"] == 1
+
+
+def test_deadline_reports_running_searches_as_timeout():
+    release = threading.Event()
+    results = {"fast": ["a", "b"], "slow": ["c"], "later": ["d"]}
+
+    def search(query):
+        if query == "slow":
+            release.wait(5)
+        return [{"id": track_id} for track_id in results[query]]
+
+    fanout = SearchFanout(max_workers=2, max_parallel=2)
+    try:
+        started = time.monotonic()
+        tracks, reports = fanout.run(
+            search, ["slow", "fast", "later"], min_candidates=10, deadline=0.3
+        )
+        elapsed = time.monotonic() - started
+    finally:
+        release.set()
+        fanout.shutdown()
+
+    # 느린 검색을 기다리지 않고 제한 시간에 끝난 결과로 반환
+    assert elapsed < 2.0
+    assert [r["status"] for r in reports] == ["timeout", "ok", "ok"]
+    assert _ids(tracks) == ["a", "b", "d"]
+    stats = fanout.stats()
+    assert stats["deadline_hits"] == 1 and stats["timeout"] == 1
+
+
+def test_errors_are_reported_not_swallowed():
+    def search(query):
+        if query == "bad":
+            raise RuntimeError("429 Too Many Requests")
+        return [{"id": query}]
+
+    fanout = SearchFanout(max_workers=2, max_parallel=2)
+    try:
+        tracks, reports = fanout.run(search, ["bad", "good"], min_candidates=10)
+    finally:
+        fanout.shutdown()
+
+    assert _ids(tracks) == ["good"]
+    assert reports[0]["status"] == "error"
+    assert "429" in reports[0]["error"]
+    assert reports[1] == {
+        "query": "good",
+        "status": "ok",
+        "ms": reports[1]["ms"],
+        "tracks": 1,
+    }
+
+
+def test_stats_accumulate_across_requests():
+    def search(query):
+        if query.startswith("err"):
+            raise ValueError(query)
+        return [{"id": query}]
+
+    fanout = SearchFanout(max_workers=2, max_parallel=1, deadline=3.0)
+    try:
+        fanout.run(search, ["a", "err1", "b"], min_candidates=10)
+        fanout.run(search, ["c", "d", "e"], min_candidates=1)
+    finally:
+        fanout.shutdown()
+
+    stats = fanout.stats()
+    assert stats["requests"] == 2
+    assert stats["ok"] == 3  # a, b, c
+    assert stats["error"] == 1
+    assert stats["skipped"] == 2  # d, e
+    assert stats["early_stops"] == 1
+    assert stats["deadline_hits"] == stats["timeout"] == stats["cancelled"] == 0
+    assert stats["max_parallel"] == 1 and stats["deadline"] == 3.0
+    assert stats["avg_latency_ms"] is not None
+
+
+def test_running_search_is_cancelled_on_early_stop():
+    release = threading.Event()
+    slow_started = threading.Event()
+
+    def search(query):
+        if query == "slow":
+            slow_started.set()
+            release.wait(5)
+        else:
+            # 뒤 검색어가 실제로 실행 중일 때 끝남 (대기열에 있으면 skipped로 남음)
+            slow_started.wait(5)
+        return [{"id": query}]
+
+    fanout = SearchFanout(max_workers=2, max_parallel=2)
+    try:
+        tracks, reports = fanout.run(search, ["fast", "slow"], min_candidates=1)
+    finally:
+        release.set()
+        fanout.shutdown()
+
+    # 앞 검색어만으로 충분하면 실행 중인 뒤 검색어는 기다리지 않음
+    assert _ids(tracks) == ["fast"]
+    assert [r["status"] for r in reports] == ["ok", "cancelled"]
+    stats = fanout.stats()
+    assert stats["early_stops"] == 1 and stats["cancelled"] == 1
@@ -0,0 +1,72 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from app.services.audio_feature_graph import AudioFeatureGraph
+from app.services.streaming_features import StreamingFeatureAccumulator
+from tests.test_audio_feature_graph import SR, _bursts, _chord
+
+
+def _stream(y: np.ndarray, block: int = SR) -> StreamingFeatureAccumulator:
+    accumulator = StreamingFeatureAccumulator(SR)
+    for start in range(0, len(y), block):
+        accumulator.update(y[start : start + block])
+    accumulator.finish()
+    return accumulator
+
+
+def test_streaming_matches_whole_signal_graph():
+    # 템포(버스트)와 조성(C 장3화음)이 모두 드러나는 40초 신호
+    y = _bursts(120, 40.0) + _chord([60, 64, 67], 40.0, amplitude=0.3)
+    graph = AudioFeatureGraph(y, SR)
+    accumulator = _stream(y)
+
+    assert accumulator.duration == pytest.approx(graph.duration)
+    # center=False 프레이밍 차이로 가장자리 프레임만 달라짐
+    assert accumulator.rms_mean == pytest.approx(graph.rms_mean, rel=0.01)
+    assert accumulator.spectral_centroid_mean == pytest.approx(
+        graph.spectral_centroid_mean, rel=0.01
+    )
+    np.testing.assert_allclose(accumulator.chroma_mean, graph.chroma_mean, atol=0.01)
+    assert accumulator.key_mode[:2] == graph.key_mode[:2]
+    assert accumulator.tempo == pytest.approx(graph.tempo, rel=0.05)
+    assert accumulator.tempo == pytest.approx(120, rel=0.05)
+
+
+def test_block_size_does_not_change_result():
+    y = _bursts(100, 30.0)
+    small = _stream(y, block=4096)
+    large = _stream(y, block=SR * 5)
+
+    assert small.rms_mean == pytest.approx(large.rms_mean, rel=1e-4)
+    assert small.spectral_centroid_mean == pytest.approx(
+        large.spectral_centroid_mean, rel=1e-4
+    )
+    assert small.tempo == pytest.approx(large.tempo)
+
+
+def _peak_memory(repeats: int) -> int:
+    """10초 블록을 repeats번 흘려 넣는 동안 추가로 할당된 최대 메모리 (바이트)"""
+    block = _bursts(120, 10.0)
+    accumulator = StreamingFeatureAccumulator(SR)
+    # 튜닝 추정 등 첫 블록에서 한 번만 하는 할당은 측정에서 제외
+    accumulator.update(block[:SR])
+
+    tracemalloc.start()
+    try:
+        for _ in range(repeats):
+            for start in range(0, len(block), SR):
+                accumulator.update(block[start : start + SR])
+        accumulator.finish()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_stays_flat_as_input_grows():
+    short = _peak_memory(3)  # 30초
+    long = _peak_memory(24)  # 240초
+
+    # 입력이 8배여도 최대 메모리는 블록 크기로 정해짐
+    assert long < short * 1.2
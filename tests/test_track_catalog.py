@@ -0,0 +1,131 @@
+import pytest
+
+from app.services.spotify_service import SpotifyService
+from app.services.track_catalog import CATALOG_FEATURES, TrackCatalog, build_catalog
+from benchmarks.ann_recall import synthetic_rows
+
+TRACKS = 400
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog_dir = str(tmp_path / "catalog")
+    build_catalog(catalog_dir, synthetic_rows(TRACKS))
+    catalog = TrackCatalog(catalog_dir, nprobe=0)
+    assert catalog.available and catalog.track_count == TRACKS
+    return catalog
+
+
+@pytest.fixture
+def spotify_service():
+    # 유사도 계산만 쓰므로 Spotify 설정 없이 생성
+    return SpotifyService()
+
+
+def _all_rows(catalog):
+    return [
+        (
+            catalog._row_id(row),
+            dict(zip(CATALOG_FEATURES, catalog._row_vector(row).tolist())),
+        )
+        for row in range(catalog.track_count)
+    ]
+
+
+def _expected_ranking(
+    catalog, spotify_service, target, k, exclude=(), max_instrumentalness=None
+):
+    scored = [
+        (spotify_service.calculate_similarity(target, features), track_id)
+        for track_id, features in _all_rows(catalog)
+        if track_id not in exclude
+        and (
+            max_instrumentalness is None
+            or features["instrumentalness"] <= max_instrumentalness
+        )
+    ]
+    scored.sort(key=lambda item: -item[0])
+    return scored[:k]
+
+
+TARGETS = [
+    # 모든 특성
+    {
+        "danceability": 0.7,
+        "energy": 0.6,
+        "valence": 0.4,
+        "tempo": 124.0,
+        "acousticness": 0.2,
+        "instrumentalness": 0.1,
+        "speechiness": 0.05,
+        "liveness": 0.15,
+    },
+    # 템포 차이가 200 BPM을 넘어 상한(유사도 0)에 걸림
+    {"danceability": 0.5, "energy": 0.5, "valence": 0.5, "tempo": 420.0},
+    # 목표에 없는 특성은 가중치 합에서 빠짐
+    {"energy": 0.9, "valence": 0.2},
+    {"tempo": 90.0, "acousticness": 0.8, "liveness": None},
+]
+
+
+@pytest.mark.parametrize("target", TARGETS)
+def test_search_scores_match_calculate_similarity(catalog, spotify_service, target):
+    found = catalog.search(target, k=10)
+
+    for track in found:
+        assert track["similarity"] == pytest.approx(
+            spotify_service.calculate_similarity(target, track["audio_features"]),
+            abs=1e-3,
+        )
+    expected = _expected_ranking(catalog, spotify_service, target, 10)
+    assert [track["similarity"] for track in found] == pytest.approx(
+        [score for score, _ in expected], abs=1e-3
+    )
+
+
+def test_search_respects_exclude_ids_and_max_instrumentalness(catalog, spotify_service):
+    target = TARGETS[0]
+    best = catalog.search(target, k=3)
+    exclude = [track["id"] for track in best]
+
+    found = catalog.search(target, k=10, exclude_ids=exclude, max_instrumentalness=0.3)
+
+    assert not set(exclude) & {track["id"] for track in found}
+    assert all(
+        track["audio_features"]["instrumentalness"] <= 0.3 + 1e-6 for track in found
+    )
+    expected = _expected_ranking(
+        catalog, spotify_service, target, 10, exclude=exclude, max_instrumentalness=0.3
+    )
+    assert [track["id"] for track in found] == [track_id for _, track_id in expected]
+
+
+def test_added_tracks_are_visible_to_open_catalogs(catalog):
+    # 다른 프로세스처럼 이미 카탈로그를 열어 검색하던 인스턴스
+    other = TrackCatalog(catalog.catalog_dir, nprobe=0)
+    target = TARGETS[0]
+    before = other.search(target, k=1)
+    assert before and before[0]["similarity"] < 100.0
+
+    added = (
+        "new0000000000000000000",
+        dict(target),
+        {"name": "New", "artists": ["Added"]},
+    )
+    assert catalog.add_tracks([added]) == 1
+
+    for instance in (catalog, other):
+        found = instance.search(target, k=1)
+        assert found[0]["id"] == added[0]
+        assert found[0]["name"] == "New"
+        assert found[0]["similarity"] == pytest.approx(100.0, abs=1e-3)
+        assert instance.track_count == TRACKS + 1
+        # 빌드 후 추가된 곡도 제외 목록과 필터가 똑같이 적용됨
+        assert added[0] not in [
+            track["id"]
+            for track in instance.search(target, k=5, exclude_ids=[added[0]])
+        ]
+        assert added[0] not in [
+            track["id"]
+            for track in instance.search(target, k=5, max_instrumentalness=0.05)
+        ]
@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile as StarletteUploadFile
+
+from app.services.audio_analyzer_simple import AudioAnalyzer
+from app.services.audio_decoders import DecoderUnavailableError
+from app.services.upload_ingest import (
+    UploadSizeLimitMiddleware,
+    UploadTooLargeError,
+    decode_spooled_upload,
+    ingest_upload,
+    spool_upload,
+)
+from tests.test_audio_feature_graph import _chord
+
+
+def _wav_bytes(sr: int, seconds: float) -> bytes:
+    buffer = io.BytesIO()
+    y = _chord([60, 64, 67], duration=seconds)
+    sf.write(buffer, y, sr, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def test_fallback_decodes_from_spooled_file_not_memory(monkeypatch):
+    analyzer = AudioAnalyzer()
+    data = _wav_bytes(22050, 2.0)
+
+    def no_stream():
+        raise DecoderUnavailableError("ffmpeg 없음")
+
+    def no_bytes(*args, **kwargs):
+        raise AssertionError("업로드 전체를 메모리로 읽으면 안 됨")
+
+    # 스트림 디코더가 없는 환경과 같은 대체 경로로 보냄
+    monkeypatch.setattr(analyzer, "open_pcm_stream", no_stream)
+    monkeypatch.setattr(analyzer, "load_audio_bytes", no_bytes)
+
+    upload = StarletteUploadFile(file=io.BytesIO(data), size=len(data))
+    result = asyncio.run(
+        ingest_upload(upload, analyzer, max_bytes=len(data), chunk_size=4096)
+    )
+
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert result.size == len(data)
+    assert result.audio_format == "wav"
+    assert result.sr == analyzer.sample_rate
+    assert len(result.y) == pytest.approx(2.0 * analyzer.sample_rate, abs=1)
+
+
+def _limited_app(max_bytes: int):
+    received = []
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, limits={"/upload": max_bytes})
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {"size": received[-1]}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return TestClient(app), received
+
+
+def test_size_limit_rejects_by_content_length():
+    client, received = _limited_app(16 * 1024)
+
+    response = client.post("/upload", files={"file": ("a.wav", b"x" * 64 * 1024)})
+
+    assert response.status_code == 413
+    assert received == []
+    # 다른 경로는 제한하지 않음
+    assert client.post("/other", files={"file": ("a.wav", b"x" * 64 * 1024)}).json()[
+        "size"
+    ] == (64 * 1024)
+
+
+def test_size_limit_stops_streamed_body_without_content_length():
+    client, received = _limited_app(16 * 1024)
+    boundary = "limit-test"
+    head = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="a.wav"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+
+    def body():
+        yield head
+        for _ in range(64):
+            yield b"x" * 4096
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/upload",
+        content=body(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_size_limit_allows_upload_within_limit():
+    client, received = _limited_app(16 * 1024)
+
+    response = client.post("/upload", files={"file": ("a.wav", b"x" * 8 * 1024)})
+
+    assert response.status_code == 200
+    assert received == [8 * 1024]
+
+
+def test_spool_upload_defers_decoding_until_the_job_runs(monkeypatch):
+    analyzer = AudioAnalyzer()
+    data = _wav_bytes(22050, 2.0)
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("요청 안에서는 디코딩하지 않아야 함")
+
+    monkeypatch.setattr(analyzer, "open_pcm_stream", no_decode)
+    monkeypatch.setattr(analyzer, "load_audio_file", no_decode)
+    upload = asyncio.run(
+        spool_upload(
+            StarletteUploadFile(file=io.BytesIO(data)),
+            analyzer,
+            max_bytes=len(data),
+            lookup=lambda sha256: None,
+        )
+    )
+
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert upload.y is None and upload.pending_decode
+    path = upload.audio_path
+    assert os.path.exists(path)
+
+    monkeypatch.undo()
+    asyncio.run(decode_spooled_upload(upload, analyzer))
+
+    assert len(upload.y) == pytest.approx(2.0 * analyzer.sample_rate, abs=1)
+    assert not upload.pending_decode and upload.audio_path is None
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize("analysis_window", ["prefix", "full"])
+def test_spool_upload_cache_hit_and_full_window(analysis_window):
+    analyzer = AudioAnalyzer()
+    data = _wav_bytes(22050, 1.0)
+    cached = {"audio_features": {}}
+
+    hit = asyncio.run(
+        spool_upload(
+            StarletteUploadFile(file=io.BytesIO(data)),
+            analyzer,
+            max_bytes=len(data),
+            lookup=lambda sha256: cached,
+            analysis_window=analysis_window,
+        )
+    )
+    assert hit.cached is cached
+    assert hit.audio_path is None and not hit.pending_decode
+
+    miss = asyncio.run(
+        spool_upload(
+            StarletteUploadFile(file=io.BytesIO(data)),
+            analyzer,
+            max_bytes=len(data),
+            analysis_window=analysis_window,
+        )
+    )
+    try:
+        # full은 분석 워커가 파일에서 직접 디코딩하므로 미뤄 둘 디코딩이 없음
+        assert miss.pending_decode == (analysis_window != "full")
+        assert os.path.exists(miss.audio_path)
+    finally:
+        miss.close()
+
+
+def test_spool_upload_enforces_size_limit():
+    data = _wav_bytes(22050, 1.0)
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(
+            spool_upload(
+                StarletteUploadFile(file=io.BytesIO(data)),
+                AudioAnalyzer(),
+                max_bytes=len(data) // 2,
+                chunk_size=1024,
+            )
+        )